@@ -24,6 +24,35 @@ CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default=','.join(default_c
 
 # Fuzzy matching settings
 NICKNAME_MAPPINGS_FILE = os.path.join(BASE_DIR, 'nickname_mappings.json')
+# Seconds between checks of the nickname mappings file for changes to reload
+NICKNAME_MAPPINGS_RELOAD_SECONDS = config('NICKNAME_MAPPINGS_RELOAD_SECONDS', default=5, cast=int)
+# Name similarity scorer of core.fuzzy_matching: 'difflib' (SequenceMatcher), 'indel' or 'jaro_winkler'
+FUZZY_MATCH_SCORER = config('FUZZY_MATCH_SCORER', default='difflib')
+# Duplicate scan: neighbours compared in each sorted pass, and the largest blocking
+# key group compared pairwise (larger groups are compared within the window)
+DUPLICATE_SCAN_WINDOW = config('DUPLICATE_SCAN_WINDOW', default=10, cast=int)
+DUPLICATE_SCAN_MAX_BLOCK = config('DUPLICATE_SCAN_MAX_BLOCK', default=200, cast=int)
+
+# Background jobs
+# Client uploads are sent to Celery when a broker is configured, otherwise they
+# run on an in-process thread pool of CLIENT_UPLOAD_WORKERS threads
+CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='')
+CELERY_TASK_ACKS_LATE = True
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CLIENT_UPLOAD_BACKGROUND = config('CLIENT_UPLOAD_BACKGROUND', default=True, cast=bool)
+CLIENT_UPLOAD_WORKERS = config('CLIENT_UPLOAD_WORKERS', default=2, cast=int)
+# 'staging' imports plain client files on PostgreSQL through a COPY-loaded staging
+# table and set-based SQL (clients.upload_staging); 'python' uses the chunk loop only
+CLIENT_UPLOAD_ENGINE = config('CLIENT_UPLOAD_ENGINE', default='python')
+# Commit each chunk of an upload in its own transaction and record a checkpoint so a
+# failed import can be resumed; uploads can also opt in with commit_mode=chunk
+CLIENT_UPLOAD_COMMIT_PER_CHUNK = config('CLIENT_UPLOAD_COMMIT_PER_CHUNK', default=False, cast=bool)
+# Skip rows whose content hash matches the last import of the same (source, client_id)
+CLIENT_UPLOAD_SKIP_UNCHANGED = config('CLIENT_UPLOAD_SKIP_UNCHANGED', default=True, cast=bool)
+# Worker processes that parse upload rows ahead of matching; 0 uses one less than the CPU count
+CLIENT_UPLOAD_PARSE_WORKERS = config('CLIENT_UPLOAD_PARSE_WORKERS', default=0, cast=int)
+# Uploads of the same source that may run at once (0 = no limit); later ones wait in the queue
+CLIENT_UPLOAD_SOURCE_CONCURRENCY = config('CLIENT_UPLOAD_SOURCE_CONCURRENCY', default=1, cast=int)
 
 
 # Application definition
@@ -35,6 +64,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework_simplejwt',
     'django_extensions',
@@ -93,6 +123,13 @@ DATABASES = {
     }
 }
 
+# Second connection to the same database, used to publish upload progress
+# while the import itself is still inside a transaction on 'default'
+DATABASES['progress'] = {
+    **DATABASES['default'],
+    'TEST': {'MIRROR': 'default'},
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
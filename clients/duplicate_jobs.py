@@ -0,0 +1,694 @@
+"""
+Background duplicate scans.
+
+run_duplicate_scan queues a DuplicateScanJob and returns straight away. The
+scan runs on a Celery worker when CELERY_BROKER_URL is set, otherwise on an
+in-process thread, as client uploads do (upload_jobs). The dedupe page polls
+duplicate_scan_status for the job's phase and, once it has finished, its result.
+
+A scan goes through PHASES in order. Each detection phase saves the pairs it
+finds as DuplicateScanCandidate rows while it runs and is added to
+completed_phases when it ends; the merge phase then auto-merges or flags each
+saved candidate and records its outcome. A job whose worker died (no heartbeat
+for STALE_AFTER) is picked up again by resume_if_stale: finished phases are
+skipped, pairs already saved are not saved twice and handled candidates are
+not handled again. A job that failed with an error can be resumed the same way
+with resume_failed_scan.
+
+The incremental mode and the high-water mark are those of the synchronous
+scan: only clients updated since DuplicateScanState.scanned_through are
+compared with the rest, unless the job was started as a full rescan.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import Count, F, Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Lower, Trim
+from django.urls import reverse
+from django.utils import timezone
+
+from core.fuzzy_matching import fuzzy_matcher
+from core.models import Client, ClientDuplicate, DuplicateScanCandidate, DuplicateScanJob, DuplicateScanState
+
+from .duplicate_scan import (
+    changed_since, find_fuzzy_duplicates, load_incremental_scan_clients, load_scan_clients, scan_scope,
+)
+
+logger = logging.getLogger(__name__)
+
+PHASES = (
+    ('external_id', 'External ID'),
+    ('client_id', 'Client ID'),
+    ('email', 'Email'),
+    ('phone', 'Phone'),
+    ('name_dob', 'Name and date of birth'),
+    ('fuzzy', 'Similar names'),
+    ('merge', 'Merging and flagging'),
+)
+PHASE_LABELS = dict(PHASES)
+FINISHED_STATUSES = ('success', 'failed')
+# A running job without a heartbeat for this long has lost its worker
+STALE_AFTER = timedelta(minutes=10)
+# Candidates saved per insert
+CANDIDATE_BATCH_SIZE = 200
+# Seconds between heartbeats while a phase runs
+HEARTBEAT_SECONDS = 30
+# Clients read between heartbeat checks in the contact phases
+HEARTBEAT_EVERY_CLIENTS = 1000
+
+# Match types merged whatever their score
+EXACT_MATCH_TYPES = (
+    'matching_email', 'exact_email', 'matching_phone', 'exact_phone',
+    'email_phone', 'name_dob_match', 'matching_name_dob',
+    'matching_client_id', 'matching_external_id', 'matching_uid_external',
+)
+AUTO_MERGE_CONFIDENCE_THRESHOLD = 'high'
+AUTO_MERGE_SIMILARITY_THRESHOLD = 0.9
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def start_duplicate_scan(include_archived=False, source=None, full_rescan=False, auto_merge=True,
+                         result_limit=10, candidate_limit=10000, requested_by=None):
+    """
+    Queue a scan of the clients in scope, or return the unfinished job already
+    scanning them (resumed if its worker died). Returns (job, created).
+    """
+    scope = scan_scope(include_archived, source)
+    active = DuplicateScanJob.objects.filter(scope=scope, status__in=('queued', 'running')).first()
+    if active:
+        resume_if_stale(active)
+        return active, False
+
+    scan_state = None if full_rescan else DuplicateScanState.objects.filter(scope=scope).first()
+    job = DuplicateScanJob.objects.create(
+        scope=scope,
+        include_archived=include_archived,
+        source=source,
+        scan_mode='incremental' if scan_state else 'full',
+        changed_since=scan_state.scanned_through if scan_state else None,
+        auto_merge=auto_merge,
+        result_limit=result_limit,
+        candidate_limit=candidate_limit,
+        requested_by=requested_by,
+    )
+    _submit(job.external_id)
+    return job, True
+
+
+def is_stale(job):
+    """A running job whose worker has stopped reporting, or a queued one nobody picked up"""
+    last_seen = job.heartbeat_at or job.created_at
+    return job.status in ('queued', 'running') and last_seen < timezone.now() - STALE_AFTER
+
+
+def resume_if_stale(job):
+    """Dispatch a stale job again; it carries on from its first unfinished phase. Returns whether it was."""
+    if not is_stale(job):
+        return False
+    logger.info(f"Duplicate scan {job.external_id} stalled in phase {job.phase or 'none'}; resuming")
+    _submit(job.external_id)
+    return True
+
+
+def resume_failed_scan(job):
+    """Queue a failed job again from its first unfinished phase. Returns False unless it had failed."""
+    if not DuplicateScanJob.objects.filter(pk=job.pk, status='failed').update(
+        status='queued', completed_at=None, error_message=None,
+    ):
+        return False
+    job.refresh_from_db()
+    _submit(job.external_id)
+    return True
+
+
+def job_progress(job):
+    """Phase progress of a job, as reported to the dedupe page"""
+    phase_keys = [key for key, _ in PHASES]
+    progress = {
+        'status': job.status,
+        'phase': job.phase,
+        'phase_label': PHASE_LABELS.get(job.phase, ''),
+        'phase_number': phase_keys.index(job.phase) + 1 if job.phase in phase_keys else 0,
+        'phase_count': len(PHASES),
+        'completed_phases': job.completed_phases,
+        'phase_candidates': job.phase_candidates,
+        'candidates': sum(job.phase_candidates.values()),
+        'clients_scanned': job.clients_scanned,
+    }
+    if job.phase == 'merge' or 'merge' in job.completed_phases:
+        outcomes = dict(job.candidates.values_list('outcome').annotate(count=Count('id')))
+        progress['processed'] = sum(count for outcome, count in outcomes.items() if outcome != 'pending')
+        progress['total'] = sum(outcomes.values())
+    return progress
+
+
+def job_result(job):
+    """The response the synchronous scan used to return, built from a finished job"""
+    candidates = job.candidates.order_by('-similarity_score', 'id')
+    if job.result_limit:
+        candidates = candidates[:job.result_limit]
+    results = [candidate.details for candidate in candidates]
+
+    message_parts = []
+    if job.scan_mode == 'incremental':
+        message_parts.append(f'Checked {job.clients_scanned} client(s) changed since the last scan')
+    if job.merged_count > 0:
+        message_parts.append(f'Auto-merged {job.merged_count} high-confidence duplicate(s)')
+    if job.flagged_count > 0:
+        message_parts.append(f'Flagged {job.flagged_count} duplicate(s) for manual review')
+    if job.skipped_count > 0:
+        message_parts.append(f'Skipped {job.skipped_count} existing record(s)')
+
+    return {
+        'success': job.status == 'success',
+        'results': results,
+        'count': len(results),
+        'merged_count': job.merged_count,
+        'flagged_count': job.flagged_count,
+        'skipped_count': job.skipped_count,
+        'errors': job.errors or None,
+        'merge_errors': job.merge_errors or None,
+        'limit': job.result_limit,
+        'scan_limit': job.candidate_limit,
+        'auto_merge_mode': job.auto_merge,
+        'include_archived': job.include_archived,
+        'source': job.source,
+        'scan_mode': job.scan_mode,
+        'clients_scanned': job.clients_scanned,
+        'message': 'Scan completed. ' + ', '.join(message_parts) + '.',
+    }
+
+
+def run_duplicate_scan_job(job_id):
+    """
+    Run a queued job, or carry on with a stale one. Safe to call more than once
+    for the same job: a job another worker is running is left alone.
+    """
+    job = DuplicateScanJob.objects.filter(external_id=job_id).first()
+    if not job:
+        logger.error(f"Duplicate scan job {job_id} does not exist")
+        return
+    now = timezone.now()
+    # Claimed with a conditional update so two workers never run the same job
+    claimable = Q(status='queued') | Q(status='running', heartbeat_at__lt=now - STALE_AFTER)
+    if not DuplicateScanJob.objects.filter(claimable, pk=job.pk).update(status='running', heartbeat_at=now):
+        logger.info(f"Duplicate scan job {job_id} skipped - status is {job.status}")
+        return
+    job.refresh_from_db()
+    if not job.started_at:
+        job.started_at = now
+        job.save(update_fields=['started_at'])
+
+    try:
+        DuplicateScan(job).run()
+    except Exception as e:
+        logger.error(f"Duplicate scan job {job_id} failed: {e}", exc_info=True)
+        DuplicateScanJob.objects.filter(pk=job.pk).update(
+            status='failed', completed_at=timezone.now(), error_message=str(e),
+        )
+
+
+class DuplicateScan:
+    """The phases of one job, reading and saving its progress"""
+
+    def __init__(self, job):
+        self.job = job
+        clients_qs = Client.objects.all()
+        if not job.include_archived:
+            clients_qs = clients_qs.filter(is_archived=False)
+        if job.source:
+            clients_qs = clients_qs.filter(source=job.source)
+        self.clients_qs = clients_qs.only(
+            'id', 'external_id', 'first_name', 'last_name', 'client_id', 'source',
+            'email', 'phone', 'contact_information', 'dob', 'is_archived', 'is_inactive', 'created_at'
+        )
+
+        # None for a full scan, else the ids of the clients to compare
+        self.changed_ids = None
+        if job.changed_since:
+            self.changed_ids = set(changed_since(self.clients_qs, job.changed_since).values_list('id', flat=True))
+        self.changed_clients_qs = self.clients_qs.filter(id__in=self.changed_ids or [])
+
+        # Track already flagged duplicates to avoid returning them again
+        existing_duplicates = ClientDuplicate.objects.all()
+        if self.changed_ids is not None:
+            existing_duplicates = existing_duplicates.filter(
+                Q(primary_client_id__in=self.changed_ids) | Q(duplicate_client_id__in=self.changed_ids)
+            )
+        self.existing_pairs = {
+            tuple(sorted(pair))
+            for pair in existing_duplicates.values_list('primary_client_id', 'duplicate_client_id')
+        }
+        # Pairs this job saved before a restart count as seen
+        self.seen_pairs = {
+            tuple(sorted(pair))
+            for pair in job.candidates.values_list('primary_client_id', 'duplicate_client_id')
+        }
+        self.candidate_count = len(self.seen_pairs)
+        self.pending = []
+        self.last_heartbeat = timezone.now()
+
+    def run(self):
+        job = self.job
+        job.clients_scanned = len(self.changed_ids) if self.changed_ids is not None else self.clients_qs.count()
+        job.save(update_fields=['clients_scanned'])
+
+        for phase, _ in PHASES:
+            if phase in job.completed_phases:
+                continue
+            job.phase = phase
+            DuplicateScanJob.objects.filter(pk=job.pk).update(phase=phase, heartbeat_at=timezone.now())
+            if phase == 'merge':
+                self.merge_candidates()
+            elif self.changed_ids != set() and not self.is_full():
+                getattr(self, f'scan_{phase}')()
+                self.flush()
+            job.completed_phases = job.completed_phases + [phase]
+            DuplicateScanJob.objects.filter(pk=job.pk).update(
+                completed_phases=job.completed_phases, heartbeat_at=timezone.now(),
+            )
+
+        # Move the high-water mark only when every candidate was found; a scan
+        # stopped at candidate_limit leaves its clients for the next scan
+        if self.candidate_count < job.candidate_limit:
+            state_defaults = {
+                'scanned_through': job.created_at,
+                'last_scan_mode': job.scan_mode,
+                'clients_scanned': job.clients_scanned,
+            }
+            if job.scan_mode == 'full':
+                state_defaults['last_full_scan_at'] = job.created_at
+            DuplicateScanState.objects.update_or_create(scope=job.scope, defaults=state_defaults)
+
+        job.status = 'success'
+        job.phase = ''
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'phase', 'completed_at'])
+
+    def is_full(self):
+        return self.candidate_count >= self.job.candidate_limit
+
+    def heartbeat(self):
+        now = timezone.now()
+        if (now - self.last_heartbeat).total_seconds() >= HEARTBEAT_SECONDS:
+            DuplicateScanJob.objects.filter(pk=self.job.pk).update(heartbeat_at=now)
+            self.last_heartbeat = now
+
+    # Candidates
+
+    def add_candidate(self, client_a, client_b, match_type, reason, score):
+        if not client_a or not client_b or client_a.id == client_b.id:
+            return
+
+        pair_key = tuple(sorted([client_a.id, client_b.id]))
+        if pair_key in self.seen_pairs or pair_key in self.existing_pairs:
+            return
+        # Pairs of unchanged clients were compared by an earlier scan
+        if self.changed_ids is not None and client_a.id not in self.changed_ids and client_b.id not in self.changed_ids:
+            return
+
+        # Determine which client should be treated as the primary candidate (oldest record wins)
+        primary, duplicate = client_a, client_b
+        if client_a.created_at and client_b.created_at:
+            if client_b.created_at < client_a.created_at:
+                primary, duplicate = client_b, client_a
+        elif client_b.id < client_a.id:
+            primary, duplicate = client_b, client_a
+
+        self.seen_pairs.add(pair_key)
+        self.candidate_count += 1
+        score = round(float(score), 3)
+        self.pending.append(DuplicateScanCandidate(
+            job=self.job,
+            primary_client_id=primary.id,
+            duplicate_client_id=duplicate.id,
+            phase=self.job.phase,
+            similarity_score=score,
+            details={
+                'primary_client': serialize_scan_client(primary),
+                'duplicate_client': serialize_scan_client(duplicate),
+                'match_type': match_type,
+                'reason': reason,
+                'similarity_score': score,
+                'confidence_level': fuzzy_matcher.get_duplicate_confidence_level(score),
+            },
+        ))
+        if len(self.pending) >= CANDIDATE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Save the pending candidates and the phase's running count"""
+        job = self.job
+        if self.pending:
+            DuplicateScanCandidate.objects.bulk_create(self.pending, ignore_conflicts=True)
+            self.pending = []
+        job.phase_candidates = {
+            **job.phase_candidates,
+            job.phase: job.candidates.filter(phase=job.phase).count(),
+        }
+        DuplicateScanJob.objects.filter(pk=job.pk).update(
+            phase_candidates=job.phase_candidates, heartbeat_at=timezone.now(),
+        )
+        self.last_heartbeat = timezone.now()
+
+    def add_group(self, group_clients, reason, match_type, score):
+        """Candidates pairing the first (oldest) client of a group with each of the others"""
+        if len(group_clients) < 2:
+            return
+        primary_candidate = group_clients[0]
+        for duplicate_candidate in group_clients[1:]:
+            self.add_candidate(primary_candidate, duplicate_candidate, match_type, reason, score)
+            if self.is_full():
+                break
+        self.heartbeat()
+
+    # Detection phases
+
+    def sharing_values_with_changed(self, queryset, *fields):
+        """In an incremental scan, the clients of queryset with a value of each field that a changed client has"""
+        if self.changed_ids is None:
+            return queryset
+        return queryset.filter(**{f'{field}__in': self.changed_clients_qs.values(field) for field in fields})
+
+    def sharing_contact_with_changed(self, queryset, field, normalize):
+        """
+        In an incremental scan, the clients of queryset whose field or
+        contact_information[field], normalized, a changed client also has
+        """
+        if self.changed_ids is None:
+            return queryset
+        keys = {
+            'field_key': normalize(Trim(field)),
+            'contact_key': normalize(Trim(KeyTextTransform(field, 'contact_information'))),
+        }
+        changed_values = {
+            value
+            for values in self.changed_clients_qs.annotate(**keys).values_list('field_key', 'contact_key')
+            for value in values if value
+        }
+        return queryset.annotate(**keys).filter(Q(field_key__in=changed_values) | Q(contact_key__in=changed_values))
+
+    def scan_external_id(self):
+        """Exact External ID (uid_external) matches - highest priority for auto-merge"""
+        external_id_groups = (
+            self.sharing_values_with_changed(self.clients_qs, 'uid_external')
+            .filter(uid_external__isnull=False)
+            .exclude(uid_external__exact='')
+            .values('uid_external')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+            .order_by('-count', 'uid_external')[:self.job.candidate_limit * 5]
+        )
+        for group in external_id_groups:
+            group_clients = list(self.clients_qs.filter(uid_external=group['uid_external']).order_by('created_at', 'id'))
+            self.add_group(group_clients, f"Matching external ID {group['uid_external']}", 'matching_external_id', 1.0)
+            if self.is_full():
+                break
+
+    def scan_client_id(self):
+        """Exact Client ID + Source matches"""
+        id_groups = (
+            self.sharing_values_with_changed(self.clients_qs, 'source', 'client_id')
+            .filter(client_id__isnull=False)
+            .exclude(client_id__exact='')
+            .values('source', 'client_id')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+            .order_by('-count', 'client_id')[:self.job.candidate_limit * 5]
+        )
+        for group in id_groups:
+            group_clients = list(
+                self.clients_qs.filter(source=group['source'], client_id=group['client_id']).order_by('created_at', 'id')
+            )
+            reason = f"Matching {group['source'] or 'source'} client ID {group['client_id']}"
+            self.add_group(group_clients, reason, 'matching_client_id', 1.0)
+            if self.is_full():
+                break
+
+    def _scan_contact(self, field, lowercase, match_type, label, score):
+        """
+        Exact matches of a contact field, checked in both the field and
+        contact_information JSON and compared stripped (and lowercased)
+        """
+        contact_clients = self.clients_qs.filter(
+            Q(**{f'{field}__isnull': False}) & ~Q(**{f'{field}__exact': ''}) |
+            Q(**{f'contact_information__{field}__isnull': False}) & ~Q(**{f'contact_information__{field}__exact': ''})
+        )
+        contact_clients = self.sharing_contact_with_changed(
+            contact_clients, field, Lower if lowercase else lambda expression: expression
+        )
+
+        groups = {}
+        for count, client in enumerate(contact_clients.iterator(chunk_size=2000), 1):
+            if count % HEARTBEAT_EVERY_CLIENTS == 0:
+                self.heartbeat()
+            # Check the field first, then fall back to contact_information
+            value = getattr(client, field)
+            if not value or value.strip() == '':
+                value = client.contact_information.get(field, '') if client.contact_information else ''
+            if value and value.strip():
+                key = value.strip().lower() if lowercase else value.strip()
+                groups.setdefault(key, []).append(client)
+
+        for key, group_clients in groups.items():
+            if len(group_clients) < 2:
+                continue
+            # Sort by created_at to ensure consistent primary/duplicate assignment
+            group_clients.sort(key=lambda c: (c.created_at or timezone.now(), c.id))
+            self.add_group(group_clients, f"{label} {key}", match_type, score)
+            if self.is_full():
+                break
+
+    def scan_email(self):
+        self._scan_contact('email', True, 'matching_email', 'Matching email address', 0.99)
+
+    def scan_phone(self):
+        self._scan_contact('phone', False, 'matching_phone', 'Matching phone number', 0.96)
+
+    def scan_name_dob(self):
+        """Exact Name + DOB matches"""
+        name_dob_groups = (
+            self.sharing_values_with_changed(self.clients_qs, 'dob', 'first_name', 'last_name')
+            .filter(dob__isnull=False)
+            .exclude(first_name__isnull=True)
+            .exclude(last_name__isnull=True)
+            .exclude(first_name__exact='')
+            .exclude(last_name__exact='')
+            .values('first_name', 'last_name', 'dob')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+            .order_by('-count', 'first_name', 'last_name')[:self.job.candidate_limit * 5]
+        )
+        for group in name_dob_groups:
+            group_clients = list(
+                self.clients_qs.filter(
+                    first_name=group['first_name'], last_name=group['last_name'], dob=group['dob'],
+                ).order_by('created_at', 'id')
+            )
+            reason = (
+                f"Matching name and date of birth "
+                f"({group['first_name']} {group['last_name']}, {group['dob']})"
+            )
+            self.add_group(group_clients, reason, 'matching_name_dob', 0.92)
+            if self.is_full():
+                break
+
+    def scan_fuzzy(self):
+        """Fuzzy name matches, compared within blocking keys and sorted-name windows (clients.duplicate_scan)"""
+        if self.changed_ids is None:
+            scan_clients = load_scan_clients(self.clients_qs)
+        else:
+            scan_clients = load_incremental_scan_clients(self.clients_qs, self.changed_ids)
+
+        matches = []
+        for scan_a, scan_b, match_type, reason, similarity in find_fuzzy_duplicates(
+            scan_clients, changed_ids=self.changed_ids, progress=self.heartbeat,
+        ):
+            self.heartbeat()
+            pair_key = tuple(sorted([scan_a.id, scan_b.id]))
+            if pair_key in self.seen_pairs or pair_key in self.existing_pairs:
+                continue
+            matches.append((scan_a.id, scan_b.id, match_type, reason, similarity))
+            if len(matches) >= CANDIDATE_BATCH_SIZE:
+                self._add_fuzzy_matches(matches)
+                matches = []
+            if self.is_full() or self.candidate_count + len(matches) >= self.job.candidate_limit:
+                break
+        self._add_fuzzy_matches(matches)
+
+    def _add_fuzzy_matches(self, matches):
+        if not matches:
+            return
+        clients = self.clients_qs.in_bulk({client_id for match in matches for client_id in match[:2]})
+        for client_a_id, client_b_id, match_type, reason, similarity in matches:
+            self.add_candidate(clients.get(client_a_id), clients.get(client_b_id), match_type, reason, similarity)
+        self.flush()
+
+    # Merge phase
+
+    def merge_candidates(self):
+        """Automatically merge high-confidence duplicates and flag the others for review, best first"""
+        pending = self.job.candidates.filter(outcome='pending').order_by('-similarity_score', 'id')
+        for candidate in pending.iterator(chunk_size=200):
+            try:
+                outcome = self.merge_candidate(candidate)
+            except Exception as e:
+                logger.error(f"Error processing duplicate record: {e}", exc_info=True)
+                self._record(candidate, 'error', error=f"Error processing duplicate: {str(e)}")
+                continue
+            self._record(candidate, *outcome)
+            self.heartbeat()
+
+    def _record(self, candidate, outcome, error=None, merge_error=None):
+        """Save a candidate's outcome and the job's counters together, so a resume sees both or neither"""
+        counters = {
+            'merged': 'merged_count',
+            'flagged': 'flagged_count',
+            'skipped': 'skipped_count',
+        }
+        job = self.job
+        with transaction.atomic():
+            DuplicateScanCandidate.objects.filter(pk=candidate.pk).update(outcome=outcome)
+            updates = {}
+            if outcome in counters:
+                updates[counters[outcome]] = F(counters[outcome]) + 1
+            if error:
+                job.errors = job.errors + [error]
+                updates['errors'] = job.errors
+            if merge_error:
+                job.merge_errors = job.merge_errors + [merge_error]
+                updates['merge_errors'] = job.merge_errors
+            if updates:
+                DuplicateScanJob.objects.filter(pk=job.pk).update(**updates)
+
+    def merge_candidate(self, candidate):
+        """(outcome, error, merge_error) of merging or flagging one candidate"""
+        from clients.views import auto_merge_high_confidence_duplicate
+
+        details = candidate.details
+        similarity_score = details['similarity_score']
+        confidence_level = details['confidence_level']
+        match_type = details['match_type']
+
+        try:
+            primary_client = Client.objects.get(id=candidate.primary_client_id)
+            duplicate_client = Client.objects.get(id=candidate.duplicate_client_id)
+        except Client.DoesNotExist as e:
+            return 'error', f"Client not found: {str(e)}", None
+
+        # Skip if either client is archived (unless include_archived is True)
+        if not self.job.include_archived and (primary_client.is_archived or duplicate_client.is_archived):
+            return 'skipped', None, None
+
+        # Check if duplicate record already exists
+        if ClientDuplicate.objects.filter(primary_client=primary_client, duplicate_client=duplicate_client).exists():
+            return 'skipped', None, None
+
+        should_auto_merge = (
+            confidence_level == AUTO_MERGE_CONFIDENCE_THRESHOLD and
+            similarity_score >= AUTO_MERGE_SIMILARITY_THRESHOLD
+        )
+        # Also auto-merge exact matches (email, phone, name+dob, client_id, external_id) regardless of similarity score
+        is_exact_match = match_type in EXACT_MATCH_TYPES or similarity_score >= 0.95
+
+        match_details = {
+            'reason': details['reason'],
+            'source': 'scan_existing_data',
+            'scan_job': str(self.job.external_id),
+        }
+        if not (should_auto_merge or is_exact_match):
+            # Lower confidence - flag for manual review
+            self._flag(primary_client, duplicate_client, details, match_details)
+            return 'flagged', None, None
+
+        try:
+            merge_result = auto_merge_high_confidence_duplicate(
+                primary_client=primary_client,
+                duplicate_client=duplicate_client,
+                similarity_score=similarity_score,
+                match_type=match_type,
+                confidence_level=confidence_level,
+                reviewed_by=self.job.requested_by,
+            )
+        except Exception as merge_exc:
+            logger.error(f"Error auto-merging duplicate: {merge_exc}", exc_info=True)
+            merge_result = {'success': False, 'error': str(merge_exc)}
+
+        if merge_result.get('success') and merge_result.get('merged'):
+            return 'merged', None, None
+
+        # Merge failed, flag for manual review instead
+        merge_error = merge_result.get('error', 'Unknown error')
+        self._flag(primary_client, duplicate_client, details, {
+            **match_details, 'auto_merge_failed': True, 'merge_error': merge_error,
+        })
+        return 'flagged', None, {
+            'primary': f"{primary_client.first_name} {primary_client.last_name}",
+            'duplicate': f"{duplicate_client.first_name} {duplicate_client.last_name}",
+            'error': merge_error,
+        }
+
+    def _flag(self, primary_client, duplicate_client, details, match_details):
+        ClientDuplicate.objects.create(
+            primary_client=primary_client,
+            duplicate_client=duplicate_client,
+            similarity_score=details['similarity_score'],
+            match_type=details['match_type'],
+            confidence_level=details['confidence_level'],
+            status='pending',
+            detection_source='scan',
+            match_details={**match_details, 'scanned_at': timezone.now().isoformat()},
+        )
+
+
+def serialize_scan_client(client):
+    return {
+        'id': client.id,
+        'external_id': str(client.external_id),
+        'detail_url': reverse('clients:detail', kwargs={'external_id': client.external_id}),
+        'first_name': client.first_name or '',
+        'last_name': client.last_name or '',
+        'client_id': client.client_id or '',
+        'source': client.source or '',
+        'email': client.email or '',
+        'phone': client.phone or '',
+        'dob': client.dob.isoformat() if client.dob else None,
+        'is_archived': bool(client.is_archived),
+        'is_inactive': bool(client.is_inactive),
+    }
+
+
+def _submit(job_id):
+    if getattr(settings, 'CELERY_BROKER_URL', ''):
+        from clients.tasks import run_duplicate_scan_task
+        run_duplicate_scan_task.delay(str(job_id))
+        logger.info(f"Duplicate scan {job_id} queued on Celery")
+    else:
+        _get_executor().submit(_run_in_thread, str(job_id))
+        logger.info(f"Duplicate scan {job_id} queued on local worker pool")
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Scans are heavy on the database; one at a time per process
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='duplicate-scan')
+        return _executor
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_duplicate_scan_job(job_id)
+    except Exception as e:
+        logger.error(f"Unhandled error in duplicate scan {job_id}: {e}")
+    finally:
+        connections.close_all()
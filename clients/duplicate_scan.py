@@ -0,0 +1,222 @@
+"""
+Fuzzy-name candidate generation for the duplicate scan.
+
+The scan's fuzzy step used to compare every pair inside a sample of 2000
+clients (400 in manual mode), so most of a large client table was never looked
+at. It now covers every named client and only compares pairs that share a
+blocking key or sit close together in a sorted order:
+
+  * same date of birth and last-name initial
+  * same Soundex codes of the last and first name
+  * same NYSIIS codes of the last and first name
+  * within DUPLICATE_SCAN_WINDOW places when sorted by "last first"
+  * within DUPLICATE_SCAN_WINDOW places when sorted by the reversed
+    "first last", which brings together names differing in their first letters
+
+Blocks larger than DUPLICATE_SCAN_MAX_BLOCK are compared with the same window
+instead of pairwise, so comparisons grow about linearly with the number of
+clients. As before, only clients with the same last-name initial are compared
+and pairs are scored with FuzzyMatcher.calculate_similarity.
+
+The phonetic codes come from the keys stored on Client (core.name_keys); rows
+that have not been backfilled yet are coded on the fly.
+
+An incremental scan only looks at clients updated since the last scan of the
+same population (DuplicateScanState). load_incremental_scan_clients fetches
+them with the clients they could match, found with the indexed blocking keys
+and a trigram search in place of the sorted windows, and find_fuzzy_duplicates
+keeps only the pairs that include one of them.
+"""
+from collections import defaultdict, namedtuple
+from datetime import timedelta
+from functools import reduce
+from itertools import combinations
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q
+
+from core.client_search import similar_clients
+from core.fuzzy_matching import fuzzy_matcher
+from core.name_keys import client_name_keys, normalize_name
+
+# Fuzzy name score a pair needs to be reported
+FUZZY_NAME_THRESHOLD = 0.88
+# Score of similar names with the same date of birth
+NAME_DOB_SCORE = 0.9
+# Names must still be this similar for a shared date of birth to count
+NAME_DOB_MIN_SIMILARITY = 0.7
+
+# An incremental scan also rechecks clients updated this long before the
+# previous scan started, in case their transaction committed after it read them
+WATERMARK_OVERLAP = timedelta(minutes=15)
+# Changed clients whose blocking keys are looked up in one query
+INCREMENTAL_LOOKUP_BATCH = 200
+# Candidate pairs between calls to find_fuzzy_duplicates' progress callback
+PROGRESS_EVERY_PAIRS = 5000
+
+ScanClient = namedtuple('ScanClient', 'id first_name last_name dob name initial soundex nysiis')
+
+
+def load_scan_clients(clients_qs):
+    """The named clients of clients_qs, with their comparison keys"""
+    rows = (
+        clients_qs
+        .filter(first_name__isnull=False, last_name__isnull=False)
+        .exclude(first_name__exact='')
+        .exclude(last_name__exact='')
+        .values_list(
+            'id', 'first_name', 'last_name', 'dob',
+            'first_name_soundex', 'last_name_soundex', 'first_name_nysiis', 'last_name_nysiis',
+        )
+        .order_by('id')
+    )
+    clients = []
+    for client_id, first_name, last_name, dob, *codes in rows.iterator(chunk_size=5000):
+        clients.append(scan_client(client_id, first_name, last_name, dob, *codes))
+    return clients
+
+
+def scan_scope(include_archived=False, source=None):
+    """DuplicateScanState.scope of the clients a scan covers"""
+    scope = 'all' if include_archived else 'active'
+    return f"{scope}:{source}" if source else scope
+
+
+def changed_since(clients_qs, scanned_through):
+    """The clients of clients_qs an incremental scan after scanned_through has to compare"""
+    return clients_qs.filter(updated_at__gte=scanned_through - WATERMARK_OVERLAP)
+
+
+def load_incremental_scan_clients(clients_qs, changed_ids, window=None):
+    """
+    ScanClient rows of the named clients in changed_ids and of the clients of
+    clients_qs they could be fuzzy duplicates of: those sharing a blocking key
+    with one of them, and its `window` most similar names by trigram search.
+    """
+    window = window or settings.DUPLICATE_SCAN_WINDOW
+    changed = load_scan_clients(clients_qs.filter(id__in=changed_ids))
+    related_ids = {client.id for client in changed}
+    for start in range(0, len(changed), INCREMENTAL_LOOKUP_BATCH):
+        blocking_keys = []
+        for client in changed[start:start + INCREMENTAL_LOOKUP_BATCH]:
+            if client.dob:
+                blocking_keys.append(Q(dob=client.dob, last_name__istartswith=client.initial))
+            # Names without letters have empty codes, as do rows not backfilled yet
+            if all(client.soundex):
+                blocking_keys.append(Q(last_name_soundex=client.soundex[0], first_name_soundex=client.soundex[1]))
+            if all(client.nysiis):
+                blocking_keys.append(Q(last_name_nysiis=client.nysiis[0], first_name_nysiis=client.nysiis[1]))
+        if not blocking_keys:
+            continue
+        related_ids.update(clients_qs.filter(reduce(or_, blocking_keys)).values_list('id', flat=True))
+    for client in changed:
+        related_ids.update(
+            similar.id
+            for similar, _, _ in similar_clients(client.first_name, client.last_name, limit=window, queryset=clients_qs)
+        )
+    return load_scan_clients(clients_qs.filter(id__in=related_ids))
+
+
+def scan_client(client_id, first_name, last_name, dob=None,
+                first_soundex='', last_soundex='', first_nysiis='', last_nysiis=''):
+    """ScanClient for one client, coding its names when the stored codes are missing"""
+    if not (first_soundex and last_soundex and first_nysiis and last_nysiis):
+        keys = client_name_keys(first_name, last_name)
+        first_soundex, last_soundex = keys['first_name_soundex'], keys['last_name_soundex']
+        first_nysiis, last_nysiis = keys['first_name_nysiis'], keys['last_name_nysiis']
+    return ScanClient(
+        client_id, first_name, last_name, dob, fuzzy_matcher.prepare(f"{first_name} {last_name}"),
+        last_name[:1].lower(), (last_soundex, first_soundex), (last_nysiis, first_nysiis),
+    )
+
+
+def _windowed(positions, window):
+    for offset, first in enumerate(positions):
+        for second in positions[offset + 1:offset + 1 + window]:
+            yield first, second
+
+
+def _block_pairs(clients, blocks, window, max_block):
+    for positions in blocks.values():
+        if len(positions) < 2:
+            continue
+        if len(positions) > max_block:
+            positions = sorted(positions, key=lambda position: clients[position].name.text)
+            yield from _windowed(positions, window)
+        else:
+            yield from combinations(positions, 2)
+
+
+def candidate_pairs(clients, window=None, max_block=None):
+    """
+    Position pairs of clients worth scoring, from every blocking pass. A pair
+    can come from more than one pass.
+    """
+    window = window or settings.DUPLICATE_SCAN_WINDOW
+    max_block = max_block or settings.DUPLICATE_SCAN_MAX_BLOCK
+
+    dob_blocks = defaultdict(list)
+    soundex_blocks = defaultdict(list)
+    nysiis_blocks = defaultdict(list)
+    for position, client in enumerate(clients):
+        if client.dob:
+            dob_blocks[(client.initial, client.dob)].append(position)
+        soundex_blocks[client.soundex].append(position)
+        nysiis_blocks[client.nysiis].append(position)
+    for blocks in (dob_blocks, soundex_blocks, nysiis_blocks):
+        yield from _block_pairs(clients, blocks, window, max_block)
+
+    sort_keys = (
+        lambda position: (normalize_name(clients[position].last_name), normalize_name(clients[position].first_name)),
+        lambda position: clients[position].name.text[::-1],
+    )
+    for sort_key in sort_keys:
+        yield from _windowed(sorted(range(len(clients)), key=sort_key), window)
+
+
+def _needed(client1, client2):
+    """Similarity the pair must reach to be reported"""
+    if client1.dob and client1.dob == client2.dob:
+        return NAME_DOB_MIN_SIMILARITY
+    return FUZZY_NAME_THRESHOLD
+
+
+def score_pair(client1, client2, matcher=fuzzy_matcher):
+    """(match_type, reason, score) when the two clients look like duplicates, else None"""
+    similarity = matcher.score_prepared(client1.name, client2.name, threshold=_needed(client1, client2))
+    if client1.dob and client1.dob == client2.dob and similarity >= NAME_DOB_MIN_SIMILARITY:
+        return 'name_dob_similarity', 'Similar names with matching date of birth', max(similarity, NAME_DOB_SCORE)
+    if similarity >= FUZZY_NAME_THRESHOLD:
+        return 'fuzzy_name', 'Similar client names', similarity
+    return None
+
+
+def find_fuzzy_duplicates(clients, matcher=fuzzy_matcher, window=None, max_block=None, changed_ids=None,
+                          progress=None):
+    """
+    Yield (client1, client2, match_type, reason, score) for each likely
+    duplicate pair among clients (ScanClient rows), each pair once. Given
+    changed_ids, only pairs including one of those clients are yielded.
+    progress, if given, is called every PROGRESS_EVERY_PAIRS candidate pairs,
+    so a caller can report that it is alive while no match is found.
+    """
+    # Only pairs that pass the cheap bound are remembered, to keep this set small
+    checked = set()
+    for count, (first, second) in enumerate(candidate_pairs(clients, window, max_block), 1):
+        if progress is not None and count % PROGRESS_EVERY_PAIRS == 0:
+            progress()
+        client1, client2 = clients[first], clients[second]
+        if client1.initial != client2.initial:
+            continue
+        if changed_ids is not None and client1.id not in changed_ids and client2.id not in changed_ids:
+            continue
+        if not matcher.could_reach(client1.name, client2.name, _needed(client1, client2)):
+            continue
+        pair_key = (first, second) if first < second else (second, first)
+        if pair_key in checked:
+            continue
+        checked.add(pair_key)
+        match = score_pair(client1, client2, matcher)
+        if match:
+            yield (client1, client2) + match
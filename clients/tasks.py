@@ -0,0 +1,16 @@
+from celery import shared_task
+
+from .duplicate_jobs import run_duplicate_scan_job
+from .upload_jobs import run_client_upload_job
+
+
+@shared_task(name='clients.process_client_upload')
+def process_client_upload_task(upload_id, user_id=None):
+    """Celery entry point for a queued client upload"""
+    run_client_upload_job(upload_id, user_id)
+
+
+@shared_task(name='clients.run_duplicate_scan')
+def run_duplicate_scan_task(job_id):
+    """Celery entry point for a queued duplicate scan"""
+    run_duplicate_scan_job(job_id)
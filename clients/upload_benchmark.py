@@ -0,0 +1,180 @@
+"""
+Repeatable throughput benchmark for client uploads.
+
+generate_upload_file writes a synthetic SMIS- or EMHware-shaped CSV of any size
+with a controlled share of possible duplicates (a new client id with the name
+and date of birth of an earlier row) and of rows carrying a program enrollment.
+run_upload_benchmark posts a file to the upload_clients view, processed inline,
+and returns the import's stats and profile: rows per second, query counts and
+peak memory per phase.
+
+Generated clients use client ids starting with BENCHMARK_ID_PREFIX and are
+enrolled in BENCHMARK_DEPARTMENT programs, so clear_benchmark_data can remove
+them without touching real data. Used by the benchmark_client_uploads command
+and the tests marked `benchmark`.
+"""
+import csv
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, override_settings
+
+from core.models import Client, Department, Program
+
+BENCHMARK_ID_PREFIX = 'BENCH'
+BENCHMARK_DEPARTMENT = 'Upload Benchmark'
+BENCHMARK_PROGRAM_COUNT = 5
+
+# Column headers as the source systems export them, with the date format each one uses
+UPLOAD_SHAPES = {
+    'SMIS': {
+        'columns': [
+            'Client ID', 'First Name', 'Last Name', 'DOB', 'Gender', 'Email', 'Phone',
+            'Program', 'Admission Date', 'Discharge Date', 'Program Status', 'Referral Source',
+        ],
+        'date_format': '%Y-%m-%d',
+    },
+    'EMHware': {
+        'columns': [
+            'Client ID', 'First Name', 'Last Name', 'Date of Birth', 'Gender', 'Email', 'Phone',
+            'Address', 'City', 'Province', 'Postal Code', 'Program Name', 'Intake Date', 'Discharge Date',
+        ],
+        'date_format': '%m/%d/%Y',
+    },
+}
+
+FIRST_NAMES = [
+    'James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+    'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Ahmed', 'Priya',
+    'Wei', 'Fatima', 'Carlos', 'Aisha', 'Dmitri', 'Mei', 'Kwame', 'Sofia', 'Arjun', 'Leila',
+]
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+    'Hernandez', 'Lopez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin', 'Lee',
+    'Nguyen', 'Patel', 'Chen', 'Khan', 'Singh', 'Okafor', 'Ivanova', 'Kim', 'Haddad', 'Silva',
+]
+CITIES = ['Toronto', 'Ottawa', 'Hamilton', 'London', 'Kingston']
+
+
+def benchmark_program_names():
+    return [f"Benchmark Program {number}" for number in range(1, BENCHMARK_PROGRAM_COUNT + 1)]
+
+
+def ensure_benchmark_programs():
+    """Programs the generated enrollments point at"""
+    department, _ = Department.objects.get_or_create(name=BENCHMARK_DEPARTMENT)
+    for name in benchmark_program_names():
+        Program.objects.get_or_create(name=name, department=department, defaults={'location': 'Benchmark'})
+
+
+def clear_benchmark_data():
+    """Delete generated clients (with their intakes and enrollments) and the benchmark programs"""
+    clients, _ = Client.objects.filter(client_id__startswith=BENCHMARK_ID_PREFIX).delete()
+    Program.objects.filter(department__name=BENCHMARK_DEPARTMENT).delete()
+    Department.objects.filter(name=BENCHMARK_DEPARTMENT).delete()
+    return clients
+
+
+def _client_row(rng, source, number, person, shape, with_enrollment):
+    first_name, last_name, dob = person
+    date_format = shape['date_format']
+    values = {
+        'Client ID': f"{BENCHMARK_ID_PREFIX}{source[:2].upper()}{number:07d}",
+        'First Name': first_name,
+        'Last Name': last_name,
+        'DOB': dob.strftime(date_format),
+        'Date of Birth': dob.strftime(date_format),
+        'Gender': rng.choice(['Male', 'Female', 'Non-binary', '']),
+        'Email': f"{first_name}.{last_name}.{number}@example.com".lower(),
+        # Unique per row so phone matching only finds the intended duplicates
+        'Phone': f"{400 + number // 10000 % 600}-555-{number % 10000:04d}",
+        'Address': f"{rng.randint(1, 999)} Main Street",
+        'City': rng.choice(CITIES),
+        'Province': 'ON',
+        'Postal Code': f"M{rng.randint(1, 9)}A {rng.randint(1, 9)}B{rng.randint(1, 9)}",
+        'Referral Source': rng.choice(['Self', 'Hospital', 'Shelter', '']),
+    }
+    if with_enrollment:
+        intake = date(2024, 1, 1) + timedelta(days=rng.randint(0, 500))
+        discharged = rng.random() < 0.3
+        values.update({
+            'Program': rng.choice(benchmark_program_names()),
+            'Program Name': rng.choice(benchmark_program_names()),
+            'Admission Date': intake.strftime(date_format),
+            'Intake Date': intake.strftime(date_format),
+            'Discharge Date': (intake + timedelta(days=rng.randint(1, 90))).strftime(date_format) if discharged else '',
+            'Program Status': 'discharged' if discharged else 'active',
+        })
+    return [values.get(column, '') for column in shape['columns']]
+
+
+def generate_upload_file(path, source, rows, duplicate_ratio=0.05, enrollment_ratio=0.5, seed=0):
+    """
+    Write a synthetic upload of `rows` rows to path and return counts of what it
+    contains. The same arguments always produce the same file.
+    """
+    shape = UPLOAD_SHAPES[source]
+    rng = random.Random(f"{seed}:{source}:{rows}")
+    people = []
+    counts = {'rows': rows, 'possible_duplicates': 0, 'enrollments': 0}
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(shape['columns'])
+        for number in range(1, rows + 1):
+            if people and rng.random() < duplicate_ratio:
+                # Same person under a different client id
+                person = rng.choice(people)
+                counts['possible_duplicates'] += 1
+            else:
+                person = (
+                    rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                    date(1940, 1, 1) + timedelta(days=rng.randint(0, 25000)),
+                )
+                people.append(person)
+            with_enrollment = rng.random() < enrollment_ratio
+            counts['enrollments'] += with_enrollment
+            writer.writerow(_client_row(rng, source, number, person, shape, with_enrollment))
+    return counts
+
+
+def run_upload_benchmark(path, source, user=None, dry_run=False):
+    """
+    Import a file through the upload_clients view, processed inline, and return
+    its wall time, stats and per-phase profile.
+    """
+    from clients.views import upload_clients
+
+    with open(path, 'rb') as fh:
+        upload = SimpleUploadedFile(os.path.basename(path), fh.read(), content_type='text/csv')
+    data = {'file': upload, 'source': source}
+    if dry_run:
+        data['dry_run'] = 'true'
+    request = RequestFactory().post('/clients/upload/process/', data)
+    request.user = user or AnonymousUser()
+
+    started = time.perf_counter()
+    with override_settings(CLIENT_UPLOAD_BACKGROUND=False):
+        response = upload_clients(request)
+    seconds = time.perf_counter() - started
+
+    result = json.loads(response.content)
+    stats = result.get('stats', {})
+    profile = result.get('profile') or {}
+    rows = stats.get('total_rows', 0)
+    return {
+        'success': result.get('success', False),
+        'status_code': response.status_code,
+        'error': result.get('error'),
+        'seconds': round(seconds, 3),
+        'rows': rows,
+        'rows_per_second': round(rows / seconds, 1) if rows and seconds > 0 else None,
+        'queries': profile.get('total_queries'),
+        'peak_memory_mb': profile.get('peak_memory_mb'),
+        'stats': stats,
+        'phases': profile.get('phases', {}),
+    }
@@ -0,0 +1,175 @@
+"""
+Change detection for repeated client imports.
+
+Nightly SMIS / EMHware extracts are mostly the rows that were imported the night
+before. UploadFingerprintIndex hashes every row (column names, their mapping and
+the cell values) and compares it with the hashes stored in ClientUploadFingerprint
+for the row's (source, client_id) the last time that client was imported. A client
+can span several rows (one per enrollment), so each of its rows keeps its own
+hash. Rows whose hash is already stored are dropped from the chunks before key
+collection, matching and writes and are counted as skipped; the hashes of rows
+that were written are upserted once per chunk, and hashes of rows that are no
+longer in the client's file rows are removed with them.
+
+changed_update_fields narrows the chunk's Client bulk_update to the clients and
+columns whose values actually differ from the database.
+"""
+import hashlib
+import json
+import logging
+
+from core.models import Client, ClientUploadFingerprint
+
+from .upload_columns import _to_text, build_field_columns, clean_client_id_column
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_BATCH_SIZE = 1000
+FIELD_SEPARATOR = '\x1f'
+
+
+def header_digest(columns, column_mapping):
+    """Hash of the file layout, so remapping or adding a column changes every row's hash"""
+    layout = [[str(col), column_mapping.get(col) or ''] for col in columns]
+    return hashlib.sha256(json.dumps(layout).encode('utf-8')).hexdigest()
+
+
+def chunk_row_hashes(chunk_df, digest):
+    """SHA-256 per row of the stripped cell text, prefixed by the layout digest"""
+    row_text = None
+    for col in chunk_df.columns:
+        text = _to_text(chunk_df[col])
+        row_text = text if row_text is None else row_text.str.cat(text, sep=FIELD_SEPARATOR)
+    return row_text.map(lambda text: hashlib.sha256(f'{digest}{FIELD_SEPARATOR}{text}'.encode('utf-8')).hexdigest())
+
+
+class UploadFingerprintIndex:
+    """Row hashes of one upload against the stored hashes of the last import"""
+
+    def __init__(self, source, columns, column_mapping):
+        self.source = source
+        self.digest = header_digest(columns, column_mapping)
+        self.client_id_columns = build_field_columns(columns, column_mapping).get('client_id', [])
+        # row index -> (client_id, row_hash) for rows that have to be imported
+        self.changed_rows = {}
+        self.unchanged_rows = set()
+        # client_id -> pks of stored fingerprints whose row is gone from this file
+        self.stale = {}
+        self.pending = {}
+        self.pending_stale = set()
+
+    @property
+    def enabled(self):
+        return bool(self.client_id_columns)
+
+    def _client_ids(self, chunk_df):
+        return clean_client_id_column(_to_text(chunk_df[self.client_id_columns[0]]))
+
+    def scan(self, chunks):
+        """Hash every row and look up the stored hashes, one query per 1000 client ids"""
+        if not self.enabled:
+            return
+        stored = {}
+        file_hashes = {}
+        for chunk_df in chunks:
+            client_ids = self._client_ids(chunk_df)
+            has_client_id = client_ids != ''
+            row_hashes = chunk_row_hashes(chunk_df[has_client_id], self.digest)
+            client_ids = client_ids[has_client_id]
+
+            # client_id -> {row_hash: fingerprint pk}, for ids not seen in an earlier chunk
+            distinct_ids = [client_id for client_id in client_ids.unique().tolist() if client_id not in file_hashes]
+            for start in range(0, len(distinct_ids), LOOKUP_BATCH_SIZE):
+                for pk, client_id, row_hash in ClientUploadFingerprint.objects.filter(
+                    source=self.source,
+                    source_client_id__in=distinct_ids[start:start + LOOKUP_BATCH_SIZE],
+                ).values_list('pk', 'source_client_id', 'row_hash'):
+                    stored.setdefault(client_id, {})[row_hash] = pk
+
+            for index, client_id, row_hash in zip(client_ids.index, client_ids, row_hashes):
+                file_hashes.setdefault(client_id, set()).add(row_hash)
+                if row_hash in stored.get(client_id, ()):
+                    self.unchanged_rows.add(index)
+                else:
+                    self.changed_rows[index] = (client_id, row_hash)
+
+        for client_id, hashes in stored.items():
+            stale = [pk for row_hash, pk in hashes.items() if row_hash not in file_hashes[client_id]]
+            if stale:
+                self.stale[client_id] = stale
+        logger.info(
+            f"Row fingerprints: {len(self.unchanged_rows)} unchanged, "
+            f"{len(self.changed_rows)} new or changed rows with a client id"
+        )
+
+    def filter_chunk(self, chunk_df):
+        """The chunk without its unchanged rows"""
+        if not self.unchanged_rows:
+            return chunk_df
+        return chunk_df[~chunk_df.index.isin(self.unchanged_rows)]
+
+    def filter_chunks(self, chunks):
+        for chunk_df in chunks:
+            yield self.filter_chunk(chunk_df)
+
+    def record(self, row_index, client):
+        """Remember the row's hash for `client`, written on the next flush"""
+        if row_index not in self.changed_rows or client.pk is None:
+            return
+        client_id, row_hash = self.changed_rows[row_index]
+        self.pending[(client_id, row_hash)] = ClientUploadFingerprint(
+            source=self.source, source_client_id=client_id, client=client, row_hash=row_hash,
+        )
+        self.pending_stale.update(self.stale.pop(client_id, ()))
+
+    def discard(self, row_index):
+        """Forget a row whose import failed part-way so the next upload retries it"""
+        key = self.changed_rows.pop(row_index, None)
+        self.pending.pop(key, None)
+
+    def flush(self):
+        """Upsert the chunk's fingerprints and drop the replaced ones of its clients"""
+        fingerprints = list(self.pending.values())
+        stale = list(self.pending_stale)
+        for start in range(0, len(stale), LOOKUP_BATCH_SIZE):
+            ClientUploadFingerprint.objects.filter(pk__in=stale[start:start + LOOKUP_BATCH_SIZE]).delete()
+        if fingerprints:
+            ClientUploadFingerprint.objects.bulk_create(
+                fingerprints,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['source', 'source_client_id', 'row_hash'],
+                update_fields=['client', 'updated_at'],
+            )
+        self.pending = {}
+        self.pending_stale = set()
+        return len(fingerprints)
+
+
+def changed_update_fields(clients, fields):
+    """
+    Clients whose values for `fields` differ from the database, and the union of
+    the fields that changed. Unchanged clients can be left out of bulk_update.
+    """
+    clients_by_pk = {}
+    for client in clients:
+        clients_by_pk[client.pk] = client
+
+    stored = {}
+    pks = list(clients_by_pk)
+    for start in range(0, len(pks), LOOKUP_BATCH_SIZE):
+        for values in Client.objects.filter(pk__in=pks[start:start + LOOKUP_BATCH_SIZE]).values('pk', *fields):
+            stored[values['pk']] = values
+
+    changed_clients = []
+    changed_fields = set()
+    for pk, client in clients_by_pk.items():
+        current = stored.get(pk)
+        if current is None:
+            continue
+        client_changes = {field for field in fields if getattr(client, field) != current[field]}
+        if client_changes:
+            changed_clients.append(client)
+            changed_fields |= client_changes
+    # Keep the caller's field order
+    return changed_clients, [field for field in fields if field in changed_fields]
@@ -0,0 +1,191 @@
+"""
+Column-wise collection of lookup keys from an uploaded client file.
+
+The column mapping is resolved to a field -> columns lookup once, and client ids,
+emails, phones, names, dates of birth and external ids are pulled out of the
+DataFrame as whole normalized columns instead of scanning df.columns row by row.
+
+Cross-source ids (anything a row could be matched on through smis_id, emhware_id
+or legacy_client_ids) are collected the same way so those lookups can be limited
+to the ids actually present in the file.
+"""
+from datetime import date
+
+import pandas as pd
+
+from .upload_dates import NEEDS_FALLBACK, parse_date_column
+
+PLACEHOLDER_DOB = date(1900, 1, 1)
+NULL_TEXT_VALUES = ['nan', 'none', 'null']
+# "Last, First (12345)" in a combined client column carries the client id
+COMBINED_CLIENT_ID_PATTERN = r'\((\d+)\)\s*$'
+
+
+def build_field_columns(columns, column_mapping):
+    """Map each standard field name to the file columns mapped to it, in file order"""
+    field_columns = {}
+    for col in columns:
+        field_name = column_mapping.get(col)
+        if field_name:
+            field_columns.setdefault(field_name, []).append(col)
+    return field_columns
+
+
+def get_raw_column(df, field_columns, field_name):
+    """First non-null value per row across the columns mapped to a field"""
+    columns = field_columns.get(field_name)
+    if not columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    if len(columns) == 1:
+        return df[columns[0]]
+    return df[columns].astype(object).bfill(axis=1).iloc[:, 0]
+
+
+def _to_text(values):
+    return values.astype(object).where(values.notna(), '').astype(str).str.strip()
+
+
+def get_text_column(df, field_columns, field_name):
+    """
+    First non-empty stripped string per row across the columns mapped to a field.
+    Empty cells and unmapped fields come back as ''.
+    """
+    result = None
+    for col in field_columns.get(field_name, []):
+        text = _to_text(df[col])
+        result = text if result is None else result.where(result != '', text)
+    if result is None:
+        return pd.Series('', index=df.index, dtype=object)
+    return result
+
+
+def clean_client_id_column(text):
+    """
+    Vectorized equivalent of the upload's client_id cleaning: whole-number decimals
+    such as '2765.0' become '2765', null markers become '' and dotted values
+    that are not numbers are dropped.
+    """
+    text = text.where(~text.str.lower().isin(NULL_TEXT_VALUES), '')
+    dotted = text.str.contains('.', regex=False)
+    if not dotted.any():
+        return text
+    numeric = pd.to_numeric(text.where(dotted), errors='coerce')
+    whole = dotted & numeric.notna() & (numeric % 1 == 0)
+    text = text.where(~(dotted & numeric.isna()), '')
+    if whole.any():
+        text = text.where(~whole, numeric[whole].map(lambda value: str(int(value))))
+    return text
+
+
+def _parse_dob_value(value):
+    if pd.isna(value):
+        return None
+    parsed = pd.to_datetime(value, errors='coerce')
+    return None if pd.isna(parsed) else parsed.date()
+
+
+def parse_dob_column(raw, date_format=None):
+    """
+    Parse a raw DOB column to dates; unparseable and placeholder values become None.
+    With the column's inferred date_format, cells are read the way the row loop reads them.
+    """
+    if date_format is not None:
+        dobs = parse_date_column(raw, date_format)
+        fallback = dobs.map(lambda value: value is NEEDS_FALLBACK).astype(bool)
+        if fallback.any():
+            dobs[fallback] = parse_dob_column(raw[fallback])
+        return dobs.where(dobs != PLACEHOLDER_DOB, None)
+    try:
+        parsed = pd.to_datetime(raw, errors='coerce', format='mixed')
+        dobs = pd.Series(parsed.dt.date, index=raw.index, dtype=object).where(parsed.notna(), None)
+    except (TypeError, ValueError):
+        # Mixed timezone-aware and naive values cannot be parsed as one column
+        dobs = raw.map(_parse_dob_value).astype(object)
+    return dobs.where(dobs != PLACEHOLDER_DOB, None)
+
+
+def collect_source_ids(df, column_mapping):
+    """
+    Every id a row could be matched on across sources: the client id column,
+    unmapped 'Client ID' style columns, 'SMIS ID' / 'EMHware ID' columns and ids
+    embedded in a combined "Last, First (ID)" client column. Values are kept
+    both as read and cleaned, matching how the row loop looks them up.
+    """
+    source_ids = set()
+    for col in df.columns:
+        col_lower = str(col).lower().strip()
+        mapped_to = column_mapping.get(col)
+        is_client_id_column = mapped_to == 'client_id' or (
+            'client' in col_lower and 'id' in col_lower
+            and mapped_to not in ['first_name', 'last_name', 'client_combined']
+        )
+        is_other_source_column = 'id' in col_lower and ('smis' in col_lower or 'emhware' in col_lower)
+        if is_client_id_column or is_other_source_column:
+            text = _to_text(df[col])
+            source_ids.update(text)
+            source_ids.update(clean_client_id_column(text))
+        if mapped_to == 'client_combined' or col_lower == 'client':
+            embedded = _to_text(df[col]).str.extract(COMBINED_CLIENT_ID_PATTERN, expand=False)
+            source_ids.update(embedded.dropna())
+    source_ids.discard('')
+    return source_ids
+
+
+def collect_upload_keys(df, column_mapping, date_formats=None):
+    """
+    Single pre-collection pass over the upload. Returns the field -> columns
+    lookup plus the distinct client ids, emails, phones, DOBs, name+DOB
+    combinations, external ids and cross-source ids needed to batch-load
+    existing clients.
+    """
+    field_columns = build_field_columns(df.columns, column_mapping)
+
+    client_ids = clean_client_id_column(get_text_column(df, field_columns, 'client_id'))
+    emails = get_text_column(df, field_columns, 'email').str.lower()
+    phones = get_text_column(df, field_columns, 'phone')
+    external_ids = get_text_column(df, field_columns, 'uid_external')
+
+    dobs = pd.Series(None, index=df.index, dtype=object)
+    if 'dob' in field_columns:
+        dobs = parse_dob_column(get_raw_column(df, field_columns, 'dob'), (date_formats or {}).get('dob'))
+
+    first_names = get_text_column(df, field_columns, 'first_name').str.lower()
+    last_names = get_text_column(df, field_columns, 'last_name').str.lower()
+    has_name_dob = (first_names != '') & (last_names != '') & dobs.notna()
+
+    return {
+        'field_columns': field_columns,
+        'client_ids': client_ids[client_ids != ''].unique().tolist(),
+        'emails': emails[emails != ''].unique().tolist(),
+        'phones': phones[phones != ''].unique().tolist(),
+        'dobs': set(dobs.dropna()),
+        'name_dob_combos': set(zip(first_names[has_name_dob], last_names[has_name_dob], dobs[has_name_dob])),
+        'external_ids': set(external_ids[external_ids != '']),
+        'source_ids': collect_source_ids(df, column_mapping),
+    }
+
+
+def collect_chunked_upload_keys(chunks, columns, column_mapping, date_formats=None):
+    """collect_upload_keys over a file read in chunks, merged in file order"""
+    client_ids, emails, phones = {}, {}, {}
+    dobs, name_dob_combos, external_ids, source_ids = set(), set(), set(), set()
+    for chunk in chunks:
+        keys = collect_upload_keys(chunk, column_mapping, date_formats)
+        client_ids.update(dict.fromkeys(keys['client_ids']))
+        emails.update(dict.fromkeys(keys['emails']))
+        phones.update(dict.fromkeys(keys['phones']))
+        dobs |= keys['dobs']
+        name_dob_combos |= keys['name_dob_combos']
+        external_ids |= keys['external_ids']
+        source_ids |= keys['source_ids']
+
+    return {
+        'field_columns': build_field_columns(columns, column_mapping),
+        'client_ids': list(client_ids),
+        'emails': list(emails),
+        'phones': list(phones),
+        'dobs': dobs,
+        'name_dob_combos': name_dob_combos,
+        'external_ids': external_ids,
+        'source_ids': source_ids,
+    }
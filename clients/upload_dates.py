@@ -0,0 +1,107 @@
+"""
+Per-file date format inference for upload date columns.
+
+Parsing every date cell on its own (Excel serial check, pandas, then a list of
+strptime formats) is a large share of the per-row work in admission and
+discharge heavy files. A file's date columns are almost always written in one
+format, so the format of each mapped date column is inferred once from a sample
+of the first chunk and whole columns are parsed with one vectorized
+pd.to_datetime call. Cells that do not fit the inferred format (blank-padded
+times, Excel serial numbers, typos) are left to the caller's per-cell parser.
+"""
+import pandas as pd
+
+DATE_FORMATS = [
+    '%Y-%m-%d',           # 2024-12-05
+    '%Y/%m/%d',           # 2024/12/05
+    '%m/%d/%Y',           # 12/05/2024 (US format)
+    '%d/%m/%Y',           # 05/12/2024 (European format)
+    '%m-%d-%Y',           # 12-05-2024
+    '%d-%m-%Y',           # 05-12-2024
+    '%Y.%m.%d',           # 2024.12.05
+    '%m.%d.%Y',           # 12.05.2024
+    '%d.%m.%Y',           # 05.12.2024
+    '%B %d, %Y',          # December 5, 2024
+    '%b %d, %Y',          # Dec 5, 2024
+    '%d %B %Y',           # 5 December 2024
+    '%d %b %Y',           # 5 Dec 2024
+    '%Y%m%d',             # 20241205
+    '%m/%d/%y',           # 12/05/24 (2-digit year)
+    '%d/%m/%y',           # 05/12/24 (2-digit year, European)
+]
+
+# Date formats plus the timestamps written by Excel and database exports.
+# On a tie the earlier format wins, so ambiguous columns stay month-first.
+DATE_FORMAT_CANDIDATES = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y %I:%M:%S %p',
+] + DATE_FORMATS
+
+DATE_SAMPLE_SIZE = 200
+
+# Cells the inferred format could not parse
+NEEDS_FALLBACK = object()
+
+
+def date_text(raw):
+    """Stripped text of a raw column, '' for empty cells"""
+    return raw.astype(object).where(raw.notna(), '').astype(str).str.strip()
+
+
+def _is_excel_serial(text):
+    # parse_date reads numbers between 1 and 1,000,000 as Excel serial dates before anything else
+    numbers = pd.to_numeric(text, errors='coerce')
+    return numbers.notna() & (numbers >= 1) & (numbers <= 1000000)
+
+
+def infer_date_format(raw):
+    """
+    The candidate format that parses the most of a sample of the column's
+    non-empty cells, or None when no format parses at least half of them.
+    Columns pandas already read as datetimes need no format.
+    """
+    # Numeric columns hold Excel serial numbers, which parse_date handles per cell
+    if pd.api.types.is_datetime64_any_dtype(raw) or pd.api.types.is_numeric_dtype(raw):
+        return None
+    text = date_text(raw)
+    sample = text[(text != '') & ~_is_excel_serial(text)].head(DATE_SAMPLE_SIZE)
+    if sample.empty:
+        return None
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMAT_CANDIDATES:
+        count = int(pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum())
+        if count > best_count:
+            best_format, best_count = date_format, count
+    return best_format if best_count * 2 >= len(sample) else None
+
+
+def infer_date_formats(chunk_df, field_columns, fields):
+    """Inferred format per mapped date field, from the first column mapped to it"""
+    formats = {}
+    for field_name in fields:
+        columns = field_columns.get(field_name)
+        if columns:
+            formats[field_name] = infer_date_format(chunk_df[columns[0]])
+    return formats
+
+
+def parse_date_column(raw, date_format):
+    """
+    Dates for a whole column: a date per parsed cell, None for empty cells and
+    NEEDS_FALLBACK for cells the inferred format does not fit.
+    """
+    if pd.api.types.is_datetime64_any_dtype(raw):
+        return pd.Series(raw.dt.date, index=raw.index, dtype=object).where(raw.notna(), None)
+
+    text = date_text(raw)
+    result = pd.Series(NEEDS_FALLBACK, index=raw.index, dtype=object)
+    result[text == ''] = None
+    if date_format is None or pd.api.types.is_numeric_dtype(raw):
+        return result
+    parsed = pd.to_datetime(text, format=date_format, errors='coerce')
+    fits = parsed.notna() & ~_is_excel_serial(text)
+    if fits.any():
+        result[fits] = parsed[fits].dt.date
+    return result
@@ -0,0 +1,224 @@
+"""
+Intake and enrollment state for the clients touched by one upload.
+
+process_intake_data used to query Intake and ClientProgramEnrollment for every
+row and then scan the whole same-upload enrollment cache to find enrollments it
+had just written. UploadEnrollmentIndex keeps both keyed by (client_id, program_id),
+loaded in bulk once per chunk for the chunk's clients, so per-row lookups are
+dictionary reads.
+
+Writes are collected in the index as pending creates and updates and flushed once
+per chunk with bulk_create / bulk_update, together with the clients' inactive
+status and one batch of audit log entries.
+"""
+import logging
+
+from django.utils import timezone
+
+from core.models import AuditLog, Client, ClientProgramEnrollment, Intake
+
+logger = logging.getLogger(__name__)
+
+INTAKE_UPDATE_FIELDS = [
+    'department', 'intake_date', 'intake_database', 'referral_source',
+    'intake_housing_status', 'notes', 'updated_at',
+]
+ENROLLMENT_UPDATE_FIELDS = [
+    'start_date', 'end_date', 'status', 'notes', 'days_elapsed',
+    'updated_by', 'is_archived', 'archived_at', 'updated_at',
+]
+
+
+class UploadEnrollmentIndex:
+    """Intakes and enrollments of the upload's clients keyed by (client_id, program_id)"""
+
+    def __init__(self, changed_by=None):
+        self.changed_by = changed_by
+        self.intakes = {}
+        self.enrollments = {}
+        self.program_ids_by_client = {}
+        self.loaded_client_ids = set()
+        # Intakes already created or merged by an earlier row of this upload
+        self.upload_intake_keys = set()
+        self._reset_pending()
+
+    def _reset_pending(self):
+        self.new_intakes = []
+        self.changed_intakes = {}
+        self.new_enrollments = []
+        self.changed_enrollments = {}
+        self.status_clients = {}
+
+    def prefetch(self, client_ids):
+        """Load intakes and enrollments for clients not seen yet, two queries in total"""
+        client_ids = {client_id for client_id in client_ids if client_id is not None} - self.loaded_client_ids
+        if not client_ids:
+            return
+        for intake in Intake.objects.filter(client_id__in=client_ids).order_by('pk'):
+            # Same choice as Intake.objects.filter(client=..., program=...).first()
+            self.intakes.setdefault((intake.client_id, intake.program_id), intake)
+        # Archived enrollments are kept so start_date lookups behave like get_or_create
+        for enrollment in ClientProgramEnrollment.objects.filter(client_id__in=client_ids):
+            self._index_enrollment(enrollment.client_id, enrollment.program_id, enrollment)
+        self.loaded_client_ids |= client_ids
+        logger.debug(f"Prefetched intakes and enrollments for {len(client_ids)} clients")
+
+    def add_new_clients(self, client_ids):
+        """Clients created by this upload have nothing to load"""
+        self.loaded_client_ids.update(client_ids)
+
+    def _index_enrollment(self, client_id, program_id, enrollment):
+        self.enrollments.setdefault((client_id, program_id), []).append(enrollment)
+        self.program_ids_by_client.setdefault(client_id, set()).add(program_id)
+
+    # Intakes
+
+    def get_intake(self, client, program):
+        self.prefetch([client.id])
+        return self.intakes.get((client.id, program.id))
+
+    def get_upload_intake(self, client, program):
+        """Intake created or merged by an earlier row of this upload, if any"""
+        key = (client.id, program.id)
+        return self.intakes.get(key) if key in self.upload_intake_keys else None
+
+    def set_intake(self, client, program, intake):
+        key = (client.id, program.id)
+        self.intakes[key] = intake
+        self.upload_intake_keys.add(key)
+
+    def create_intake(self, client, program, **fields):
+        """Pending Intake, inserted on the next flush"""
+        intake = Intake(client=client, program=program, **fields)
+        self.new_intakes.append(intake)
+        self.set_intake(client, program, intake)
+        return intake
+
+    def save_intake(self, intake):
+        """Queue an existing intake for bulk_update; pending ones are inserted as they are"""
+        if intake.pk is not None:
+            self.changed_intakes[intake.pk] = intake
+
+    # Enrollments
+
+    def get_enrollments(self, client, program):
+        """Non-archived enrollments for a client in a program, latest start date first"""
+        self.prefetch([client.id])
+        enrollments = [
+            enrollment for enrollment in self.enrollments.get((client.id, program.id), [])
+            if not enrollment.is_archived
+        ]
+        return sorted(enrollments, key=lambda enrollment: enrollment.start_date, reverse=True)
+
+    def add_enrollment(self, client, program, enrollment):
+        """Record an enrollment written by this upload so later rows see it"""
+        enrollments = self.enrollments.get((client.id, program.id), [])
+        for position, existing in enumerate(enrollments):
+            if existing is enrollment or (existing.pk is not None and existing.pk == enrollment.pk):
+                enrollments[position] = enrollment
+                return
+        self._index_enrollment(client.id, program.id, enrollment)
+
+    def find_open_ended(self, client, program, exclude_start_date=None):
+        """First non-archived enrollment without an end date, other than one starting on exclude_start_date"""
+        for enrollment in self.get_enrollments(client, program):
+            if enrollment.end_date is None and enrollment.start_date != exclude_start_date:
+                return enrollment
+        return None
+
+    def get_or_create_enrollment(self, client, program, start_date, defaults):
+        """
+        In-memory ClientProgramEnrollment.objects.get_or_create(client, program, start_date).
+        New enrollments are inserted on the next flush.
+        """
+        self.prefetch([client.id])
+        for enrollment in self.enrollments.get((client.id, program.id), []):
+            if enrollment.start_date == start_date:
+                return enrollment, False
+        enrollment = ClientProgramEnrollment(client=client, program=program, start_date=start_date, **defaults)
+        self.new_enrollments.append(enrollment)
+        self._index_enrollment(client.id, program.id, enrollment)
+        return enrollment, True
+
+    def save_enrollment(self, enrollment):
+        """Queue an existing enrollment for bulk_update; pending ones are inserted as they are"""
+        if enrollment.pk is not None:
+            self.changed_enrollments[enrollment.pk] = enrollment
+
+    def refresh_client_status(self, client):
+        """Recompute the client's inactive status from its enrollments on the next flush"""
+        self.status_clients[client.id] = client
+
+    def _has_active_enrollments(self, client_id, as_of_date):
+        # Same rule as Client.has_active_enrollments, over the indexed enrollments
+        for program_id in self.program_ids_by_client.get(client_id, ()):
+            for enrollment in self.enrollments[(client_id, program_id)]:
+                if (not enrollment.is_archived and enrollment.start_date <= as_of_date
+                        and (enrollment.end_date is None or enrollment.end_date > as_of_date)):
+                    return True
+        return False
+
+    def flush(self):
+        """Write the chunk's pending intakes, enrollments, client statuses and audit entries"""
+        now = timezone.now()
+        created_enrollments = list(self.new_enrollments)
+        changed_enrollments = list(self.changed_enrollments.values())
+
+        if self.new_intakes:
+            Intake.objects.bulk_create(self.new_intakes, batch_size=500)
+        if self.changed_intakes:
+            for intake in self.changed_intakes.values():
+                intake.updated_at = now
+            Intake.objects.bulk_update(list(self.changed_intakes.values()), INTAKE_UPDATE_FIELDS, batch_size=500)
+        if created_enrollments:
+            ClientProgramEnrollment.objects.bulk_create(created_enrollments, batch_size=500)
+        if changed_enrollments:
+            for enrollment in changed_enrollments:
+                enrollment.updated_at = now
+            ClientProgramEnrollment.objects.bulk_update(changed_enrollments, ENROLLMENT_UPDATE_FIELDS, batch_size=500)
+
+        status_changed_clients = []
+        today = now.date()
+        for client in self.status_clients.values():
+            was_inactive = client.is_inactive
+            client.is_inactive = not self._has_active_enrollments(client.id, today)
+            if client.is_inactive != was_inactive:
+                status_changed_clients.append(client)
+        if status_changed_clients:
+            Client.objects.bulk_update(status_changed_clients, ['is_inactive'], batch_size=500)
+
+        audit_entries = [
+            self._audit_entry(enrollment, 'create') for enrollment in created_enrollments
+        ] + [
+            self._audit_entry(enrollment, 'archive' if enrollment.is_archived else 'update')
+            for enrollment in changed_enrollments
+        ]
+        if audit_entries:
+            AuditLog.objects.bulk_create(audit_entries, batch_size=500)
+
+        summary = {
+            'intakes_created': len(self.new_intakes),
+            'intakes_updated': len(self.changed_intakes),
+            'enrollments_created': len(created_enrollments),
+            'enrollments_updated': len(changed_enrollments),
+            'client_statuses_changed': len(status_changed_clients),
+        }
+        self._reset_pending()
+        logger.info(f"Flushed upload intake and enrollment writes: {summary}")
+        return summary
+
+    def _audit_entry(self, enrollment, action):
+        return AuditLog(
+            entity='ClientProgramEnrollment',
+            entity_id=enrollment.external_id,
+            action=action,
+            changed_by=self.changed_by,
+            diff_json={
+                'client_id': enrollment.client_id,
+                'program_id': enrollment.program_id,
+                'start_date': str(enrollment.start_date),
+                'end_date': str(enrollment.end_date) if enrollment.end_date else None,
+                'status': enrollment.status,
+                'source': 'client_upload',
+            },
+        )
@@ -0,0 +1,432 @@
+"""
+Background execution of client uploads.
+
+Uploads are stored under MEDIA_ROOT and processed outside the request cycle so
+web workers stay free while large imports run. When CELERY_BROKER_URL is set the
+job is sent to a Celery worker; otherwise it runs on a small in-process thread
+pool, which is enough for local development. Progress is reported through
+ClientUploadLog.upload_details['progress'] and read back by the upload_status view.
+
+Uploads in commit-per-chunk mode record a checkpoint (last committed row and the
+file's hash) with every chunk. Their stored file is kept when they fail so the
+import can be resumed from the checkpoint with resume_client_upload.
+
+Every progress write also sets heartbeat_at. An upload left 'processing' with no
+heartbeat for STALE_AFTER has lost its worker (killed or restarted mid-import):
+fail_if_stale marks it failed so it can be resumed or cancelled, and a
+redelivered job for it claims it again and carries on from the checkpoint.
+
+At most CLIENT_UPLOAD_SOURCE_CONCURRENCY uploads of one source run at a time;
+a job that finds every slot of its source taken stays queued and is retried a
+few seconds later. A queued upload can be cancelled outright; a running one is
+asked to stop with request_cancel and checks for it between chunks.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.files import File
+from django.db import close_old_connections, connection, connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import ClientUploadLog
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_STORAGE_DIR = 'client_uploads'
+PROGRESS_DB_ALIAS = 'progress'
+FINISHED_STATUSES = ('success', 'partial', 'failed', 'cancelled')
+# Seconds before a job that found no free slot for its source tries again
+SLOT_RETRY_SECONDS = 5
+# First key of the advisory locks that hold per-source upload slots
+UPLOAD_LOCK_NAMESPACE = 7301
+# A processing upload without a progress write for this long has lost its worker
+STALE_AFTER = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_upload_file_path(upload_log):
+    """Location of the stored copy of an uploaded file"""
+    return os.path.join(
+        settings.MEDIA_ROOT,
+        UPLOAD_STORAGE_DIR,
+        f"{upload_log.external_id}.{upload_log.file_type}"
+    )
+
+
+def store_upload_file(upload_log, file):
+    """Copy the uploaded file to disk so a worker can read it after the request ends"""
+    path = get_upload_file_path(upload_log)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    file.seek(0)
+    with open(path, 'wb') as destination:
+        for chunk in file.chunks():
+            destination.write(chunk)
+    return path
+
+
+def hash_upload_file(file):
+    """SHA-256 of an uploaded file, read in chunks; the file is rewound afterwards"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _stale_processing():
+    """Processing uploads whose worker has not written progress for STALE_AFTER"""
+    cutoff = timezone.now() - STALE_AFTER
+    return Q(status='processing') & (
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+    )
+
+
+def is_stale(upload_log):
+    """A processing upload whose worker stopped reporting progress"""
+    last_seen = upload_log.heartbeat_at or upload_log.started_at
+    return upload_log.status == 'processing' and last_seen < timezone.now() - STALE_AFTER
+
+
+def fail_if_stale(upload_log):
+    """
+    Mark a stale processing upload as failed; the rows its last committed chunk
+    checkpointed stay, so a commit-per-chunk upload can then be resumed.
+    Returns whether it was marked.
+    """
+    now = timezone.now()
+    if not ClientUploadLog.objects.filter(_stale_processing(), pk=upload_log.pk).update(
+        status='failed',
+        completed_at=now,
+        error_message='Upload stopped: its worker stopped responding before the import finished.',
+    ):
+        return False
+    upload_log.refresh_from_db()
+    set_upload_progress(upload_log, status='failed')
+    logger.warning(
+        f"Upload {upload_log.external_id} had no progress since {upload_log.heartbeat_at or upload_log.started_at}; "
+        f"marked failed at committed row {upload_log.checkpoint_row}"
+    )
+    return True
+
+
+def is_resumable(upload_log):
+    """
+    A failed, or stale processing, commit-per-chunk upload with committed rows
+    and its stored file still on disk
+    """
+    return (
+        upload_log.commit_mode == 'chunk'
+        and (upload_log.status == 'failed' or is_stale(upload_log))
+        and upload_log.checkpoint_row > 0
+        and os.path.exists(get_upload_file_path(upload_log))
+    )
+
+
+def discard_upload_file(upload_log):
+    """Remove the stored file unless the upload can still be resumed from it"""
+    if is_resumable(upload_log):
+        logger.info(f"Keeping file of upload {upload_log.external_id} to resume from row {upload_log.checkpoint_row}")
+        return
+    try:
+        os.remove(get_upload_file_path(upload_log))
+    except OSError:
+        pass
+
+
+@contextmanager
+def chunk_transactions():
+    """
+    Run a commit-per-chunk import with autocommit off. The import calls
+    transaction.commit() after each chunk; whatever is uncommitted when an
+    error escapes is rolled back.
+    """
+    transaction.set_autocommit(False)
+    try:
+        yield
+    except BaseException:
+        transaction.rollback()
+        raise
+    finally:
+        transaction.set_autocommit(True)
+
+
+def save_checkpoint(upload_log, row, stats):
+    """
+    Record the last committed row and running counters. Written on the default
+    connection inside the chunk's transaction, so it commits with the chunk.
+    """
+    upload_log.checkpoint_row = row
+    upload_log.checkpoint_stats = stats
+    ClientUploadLog.objects.filter(pk=upload_log.pk).update(
+        checkpoint_row=row,
+        checkpoint_stats=stats,
+        file_hash=upload_log.file_hash,
+    )
+
+
+def _progress_alias():
+    return PROGRESS_DB_ALIAS if PROGRESS_DB_ALIAS in settings.DATABASES else 'default'
+
+
+def set_upload_progress(upload_log, **progress):
+    """
+    Merge progress fields into upload_details['progress'] and persist them.
+    Writes go through the 'progress' connection so pollers can see them while
+    the import transaction on the default connection is still open.
+    """
+    details = upload_log.upload_details or {}
+    details['progress'] = {**details.get('progress', {}), **progress}
+    upload_log.upload_details = details
+    upload_log.heartbeat_at = timezone.now()
+    ClientUploadLog.objects.using(_progress_alias()).filter(pk=upload_log.pk).update(
+        upload_details=details, heartbeat_at=upload_log.heartbeat_at,
+    )
+
+
+def request_cancel(upload_log):
+    """
+    Cancel a queued upload, or one whose worker is gone, right away, or ask a
+    running one to stop before its next chunk. Returns False when the upload has
+    already finished.
+    """
+    now = timezone.now()
+    cancelled = ClientUploadLog.objects.filter(Q(status='queued') | _stale_processing(), pk=upload_log.pk).update(
+        status='cancelled',
+        cancel_requested_at=now,
+        completed_at=now,
+        error_message='Upload was cancelled before it finished processing.',
+    )
+    if cancelled:
+        upload_log.refresh_from_db()
+        set_upload_progress(upload_log, status='cancelled')
+        discard_upload_file(upload_log)
+        logger.info(f"Upload {upload_log.external_id} cancelled while queued or stalled")
+        return True
+
+    requested = ClientUploadLog.objects.filter(pk=upload_log.pk, status='processing').update(cancel_requested_at=now)
+    upload_log.refresh_from_db()
+    if requested:
+        logger.info(f"Cancel requested for running upload {upload_log.external_id}")
+    return bool(requested)
+
+
+def is_cancel_requested(upload_log):
+    """
+    Whether a user asked to stop the upload. Read on the 'progress' connection,
+    outside the import's transaction.
+    """
+    return ClientUploadLog.objects.using(_progress_alias()).filter(
+        pk=upload_log.pk, cancel_requested_at__isnull=False
+    ).exists()
+
+
+def queue_position(upload_log):
+    """1-based place of a queued upload among the queued uploads of its source; None once it left the queue"""
+    if upload_log.status != 'queued':
+        return None
+    return ClientUploadLog.objects.filter(
+        source=upload_log.source, status='queued', started_at__lt=upload_log.started_at
+    ).count() + 1
+
+
+def _slot_lock_key(source, slot):
+    # Advisory lock keys are signed 32-bit integers
+    key = zlib.crc32(f"{source}:{slot}".encode())
+    return key - 2 ** 32 if key >= 2 ** 31 else key
+
+
+@contextmanager
+def source_slot(source):
+    """
+    Hold one of the CLIENT_UPLOAD_SOURCE_CONCURRENCY upload slots of a source.
+    Slots are PostgreSQL session advisory locks on the default connection, so
+    a worker that dies gives its slot back. Yields False when every slot is taken.
+    """
+    limit = getattr(settings, 'CLIENT_UPLOAD_SOURCE_CONCURRENCY', 1)
+    if limit <= 0 or connection.vendor != 'postgresql':
+        yield True
+        return
+
+    key = None
+    with connection.cursor() as cursor:
+        for slot in range(limit):
+            cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", [UPLOAD_LOCK_NAMESPACE, _slot_lock_key(source, slot)])
+            if cursor.fetchone()[0]:
+                key = _slot_lock_key(source, slot)
+                break
+    try:
+        yield key is not None
+    finally:
+        if key is not None:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s, %s)", [UPLOAD_LOCK_NAMESPACE, key])
+            except Exception as e:
+                # The lock goes away with the connection
+                logger.warning(f"Failed to release {source} upload slot: {e}")
+
+
+def enqueue_client_upload(upload_log, file, user):
+    """Store the file, mark the upload as queued and dispatch it to a worker"""
+    store_upload_file(upload_log, file)
+    _dispatch(upload_log, user, processed=0)
+
+
+def resume_client_upload(upload_log, user):
+    """Queue a failed (or stale) commit-per-chunk upload again; it restarts after the checkpoint row"""
+    fail_if_stale(upload_log)
+    upload_log.completed_at = None
+    upload_log.error_message = None
+    upload_log.save(update_fields=['completed_at', 'error_message'])
+    _dispatch(upload_log, user, processed=upload_log.checkpoint_row)
+
+
+def _dispatch(upload_log, user, processed):
+    upload_log.status = 'queued'
+    upload_log.upload_details = {
+        'source': upload_log.source,
+        'file_extension': upload_log.file_type,
+        'progress': {
+            'processed': processed,
+            'total': None,
+            'percentage': 0,
+            'status': 'queued'
+        }
+    }
+    upload_log.save(update_fields=['status', 'upload_details'])
+
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    _submit(str(upload_log.external_id), user_id)
+
+
+def _submit(upload_id, user_id, countdown=0):
+    if getattr(settings, 'CELERY_BROKER_URL', ''):
+        from clients.tasks import process_client_upload_task
+        process_client_upload_task.apply_async((upload_id, user_id), countdown=countdown)
+        logger.info(f"Upload {upload_id} queued on Celery")
+    elif countdown:
+        timer = threading.Timer(countdown, _get_executor().submit, args=(_run_in_thread, upload_id, user_id))
+        timer.daemon = True
+        timer.start()
+    else:
+        _get_executor().submit(_run_in_thread, upload_id, user_id)
+        logger.info(f"Upload {upload_id} queued on local worker pool")
+
+
+def run_client_upload_job(upload_id, user_id=None):
+    """
+    Process a queued upload. Safe to call more than once for the same upload:
+    only uploads still queued, or left processing by a worker that died, are
+    picked up. The latter carry on after their checkpoint row.
+    """
+    upload_log = ClientUploadLog.objects.filter(external_id=upload_id).first()
+    if not upload_log:
+        logger.error(f"Upload job {upload_id} has no upload log")
+        return
+    if upload_log.status != 'queued' and not is_stale(upload_log):
+        logger.info(f"Upload job {upload_id} skipped - status is {upload_log.status}")
+        return
+
+    user = None
+    if user_id:
+        user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None:
+        user = AnonymousUser()
+
+    with source_slot(upload_log.source) as acquired:
+        if not acquired:
+            logger.info(
+                f"Upload job {upload_id} waiting for a free {upload_log.source} slot "
+                f"(queue position {queue_position(upload_log)})"
+            )
+            _submit(upload_id, user_id, countdown=SLOT_RETRY_SECONDS)
+            return
+        # Claimed with a conditional update so a cancel of the queued upload is not overwritten
+        claimable = Q(status='queued') | _stale_processing()
+        if not ClientUploadLog.objects.filter(claimable, pk=upload_log.pk).update(
+            status='processing', heartbeat_at=timezone.now(),
+        ):
+            logger.info(f"Upload job {upload_id} skipped - no longer queued")
+            return
+        upload_log.refresh_from_db()
+        upload_log.status = 'processing'
+        set_upload_progress(upload_log, status='processing')
+        _process_upload(upload_log, user)
+
+
+def _process_upload(upload_log, user):
+    from clients.views import process_client_upload
+
+    upload_id = str(upload_log.external_id)
+    path = get_upload_file_path(upload_log)
+    result = None
+    try:
+        with open(path, 'rb') as fh:
+            response = process_client_upload(
+                upload_log,
+                File(fh, name=upload_log.file_name),
+                upload_log.source,
+                upload_log.file_type,
+                user,
+                upload_log.started_at,
+                temp_upload_id=upload_log.external_id,
+                dry_run=upload_log.is_dry_run,
+            )
+        result = json.loads(response.content)
+    except Exception as e:
+        logger.error(f"Upload job {upload_id} failed: {e}")
+        upload_log.status = 'failed'
+        upload_log.completed_at = timezone.now()
+        upload_log.error_message = str(e)
+        upload_log.save()
+        result = {'success': False, 'error': str(e)}
+
+    # Keep the final response so the browser can render it when polling finishes
+    if upload_log.status not in FINISHED_STATUSES:
+        upload_log.status = 'success' if result.get('success') else 'failed'
+        upload_log.completed_at = upload_log.completed_at or timezone.now()
+    details = upload_log.upload_details or {}
+    details['result'] = result
+    if not result.get('success'):
+        details['progress'] = {
+            **details.get('progress', {}),
+            'status': 'cancelled' if upload_log.status == 'cancelled' else 'failed',
+        }
+    upload_log.upload_details = details
+    upload_log.save()
+    discard_upload_file(upload_log)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'CLIENT_UPLOAD_WORKERS', 2),
+                thread_name_prefix='client-upload'
+            )
+        return _executor
+
+
+def _run_in_thread(upload_id, user_id):
+    close_old_connections()
+    try:
+        run_client_upload_job(upload_id, user_id)
+    except Exception as e:
+        logger.error(f"Unhandled error in upload job {upload_id}: {e}")
+    finally:
+        connections.close_all()
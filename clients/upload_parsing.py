@@ -0,0 +1,92 @@
+"""
+Parallel row parsing for client uploads.
+
+Turning a row into typed client fields (date parsing across many formats,
+combined "Last, First (ID)" client fields, name fallbacks, list and JSON fields)
+is pure Python work that does not touch the database. ChunkParser runs
+UploadRowMapper.parse_chunk for the next chunks in a process pool while the
+chunk loop matches and writes the current one, so large imports use more than
+one core. Chunks are handed back in file order and each chunk's rows in row
+order, so the import behaves exactly as if parsing ran inline.
+"""
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def parse_upload_chunk(row_mapper, chunk_df, source):
+    """Worker entry point; module level so it can be pickled"""
+    return row_mapper.parse_chunk(chunk_df, source)
+
+
+def get_parse_workers():
+    """CLIENT_UPLOAD_PARSE_WORKERS, or one less than the number of cores when it is 0; 1 parses inline"""
+    workers = getattr(settings, 'CLIENT_UPLOAD_PARSE_WORKERS', 0)
+    if workers <= 0:
+        workers = (os.cpu_count() or 1) - 1
+    return max(workers, 1)
+
+
+class ChunkParser:
+    """Parses upload chunks ahead of the chunk loop, inline or on a process pool"""
+
+    def __init__(self, row_mapper, source, chunk_count, workers=None):
+        self.row_mapper = row_mapper
+        self.source = source
+        self.workers = get_parse_workers() if workers is None else workers
+        # Starting the workers takes a few seconds, so small files are parsed inline
+        self.parallel = self.workers > 1 and chunk_count > self.workers
+        self.executor = None
+
+    def start(self):
+        if self.parallel and self.executor is None:
+            # Spawned workers do not inherit the web process's threads or database connections
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"Parsing upload rows on {self.workers} worker processes")
+        return self
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def iter_chunks(self, chunks, select_rows=None):
+        """
+        Yield (chunk_df, rows_df, parsed_rows) for each chunk in order. select_rows
+        picks the rows of a chunk that need processing; when it returns None the
+        chunk is yielded with rows_df and parsed_rows set to None.
+        """
+        if self.executor is None:
+            for chunk_df in chunks:
+                rows_df = select_rows(chunk_df) if select_rows else chunk_df
+                parsed_rows = None if rows_df is None else self.row_mapper.parse_chunk(rows_df, self.source)
+                yield chunk_df, rows_df, parsed_rows
+            return
+
+        # Keep every worker busy with the chunks after the one being written
+        pending = deque()
+        chunks = iter(chunks)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) <= self.workers:
+                chunk_df = next(chunks, None)
+                if chunk_df is None:
+                    exhausted = True
+                    break
+                rows_df = select_rows(chunk_df) if select_rows else chunk_df
+                future = None
+                if rows_df is not None:
+                    future = self.executor.submit(parse_upload_chunk, self.row_mapper, rows_df, self.source)
+                pending.append((chunk_df, rows_df, future))
+            if not pending:
+                return
+            chunk_df, rows_df, future = pending.popleft()
+            yield chunk_df, rows_df, future.result() if future is not None else None
@@ -0,0 +1,112 @@
+"""
+Per-phase timing and query counts for a client upload.
+
+UploadProfiler splits an import into named phases (reading the file, collecting
+keys, preloading existing clients, matching rows, bulk writes, intake
+processing) and records for each one the wall time and the number and time of
+database queries run on the default connection. Chunk throughput and the
+process's peak memory are recorded alongside, and the whole profile is stored in
+ClientUploadLog.upload_details['profile'].
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_memory_mb():
+    """Peak resident set size of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class UploadProfiler:
+    """Wall time, query count and query time per upload phase"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.chunks = []
+        self.current_phase = None
+        self.phase_started = None
+        self.chunk_started = None
+
+    def _phase_stats(self, name):
+        return self.phases.setdefault(name, {'seconds': 0.0, 'queries': 0, 'query_seconds': 0.0})
+
+    def enter(self, name):
+        """Close the running phase and start `name`; time spent in repeated phases adds up"""
+        now = time.perf_counter()
+        if self.current_phase is not None:
+            stats = self._phase_stats(self.current_phase)
+            stats['seconds'] += now - self.phase_started
+            # Peak memory is process-wide and only grows; its value when a phase ends covers that phase
+            stats['peak_memory_mb'] = peak_memory_mb()
+        self.current_phase = name
+        self.phase_started = now
+        if name is not None:
+            self._phase_stats(name)
+
+    def stop(self):
+        self.enter(None)
+
+    def _record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats = self._phase_stats(self.current_phase or 'other')
+            stats['queries'] += 1
+            stats['query_seconds'] += time.perf_counter() - started
+
+    @contextmanager
+    def capture_queries(self):
+        """Count queries run on the default connection while the block runs"""
+        with connection.execute_wrapper(self._record_query):
+            yield self
+
+    def start_chunk(self):
+        self.chunk_started = time.perf_counter()
+
+    def end_chunk(self, number, rows):
+        seconds = time.perf_counter() - self.chunk_started
+        self.chunks.append({
+            'chunk': number,
+            'rows': rows,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds, 1) if seconds > 0 else None,
+            'peak_memory_mb': peak_memory_mb(),
+        })
+
+    def as_dict(self):
+        if self.current_phase is not None:
+            self.stop()
+        total_seconds = time.perf_counter() - self.started
+        total_rows = sum(chunk['rows'] for chunk in self.chunks)
+        return {
+            'total_seconds': round(total_seconds, 3),
+            'total_queries': sum(stats['queries'] for stats in self.phases.values()),
+            'rows_per_second': round(total_rows / total_seconds, 1) if total_rows and total_seconds > 0 else None,
+            'peak_memory_mb': peak_memory_mb(),
+            'phases': {
+                name: {
+                    'seconds': round(stats['seconds'], 3),
+                    'queries': stats['queries'],
+                    'query_seconds': round(stats['query_seconds'], 3),
+                    # Rows of the whole upload per second of this phase
+                    'rows_per_second': round(total_rows / stats['seconds'], 1) if total_rows and stats['seconds'] > 0 else None,
+                    'peak_memory_mb': stats.get('peak_memory_mb'),
+                }
+                for name, stats in self.phases.items()
+            },
+            'chunks': self.chunks,
+        }
@@ -0,0 +1,215 @@
+"""
+Program-name resolution for client uploads.
+
+Upload rows name programs the way the source system spells them. A name that
+is not an exact (case-insensitive) match used to be scored against every
+program, for every distinct name in every upload. ProgramNameResolver indexes
+program names by word and by character trigram, so only programs that can
+score above zero are compared, and keeps aliases learned from fuzzy matches
+that earlier imports committed.
+
+One resolver is shared by all uploads in a process. It is rebuilt when the
+programs or aliases change, detected from their row counts and latest
+updated_at, so every upload still sees programs created or renamed since the
+last one.
+"""
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Max
+
+from core.models import Program, ProgramNameAlias
+
+logger = logging.getLogger(__name__)
+
+# Fuzzy matches scoring below this are still used for their row, but never
+# stored as aliases that later imports would treat as exact
+ALIAS_MIN_SCORE = 0.9
+
+
+def normalize_program_name(name):
+    """Lowercase with runs of whitespace collapsed"""
+    return " ".join((name or '').lower().split())
+
+
+def program_name_similarity(name1, name2):
+    """Similarity of two program names (0-1 scale), as upload matching has always scored it"""
+    if not name1 or not name2:
+        return 0
+
+    name1_norm = normalize_program_name(name1)
+    name2_norm = normalize_program_name(name2)
+
+    if name1_norm == name2_norm:
+        return 1.0
+
+    # One name contains the other
+    if name1_norm in name2_norm or name2_norm in name1_norm:
+        return 0.8
+
+    # Share of common words
+    words1 = set(name1_norm.split())
+    words2 = set(name2_norm.split())
+    if words1 and words2:
+        common_words = len(words1.intersection(words2))
+        total_words = len(words1.union(words2))
+        return common_words / total_words if total_words > 0 else 0
+
+    return 0
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ProgramNameResolver:
+    """
+    Exact, alias and fuzzy lookup of upload program names. Fuzzy results are
+    the same as scoring every program with program_name_similarity and keeping
+    the first best one; the indexes only skip programs that would score 0.
+    """
+
+    def __init__(self, programs, aliases=None, version=None):
+        self.programs = list(programs)
+        self.version = version
+        # Later programs win on a duplicate name, as the upload preload always did
+        self.exact = {}
+        for program in self.programs:
+            name_key = (program.name or '').strip().lower()
+            if name_key:
+                self.exact[name_key] = program
+        self.aliases = dict(aliases or {})
+
+        self.names = [normalize_program_name(program.name) for program in self.programs]
+        # Positions by normalized name, for names contained in a query
+        self.positions_by_name = defaultdict(list)
+        self.token_index = defaultdict(set)
+        self.token_counts = []
+        self.trigram_index = defaultdict(set)
+        for position, name in enumerate(self.names):
+            if not self.programs[position].name:
+                # Unnamed programs never match
+                self.token_counts.append(0)
+                continue
+            self.positions_by_name[name].append(position)
+            tokens = set(name.split())
+            self.token_counts.append(len(tokens))
+            for token in tokens:
+                self.token_index[token].add(position)
+            for gram in _trigrams(name):
+                self.trigram_index[gram].add(position)
+
+        self._fuzzy_cache = {}
+
+    def _containing(self, query):
+        """Positions of named programs whose normalized name contains query"""
+        grams = _trigrams(query)
+        if not grams:
+            return [position for position, name in enumerate(self.names)
+                    if self.programs[position].name and query in name]
+        postings = sorted((self.trigram_index.get(gram, set()) for gram in grams), key=len)
+        return [position for position in set.intersection(*postings) if query in self.names[position]]
+
+    def _contained(self, query):
+        """Positions of named programs whose normalized name is a substring of query"""
+        positions = []
+        substrings = {query[start:end] for start in range(len(query) + 1) for end in range(start, len(query) + 1)}
+        for substring in substrings:
+            positions.extend(self.positions_by_name.get(substring, ()))
+        return positions
+
+    def scores(self, query):
+        """
+        Non-zero program_name_similarity scores of a normalized query, by position.
+        Only programs sharing a word with query or containing / contained in it
+        are looked at.
+        """
+        scores = {}
+        query_tokens = set(query.split())
+        if query_tokens:
+            common = Counter()
+            for token in query_tokens:
+                common.update(self.token_index.get(token, ()))
+            query_count = len(query_tokens)
+            token_counts = self.token_counts
+            for position, shared in common.items():
+                scores[position] = shared / (query_count + token_counts[position] - shared)
+        for position in self._containing(query) + self._contained(query):
+            scores[position] = 1.0 if self.names[position] == query else 0.8
+        return scores
+
+    def fuzzy_match(self, name):
+        """(program, score) of the best scoring program, or (None, 0)"""
+        query = normalize_program_name(name)
+        cached = self._fuzzy_cache.get(query)
+        if cached is not None:
+            return cached
+        best_match, best_score = None, 0
+        scores = self.scores(query)
+        if scores:
+            # Highest score, first program on a tie
+            position = min(scores, key=lambda position: (-scores[position], position))
+            best_match, best_score = self.programs[position], scores[position]
+        self._fuzzy_cache[query] = (best_match, best_score)
+        return best_match, best_score
+
+    def resolve(self, name):
+        """
+        (program, score, how) for an upload program name; how is 'exact', 'alias'
+        or 'fuzzy', and program is None when nothing matches.
+        """
+        program = self.exact.get(name.strip().lower())
+        if program is not None:
+            return program, 1.0, 'exact'
+        program = self.aliases.get(normalize_program_name(name))
+        if program is not None:
+            return program, 1.0, 'alias'
+        program, score = self.fuzzy_match(name)
+        return program, score, 'fuzzy'
+
+
+def get_programs_version():
+    """Changes whenever a program or alias is created, saved or deleted"""
+    programs = Program.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    aliases = ProgramNameAlias.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return programs['count'], programs['updated'], aliases['count'], aliases['updated']
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_program_resolver():
+    """The process-wide resolver, rebuilt if programs or aliases changed since it was built"""
+    global _resolver
+    version = get_programs_version()
+    with _resolver_lock:
+        if _resolver is None or _resolver.version != version:
+            programs = Program.objects.select_related('department').order_by('id')
+            aliases = {
+                alias.alias: alias.program
+                for alias in ProgramNameAlias.objects.select_related('program__department')
+            }
+            _resolver = ProgramNameResolver(programs, aliases, version=version)
+            logger.info(
+                f"Indexed {len(_resolver.programs)} programs and {len(_resolver.aliases)} aliases for upload matching"
+            )
+        return _resolver
+
+
+def record_program_aliases(matches, source):
+    """
+    Store fuzzy program matches used by an import as aliases. matches maps a
+    normalized name to (program, score); only scores of at least ALIAS_MIN_SCORE
+    are learned. Called inside the import's transaction, so matches of rolled
+    back imports are not learned.
+    """
+    aliases = [
+        ProgramNameAlias(alias=alias, program=program, source=source)
+        for alias, (program, score) in matches.items()
+        if score >= ALIAS_MIN_SCORE
+    ]
+    if not aliases:
+        return
+    ProgramNameAlias.objects.bulk_create(aliases, ignore_conflicts=True)
@@ -0,0 +1,222 @@
+"""
+Chunked reading of uploaded client files.
+
+UploadFileReader parses a CSV or XLSX upload once, CHUNK_SIZE rows at a time,
+and spools the parsed chunks to an anonymous temporary file. Later passes
+(key collection, the import loop) replay the spooled chunks, so peak memory is
+bounded by the chunk size instead of the file size.
+
+Column dtypes are unified across chunks the way pandas unifies the internal
+chunks of a whole-file read (int + float -> float, anything mixed -> object),
+so every chunk sees the same types a single pd.read_csv/pd.read_excel would give.
+"""
+import codecs
+import io
+import logging
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
+from pandas.io.parsers import TextParser
+
+logger = logging.getLogger(__name__)
+
+# Tried in order; the first one that decodes and parses the head of the file wins
+CSV_ENCODINGS = ['latin-1', 'cp1252', 'iso-8859-1', 'utf-8', 'utf-16', 'utf-16le', 'utf-16be']
+SNIFF_BYTES = 64 * 1024
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def sniff_csv_encoding(sample):
+    """Pick the encoding for a CSV upload from the first bytes of the file"""
+    for encoding in CSV_ENCODINGS:
+        try:
+            text = codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+        # Only parse complete lines; the sample may end mid-row
+        if len(sample) >= SNIFF_BYTES and '\n' in text:
+            text = text[:text.rindex('\n') + 1]
+        try:
+            pd.read_csv(io.StringIO(text), nrows=100)
+        except Exception as e:
+            logger.debug(f"Encoding {encoding} rejected while sniffing upload: {e}")
+            continue
+        return encoding
+    return CSV_ENCODINGS[0]
+
+
+def _convert_xlsx_cell(cell):
+    """Cell value as pandas.read_excel converts it with the openpyxl engine"""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ''
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        value = int(cell.value)
+        if value == cell.value:
+            return value
+        return float(cell.value)
+    return cell.value
+
+
+def _unify_dtypes(dtypes, has_missing=False):
+    """
+    Common dtype for a column whose chunks were parsed separately. Missing
+    values in any chunk turn an integer column into float and a boolean one
+    into object, as in a whole-file read.
+    """
+    unique = list(dict.fromkeys(dtypes))
+    if len(unique) == 1:
+        dtype = unique[0]
+    elif all(is_numeric_dtype(dtype) and not is_bool_dtype(dtype) for dtype in unique):
+        dtype = np.result_type(*unique)
+    else:
+        return np.dtype(object)
+    if has_missing and is_bool_dtype(dtype):
+        return np.dtype(object)
+    if has_missing and is_integer_dtype(dtype):
+        return np.result_type(dtype, np.float64)
+    return dtype
+
+
+class UploadFileReader:
+    """Reads an uploaded CSV/XLSX file in chunks of chunk_size rows"""
+
+    def __init__(self, file, file_extension, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.file = file
+        self.file_extension = file_extension
+        self.chunk_size = chunk_size
+        self.encoding = None
+        self.columns = []
+        self.total_rows = 0
+        self.chunk_count = 0
+        self.dtypes = {}
+        self._spool = None
+
+    @property
+    def empty(self):
+        return self.total_rows == 0 or not self.columns
+
+    def scan(self):
+        """Parse the whole file once, spooling chunks and recording column dtypes"""
+        self.close()
+        self._spool = tempfile.TemporaryFile()
+        seen_dtypes = {}
+        for chunk in self._parse_chunks():
+            chunk.index = pd.RangeIndex(self.total_rows, self.total_rows + len(chunk))
+            if not self.columns:
+                self.columns = list(chunk.columns)
+            for col in chunk.columns:
+                values = chunk[col]
+                seen_dtypes.setdefault(col, []).append((values.notna().any(), values.isna().any(), values.dtype))
+            pickle.dump(chunk, self._spool, protocol=pickle.HIGHEST_PROTOCOL)
+            self.total_rows += len(chunk)
+            self.chunk_count += 1
+
+        for col, seen in seen_dtypes.items():
+            # An all-empty slice says nothing about the column's type
+            typed = [dtype for has_values, _, dtype in seen if has_values]
+            has_missing = any(missing for _, missing, _ in seen)
+            self.dtypes[col] = _unify_dtypes(typed or [seen[0][2]], has_missing)
+        logger.info(
+            f"Read upload in {self.chunk_count} chunk(s): {self.total_rows} rows, {len(self.columns)} columns"
+            + (f", encoding {self.encoding}" if self.encoding else '')
+        )
+        return self
+
+    def iter_chunks(self):
+        """Yield the spooled chunks in file order, indexed by row position in the file"""
+        if self._spool is None:
+            self.scan()
+        self._spool.seek(0)
+        for _ in range(self.chunk_count):
+            chunk = pickle.load(self._spool)
+            for col, dtype in self.dtypes.items():
+                if chunk[col].dtype != dtype:
+                    chunk[col] = chunk[col].astype(dtype)
+            yield chunk
+
+    def close(self):
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        self.columns = []
+        self.total_rows = 0
+        self.chunk_count = 0
+        self.dtypes = {}
+
+    def _parse_chunks(self):
+        if self.file_extension == 'csv':
+            return self._parse_csv()
+        if self.file_extension == 'xlsx':
+            return self._parse_xlsx()
+        return self._parse_excel_frame()
+
+    def _parse_csv(self):
+        self.file.seek(0)
+        self.encoding = sniff_csv_encoding(self.file.read(SNIFF_BYTES))
+        self.file.seek(0)
+        header = pd.read_csv(self.file, encoding=self.encoding, nrows=0)
+        self.columns = list(header.columns)
+        self.file.seek(0)
+        with pd.read_csv(self.file, encoding=self.encoding, chunksize=self.chunk_size) as chunks:
+            yield from chunks
+
+    def _parse_xlsx(self):
+        from openpyxl import load_workbook
+
+        self.file.seek(0)
+        workbook = load_workbook(self.file, read_only=True, data_only=True, keep_links=False)
+        try:
+            sheet = workbook.worksheets[0]
+            sheet.reset_dimensions()
+            rows = sheet.rows
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [_convert_xlsx_cell(cell) for cell in header]
+            while header and header[-1] == '':
+                header.pop()
+            width = len(header)
+            if not width:
+                return
+
+            pending = []
+            blank_rows = []
+            for cells in rows:
+                # Cells beyond the header row have no column name and are never mapped
+                values = [_convert_xlsx_cell(cell) for cell in cells[:width]]
+                values += [''] * (width - len(values))
+                if all(value == '' for value in values):
+                    # Blank rows are kept unless they trail the data, as read_excel does
+                    blank_rows.append(values)
+                    continue
+                pending.extend(blank_rows)
+                blank_rows = []
+                pending.append(values)
+                while len(pending) >= self.chunk_size:
+                    yield self._frame_from_rows(header, pending[:self.chunk_size])
+                    pending = pending[self.chunk_size:]
+            if pending:
+                yield self._frame_from_rows(header, pending)
+            elif not self.columns:
+                yield self._frame_from_rows(header, [])
+        finally:
+            workbook.close()
+
+    def _frame_from_rows(self, header, rows):
+        parser = TextParser([list(header)] + rows, header=0, skip_blank_lines=False)
+        return parser.read()
+
+    def _parse_excel_frame(self):
+        # Legacy .xls workbooks cannot be streamed; read once and spool the slices
+        self.file.seek(0)
+        df = pd.read_excel(self.file)
+        self.columns = list(df.columns)
+        for chunk_start in range(0, len(df), self.chunk_size):
+            yield df.iloc[chunk_start:chunk_start + self.chunk_size].copy()
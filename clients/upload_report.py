@@ -0,0 +1,134 @@
+"""
+Row-by-row report of a dry-run client upload.
+
+A dry run goes through the whole chunk loop (parsing, duplicate matching,
+enrollment merging and the bulk writes) inside a transaction that is rolled back
+at the end. UploadReport records what happened to every row (created, updated,
+flagged as a duplicate, merged into another row, unchanged, skipped or failed)
+as JSON lines stored next to the uploaded file, so the report for a large file
+is never held in memory. The upload_report view streams it back as CSV or JSON.
+"""
+import csv
+import io
+import json
+import os
+import re
+
+from django.conf import settings
+
+from .upload_jobs import UPLOAD_STORAGE_DIR
+
+REPORT_FIELDS = ['row', 'action', 'client_id', 'name', 'matched_client_id', 'reason', 'message']
+
+ROW_NUMBER_PATTERN = re.compile(r'^Row (\d+)')
+
+
+def get_report_path(upload_log):
+    return os.path.join(settings.MEDIA_ROOT, UPLOAD_STORAGE_DIR, f"{upload_log.external_id}.report.jsonl")
+
+
+def _row_number(entry):
+    """Spreadsheet row number of an error or warning, if it names one"""
+    if isinstance(entry, dict):
+        return entry.get('row')
+    match = ROW_NUMBER_PATTERN.match(str(entry))
+    return int(match.group(1)) if match else None
+
+
+def _name(first_name, last_name):
+    return f"{first_name or ''} {last_name or ''}".strip()
+
+
+class UploadReport:
+    """Append-only JSON-lines file of per-row dry-run outcomes, written once per chunk"""
+
+    def __init__(self, path):
+        self.path = path
+        self.counts = {}
+        self.lines = []
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, 'w', encoding='utf-8').close()
+
+    def add(self, row, action, **fields):
+        entry = {'row': row, 'action': action}
+        entry.update({key: value for key, value in fields.items() if value not in (None, '')})
+        self.lines.append(json.dumps(entry, default=str) + '\n')
+        self.counts[action] = self.counts.get(action, 0) + 1
+
+    def write(self):
+        with open(self.path, 'a', encoding='utf-8') as fh:
+            fh.writelines(self.lines)
+        self.lines = []
+
+    def add_chunk(self, unchanged_indices, clients_to_update, clients_to_create, errors, warnings):
+        """Outcomes of one chunk; row indices are 0-based file positions"""
+        for index in unchanged_indices:
+            self.add(index + 2, 'unchanged', reason='Row identical to the last import')
+        for update_data in clients_to_update:
+            client = update_data['client']
+            self.add(
+                update_data['row_index'] + 2, 'update',
+                client_id=client.client_id, name=_name(client.first_name, client.last_name),
+                matched_client_id=client.client_id,
+            )
+        for client_data in clients_to_create:
+            fields = client_data['client_fields']
+            name = _name(fields.get('first_name'), fields.get('last_name'))
+            duplicate_info = client_data.get('duplicate_info') or {}
+            if duplicate_info.get('is_duplicate'):
+                self.add(
+                    client_data['row_index'] + 2, 'duplicate',
+                    client_id=fields.get('client_id'), name=name,
+                    matched_client_id=duplicate_info['duplicate_client'].client_id,
+                    reason=duplicate_info.get('match_type'),
+                )
+            else:
+                self.add(client_data['row_index'] + 2, 'create', client_id=fields.get('client_id'), name=name)
+            for merged_row_index in client_data.get('merged_row_indices', []):
+                self.add(
+                    merged_row_index + 2, 'merge',
+                    client_id=fields.get('client_id'), name=name,
+                    reason=f"Same client as row {client_data['row_index'] + 2}",
+                )
+        # Row errors are recorded twice, as a message and as a dict with the traceback
+        reported_rows = {_row_number(error) for error in errors if not isinstance(error, dict)}
+        for error in errors:
+            if isinstance(error, dict):
+                if error.get('row') in reported_rows:
+                    continue
+                message = error.get('user_friendly_message') or error.get('error_message')
+            else:
+                message = str(error)
+            self.add(_row_number(error), 'error', message=message)
+        for warning in warnings:
+            action = 'skip' if 'skipped' in str(warning) else 'warning'
+            self.add(_row_number(warning), action, message=str(warning))
+        self.write()
+
+
+def iter_report_csv(path):
+    """CSV lines of a stored report, one row at a time"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writeheader()
+    yield flush()
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            writer.writerow(json.loads(line))
+            yield flush()
+
+
+def iter_report_json(path, summary):
+    """A JSON document {"summary": ..., "rows": [...]} streamed from a stored report"""
+    yield '{"summary": ' + json.dumps(summary, default=str) + ', "rows": ['
+    with open(path, encoding='utf-8') as fh:
+        for position, line in enumerate(fh):
+            yield (',' if position else '') + line.rstrip('\n')
+    yield ']}'
@@ -0,0 +1,670 @@
+"""
+Compiled row mapping for client uploads.
+
+UploadRowMapper is built once per upload from the resolved column mapping. It
+records the position of every mapped column, so a row can be read by field name
+without scanning df.columns, and turns rows into the typed client dicts used by
+the upload chunk loop.
+"""
+import json
+import logging
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import pandas as pd
+from django.utils import timezone
+
+from .upload_dates import DATE_FORMATS, NEEDS_FALLBACK, parse_date_column
+
+logger = logging.getLogger(__name__)
+
+# Optional text fields copied onto client_data, empty values become None
+OPTIONAL_TEXT_FIELDS = (
+    'middle_name', 'preferred_name', 'alias', 'gender', 'gender_identity', 'pronoun',
+    'marital_status', 'citizenship_status', 'location_county', 'province', 'city',
+    'postal_code', 'address', 'address_2', 'language', 'preferred_language',
+    'mother_tongue', 'official_language', 'self_identification_race_ethnicity',
+    'indigenous_status', 'lgbtq_status', 'highest_level_education', 'lhin', 'phone',
+    'level_of_support', 'client_type', 'referral_source', 'phone_work', 'phone_alt',
+    'medical_conditions', 'primary_diagnosis', 'family_doctor', 'health_card_number',
+    'health_card_version', 'health_card_issuing_province', 'no_health_card_reason',
+    'next_of_kin', 'emergency_contact', 'comments', 'chart_number',
+    # Extended fields for ClientExtended model
+    'indigenous_identity', 'military_status', 'refugee_status', 'family_head_client_no',
+    'relationship', 'primary_worker', 'income_source', 'taxation_year_filed', 'status_id',
+    'picture_id', 'other_id', 'allergies', 'other_health_supports',
+    'vision_hearing_speech_supports', 'other_accessibility_supports',
+    'religious_cultural_supports', 'safety_concerns', 'other_supports',
+    'access_to_housing_application', 'access_to_housing_no', 'access_point_application',
+    'access_point_no', 'cars', 'discharge_disposition', 'intake_status',
+    'lived_last_12_months', 'reason_for_service', 'rejection_reason', 'room', 'bed',
+    'occupancy_status', 'restriction_reason', 'restriction_status', 'early_termination_by',
+)
+
+BOOLEAN_FIELDS = (
+    'language_interpreter_required', 'children_home', 'permission_to_phone',
+    'permission_to_email', 'chronically_homeless', 'bnl_consent', 'harm_reduction_support',
+    'medication_support', 'pregnancy_support', 'mental_health_support',
+    'physical_health_support', 'daily_activities_support', 'cannot_use_stairs',
+    'limited_mobility', 'wheelchair_accessibility', 'english_translator', 'reading_supports',
+    'pet_owner', 'legal_support', 'immigration_support', 'intimate_partner_violence_support',
+    'human_trafficking_support',
+)
+
+INTEGER_FIELDS = (
+    'children_number', 'household_size', 'num_bednights_current_stay', 'length_homeless_3yrs',
+    'cars_no', 'bed_nights_historical', 'restriction_duration_days',
+)
+
+# intake_date is parsed up front (future intakes skip the row) and passed in
+DATE_FIELDS = (
+    'health_card_exp_date', 'service_end_date', 'rejection_date', 'restriction_date',
+)
+
+# Date fields that produce a "future date detected" warning (intake and discharge
+# dates skip the whole row instead)
+FUTURE_DATE_WARNING_FIELDS = (
+    'dob', 'health_card_exp_date', 'service_end_date', 'rejection_date', 'restriction_date',
+)
+
+# Date fields parsed column-at-a-time in parse_chunk
+COLUMN_DATE_FIELDS = ('intake_date', 'discharge_date', 'dob') + DATE_FIELDS
+
+NON_DATE_DOB_VALUES = {'yes', 'no', 'y', 'n', 'true', 'false', '1', '0', ''}
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+def clean_client_id(value):
+    """Clean client_id to ensure it's a whole number string without decimals"""
+    if value is None or pd.isna(value):
+        return None
+    try:
+        str_value = str(value).strip()
+        if not str_value or str_value.lower() in ['nan', 'none', 'null', '']:
+            return None
+        # If it's a decimal number (like 2765.0), convert to integer then back to string
+        if '.' in str_value:
+            float_val = float(str_value)
+            if float_val.is_integer():
+                return str(int(float_val))
+        return str_value
+    except (ValueError, TypeError):
+        return None
+
+
+def parse_boolean(value, default=False):
+    """Parse boolean value from string, handling empty values"""
+    if not value or value.strip() == '':
+        return default
+    return str(value).lower().strip() in ['true', '1', 'yes', 'y']
+
+
+def parse_integer(value, default=None):
+    """Parse integer value from string, handling empty values"""
+    if not value or value.strip() == '':
+        return default
+    try:
+        return int(str(value).strip())
+    except (ValueError, TypeError):
+        return default
+
+
+def is_future_date(parsed_date):
+    """Check if date is in the future"""
+    if not parsed_date:
+        return False
+    return parsed_date > timezone.now().date()
+
+
+def _parse_split_date(value_str, separator, orders):
+    parts = value_str.split(separator)
+    if len(parts) != 3:
+        return None
+    for order in orders:
+        try:
+            values = dict(zip(order, parts))
+            year, month, day = values['year'], values['month'], values['day']
+            if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
+                return datetime(int(year), int(month), int(day)).date()
+            return None
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def parse_date(value, default=None):
+    """
+    Parse date value from string, handling empty values, multiple formats,
+    Excel serial numbers and various date formats
+    """
+    if not value or (isinstance(value, str) and value.strip() == ''):
+        return default
+    # Upload columns repeat the same date strings, so their results are cached
+    parsed = _parse_date_text(value) if isinstance(value, str) else _parse_date_value(value)
+    return default if parsed is None else parsed
+
+
+def _parse_date_value(value):
+    # Handle pandas Timestamp or datetime objects directly
+    if hasattr(value, 'date'):
+        try:
+            return value.date()
+        except (AttributeError, TypeError):
+            pass
+
+    if isinstance(value, date):
+        return value
+
+    # Excel serial numbers are days since 1899-12-30 (Excel treats 1900 as a leap year)
+    try:
+        numeric_value = float(value)
+        if 1 <= numeric_value <= 1000000:
+            parsed_date = (EXCEL_EPOCH + timedelta(days=int(numeric_value))).date()
+            logger.debug(f"Converted Excel serial {numeric_value} to date: {parsed_date}")
+            return parsed_date
+    except (ValueError, TypeError, OverflowError):
+        pass
+
+    # Try pandas automatic parsing first (handles most standard formats)
+    try:
+        parsed = pd.to_datetime(value, errors='coerce')
+        if pd.notna(parsed):
+            return parsed.date() if hasattr(parsed, 'date') else parsed
+    except (ValueError, TypeError, OverflowError):
+        pass
+
+    # If pandas fails, try manual parsing for common formats
+    try:
+        value_str = str(value).strip()
+        # Remove time components: "2024-12-05 14:30:00" / "2024-12-05T14:30:00" -> "2024-12-05"
+        if ' ' in value_str:
+            value_str = value_str.split(' ')[0]
+        if 'T' in value_str:
+            value_str = value_str.split('T')[0]
+
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value_str, date_format).date()
+            except (ValueError, TypeError):
+                continue
+
+        if '/' in value_str:
+            parsed_date = _parse_split_date(value_str, '/', [
+                ('month', 'day', 'year'),
+                ('day', 'month', 'year'),
+            ])
+            if parsed_date:
+                return parsed_date
+
+        if '-' in value_str:
+            parsed_date = _parse_split_date(value_str, '-', [
+                ('year', 'month', 'day'),
+                ('month', 'day', 'year'),
+                ('day', 'month', 'year'),
+            ])
+            if parsed_date:
+                return parsed_date
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.debug(f"Failed to parse date '{value}': {e}")
+
+    return None
+
+
+_parse_date_text = lru_cache(maxsize=4096)(_parse_date_value)
+
+
+def parse_combined_client_field(client_field_value, client_id_field_value=None):
+    """
+    Parse client field that can be in various formats:
+    1. Combined: 'Last, First (ID)' - everything in one field
+    2. Separate: 'Last, First' + client_id from separate field
+    3. Complex: 'Last, First (Preferred)' - with preferred names
+    4. Complex: 'First (Previous), Last' - with previous names
+
+    Handles various name formats:
+    - Abdul-Azim,  Safi
+    - Abdirazaq Warsame,  Mohamed
+    - A. Hussein,  Mohamud
+    - Abbakar,  Tagwa Seddig Adam
+    - Abdoun Mohamed,  Sarah Hassan
+    - Adeshigbin,  Babatunde (Ganiu)
+    - Adeware,  Olubunni (Elizabeth)
+    - Adrian (Prev. Langton),  Naomi
+    - Ahmed,  Tasaddhuque (Duke)
+    - Archibald_2,  Reina
+    - Al-Khair,  A'shafie
+
+    Returns: (first_name, last_name, client_id)
+    """
+    if not client_field_value or str(client_field_value).strip() == '':
+        return None, None, None
+
+    client_str = str(client_field_value).strip()
+    client_id = None
+
+    # Pattern 1: "Last, First (ID)" - Last, First with ID in parentheses
+    pattern1 = r'^([A-Za-z0-9\s._\'-]+),\s*([A-Za-z0-9\s._\'-]+)\s*\((\d+)\)$'
+    match1 = re.match(pattern1, client_str)
+    if match1:
+        last_name = match1.group(1).strip()    # "Abdul-Azim"
+        first_name = match1.group(2).strip()   # "Safi"
+        client_id = match1.group(3).strip()    # "12345"
+
+        return first_name, last_name, client_id
+
+    # Pattern 2: "Last, First (Preferred)" - Last, First with preferred name in parentheses
+    pattern2 = r'^([A-Za-z0-9\s._\'-]+),\s*([A-Za-z0-9\s._\'-]+)\s*\(([A-Za-z0-9\s._\'-]+)\)$'
+    match2 = re.match(pattern2, client_str)
+    if match2:
+        last_name = match2.group(1).strip()    # "Adeshigbin"
+        first_name = match2.group(2).strip()   # "Babatunde"
+        # The preferred name in parentheses ("Ganiu") is not imported
+
+        # Use client_id from separate field if provided
+        if client_id_field_value and str(client_id_field_value).strip():
+            client_id = str(client_id_field_value).strip()
+            return first_name, last_name, client_id
+        else:
+            # Return names but no client_id
+            return first_name, last_name, None
+
+    # Pattern 3: "First (Previous), Last" - First with previous name, Last
+    pattern3 = r'^([A-Za-z0-9\s._\'-]+)\s*\(([A-Za-z0-9\s._\'-]+)\)\s*,\s*([A-Za-z0-9\s._\'-]+)$'
+    match3 = re.match(pattern3, client_str)
+    if match3:
+        first_name = match3.group(1).strip()    # "Adrian"
+        last_name = match3.group(3).strip()     # "Naomi"
+        # The previous name in parentheses ("Prev. Langton") is not imported
+
+        # Use client_id from separate field if provided
+        if client_id_field_value and str(client_id_field_value).strip():
+            client_id = str(client_id_field_value).strip()
+            return first_name, last_name, client_id
+        else:
+            # Return names but no client_id
+            return first_name, last_name, None
+
+    # Pattern 4: "Last, First" - Simple Last, First without parentheses
+    pattern4 = r'^([A-Za-z0-9\s._\'-]+),\s*([A-Za-z0-9\s._\'-]+)$'
+    match4 = re.match(pattern4, client_str)
+    if match4:
+        last_name = match4.group(1).strip()    # "Abdul-Azim"
+        first_name = match4.group(2).strip()   # "Safi"
+
+        # Use client_id from separate field if provided
+        if client_id_field_value and str(client_id_field_value).strip():
+            client_id = str(client_id_field_value).strip()
+            return first_name, last_name, client_id
+        else:
+            # Return names but no client_id
+            return first_name, last_name, None
+
+    # Pattern 5: "First Last" - Simple space-separated First Last format (no comma)
+    # This handles cases like "John Doe" or "Mary Jane Smith"
+    pattern5 = r'^([A-Za-z0-9._\'-]+(?:\s+[A-Za-z0-9._\'-]+)*)\s+([A-Za-z0-9\s._\'-]+)$'
+    match5 = re.match(pattern5, client_str)
+    if match5:
+        # First group might be just first name or first + middle name(s)
+        name_parts = match5.group(1).strip().split()
+        if len(name_parts) >= 1:
+            first_name = name_parts[0].strip()  # First part is first name
+            last_name = match5.group(2).strip()  # Second group is last name
+
+            # Use client_id from separate field if provided
+            if client_id_field_value and str(client_id_field_value).strip():
+                client_id = str(client_id_field_value).strip()
+                return first_name, last_name, client_id
+            else:
+                # Return names but no client_id
+                return first_name, last_name, None
+
+    # If no pattern matches, return None
+    return None, None, None
+
+
+class ParsedRow:
+    """
+    Result of the CPU-bound part of processing one upload row: date parsing,
+    typed client fields, combined client field and name fallbacks. Plain data,
+    so it can be produced in a worker process.
+    """
+
+    __slots__ = ('intake_date', 'discharge_date', 'dob', 'client_data', 'error')
+
+    def __init__(self, intake_date=None, discharge_date=None, dob=None, client_data=None, error=None):
+        self.intake_date = intake_date
+        self.discharge_date = discharge_date
+        self.dob = dob
+        self.client_data = client_data
+        self.error = error
+
+
+class MappedRow:
+    """One upload row, readable by mapped field name or by original column name"""
+
+    __slots__ = ('mapper', 'values')
+
+    def __init__(self, mapper, values):
+        self.mapper = mapper
+        self.values = values
+
+    def get(self, field_name, default=''):
+        """
+        Stripped string value of the first column mapped to field_name, or
+        default when that cell is empty or no column is mapped.
+        """
+        position = self.mapper.field_positions.get(field_name)
+        if position is None:
+            return default
+        value = self.values[position]
+        if pd.notna(value):
+            text = str(value).strip()
+            if text:
+                return text
+        return default
+
+    def get_optional(self, field_name, default=None):
+        """Field value with empty strings converted to default"""
+        value = self.get(field_name, '')
+        if value == '' or value is None:
+            return default
+        return value
+
+    def get_raw(self, field_name):
+        """Unconverted value of the first column mapped to field_name"""
+        position = self.mapper.field_positions.get(field_name)
+        return None if position is None else self.values[position]
+
+    def first_present(self, positions):
+        """First non-empty value among the given column positions"""
+        for position in positions:
+            value = self.values[position]
+            if value and not pd.isna(value) and str(value).strip() and str(value).strip().lower() not in ['nan', 'none', '']:
+                return value
+        return None
+
+    def get_source_id(self, source_type):
+        """Value of the first non-empty '<source> id' column, e.g. 'SMIS ID'"""
+        for position in self.mapper.source_id_positions.get(source_type, []):
+            value = self.values[position]
+            if pd.notna(value) and str(value).strip():
+                return str(value).strip()
+        return None
+
+    def __getitem__(self, column):
+        return self.values[self.mapper.column_positions[column]]
+
+    def __contains__(self, column):
+        return column in self.mapper.column_positions
+
+
+class UploadRowMapper:
+    """Field -> column positions for one upload, resolved once from column_mapping"""
+
+    def __init__(self, columns, column_mapping, date_formats=None):
+        self.columns = list(columns)
+        # Inferred format per date field (see upload_dates.infer_date_formats)
+        self.date_formats = dict(date_formats or {})
+        self.column_positions = {col: position for position, col in enumerate(self.columns)}
+
+        # First column mapped to each field, matching the chunk loop's lookup order
+        self.field_positions = {}
+        for position, col in enumerate(self.columns):
+            field_name = column_mapping.get(col)
+            if field_name and field_name not in self.field_positions:
+                self.field_positions[field_name] = position
+        self.mapped_fields = set(self.field_positions)
+
+        # Unmapped fallback columns recognised by name
+        self.client_column_positions = []
+        self.client_id_column_positions = []
+        self.name_column_positions = []
+        self.source_id_positions = {'SMIS': [], 'EMHware': []}
+        for position, col in enumerate(self.columns):
+            col_lower = col.lower().strip()
+            mapped_to = column_mapping.get(col)
+            if col_lower == 'client' and mapped_to not in ['client_id', 'first_name', 'last_name']:
+                self.client_column_positions.append(position)
+            if 'client' in col_lower and 'id' in col_lower and mapped_to not in ['first_name', 'last_name', 'client_combined']:
+                self.client_id_column_positions.append(position)
+            if col_lower == 'name' and mapped_to not in ['first_name', 'last_name', 'client_combined']:
+                self.name_column_positions.append(position)
+            if 'smis' in col_lower and 'id' in col_lower:
+                self.source_id_positions['SMIS'].append(position)
+            if 'emhware' in col_lower and 'id' in col_lower:
+                self.source_id_positions['EMHware'].append(position)
+
+    def iter_rows(self, chunk_df):
+        """Yield (index, MappedRow) for each row of a chunk without building Series objects"""
+        for values in chunk_df.itertuples(index=True, name=None):
+            yield values[0], MappedRow(self, values[1:])
+
+    def parse_dob(self, row):
+        """Date of birth for a row; values that are clearly not dates count as missing"""
+        dob_value = row.get('dob')
+        if not dob_value or dob_value.strip().lower() in NON_DATE_DOB_VALUES:
+            return None
+        try:
+            return parse_date(dob_value)
+        except Exception:
+            return None
+
+    def build_client_data(self, row, source, dob=None, intake_date=None, dates=None):
+        """Typed client dict for a row, before combined-field and name fallbacks"""
+        get = row.get
+        dates = dates or {}
+        email = get('email')
+        phone = get('phone')
+
+        client_data = {
+            'first_name': get('first_name'),
+            'last_name': get('last_name'),
+            'dob': dob,
+            'client_id': clean_client_id(get('client_id')),
+            'email': email if email else None,
+            'source': source,
+            'intake_date': intake_date,
+            'contact_information': {
+                'email': email if email else None,
+                'phone': phone if phone else None,
+            },
+        }
+        for field_name in OPTIONAL_TEXT_FIELDS:
+            client_data[field_name] = row.get_optional(field_name)
+        for field_name in BOOLEAN_FIELDS:
+            client_data[field_name] = parse_boolean(get(field_name))
+        for field_name in INTEGER_FIELDS:
+            client_data[field_name] = parse_integer(get(field_name))
+        for field_name in DATE_FIELDS:
+            value = dates.get(field_name, NEEDS_FALLBACK)
+            client_data[field_name] = parse_date(get(field_name)) if value is NEEDS_FALLBACK else value
+        return client_data
+
+    def parse_row(self, row, source, dates=None):
+        """
+        ParsedRow for a row. Errors are kept on the result rather than raised so
+        the chunk loop reports them against the row. dates holds values already
+        parsed from the row's date columns; NEEDS_FALLBACK cells are parsed here.
+        """
+        dates = dates or {}
+        intake_date = dates.get('intake_date', NEEDS_FALLBACK)
+        if intake_date is NEEDS_FALLBACK:
+            intake_date_value = row.get('intake_date')
+            intake_date = parse_date(intake_date_value) if intake_date_value else None
+        discharge_date = dates.get('discharge_date', NEEDS_FALLBACK)
+        if discharge_date is NEEDS_FALLBACK:
+            discharge_date_value = row.get('discharge_date')
+            discharge_date = parse_date(discharge_date_value) if discharge_date_value else None
+        parsed = ParsedRow(intake_date=intake_date, discharge_date=discharge_date)
+        try:
+            dob = dates.get('dob', NEEDS_FALLBACK)
+            parsed.dob = self.parse_dob(row) if dob is NEEDS_FALLBACK else dob
+            client_data = self.build_client_data(
+                row, source, dob=parsed.dob, intake_date=parsed.intake_date, dates=dates,
+            )
+            self.add_combined_client_fields(row, client_data)
+            self.add_structured_fields(row, client_data)
+            parsed.client_data = client_data
+        except Exception as e:
+            parsed.error = e
+        return parsed
+
+    def add_combined_client_fields(self, row, client_data):
+        """
+        Fill missing names and client_id from a combined "Last, First (ID)" client
+        column, an unmapped "Client ID" column or a "First Last" name column.
+        """
+        # Look for combined client field via mapping first
+        combined_client_value = row.get_raw('client_combined')
+
+        # If not found via mapping, check for "Client" or "client" column directly (case-insensitive)
+        if not combined_client_value or pd.isna(combined_client_value) or not str(combined_client_value).strip():
+            if self.client_column_positions:
+                combined_client_value = row.values[self.client_column_positions[0]]
+
+        # Look for separate client_id field via mapping
+        client_id_from_separate_field = row.get_raw('client_id')
+
+        # If not found via mapping, check for "Client ID" or "client id" column directly (case-insensitive)
+        if not client_id_from_separate_field or pd.isna(client_id_from_separate_field) or (str(client_id_from_separate_field).strip() == '' or str(client_id_from_separate_field).strip().lower() in ['nan', 'none', '']):
+            potential_client_id = row.first_present(self.client_id_column_positions)
+            if potential_client_id is not None:
+                client_id_from_separate_field = potential_client_id
+
+        # Try to extract names and client_id from combined field
+        if combined_client_value and not pd.isna(combined_client_value) and str(combined_client_value).strip():
+            parsed_first, parsed_last, parsed_client_id = parse_combined_client_field(
+                combined_client_value,
+                client_id_from_separate_field
+            )
+
+            # Override names if parsing was successful
+            if parsed_first and parsed_last:
+                if not client_data.get('first_name') or (isinstance(client_data.get('first_name'), str) and client_data.get('first_name', '').strip() == ''):
+                    client_data['first_name'] = parsed_first
+                if not client_data.get('last_name') or (isinstance(client_data.get('last_name'), str) and client_data.get('last_name', '').strip() == ''):
+                    client_data['last_name'] = parsed_last
+
+                # Override client_id if we successfully parsed it and it's missing
+                if parsed_client_id and (not client_data.get('client_id') or (isinstance(client_data.get('client_id'), str) and client_data.get('client_id', '').strip() == '')):
+                    client_data['client_id'] = clean_client_id(parsed_client_id)
+
+        # If client_id is still missing, try to get it from Client ID column
+        client_id_value = client_data.get('client_id')
+        if (not client_id_value or (isinstance(client_id_value, str) and client_id_value.strip() == '')) and client_id_from_separate_field:
+            try:
+                if not pd.isna(client_id_from_separate_field):
+                    cleaned_id = clean_client_id(client_id_from_separate_field)
+                    if cleaned_id:
+                        client_data['client_id'] = cleaned_id
+            except Exception:
+                pass
+
+        # If names are still missing, try to extract from a simple "name" column (First Last format)
+        first_name_val = client_data.get('first_name')
+        last_name_val = client_data.get('last_name')
+        first_name_empty = not first_name_val or (isinstance(first_name_val, str) and first_name_val.strip() == '')
+        last_name_empty = not last_name_val or (isinstance(last_name_val, str) and last_name_val.strip() == '')
+
+        if first_name_empty or last_name_empty:
+            # Check for a "name" column that might contain "First Last" format
+            name_field_value = None
+            if self.name_column_positions:
+                name_field_value = row.values[self.name_column_positions[0]]
+
+            if name_field_value and str(name_field_value).strip():
+                name_str = str(name_field_value).strip()
+                # Try to parse as "First Last" format (simple space-separated)
+                # Only split if we have at least one space and the result has 2+ parts
+                name_parts = name_str.split()
+                if len(name_parts) >= 2:
+                    # First part is first name, rest is last name
+                    if first_name_empty:
+                        client_data['first_name'] = name_parts[0]
+                    if last_name_empty:
+                        client_data['last_name'] = ' '.join(name_parts[1:])
+        return client_data
+
+    def parse_date_columns(self, chunk_df):
+        """
+        Per-row dicts of the chunk's mapped date fields, each column parsed in
+        one pass with its inferred format
+        """
+        columns = {}
+        for field_name in COLUMN_DATE_FIELDS:
+            position = self.field_positions.get(field_name)
+            if position is not None:
+                raw = chunk_df.iloc[:, position]
+                columns[field_name] = parse_date_column(raw, self.date_formats.get(field_name)).tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())] if columns else None
+
+    def parse_chunk(self, chunk_df, source):
+        """ParsedRow for every row of a chunk, in row order"""
+        row_dates = self.parse_date_columns(chunk_df)
+        if row_dates is None:
+            return [self.parse_row(row, source) for _, row in self.iter_rows(chunk_df)]
+        return [
+            self.parse_row(row, source, dates)
+            for (_, row), dates in zip(self.iter_rows(chunk_df), row_dates)
+        ]
+
+    def add_structured_fields(self, row, client_data):
+        """Fill the list, JSON contact and address fields of client_data from a row"""
+        get = row.get
+
+        # Handle languages_spoken (expect comma-separated string)
+        languages = get('language')
+        if languages:
+            client_data['languages_spoken'] = [lang.strip() for lang in languages.split(',') if lang.strip()]
+        else:
+            client_data['languages_spoken'] = []
+
+        # Handle ethnicity (expect comma-separated string)
+        ethnicity = get('ethnicity')
+        if ethnicity:
+            client_data['ethnicity'] = [eth.strip() for eth in ethnicity.split(',') if eth.strip()]
+        else:
+            client_data['ethnicity'] = []
+
+        # Handle support_workers (expect comma-separated string)
+        support_workers = get('support_workers')
+        if support_workers:
+            client_data['support_workers'] = [worker.strip() for worker in support_workers.split(',') if worker.strip()]
+        # Don't set empty list if no support_workers column exists - this prevents overwriting existing data
+
+        # Handle next_of_kin and emergency_contact (expect JSON string or simple text)
+        for field_name in ('next_of_kin', 'emergency_contact'):
+            value = get(field_name)
+            if value:
+                try:
+                    client_data[field_name] = json.loads(value)
+                except json.JSONDecodeError:
+                    # If JSON parsing fails, create a simple dict with the string
+                    client_data[field_name] = {'name': value}
+            else:
+                client_data[field_name] = {}
+
+        # Handle addresses (expect JSON string or individual address fields)
+        addresses = []
+        if 'addresses' in row and pd.notna(row['addresses']):
+            try:
+                addresses = json.loads(str(row['addresses']))
+            except (json.JSONDecodeError, ValueError, TypeError):
+                addresses = []
+        elif get('address'):
+            address = {
+                'type': get('address_type', 'Home'),
+                'street': get('address'),
+                'address_2': get('address_2'),
+                'city': get('city'),
+                'state': get('province'),
+                'zip': get('postal_code'),
+                'country': 'USA'  # Default country
+            }
+            if any(address.values()):
+                addresses = [address]
+
+        client_data['addresses'] = addresses
+        return client_data
@@ -0,0 +1,642 @@
+"""
+Set-based client import for PostgreSQL.
+
+StagedClientImport COPYs the parsed rows of an upload into a temporary staging
+table, resolves matches against existing clients with joins in the same priority
+order as the row-by-row chunk loop, and applies the result with one INSERT for new
+clients, one UPDATE ... FROM for matched clients and INSERT ... ON CONFLICT for
+their ClientExtended records.
+
+Only plain client files are staged. Uploads with intake, discharge or program
+columns, or that depend on the combined 'Client'/'Name' column parsing, keep going
+through the chunk loop in process_client_upload. The engine is enabled with
+CLIENT_UPLOAD_ENGINE = 'staging'.
+"""
+import csv
+import io
+import json
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from core.client_search import NAME_DUPLICATE_CANDIDATES
+from core.fuzzy_matching import fuzzy_matcher
+from core.models import Client, ClientDuplicate, ClientExtended
+from core.name_keys import normalize_name, refresh_name_keys
+
+from .upload_row_mapper import FUTURE_DATE_WARNING_FIELDS, is_future_date
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = 'client_upload_staging'
+PLACEHOLDER_DOB = date(1900, 1, 1)
+
+# Mapped fields that only the chunk loop knows how to handle
+ROW_LOOP_FIELDS = {
+    'client_combined', 'intake_date', 'discharge_date', 'reason_discharge',
+    'program_name', 'program_department', 'program_status', 'sub_program',
+}
+
+CLIENT_FIELDS = {field.name: field for field in Client._meta.concrete_fields}
+EXTENDED_FIELDS = {
+    field.name: field for field in ClientExtended._meta.concrete_fields
+    if field.name not in ('id', 'client', 'external_id', 'created_at', 'updated_at')
+}
+
+# Client columns filled from the parsed row, in staging table order
+CLIENT_ROW_FIELDS = (
+    'first_name', 'last_name', 'dob', 'client_id', 'email', 'middle_name', 'preferred_name',
+    'alias', 'gender', 'gender_identity', 'pronoun', 'marital_status', 'citizenship_status',
+    'location_county', 'province', 'city', 'postal_code', 'address', 'address_2', 'language',
+    'preferred_language', 'mother_tongue', 'official_language', 'language_interpreter_required',
+    'self_identification_race_ethnicity', 'indigenous_status', 'lgbtq_status',
+    'highest_level_education', 'children_home', 'children_number', 'lhin', 'phone',
+    'level_of_support', 'client_type', 'referral_source', 'phone_work', 'phone_alt',
+    'permission_to_phone', 'permission_to_email', 'medical_conditions', 'primary_diagnosis',
+    'family_doctor', 'health_card_number', 'health_card_version', 'health_card_exp_date',
+    'health_card_issuing_province', 'no_health_card_reason', 'comments', 'chart_number',
+    'contact_information', 'languages_spoken', 'ethnicity', 'support_workers', 'next_of_kin',
+    'emergency_contact', 'addresses',
+)
+JSON_ROW_FIELDS = (
+    'contact_information', 'languages_spoken', 'ethnicity', 'support_workers', 'next_of_kin',
+    'emergency_contact', 'addresses',
+)
+# Mapped JSON fields are only written to existing clients when their column is in the file
+UPDATABLE_JSON_FIELDS = ('ethnicity', 'support_workers', 'next_of_kin', 'emergency_contact')
+EXTENDED_ROW_FIELDS = tuple(EXTENDED_FIELDS)
+
+SOURCE_ID_FIELDS = {'SMIS': 'smis_id', 'EMHware': 'emhware_id'}
+# New rows whose name-duplicate candidates are fetched in one query
+NAME_CANDIDATE_BATCH = 500
+
+# (match_type, join condition) in the chunk loop's priority order. Each step only
+# considers staged rows that are still unmatched.
+ID_MATCH_STEPS = (
+    ('source_id', "NULLIF(btrim(c.{same_id}), '') = s.client_id"),
+    ('other_source_id', "NULLIF(btrim(c.{other_id}), '') = s.other_source_id"),
+    ('legacy_client_id', "c.legacy_client_ids @> jsonb_build_array(jsonb_build_object('client_id', s.client_id))"),
+    ('legacy_client_id', "c.legacy_client_ids @> jsonb_build_array(jsonb_build_object('client_id', s.other_source_id))"),
+    ('cross_source_id', "NULLIF(btrim(c.{other_id}), '') = s.client_id"),
+    ('matching_client_id', "c.client_id = s.client_id"),
+    ('name_dob_match', (
+        "lower(btrim(c.first_name)) = s.first_name_key AND lower(btrim(c.last_name)) = s.last_name_key "
+        "AND c.dob = s.dob"
+    )),
+)
+EXACT_MATCH_STEPS = (
+    ('matching_external_id', "c.uid_external = s.uid_external"),
+    ('exact_email', "(c.email = s.email_key OR c.contact_information->>'email' = s.email_key)"),
+    ('exact_phone', "(c.phone = s.phone OR c.contact_information->>'phone' = s.phone)"),
+)
+
+
+def staged_import_enabled():
+    return getattr(settings, 'CLIENT_UPLOAD_ENGINE', 'python') == 'staging' and connection.vendor == 'postgresql'
+
+
+def can_stage_upload(row_mapper):
+    """Whether an upload only uses fields the staging engine writes"""
+    if not staged_import_enabled():
+        return False
+    if row_mapper.mapped_fields & ROW_LOOP_FIELDS:
+        return False
+    # Unmapped 'Client' / 'Name' columns are parsed into names by the chunk loop
+    return not (row_mapper.client_column_positions or row_mapper.name_column_positions)
+
+
+def _copy_value(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _prep_default(field):
+    return field.get_db_prep_save(field.get_default(), connection)
+
+
+class StagedImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.duplicates_flagged = 0
+        self.errors = []
+        self.warnings = []
+        self.duplicate_details = []
+        self.chunks = 0
+
+
+class StagedClientImport:
+    """Imports one upload through a staging table; run inside transaction.atomic()"""
+
+    def __init__(self, row_mapper, source, user_name, progress=None):
+        self.row_mapper = row_mapper
+        self.source = source
+        self.user_name = user_name
+        self.progress = progress
+        self.same_id_field = SOURCE_ID_FIELDS.get(source)
+        self.other_id_field = next(
+            (field for other_source, field in SOURCE_ID_FIELDS.items() if other_source != source), None
+        )
+        self.other_source = next((other for other in SOURCE_ID_FIELDS if other != source), None)
+        self.result = StagedImportResult()
+
+    def run(self, chunks, total_rows):
+        with connection.cursor() as cursor:
+            self._create_staging_table(cursor)
+            processed = 0
+            for chunk_df in chunks:
+                self.result.chunks += 1
+                self._copy_chunk(cursor, chunk_df)
+                processed += len(chunk_df)
+                if self.progress:
+                    self.progress(processed, total_rows, self.result.chunks)
+            cursor.execute(f"ANALYZE {STAGING_TABLE}")
+
+            for match_type, condition in ID_MATCH_STEPS:
+                self._match(cursor, match_type, condition)
+            self._group_new_rows(cursor)
+            self._flag_name_duplicates(cursor)
+            for match_type, condition in EXACT_MATCH_STEPS:
+                self._match(cursor, match_type, condition, skip_flagged=True)
+            self._skip_rows_missing_first_name(cursor)
+
+            self._insert_new_clients(cursor)
+            self._resolve_merged_rows(cursor)
+            self._update_matched_clients(cursor)
+            self._refresh_name_keys()
+            self._create_duplicate_flags(cursor)
+            self._update_inactive_status(cursor)
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        return self.result
+
+    # ----- staging -----
+
+    def _create_staging_table(self, cursor):
+        columns = ['row_number integer PRIMARY KEY']
+        for name in CLIENT_ROW_FIELDS:
+            columns.append(f"{name} {CLIENT_FIELDS[name].db_type(connection)}")
+        for name in EXTENDED_ROW_FIELDS:
+            columns.append(f"ext_{name} {EXTENDED_FIELDS[name].db_type(connection)}")
+        columns += [
+            'other_source_id varchar(100)', 'uid_external varchar(255)', 'email_key varchar(254)',
+            'first_name_key varchar(100)', 'last_name_key varchar(100)',
+            'match_id bigint', 'match_type varchar(50)', 'merge_into_row integer',
+            'duplicate_of bigint', 'duplicate_score double precision', 'client_pk bigint',
+            'skipped boolean NOT NULL DEFAULT false',
+        ]
+        cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+        cursor.execute(f"CREATE TEMPORARY TABLE {STAGING_TABLE} ({', '.join(columns)}) ON COMMIT DROP")
+
+    def _copy_columns(self):
+        return (
+            ['row_number'] + list(CLIENT_ROW_FIELDS) + [f"ext_{name}" for name in EXTENDED_ROW_FIELDS]
+            + ['other_source_id', 'uid_external', 'email_key', 'first_name_key', 'last_name_key']
+        )
+
+    def _copy_chunk(self, cursor, chunk_df):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for index, row in self.row_mapper.iter_rows(chunk_df):
+            values = self._row_values(index, row)
+            if values is not None:
+                writer.writerow([_copy_value(value) for value in values])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(self._copy_columns())}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+    def _row_values(self, index, row):
+        """Staging row for one upload row, or None when the row is skipped"""
+        mapper = self.row_mapper
+        client_data = mapper.build_client_data(row, self.source, dob=mapper.parse_dob(row))
+        mapper.add_structured_fields(row, client_data)
+
+        for field_name in FUTURE_DATE_WARNING_FIELDS:
+            parsed_date = client_data.get(field_name)
+            if is_future_date(parsed_date):
+                warning_msg = (
+                    f"Row {index + 2}: Future date detected for {field_name}. "
+                    f"Date: {parsed_date} (Client ID: {row.get('client_id', 'N/A')}). "
+                    f"Please update the sheet with the correct date."
+                )
+                self.result.warnings.append(warning_msg)
+                logger.warning(warning_msg)
+
+        if not client_data.get('client_id') and not client_data.get('first_name'):
+            self.result.errors.append(
+                f"Row {index + 2}: Missing all required fields (client_id, first_name). Row appears to be empty or invalid."
+            )
+            self.result.skipped += 1
+            return None
+
+        first_name = client_data.get('first_name') or ''
+        last_name = client_data.get('last_name') or ''
+        dob = client_data.get('dob')
+        has_name_dob = first_name and last_name and dob and dob != PLACEHOLDER_DOB
+        email = client_data['contact_information'].get('email') or ''
+        other_source_id = row.get_source_id(self.other_source) if self.other_source else None
+        uid_external = row.get('uid_external')
+
+        return (
+            [index]
+            + [client_data.get(name) for name in CLIENT_ROW_FIELDS]
+            + [client_data.get(name) for name in EXTENDED_ROW_FIELDS]
+            + [
+                other_source_id,
+                uid_external or None,
+                email.strip().lower() or None,
+                first_name.strip().lower() if has_name_dob else None,
+                last_name.strip().lower() if has_name_dob else None,
+            ]
+        )
+
+    # ----- matching -----
+
+    def _match(self, cursor, match_type, condition, skip_flagged=False):
+        if '{same_id}' in condition and not self.same_id_field:
+            return
+        if '{other_id}' in condition and not self.other_id_field:
+            return
+        condition = condition.format(same_id=self.same_id_field, other_id=self.other_id_field)
+        flagged = ' AND s.duplicate_of IS NULL' if skip_flagged else ''
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE} t
+            SET match_id = m.client_pk, match_type = %s
+            FROM (
+                SELECT DISTINCT ON (s.row_number) s.row_number, c.id AS client_pk
+                FROM {STAGING_TABLE} s
+                JOIN clients c ON {condition}
+                WHERE s.match_id IS NULL AND s.merge_into_row IS NULL AND NOT s.skipped{flagged}
+                ORDER BY s.row_number, c.id
+            ) m
+            WHERE t.row_number = m.row_number
+        """, [match_type])
+        if cursor.rowcount:
+            logger.info(f"Staged import matched {cursor.rowcount} rows by {match_type}")
+
+    def _group_new_rows(self, cursor):
+        """Rows repeating an unmatched name+DOB merge into the first such row of the file"""
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE} t
+            SET merge_into_row = g.first_row
+            FROM (
+                SELECT row_number, min(row_number) OVER (
+                    PARTITION BY first_name_key, last_name_key, dob
+                ) AS first_row
+                FROM {STAGING_TABLE}
+                WHERE match_id IS NULL AND NOT skipped AND first_name_key IS NOT NULL
+            ) g
+            WHERE t.row_number = g.row_number AND g.first_row <> g.row_number
+        """)
+
+    def _flag_name_duplicates(self, cursor):
+        """
+        Fuzzy name check against clients from the other source, as the chunk loop does
+        for SMIS and EMHware uploads: >= 0.9 with the same DOB or ID merges, otherwise
+        the new client is flagged as a probable duplicate. Each row is only scored
+        against the candidates _name_candidates finds for it.
+        """
+        if self.source not in SOURCE_ID_FIELDS:
+            return
+        cursor.execute(f"""
+            SELECT row_number, first_name, last_name, dob, client_id
+            FROM {STAGING_TABLE}
+            WHERE match_id IS NULL AND merge_into_row IS NULL AND NOT skipped
+              AND COALESCE(first_name, '') || COALESCE(last_name, '') <> ''
+        """)
+        new_rows = cursor.fetchall()
+        if not new_rows:
+            return
+
+        merges, flags = [], []
+        for start in range(0, len(new_rows), NAME_CANDIDATE_BATCH):
+            batch = new_rows[start:start + NAME_CANDIDATE_BATCH]
+            candidate_ids = self._name_candidates(cursor, batch)
+            other_clients = Client.objects.only(
+                'id', 'first_name', 'last_name', 'dob', 'smis_id', 'emhware_id', 'legacy_client_ids'
+            ).in_bulk({client_pk for ids in candidate_ids.values() for client_pk in ids})
+
+            for row_number, first_name, last_name, dob, client_id in batch:
+                candidates = [other_clients[client_pk] for client_pk in candidate_ids.get(row_number, ())]
+                if not candidates:
+                    continue
+                matches = fuzzy_matcher.find_potential_duplicates(
+                    {'first_name': first_name or '', 'last_name': last_name or ''},
+                    candidates,
+                    similarity_threshold=0.9,
+                )
+                if not matches:
+                    continue
+                duplicate_client, _, similarity = matches[0]
+                legacy_ids = {
+                    str(entry.get('client_id', '')).strip()
+                    for entry in (duplicate_client.legacy_client_ids or []) if isinstance(entry, dict)
+                }
+                same_id = client_id and (
+                    client_id in (str(duplicate_client.smis_id or '').strip(), str(duplicate_client.emhware_id or '').strip())
+                    or client_id in legacy_ids
+                )
+                same_dob = dob and duplicate_client.dob and dob == duplicate_client.dob
+                if same_id or same_dob:
+                    merges.append((duplicate_client.id, row_number))
+                else:
+                    flags.append((duplicate_client.id, similarity, row_number))
+
+        if merges:
+            cursor.executemany(
+                f"UPDATE {STAGING_TABLE} SET match_id = %s, match_type = 'name_similarity_exact' WHERE row_number = %s",
+                merges,
+            )
+        if flags:
+            cursor.executemany(
+                f"UPDATE {STAGING_TABLE} SET duplicate_of = %s, duplicate_score = %s WHERE row_number = %s",
+                flags,
+            )
+        logger.info(f"Staged import name check: {len(merges)} merged, {len(flags)} flagged as duplicates")
+
+    def _name_candidates(self, cursor, rows):
+        """
+        Ids of other-source clients worth scoring for each (row_number, first_name,
+        last_name, dob, ...) row, by row_number: the NAME_DUPLICATE_CANDIDATES most
+        similar full names by trigram search (client_full_name_trgm_idx), plus
+        clients with the same last name and DOB, which keeps nicknames the trigram
+        search misses ("Bob" / "Robert") for the DOB merge.
+        """
+        row_numbers = [row[0] for row in rows]
+        names = [normalize_name(f"{row[1] or ''} {row[2] or ''}") for row in rows]
+        last_names = [normalize_name(row[2]) for row in rows]
+        dobs = [row[3] for row in rows]
+        client_table = Client._meta.db_table
+        cursor.execute(f"""
+            SELECT q.row_number, c.id
+            FROM unnest(%s::integer[], %s::text[]) AS q(row_number, name)
+            CROSS JOIN LATERAL (
+                SELECT id FROM {client_table}
+                WHERE full_name_key %% q.name AND source IS DISTINCT FROM %s
+                ORDER BY similarity(full_name_key, q.name) DESC, id
+                LIMIT %s
+            ) c
+            UNION
+            SELECT q.row_number, c.id
+            FROM unnest(%s::integer[], %s::text[], %s::date[]) AS q(row_number, last_name_key, dob)
+            JOIN {client_table} c ON c.last_name_key = q.last_name_key AND c.dob = q.dob
+            WHERE q.last_name_key <> '' AND c.source IS DISTINCT FROM %s
+        """, [
+            row_numbers, names, self.source, NAME_DUPLICATE_CANDIDATES,
+            row_numbers, last_names, dobs, self.source,
+        ])
+        candidate_ids = {}
+        for row_number, client_pk in cursor.fetchall():
+            candidate_ids.setdefault(row_number, []).append(client_pk)
+        for ids in candidate_ids.values():
+            # Score in id order, so a tie picks the same client on every run
+            ids.sort()
+        return candidate_ids
+
+    def _skip_rows_missing_first_name(self, cursor):
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE} SET skipped = true
+            WHERE match_id IS NULL AND merge_into_row IS NULL AND NOT skipped
+              AND COALESCE(btrim(first_name), '') = ''
+            RETURNING row_number
+        """)
+        for (row_number,) in sorted(cursor.fetchall()):
+            self.result.errors.append(
+                f"Row {row_number + 2}: Missing required fields for client creation: first_name"
+            )
+            self.result.skipped += 1
+
+    # ----- writes -----
+
+    def _legacy_entry_sql(self, alias):
+        return f"jsonb_build_array(jsonb_build_object('source', %s::text, 'client_id', {alias}.client_id))"
+
+    def _insert_new_clients(self, cursor):
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE}
+            SET client_pk = nextval(pg_get_serial_sequence('clients', 'id'))
+            WHERE match_id IS NULL AND merge_into_row IS NULL AND NOT skipped
+        """)
+        if not cursor.rowcount:
+            return
+
+        columns, expressions, params = [], [], []
+        for name, field in CLIENT_FIELDS.items():
+            column = field.column
+            if name == 'id':
+                expression = 's.client_pk'
+            elif name == 'external_id':
+                expression = 'gen_random_uuid()'
+            elif name in ('created_at', 'updated_at'):
+                expression = 'now()'
+            elif name == 'source':
+                expression = '%s'
+                params.append(self.source)
+            elif name in ('created_by', 'updated_by'):
+                expression = '%s'
+                params.append(self.user_name)
+            elif name == self.same_id_field:
+                expression = 's.client_id'
+            elif name == 'legacy_client_ids':
+                expression = f"CASE WHEN s.client_id IS NULL THEN '[]'::jsonb ELSE {self._legacy_entry_sql('s')} END"
+                params.append(self.source)
+            elif name in CLIENT_ROW_FIELDS:
+                expression = f"s.{name}"
+                if field.has_default() or not field.null:
+                    expression = f"COALESCE(s.{name}, %s)"
+                    params.append(_prep_default(field))
+            else:
+                expression = '%s'
+                params.append(_prep_default(field))
+            columns.append(column)
+            expressions.append(expression)
+
+        cursor.execute(f"""
+            INSERT INTO clients ({', '.join(columns)})
+            SELECT {', '.join(expressions)}
+            FROM {STAGING_TABLE} s
+            WHERE s.client_pk IS NOT NULL
+            ORDER BY s.row_number
+        """, params)
+        self.result.created = cursor.rowcount
+
+        # Every client created by an upload gets its ClientExtended record
+        ext_columns = ['client_id', 'external_id', 'created_at', 'updated_at']
+        ext_expressions = ['s.client_pk', 'gen_random_uuid()', 'now()', 'now()']
+        ext_params = []
+        for name, field in EXTENDED_FIELDS.items():
+            ext_columns.append(field.column)
+            if field.has_default() or not field.null:
+                ext_expressions.append(f"COALESCE(s.ext_{name}, %s)")
+                ext_params.append(_prep_default(field))
+            else:
+                ext_expressions.append(f"s.ext_{name}")
+        cursor.execute(f"""
+            INSERT INTO client_extended ({', '.join(ext_columns)})
+            SELECT {', '.join(ext_expressions)}
+            FROM {STAGING_TABLE} s
+            WHERE s.client_pk IS NOT NULL
+        """, ext_params)
+
+    def _resolve_merged_rows(self, cursor):
+        """Rows merged into another row of the file update whichever client that row became"""
+        cursor.execute(f"""
+            UPDATE {STAGING_TABLE} t
+            SET match_id = COALESCE(f.client_pk, f.match_id), match_type = 'upload_name_dob'
+            FROM {STAGING_TABLE} f
+            WHERE t.merge_into_row = f.row_number AND COALESCE(f.client_pk, f.match_id) IS NOT NULL
+        """)
+
+    def _update_matched_clients(self, cursor):
+        cursor.execute(f"""
+            SELECT count(*) FROM {STAGING_TABLE}
+            WHERE match_id IS NOT NULL AND merge_into_row IS NULL
+        """)
+        self.result.updated = cursor.fetchone()[0]
+
+        mapped = self.row_mapper.mapped_fields
+        assignments, params = [], []
+        for name in CLIENT_ROW_FIELDS:
+            if name in JSON_ROW_FIELDS or name not in mapped:
+                continue
+            assignments.append(f"{name} = COALESCE(u.{name}, c.{name})")
+        for name in UPDATABLE_JSON_FIELDS:
+            if name in mapped:
+                assignments.append(f"{name} = COALESCE(NULLIF(NULLIF(u.{name}, '[]'), '{{}}'), c.{name})")
+        if mapped & {'email', 'phone'}:
+            assignments.append(
+                "contact_information = COALESCE(c.contact_information, '{}'::jsonb) "
+                "|| jsonb_strip_nulls(COALESCE(u.contact_information, '{}'::jsonb))"
+            )
+        if self.same_id_field:
+            assignments.append(
+                f"{self.same_id_field} = COALESCE(NULLIF(c.{self.same_id_field}, ''), u.client_id)"
+            )
+        assignments.append(f"""legacy_client_ids = CASE
+                WHEN u.client_id IS NULL OR c.legacy_client_ids @> {self._legacy_entry_sql('u')}
+                THEN c.legacy_client_ids
+                ELSE COALESCE(c.legacy_client_ids, '[]'::jsonb) || {self._legacy_entry_sql('u')}
+            END""")
+        params += [self.source, self.source]
+        assignments += ['updated_by = %s', 'updated_at = now()']
+        params.append(self.user_name)
+
+        # The last row for a client wins, as when the chunk loop updates it repeatedly
+        latest_rows = f"""
+            SELECT DISTINCT ON (match_id) *
+            FROM {STAGING_TABLE}
+            WHERE match_id IS NOT NULL
+            ORDER BY match_id, row_number DESC
+        """
+        cursor.execute(f"""
+            UPDATE clients c SET {', '.join(assignments)}
+            FROM ({latest_rows}) u
+            WHERE c.id = u.match_id
+        """, params)
+
+        mapped_extended = [name for name in EXTENDED_ROW_FIELDS if name in mapped]
+        if mapped_extended:
+            ext_columns = ['client_id', 'external_id', 'created_at', 'updated_at']
+            ext_expressions = ['u.match_id', 'gen_random_uuid()', 'now()', 'now()']
+            ext_params = []
+            for name, field in EXTENDED_FIELDS.items():
+                ext_columns.append(field.column)
+                if field.has_default() or not field.null:
+                    ext_expressions.append(f"COALESCE(u.ext_{name}, %s)")
+                    ext_params.append(_prep_default(field))
+                else:
+                    ext_expressions.append(f"u.ext_{name}")
+            updates = ', '.join(
+                f"{EXTENDED_FIELDS[name].column} = COALESCE(EXCLUDED.{EXTENDED_FIELDS[name].column}, "
+                f"client_extended.{EXTENDED_FIELDS[name].column})"
+                for name in mapped_extended
+            )
+            cursor.execute(f"""
+                INSERT INTO client_extended ({', '.join(ext_columns)})
+                SELECT {', '.join(ext_expressions)}
+                FROM ({latest_rows}) u
+                ON CONFLICT (client_id) DO UPDATE SET {updates}, updated_at = now()
+            """, ext_params)
+
+    def _refresh_name_keys(self):
+        """Name matching keys of the created and updated clients, which the SQL writes leave alone"""
+        refresh_name_keys(Client.objects.filter(id__in=RawSQL(f"""
+            SELECT client_pk FROM {STAGING_TABLE} WHERE client_pk IS NOT NULL
+            UNION
+            SELECT match_id FROM {STAGING_TABLE} WHERE match_id IS NOT NULL
+        """, [])))
+
+    def _create_duplicate_flags(self, cursor):
+        cursor.execute(f"""
+            SELECT s.client_pk, s.duplicate_of, s.duplicate_score, s.first_name, s.last_name,
+                   s.contact_information->>'email', s.contact_information->>'phone', s.client_id
+            FROM {STAGING_TABLE} s
+            WHERE s.duplicate_of IS NOT NULL AND s.client_pk IS NOT NULL
+            ORDER BY s.row_number
+        """)
+        flagged = cursor.fetchall()
+        if not flagged:
+            return
+
+        primaries = Client.objects.in_bulk({row[1] for row in flagged})
+        duplicate_objects = []
+        for client_pk, primary_id, similarity, first_name, last_name, email, phone, client_id in flagged:
+            primary = primaries[primary_id]
+            match_type = f"name_similarity_{similarity:.2f}"
+            client_name = f"{first_name or ''} {last_name or ''}".strip()
+            existing_name = f"{primary.first_name} {primary.last_name}".strip()
+            duplicate_objects.append(ClientDuplicate(
+                primary_client=primary,
+                duplicate_client_id=client_pk,
+                similarity_score=similarity,
+                match_type=match_type,
+                confidence_level=fuzzy_matcher.get_duplicate_confidence_level(similarity),
+                match_details={
+                    'primary_name': existing_name,
+                    'duplicate_name': client_name,
+                    'primary_email': primary.email,
+                    'primary_phone': primary.phone,
+                    'primary_client_id': primary.client_id,
+                    'duplicate_original_email': email or '',
+                    'duplicate_original_phone': phone or '',
+                    'duplicate_original_client_id': client_id or '',
+                },
+            ))
+            self.result.duplicate_details.append({
+                'type': 'created_with_duplicate',
+                'reason': f'{match_type.replace("_", " ").title()} match - created with duplicate flag for review',
+                'client_name': client_name,
+                'existing_name': existing_name,
+                'match_field': f"Match: {match_type}",
+            })
+        ClientDuplicate.objects.bulk_create(duplicate_objects, batch_size=500)
+        self.result.duplicates_flagged = len(duplicate_objects)
+
+    def _update_inactive_status(self, cursor):
+        """is_inactive for every touched client: no enrollment active today"""
+        cursor.execute(f"""
+            UPDATE clients c
+            SET is_inactive = NOT EXISTS (
+                SELECT 1 FROM client_program_enrollments e
+                WHERE e.client_id = c.id AND NOT e.is_archived
+                  AND e.start_date <= CURRENT_DATE
+                  AND (e.end_date IS NULL OR e.end_date > CURRENT_DATE)
+            )
+            WHERE c.id IN (
+                SELECT client_pk FROM {STAGING_TABLE} WHERE client_pk IS NOT NULL
+                UNION
+                SELECT match_id FROM {STAGING_TABLE} WHERE match_id IS NOT NULL
+            )
+        """)
@@ -12,11 +12,17 @@ urlpatterns = [
     path('<uuid:external_id>/delete/', views.ClientDeleteView.as_view(), name='delete'),
     path('upload/', views.ClientUploadView.as_view(), name='upload'),
     path('upload/process/', views.upload_clients, name='upload_process'),
+    path('upload/<uuid:external_id>/status/', views.upload_status, name='upload_status'),
+    path('upload/<uuid:external_id>/resume/', views.resume_upload, name='upload_resume'),
+    path('upload/<uuid:external_id>/cancel/', views.cancel_upload, name='upload_cancel'),
+    path('upload/<uuid:external_id>/report/', views.upload_report, name='upload_report'),
     path('download-sample/<str:file_type>/', views.download_sample, name='download_sample'),
     path('bulk-delete/', views.bulk_delete_clients, name='bulk_delete'),
     path('bulk-restore/', views.bulk_restore_clients, name='bulk_restore'),
     path('dedupe/', views.ClientDedupeView.as_view(), name='dedupe'),
     path('dedupe/run-scan/', views.run_duplicate_scan, name='dedupe_run_scan'),
+    path('dedupe/scan/<uuid:external_id>/status/', views.duplicate_scan_status, name='dedupe_scan_status'),
+    path('dedupe/scan/<uuid:external_id>/resume/', views.resume_duplicate_scan, name='dedupe_scan_resume'),
     path('dedupe/delete-high-confidence/', views.delete_high_confidence_duplicates, name='dedupe_delete_high_confidence'),
     path('dedupe/action/<int:duplicate_id>/<str:action>/', views.mark_duplicate_action, name='duplicate_action'),
     path('dedupe/bulk-action/', views.bulk_duplicate_action, name='bulk_duplicate_action'),
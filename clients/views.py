@@ -3,31 +3,51 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 from django.urls import reverse_lazy, reverse
 from django.contrib import messages
 from core.message_utils import success_message, error_message, warning_message, info_message, create_success, update_success, delete_success, validation_error, permission_error, not_found_error
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from django.utils.decorators import method_decorator
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.db.models import Q, Count, Exists, OuterRef, Max
+from django.db.models.expressions import RawSQL
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.db import IntegrityError, transaction
-from core.models import Client, Program, Department, Intake, ClientProgramEnrollment, ClientDuplicate, ClientUploadLog, ServiceRestrictionNotificationSubscription
+from core.models import Client, Program, Department, Intake, ClientProgramEnrollment, ClientDuplicate, ClientUploadLog, DuplicateScanJob, ServiceRestrictionNotificationSubscription
 from core.upload_errors import UploadError, UPLOAD_ERROR_CODES, get_error_code_for_exception
 from datetime import datetime, date, timedelta
 from core.views import ProgramManagerAccessMixin, AnalystAccessMixin, jwt_required, can_see_archived
 from core.fuzzy_matching import fuzzy_matcher
+from core.client_search import find_name_duplicates
+from core.name_keys import NAME_KEY_FIELDS
 from .forms import ClientForm
+from . import duplicate_jobs, upload_jobs
+from .upload_changes import UploadFingerprintIndex, changed_update_fields
+from .upload_columns import build_field_columns, collect_chunked_upload_keys
+from .upload_enrollments import UploadEnrollmentIndex
+from .upload_parsing import ChunkParser
+from .upload_profile import UploadProfiler
+from .upload_report import UploadReport, get_report_path, iter_report_csv, iter_report_json
+from .upload_reader import UploadFileReader
+from .upload_dates import infer_date_formats
+from .upload_programs import get_program_resolver, normalize_program_name, record_program_aliases
+from .upload_row_mapper import (
+    COLUMN_DATE_FIELDS, FUTURE_DATE_WARNING_FIELDS, UploadRowMapper, clean_client_id, is_future_date, parse_boolean,
+    parse_date, parse_integer,
+)
+from .upload_staging import StagedClientImport, can_stage_upload
 import pandas as pd
 import json
 import uuid
 import logging
 import csv
 import io
+import os
 from django.core.mail import EmailMultiAlternatives
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError, FieldError
 from django.template.loader import render_to_string
 from django.conf import settings
+from contextlib import nullcontext
 from functools import wraps
 from core.security import require_permission, SecurityManager
 
@@ -1037,6 +1057,34 @@ class ClientDetailView(AnalystAccessMixin, DetailView):
         context['archived_count'] = archived_enrollments.count()
         return context
 
+def flag_name_duplicates(client):
+    """
+    Flag clients whose names look like this client's (similarity >= 0.7) as
+    potential duplicates for manual review. Returns the matches.
+    """
+    potential_duplicates = find_name_duplicates(client)
+    for duplicate_client, match_type, similarity in potential_duplicates:
+        confidence_level = fuzzy_matcher.get_duplicate_confidence_level(similarity)
+        
+        # Create or update duplicate record
+        ClientDuplicate.objects.update_or_create(
+            primary_client=duplicate_client,
+            duplicate_client=client,
+            defaults={
+                'similarity_score': similarity,
+                'match_type': match_type,
+                'confidence_level': confidence_level,
+                'match_details': {
+                    'primary_name': f"{duplicate_client.first_name} {duplicate_client.last_name}",
+                    'duplicate_name': f"{client.first_name} {client.last_name}",
+                    'primary_email': duplicate_client.email,
+                    'primary_phone': duplicate_client.phone,
+                }
+            }
+        )
+    return potential_duplicates
+
+
 class ClientCreateView(AnalystAccessMixin, CreateView):
     model = Client
     form_class = ClientForm
@@ -1106,14 +1154,6 @@ class ClientCreateView(AnalystAccessMixin, CreateView):
             elif source == 'SMIS':
                 client.smis_id = uid_external
         
-        # Check for potential duplicates using fuzzy matching
-        client_data = {
-            'first_name': client.first_name,
-            'last_name': client.last_name,
-            'email': client.email,
-            'phone': client.phone,
-        }
-        
         # Save the client first before checking for duplicates
         client.save()
         
@@ -1121,33 +1161,9 @@ class ClientCreateView(AnalystAccessMixin, CreateView):
         self.handle_program_enrollments(client)
         
         # Always check for duplicates based on names (regardless of email/phone)
-        existing_clients = Client.objects.exclude(id=client.id)
-        potential_duplicates = fuzzy_matcher.find_potential_duplicates(
-            client_data, existing_clients, similarity_threshold=0.7
-        )
+        potential_duplicates = flag_name_duplicates(client)
         
         if potential_duplicates:
-            # Create duplicate warnings for manual review
-            for duplicate_client, match_type, similarity in potential_duplicates:
-                confidence_level = fuzzy_matcher.get_duplicate_confidence_level(similarity)
-                
-                # Create or update duplicate record
-                ClientDuplicate.objects.update_or_create(
-                    primary_client=duplicate_client,
-                    duplicate_client=client,
-                    defaults={
-                        'similarity_score': similarity,
-                        'match_type': match_type,
-                        'confidence_level': confidence_level,
-                        'match_details': {
-                            'primary_name': f"{duplicate_client.first_name} {duplicate_client.last_name}",
-                            'duplicate_name': f"{client.first_name} {client.last_name}",
-                            'primary_email': duplicate_client.email,
-                            'primary_phone': duplicate_client.phone,
-                        }
-                    }
-                )
-            
             warning_message(
                 self.request, 
                 f'Client created with potential duplicates detected. Please review the Probable Duplicate Clients page.'
@@ -1474,6 +1490,15 @@ class ClientUpdateView(AnalystAccessMixin, UpdateView):
                 except Exception as e:
                     logger.error(f"Error creating audit log for client update: {e}")
             
+            # A renamed client is checked for name duplicates, as on create
+            if 'first_name' in changes or 'last_name' in changes:
+                if flag_name_duplicates(client):
+                    warning_message(
+                        self.request,
+                        'Client updated with potential duplicates detected. Please review the Probable Duplicate Clients page.'
+                    )
+                    return super().form_valid(form)
+            
             update_success(self.request, 'Client')
             return super().form_valid(form)
         except Exception as e:
@@ -1768,16 +1793,18 @@ class ClientUploadView(TemplateView):
 def upload_clients(request):
     """
     Handle CSV/Excel file upload and process client data with chunked processing.
-    Processes files in chunks to avoid timeouts and enable partial success.
+    Validates the request and either queues the file for a background worker
+    (returning 202 with a status URL) or processes it inline.
     """
     
     # Start timing the upload
     upload_start_time = timezone.now()
     upload_log = None
-    CHUNK_SIZE = 1000  # Process 1000 rows per chunk
     
-    # Check for load test mode - skip database writes if X-Load-Test header is present
+    # Load tests (X-Load-Test header, always inline) and dry runs (dry_run=true) process the
+    # whole file in a transaction that is rolled back and produce a row-by-row report
     is_load_test = request.headers.get('X-Load-Test', '').lower() == 'true'
+    dry_run = is_load_test or request.POST.get('dry_run', '').lower() in ('1', 'true')
     
     # Check if user has permission to upload clients
     if request.user.is_authenticated:
@@ -1816,6 +1843,7 @@ def upload_clients(request):
         
         file = request.FILES['file']
         file_extension = file.name.split('.')[-1].lower()
+        commit_per_chunk = request.POST.get('commit_mode') == 'chunk' or getattr(settings, 'CLIENT_UPLOAD_COMMIT_PER_CHUNK', False)
         
         # Get staff profile for upload log
         staff_profile = None
@@ -1837,7 +1865,9 @@ def upload_clients(request):
                 started_at=upload_start_time,
                 uploaded_by=staff_profile,
                 status='success',
-                upload_details={}
+                upload_details={},
+                commit_mode='chunk' if commit_per_chunk and not dry_run else 'single',
+                is_dry_run=dry_run,
             )
             temp_upload_id = upload_log.external_id  # Use the actual upload log ID
         except Exception as e:
@@ -1913,96 +1943,170 @@ def upload_clients(request):
                 logger.error(f"Failed to create audit log for file extension validation: {audit_error}")
             return JsonResponse({'success': False, 'error': error.message, 'error_code': error.code}, status=400)
         
+        # Matching and writing a large file takes minutes, so hand it to a
+        # background worker and let the browser poll upload_status for progress
+        # instead of holding this web worker for the whole import.
+        if upload_log and not is_load_test and getattr(settings, 'CLIENT_UPLOAD_BACKGROUND', True):
+            upload_jobs.enqueue_client_upload(upload_log, file, request.user)
+            return JsonResponse({
+                'success': True,
+                'queued': True,
+                'upload_id': str(upload_log.external_id),
+                'status': upload_log.status,
+                'queue_position': upload_jobs.queue_position(upload_log),
+                'status_url': reverse('clients:upload_status', args=[upload_log.external_id]),
+                'cancel_url': reverse('clients:upload_cancel', args=[upload_log.external_id]),
+                'message': 'Upload received. Processing will continue in the background.'
+            }, status=202)
+        
+        # Inline uploads cannot wait in the queue, so they are refused while every slot
+        # of their source is taken (load tests are exempt so they can run concurrently)
+        with (nullcontext(True) if is_load_test else upload_jobs.source_slot(source)) as acquired:
+            if not acquired:
+                error = UploadError('UPLOAD_064', details={'source': source})
+                if upload_log:
+                    upload_log.status = 'failed'
+                    upload_log.error_message = error.message
+                    upload_log.completed_at = timezone.now()
+                    upload_log.save(update_fields=['status', 'error_message', 'completed_at', 'duration_seconds'])
+                return JsonResponse({
+                    'success': False,
+                    'error': error.message,
+                    'error_code': error.code,
+                    'user_action': error.user_action,
+                }, status=409)
+            
+            # Keep a copy of commit-per-chunk uploads so a failed import can be resumed
+            resumable = upload_log and upload_log.commit_mode == 'chunk'
+            if resumable:
+                upload_jobs.store_upload_file(upload_log, file)
+            response = process_client_upload(
+                upload_log, file, source, file_extension, request.user, upload_start_time,
+                temp_upload_id=temp_upload_id, dry_run=dry_run
+            )
+        if resumable:
+            upload_jobs.discard_upload_file(upload_log)
+        return response
+    
+    except Exception as e:
+        # Handle unexpected errors raised before processing started
+        import traceback
+        error_traceback = traceback.format_exc()
+        logger.error(f"Upload failed before processing: {str(e)}\nTraceback:\n{error_traceback}")
+        
+        error_code = get_error_code_for_exception(e)
+        upload_error = UploadError(
+            code=error_code,
+            raw_error=e,
+            details={'traceback': error_traceback, 'error_type': type(e).__name__}
+        )
+        
+        if upload_log:
+            try:
+                upload_log.completed_at = timezone.now()
+                upload_log.status = 'failed'
+                upload_log.error_message = upload_error.message
+                upload_log.error_details = upload_error.to_log_dict()
+                upload_log.save()
+            except Exception as log_error:
+                logger.error(f"Failed to update upload log with error: {log_error}")
+        
+        return JsonResponse({
+            'success': False,
+            'error': upload_error.message,
+            'error_code': upload_error.code,
+            'error_category': upload_error.category,
+            'user_action': upload_error.user_action,
+            'details': upload_error.details if settings.DEBUG else {}
+        }, status=500)
+
+
+def process_client_upload(upload_log, file, source, file_extension, user, upload_start_time,
+                          temp_upload_id=None, dry_run=False):
+    """
+    Read, match and write an uploaded client file in chunks.
+    Runs inline for synchronous uploads and from clients.upload_jobs for
+    background uploads; returns the JsonResponse describing the outcome.
+    Phase timings and query counts are stored in upload_details['profile'].
+    A dry run rolls every write back and stores a row-by-row report instead.
+    """
+    profiler = UploadProfiler()
+    with profiler.capture_queries():
+        return run_client_upload(
+            upload_log, file, source, file_extension, user, upload_start_time,
+            temp_upload_id, dry_run, profiler
+        )
+
+
+def run_client_upload(upload_log, file, source, file_extension, user, upload_start_time,
+                      temp_upload_id, dry_run, profiler):
+    """Body of process_client_upload, reporting its phases to profiler"""
+    CHUNK_SIZE = 1000  # Process 1000 rows per chunk
+    if temp_upload_id is None:
+        temp_upload_id = upload_log.external_id if upload_log else uuid.uuid4()
+    
+    try:
         # Read the file
+        profiler.enter('read_file')
         try:
+            # Parse the file once in CHUNK_SIZE chunks; later passes replay the spooled chunks
+            upload_reader = UploadFileReader(file, file_extension, chunk_size=CHUNK_SIZE)
             if file_extension == 'csv':
-                # Try different encodings for CSV files
-                encodings_to_try = ['latin-1', 'cp1252', 'iso-8859-1', 'utf-8', 'utf-16', 'utf-16le', 'utf-16be']
-                df = None
-                last_error = None
-                
-                for encoding in encodings_to_try:
-                    try:
-                        file.seek(0)  # Reset file pointer
-                        df = pd.read_csv(file, encoding=encoding)
-                        break
-                    except (UnicodeDecodeError, UnicodeError) as e:
-                        last_error = str(e)
-                        continue
-                    except Exception as e:
-                        # Handle other pandas errors (like parsing issues)
-                        last_error = str(e)
-                        continue
-                
-                # If all encodings fail, try with error handling using StringIO
-                if df is None:
+                # The encoding is sniffed once from the head of the file
+                try:
+                    upload_reader.scan()
+                except Exception as e:
+                    import traceback
+                    error_traceback = traceback.format_exc()
+                    error = UploadError('UPLOAD_004', details={'last_error': str(e), 'encoding': upload_reader.encoding, 'traceback': error_traceback})
+                    # Create audit log for file reading failure (always create, even if upload_log is None)
                     try:
-                        import io
-                        file.seek(0)
-                        # Read the file content and handle encoding errors
-                        content = file.read()
-                        # Try to decode with error replacement
-                        try:
-                            decoded_content = content.decode('latin-1')
-                        except (UnicodeDecodeError, UnicodeError):
-                            decoded_content = content.decode('utf-8', errors='replace')
+                        from core.models import create_audit_log
+                        if upload_log:
+                            upload_log.completed_at = timezone.now()
+                            upload_log.status = 'failed'
+                            upload_log.error_message = f"{error.message}\n\nTraceback:\n{error_traceback}"
+                            upload_log.error_details = [{
+                                'error_code': error.code,
+                                'error_message': error.message,
+                                'error_category': error.category,
+                                'traceback': error_traceback,
+                                'failure_stage': 'file_reading',
+                                'last_error': str(e),
+                                'encoding': upload_reader.encoding
+                            }]
+                            upload_log.save()
+                            entity_id = upload_log.external_id
+                        else:
+                            entity_id = temp_upload_id
                         
-                        # Create StringIO object and read with pandas
-                        string_io = io.StringIO(decoded_content)
-                        df = pd.read_csv(string_io)
-                    except Exception as e:
-                        import traceback
-                        error_traceback = traceback.format_exc()
-                        error = UploadError('UPLOAD_004', details={'last_error': last_error, 'fallback_error': str(e), 'traceback': error_traceback})
-                        # Create audit log for file reading failure (always create, even if upload_log is None)
-                        try:
-                            from core.models import create_audit_log
-                            if upload_log:
-                                upload_log.completed_at = timezone.now()
-                                upload_log.status = 'failed'
-                                upload_log.error_message = f"{error.message}\n\nTraceback:\n{error_traceback}"
-                                upload_log.error_details = [{
-                                    'error_code': error.code,
-                                    'error_message': error.message,
-                                    'error_category': error.category,
-                                    'traceback': error_traceback,
-                                    'failure_stage': 'file_reading',
-                                    'last_error': last_error,
-                                    'fallback_error': str(e)
-                                }]
-                                upload_log.save()
-                                entity_id = upload_log.external_id
-                            else:
-                                entity_id = temp_upload_id
-                            
-                            create_audit_log(
-                                entity_name='ClientUpload',
-                                entity_id=entity_id,
-                                action='import',
-                                changed_by=request.user if request.user.is_authenticated else None,
-                                diff_data={
-                                    'file_name': file.name if hasattr(file, 'name') else 'Unknown',
-                                    'file_size': file.size if hasattr(file, 'size') else 0,
-                                    'source': source,
-                                    'status': 'failed',
-                                    'error_code': error.code,
-                                    'error_message': error.message,
-                                    'error_category': 'File Processing',
-                                    'failure_stage': 'file_reading',
-                                    'last_error': last_error,
-                                    'fallback_error': str(e),
-                                    'error_traceback': error_traceback,
-                                    'started_at': str(upload_start_time),
-                                    'completed_at': str(timezone.now())
-                                }
-                            )
-                            logger.info(f"Audit log created for file reading failure: {entity_id}")
-                        except Exception as audit_error:
-                            logger.error(f"Failed to create audit log for file reading failure: {audit_error}")
-                        return JsonResponse({'success': False, 'error': error.message, 'error_code': error.code}, status=400)
-            
+                        create_audit_log(
+                            entity_name='ClientUpload',
+                            entity_id=entity_id,
+                            action='import',
+                            changed_by=user if user.is_authenticated else None,
+                            diff_data={
+                                'file_name': file.name if hasattr(file, 'name') else 'Unknown',
+                                'file_size': file.size if hasattr(file, 'size') else 0,
+                                'source': source,
+                                'status': 'failed',
+                                'error_code': error.code,
+                                'error_message': error.message,
+                                'error_category': 'File Processing',
+                                'failure_stage': 'file_reading',
+                                'last_error': str(e),
+                                'encoding': upload_reader.encoding,
+                                'error_traceback': error_traceback,
+                                'started_at': str(upload_start_time),
+                                'completed_at': str(timezone.now())
+                            }
+                        )
+                        logger.info(f"Audit log created for file reading failure: {entity_id}")
+                    except Exception as audit_error:
+                        logger.error(f"Failed to create audit log for file reading failure: {audit_error}")
+                    return JsonResponse({'success': False, 'error': error.message, 'error_code': error.code}, status=400)
             else:
-                df = pd.read_excel(file)
+                upload_reader.scan()
         except Exception as e:
             import traceback
             error_traceback = traceback.format_exc()
@@ -2034,7 +2138,7 @@ def upload_clients(request):
                     entity_name='ClientUpload',
                     entity_id=entity_id,
                     action='import',
-                    changed_by=request.user if request.user.is_authenticated else None,
+                    changed_by=user if user.is_authenticated else None,
                     diff_data={
                         'file_name': file.name if hasattr(file, 'name') else 'Unknown',
                         'file_size': file.size if hasattr(file, 'size') else 0,
@@ -2058,7 +2162,7 @@ def upload_clients(request):
             return JsonResponse({'success': False, 'error': error.message, 'error_code': error.code}, status=400)
         
         # Check if dataframe is empty
-        if df.empty:
+        if upload_reader.empty:
             import traceback
             error_traceback = traceback.format_exc()
             error = UploadError('UPLOAD_002', details={'traceback': error_traceback})
@@ -2086,7 +2190,7 @@ def upload_clients(request):
                     entity_name='ClientUpload',
                     entity_id=entity_id,
                     action='import',
-                    changed_by=request.user if request.user.is_authenticated else None,
+                    changed_by=user if user.is_authenticated else None,
                     diff_data={
                         'file_name': file.name if hasattr(file, 'name') else 'Unknown',
                         'file_size': file.size if hasattr(file, 'size') else 0,
@@ -2107,7 +2211,7 @@ def upload_clients(request):
             return JsonResponse({'success': False, 'error': error.message, 'error_code': error.code}, status=400)
         
         # Check if dataframe has no columns
-        if len(df.columns) == 0:
+        if not upload_reader.columns:
             import traceback
             error_traceback = traceback.format_exc()
             error = UploadError('UPLOAD_003', details={'traceback': error_traceback})
@@ -2135,7 +2239,7 @@ def upload_clients(request):
                     entity_name='ClientUpload',
                     entity_id=entity_id,
                     action='import',
-                    changed_by=request.user if request.user.is_authenticated else None,
+                    changed_by=user if user.is_authenticated else None,
                     diff_data={
                         'file_name': file.name if hasattr(file, 'name') else 'Unknown',
                         'file_size': file.size if hasattr(file, 'size') else 0,
@@ -2155,7 +2259,7 @@ def upload_clients(request):
                 logger.error(f"Failed to create audit log for no columns: {audit_error}")
             return JsonResponse({'success': False, 'error': error.message, 'error_code': error.code}, status=400)
         
-        logger.info(f"Successfully read file with {len(df)} rows and {len(df.columns)} columns")
+        logger.info(f"Successfully read file with {upload_reader.total_rows} rows and {len(upload_reader.columns)} columns")
         
         # Create case-insensitive field mapping
         def create_field_mapping(df_columns):
@@ -2208,40 +2312,56 @@ def upload_clients(request):
             return column_mapping
         
         # Create field mapping
-        column_mapping = create_field_mapping(df.columns)
+        column_mapping = create_field_mapping(upload_reader.columns)
         
         # Check if we have client_id column (now required for all uploads)
         # Check if any column maps to client_id (not just exact column name)
-        has_client_id = any(column_mapping.get(col) == 'client_id' for col in df.columns)
+        has_client_id = any(column_mapping.get(col) == 'client_id' for col in upload_reader.columns)
 
-        # Helper used in multiple phases to normalize client ids
-        def _clean_client_id(value):
-            """Normalize client_id values to strings suitable for lookups"""
-            if pd.isna(value) or value is None:
-                return None
-            try:
-                str_value = str(value).strip()
-                if not str_value or str_value.lower() in ['nan', 'none', 'null']:
-                    return None
-                if '.' in str_value:
-                    float_val = float(str_value)
-                    if float_val.is_integer():
-                        return str(int(float_val))
-                return str_value
-            except (ValueError, TypeError):
-                return None
+        # Commit-per-chunk uploads checkpoint after every chunk; a resumed upload must be the same file
+        commit_per_chunk = bool(upload_log) and upload_log.commit_mode == 'chunk' and not dry_run
+        resume_from_row = 0
+        if commit_per_chunk:
+            file_hash = upload_jobs.hash_upload_file(file)
+            if upload_log.checkpoint_row:
+                if upload_log.file_hash and upload_log.file_hash != file_hash:
+                    raise UploadError('UPLOAD_006', details={'checkpoint_row': upload_log.checkpoint_row})
+                resume_from_row = upload_log.checkpoint_row
+                logger.info(f"Resuming upload {upload_log.external_id} after committed row {resume_from_row}")
+            upload_log.file_hash = file_hash
+
+        # Rows identical to the last import of their (source, client_id) are skipped
+        # before key collection, matching and writes
+        fingerprints = UploadFingerprintIndex(source, upload_reader.columns, column_mapping)
+        if getattr(settings, 'CLIENT_UPLOAD_SKIP_UNCHANGED', True):
+            profiler.enter('fingerprint')
+            fingerprints.scan(upload_reader.iter_chunks())
+
+        # Collect client_ids, emails, phones, DOBs, name+DOB combinations and external IDs
+        # from the upload in one column-wise pass over the spooled chunks
+        logger.info("Starting batch data collection phase")
+        profiler.enter('collect_keys')
+        # Each date column's format is inferred once from the first chunk, so every chunk
+        # (and every parse worker) reads ambiguous day/month values the same way
+        date_formats = {}
+        if upload_reader.chunk_count:
+            date_formats = infer_date_formats(
+                next(upload_reader.iter_chunks()),
+                build_field_columns(upload_reader.columns, column_mapping),
+                COLUMN_DATE_FIELDS,
+            )
+            logger.info(f"Inferred upload date formats: {date_formats}")
+        upload_keys = collect_chunked_upload_keys(
+            fingerprints.filter_chunks(upload_reader.iter_chunks()), upload_reader.columns, column_mapping,
+            date_formats=date_formats,
+        )
+        profiler.enter('validate')
         
         # Determine if any Client ID + source combinations already exist (single batched lookup)
-        has_existing_client_ids = False
-        if has_client_id:
-            client_id_candidates = set()
-            for col in df.columns:
-                if column_mapping.get(col) == 'client_id':
-                    client_id_series = df[col]
-                    for value in client_id_series:
-                        cleaned = _clean_client_id(value)
-                        if cleaned:
-                            client_id_candidates.add(cleaned)
+        # Unchanged rows were imported before, so their client ids exist
+        has_existing_client_ids = bool(fingerprints.unchanged_rows)
+        if has_client_id and not has_existing_client_ids:
+            client_id_candidates = set(upload_keys['client_ids'])
             if client_id_candidates:
                 has_existing_client_ids = Client.objects.filter(
                     client_id__in=list(client_id_candidates),
@@ -2265,20 +2385,20 @@ def upload_clients(request):
         debug_info = {
             'column_mapping': column_mapping,
             'has_existing_client_ids': has_existing_client_ids,
-            'df_columns': list(df.columns)
+            'df_columns': list(upload_reader.columns)
         }
         
         # Enforce required fields for all uploads (client_id is now required for both new and updates)
         # Special handling for combined client field - if present, it can provide client_id, first_name, last_name
         has_combined_client_field = False
-        for col in df.columns:
+        for col in upload_reader.columns:
             if column_mapping.get(col) == 'client_combined':
                 has_combined_client_field = True
                 break
         
         for required_field in required_fields:
             found = False
-            for col in df.columns:
+            for col in upload_reader.columns:
                 if column_mapping.get(col) == required_field:
                     found = True
                     break
@@ -2305,10 +2425,17 @@ def upload_clients(request):
         
         # Check for intake-related columns using case-insensitive mapping
         has_intake_data = False
-        for col in df.columns:
+        for col in upload_reader.columns:
             if column_mapping.get(col) in ['program_name', 'intake_date']:
                 has_intake_data = True
                 break
+        if has_intake_data and 'intake_date' not in column_mapping.values():
+            similar_cols = [col for col in upload_reader.columns if 'intake' in col.lower() or 'admission' in col.lower() or 'date' in col.lower()]
+            logger.info(
+                f"No column mapped to 'intake_date'. Enrollments will use the discharge date or today's date. "
+                f"Similar columns: {similar_cols or list(upload_reader.columns)}. "
+                f"To map a column, add it to field_mapping.json under 'intake_date' variations."
+            )
         
         # Process the data
         created_count = 0
@@ -2349,116 +2476,6 @@ def upload_clients(request):
             
             return 0
         
-        def parse_combined_client_field(client_field_value, client_id_field_value=None):
-            """
-            Parse client field that can be in various formats:
-            1. Combined: 'Last, First (ID)' - everything in one field
-            2. Separate: 'Last, First' + client_id from separate field
-            3. Complex: 'Last, First (Preferred)' - with preferred names
-            4. Complex: 'First (Previous), Last' - with previous names
-            
-            Handles various name formats:
-            - Abdul-Azim,  Safi
-            - Abdirazaq Warsame,  Mohamed  
-            - A. Hussein,  Mohamud
-            - Abbakar,  Tagwa Seddig Adam
-            - Abdoun Mohamed,  Sarah Hassan
-            - Adeshigbin,  Babatunde (Ganiu)
-            - Adeware,  Olubunni (Elizabeth)
-            - Adrian (Prev. Langton),  Naomi
-            - Ahmed,  Tasaddhuque (Duke)
-            - Archibald_2,  Reina
-            - Al-Khair,  A'shafie
-            
-            Returns: (first_name, last_name, client_id)
-            """
-            if not client_field_value or str(client_field_value).strip() == '':
-                return None, None, None
-            
-            client_str = str(client_field_value).strip()
-            client_id = None
-            
-            import re
-            
-            # Pattern 1: "Last, First (ID)" - Last, First with ID in parentheses
-            pattern1 = r'^([A-Za-z0-9\s._\'-]+),\s*([A-Za-z0-9\s._\'-]+)\s*\((\d+)\)$'
-            match1 = re.match(pattern1, client_str)
-            if match1:
-                last_name = match1.group(1).strip()    # "Abdul-Azim"
-                first_name = match1.group(2).strip()   # "Safi"
-                client_id = match1.group(3).strip()    # "12345"
-                
-                return first_name, last_name, client_id
-            
-            # Pattern 2: "Last, First (Preferred)" - Last, First with preferred name in parentheses
-            pattern2 = r'^([A-Za-z0-9\s._\'-]+),\s*([A-Za-z0-9\s._\'-]+)\s*\(([A-Za-z0-9\s._\'-]+)\)$'
-            match2 = re.match(pattern2, client_str)
-            if match2:
-                last_name = match2.group(1).strip()    # "Adeshigbin"
-                first_name = match2.group(2).strip()   # "Babatunde"
-                preferred_name = match2.group(3).strip()  # "Ganiu"
-                
-                # Use client_id from separate field if provided
-                if client_id_field_value and str(client_id_field_value).strip():
-                    client_id = str(client_id_field_value).strip()
-                    return first_name, last_name, client_id
-                else:
-                    # Return names but no client_id
-                    return first_name, last_name, None
-            
-            # Pattern 3: "First (Previous), Last" - First with previous name, Last
-            pattern3 = r'^([A-Za-z0-9\s._\'-]+)\s*\(([A-Za-z0-9\s._\'-]+)\)\s*,\s*([A-Za-z0-9\s._\'-]+)$'
-            match3 = re.match(pattern3, client_str)
-            if match3:
-                first_name = match3.group(1).strip()    # "Adrian"
-                previous_name = match3.group(2).strip()  # "Prev. Langton"
-                last_name = match3.group(3).strip()     # "Naomi"
-                
-                # Use client_id from separate field if provided
-                if client_id_field_value and str(client_id_field_value).strip():
-                    client_id = str(client_id_field_value).strip()
-                    return first_name, last_name, client_id
-                else:
-                    # Return names but no client_id
-                    return first_name, last_name, None
-            
-            # Pattern 4: "Last, First" - Simple Last, First without parentheses
-            pattern4 = r'^([A-Za-z0-9\s._\'-]+),\s*([A-Za-z0-9\s._\'-]+)$'
-            match4 = re.match(pattern4, client_str)
-            if match4:
-                last_name = match4.group(1).strip()    # "Abdul-Azim"
-                first_name = match4.group(2).strip()   # "Safi"
-                
-                # Use client_id from separate field if provided
-                if client_id_field_value and str(client_id_field_value).strip():
-                    client_id = str(client_id_field_value).strip()
-                    return first_name, last_name, client_id
-                else:
-                    # Return names but no client_id
-                    return first_name, last_name, None
-            
-            # Pattern 5: "First Last" - Simple space-separated First Last format (no comma)
-            # This handles cases like "John Doe" or "Mary Jane Smith"
-            pattern5 = r'^([A-Za-z0-9._\'-]+(?:\s+[A-Za-z0-9._\'-]+)*)\s+([A-Za-z0-9\s._\'-]+)$'
-            match5 = re.match(pattern5, client_str)
-            if match5:
-                # First group might be just first name or first + middle name(s)
-                name_parts = match5.group(1).strip().split()
-                if len(name_parts) >= 1:
-                    first_name = name_parts[0].strip()  # First part is first name
-                    last_name = match5.group(2).strip()  # Second group is last name
-                    
-                    # Use client_id from separate field if provided
-                    if client_id_field_value and str(client_id_field_value).strip():
-                        client_id = str(client_id_field_value).strip()
-                        return first_name, last_name, client_id
-                    else:
-                        # Return names but no client_id
-                        return first_name, last_name, None
-            
-            # If no pattern matches, return None
-            return None, None, None
-        
         def _is_duplicate_data(existing_client, new_data):
             """Check if the new data is essentially the same as existing client data"""
             # Compare key fields to determine if this is truly a duplicate
@@ -2510,305 +2527,41 @@ def upload_clients(request):
             client,
             row,
             index,
-            column_mapping,
-            df_columns,
             departments_cache,
-            program_lookup_by_name,
-            all_programs_list,
-            program_fuzzy_cache,
-            enrollment_cache,
-            intake_cache,
+            program_resolver,
+            learned_program_aliases,
+            enrollment_index,
             warnings_list=None,  # Optional list to collect future date warnings
+            parsed_row=None,  # ParsedRow from the chunk loop, dates already parsed with the file's formats
         ):
-            """Process intake data for a client - optimized with pre-loaded caches"""
+            """
+            Process intake data for a client - optimized with pre-loaded caches.
+            row is the upload row's MappedRow, so fields are read by their column position.
+            """
             try:
-                # Helper function to get data using field mapping
-                def get_field_data(field_name, default=''):
-                    """Get data from row using field mapping"""
-                    for col in df_columns:
-                        if column_mapping.get(col) == field_name:
-                            value = row[col]
-                            if pd.notna(value) and str(value).strip():
-                                logger.debug(f"Found {field_name} in column '{col}' with value: '{value}'")
-                                return str(value).strip()
-                    # Only log warning for intake_date if we're actually processing intake data
-                    # (i.e., if program_name is present, which means intake processing is expected)
-                    if field_name == 'intake_date':
-                        # Check if program_name is mapped (indicating intake processing is expected)
-                        has_program = any(column_mapping.get(col) == 'program_name' for col in df_columns)
-                        if has_program:
-                            # Try to find similar column names that might be intake_date
-                            similar_cols = [col for col in df_columns if 'intake' in col.lower() or 'admission' in col.lower() or 'date' in col.lower()]
-                            if similar_cols:
-                                logger.info(f"No column mapped to 'intake_date' for client {client.first_name} {client.last_name}. "
-                                          f"Similar columns found: {similar_cols}. Will use today's date as default. "
-                                          f"To map a column, add it to field_mapping.json under 'intake_date' variations.")
-                            else:
-                                logger.info(f"No column mapped to 'intake_date' for client {client.first_name} {client.last_name}. "
-                                          f"Will use today's date as default. Available columns: {list(df_columns)}")
-                    return default
-                
-                # Helper function to ensure proper defaults for optional fields (convert empty strings to None)
-                def get_field_with_default(field_name, default=None):
-                    """Get field data and ensure empty strings become None for optional fields"""
-                    value = get_field_data(field_name, '')
-                    if value == '' or value is None:
-                        return default
-                    return value
-                
-                # Helper function to parse boolean values safely
-                def parse_boolean(value, default=False):
-                    """Parse boolean value from string, handling empty values"""
-                    if not value or value.strip() == '':
-                        return default
-                    return str(value).lower().strip() in ['true', '1', 'yes', 'y']
-                
-                # Helper function to parse integer values safely
-                def parse_integer(value, default=None):
-                    """Parse integer value from string, handling empty values"""
-                    if not value or value.strip() == '':
-                        return default
-                    try:
-                        return int(str(value).strip())
-                    except (ValueError, TypeError):
-                        return default
-                
-                # Helper function to check if a date is in the future (without adding warning)
-                def is_future_date_intake(parsed_date):
-                    """Check if date is in the future. Returns True if date is future."""
-                    if not parsed_date:
-                        return False
-                    from django.utils import timezone
-                    today = timezone.now().date()
-                    return parsed_date > today
-                
-                # Helper function to check for future dates and add warnings
-                def check_future_date_intake(parsed_date, field_name):
-                    """Check if date is in the future and add warning for all date fields. Returns True if date is future."""
-                    if is_future_date_intake(parsed_date):
-                        # For intake_date and discharge_date, don't add warning here - it will be added when we skip processing
-                        if field_name in ['intake_date', 'discharge_date']:
-                            return True
-                        
-                        # For other date fields, add warning
-                        client_id = client.client_id if client else 'N/A'
-                        if warnings_list is not None:
-                            warning_msg = (
-                                f"Row {index + 2}: Future date detected for {field_name}. "
-                                f"Date: {parsed_date} (Client ID: {client_id}). "
-                                f"Please update the sheet with the correct date."
-                            )
-                            warnings_list.append(warning_msg)
-                            logger.warning(warning_msg)
-                        return True
-                    return False
-                
-                # Helper function to parse date values safely
-                def parse_date(value, field_name='date', default=None):
-                    """Parse date value from string, handling empty values, multiple formats, Excel serial numbers, and various date formats"""
-                    if not value or (isinstance(value, str) and value.strip() == ''):
-                        return default
-                    
-                    # Handle pandas Timestamp or datetime objects directly
-                    if hasattr(value, 'date'):
-                        try:
-                            parsed_date_obj = value.date()
-                            check_future_date_intake(parsed_date_obj, field_name)
-                            return parsed_date_obj
-                        except (AttributeError, TypeError):
-                            pass
-                    
-                    # Handle date objects directly
-                    if hasattr(value, 'year') and hasattr(value, 'month') and hasattr(value, 'day'):
-                        try:
-                            from datetime import date
-                            if isinstance(value, date):
-                                check_future_date_intake(value, field_name)
-                                return value
-                        except (AttributeError, TypeError):
-                            pass
-                    
-                    try:
-                        # Check if it's an Excel serial number (numeric value between 1 and 1000000)
-                        # Excel dates are days since 1900-01-01 (but Excel incorrectly treats 1900 as a leap year)
-                        try:
-                            numeric_value = float(value)
-                            # Excel serial numbers for dates are typically between 1 (Jan 1, 1900) and ~45000+ (modern dates)
-                            if 1 <= numeric_value <= 1000000:
-                                from datetime import datetime, timedelta
-                                from django.utils import timezone
-                                # Excel epoch is 1899-12-30 (not 1900-01-01 due to Excel's 1900 leap year bug)
-                                excel_epoch = datetime(1899, 12, 30)
-                                parsed_date = excel_epoch + timedelta(days=int(numeric_value))
-                                parsed_date_obj = parsed_date.date()
-                                
-                                # Check for future date and add warning (don't reject)
-                                check_future_date_intake(parsed_date_obj, field_name)
-                                
-                                logger.debug(f"Converted Excel serial {numeric_value} to date: {parsed_date_obj}")
-                                return parsed_date_obj
-                        except (ValueError, TypeError):
-                            pass
-                        
-                        # Try pandas automatic parsing first (handles most standard formats)
-                        try:
-                            parsed = pd.to_datetime(value, errors='coerce', infer_datetime_format=True)
-                            if pd.notna(parsed):
-                                parsed_date_obj = parsed.date() if hasattr(parsed, 'date') else parsed
-                                
-                                # Check for future date and add warning (don't reject)
-                                check_future_date_intake(parsed_date_obj, field_name)
-                                
-                                return parsed_date_obj
-                        except (ValueError, TypeError, OverflowError):
-                            pass
-                    except (ValueError, TypeError):
-                        pass
-                    
-                    # If pandas fails, try manual parsing for common formats
-                    try:
-                        from datetime import datetime, timedelta
-                        value_str = str(value).strip()
-                        
-                        # ISSUE 6 FIX: Enhanced time stripping - handle multiple datetime formats
-                        # Remove time components: "2024-12-05 14:30:00" -> "2024-12-05"
-                        if ' ' in value_str:
-                            value_str = value_str.split(' ')[0]
-                            logger.debug(f"Stripped time component from datetime string, result: {value_str}")
-                        # Handle T separator: "2024-12-05T14:30:00" -> "2024-12-05"
-                        if 'T' in value_str:
-                            value_str = value_str.split('T')[0]
-                            logger.debug(f"Stripped T separator from datetime string, result: {value_str}")
-                        
-                        # Try various date formats
-                        date_formats = [
-                            '%Y-%m-%d',           # 2024-12-05
-                            '%Y/%m/%d',           # 2024/12/05
-                            '%m/%d/%Y',           # 12/05/2024 (US format)
-                            '%d/%m/%Y',           # 05/12/2024 (European format)
-                            '%m-%d-%Y',           # 12-05-2024
-                            '%d-%m-%Y',           # 05-12-2024
-                            '%Y.%m.%d',           # 2024.12.05
-                            '%m.%d.%Y',           # 12.05.2024
-                            '%d.%m.%Y',           # 05.12.2024
-                            '%B %d, %Y',          # December 5, 2024
-                            '%b %d, %Y',          # Dec 5, 2024
-                            '%d %B %Y',           # 5 December 2024
-                            '%d %b %Y',           # 5 Dec 2024
-                            '%Y%m%d',             # 20241205
-                            '%m/%d/%y',           # 12/05/24 (2-digit year)
-                            '%d/%m/%y',           # 05/12/24 (2-digit year, European)
-                        ]
-                        
-                        for date_format in date_formats:
-                            try:
-                                parsed = datetime.strptime(value_str, date_format)
-                                parsed_date = parsed.date()
-                                
-                                # Check for future date and add warning (don't reject)
-                                check_future_date_intake(parsed_date, field_name)
-                                
-                                return parsed_date
-                            except (ValueError, TypeError):
-                                continue
-                        
-                        # Try parsing with slash separator (handle both MM/DD/YYYY and DD/MM/YYYY)
-                        if '/' in value_str:
-                            parts = value_str.split('/')
-                            if len(parts) == 3:
-                                try:
-                                    # Try MM/DD/YYYY first (US format)
-                                    month, day, year = parts
-                                    if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                        parsed_date = datetime(int(year), int(month), int(day)).date()
-                                        check_future_date_intake(parsed_date, field_name)
-                                        return parsed_date
-                                except (ValueError, TypeError):
-                                    try:
-                                        # Try DD/MM/YYYY (European format)
-                                        day, month, year = parts
-                                        if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                            parsed_date = datetime(int(year), int(month), int(day)).date()
-                                            check_future_date_intake(parsed_date, field_name)
-                                            return parsed_date
-                                    except (ValueError, TypeError):
-                                        pass
-                        
-                        # Try parsing with dash separator
-                        if '-' in value_str:
-                            parts = value_str.split('-')
-                            if len(parts) == 3:
-                                try:
-                                    # Try YYYY-MM-DD first (ISO format)
-                                    year, month, day = parts
-                                    if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                        parsed_date = datetime(int(year), int(month), int(day)).date()
-                                        check_future_date_intake(parsed_date, field_name)
-                                        return parsed_date
-                                except (ValueError, TypeError):
-                                    try:
-                                        # Try MM-DD-YYYY (US format)
-                                        month, day, year = parts
-                                        if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                            parsed_date = datetime(int(year), int(month), int(day)).date()
-                                            check_future_date_intake(parsed_date, field_name)
-                                            return parsed_date
-                                    except (ValueError, TypeError):
-                                        try:
-                                            # Try DD-MM-YYYY (European format)
-                                            day, month, year = parts
-                                            if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                                parsed_date = datetime(int(year), int(month), int(day)).date()
-                                                check_future_date_intake(parsed_date, field_name)
-                                                return parsed_date
-                                        except (ValueError, TypeError):
-                                            pass
-                    except (ValueError, TypeError, AttributeError) as e:
-                        logger.debug(f"Failed to parse date '{value}': {e}")
-                        pass
-                    
-                    return default
-                
-                # Helper function to parse multi-line date values safely
-                def parse_multiline_dates(value, default=None):
-                    """Parse multiple dates from a single cell (separated by newlines)"""
-                    if not value or (isinstance(value, str) and value.strip() == ''):
-                        return [default] if default else []
-                    
-                    date_strings = [date.strip() for date in str(value).split('\n') if date.strip()]
-                    parsed_dates = []
-                    
-                    for date_str in date_strings:
-                        # Use the robust parse_date function instead of pd.to_datetime
-                        parsed_date = parse_date(date_str)
-                        if parsed_date:
-                            parsed_dates.append(parsed_date)
-                        elif default:
-                            # Only use default if date_str was provided but couldn't be parsed
-                            logger.warning(f"Failed to parse date '{date_str}', using default: {default}")
-                            parsed_dates.append(default)
-                    
-                    return parsed_dates if parsed_dates else ([default] if default else [])
-                
-                program_name = get_field_data('program_name')
-                program_department = get_field_data('program_department')
+                program_name = row.get('program_name')
+                program_department = row.get('program_department')
                 # Use the source from the form (upload type selection), not from CSV
                 
                 print(f"DEBUG: Program enrollment data - program_name: '{program_name}', source: '{source}'")
                 
                 # ISSUE 7 FIX: Get discharge_date early to use as fallback for intake_date
-                discharge_date_value = get_field_data('discharge_date')
-                parsed_discharge_date = parse_date(discharge_date_value, 'discharge_date')
+                discharge_date_value = row.get('discharge_date')
+                parsed_discharge_date = parsed_row.discharge_date if parsed_row is not None else None
+                if parsed_discharge_date is None:
+                    parsed_discharge_date = parse_date(discharge_date_value)
                 
-                intake_date_value = get_field_data('intake_date')
+                intake_date_value = row.get('intake_date')
                 logger.debug(f"DEBUG: Raw intake_date_value for client {client.first_name} {client.last_name}: '{intake_date_value}' (type: {type(intake_date_value)})")
                 # Parse the intake date value first - only default to today if truly empty
-                parsed_intake_date = parse_date(intake_date_value, 'intake_date')
+                parsed_intake_date = parsed_row.intake_date if parsed_row is not None else None
+                if parsed_intake_date is None:
+                    parsed_intake_date = parse_date(intake_date_value)
                 logger.debug(f"DEBUG: Parsed intake_date for client {client.first_name} {client.last_name}: {parsed_intake_date}")
                 
                 # Check if either date is in the future - if so, skip processing this intake
-                has_future_intake = is_future_date_intake(parsed_intake_date)
-                has_future_discharge = is_future_date_intake(parsed_discharge_date)
+                has_future_intake = is_future_date(parsed_intake_date)
+                has_future_discharge = is_future_date(parsed_discharge_date)
                 
                 if has_future_intake or has_future_discharge:
                     client_id_display = client.client_id if client else 'N/A'
@@ -2854,9 +2607,9 @@ def upload_clients(request):
                     # Successfully parsed date - use it
                     intake_date = parsed_intake_date
                 
-                intake_database = get_field_data('intake_database', 'CCD')
-                referral_source = get_field_data('referral_source', source)
-                intake_housing_status = get_field_data('intake_housing_status', 'unknown')
+                intake_database = row.get('intake_database', 'CCD')
+                referral_source = row.get('referral_source', source)
+                intake_housing_status = row.get('intake_housing_status', 'unknown')
                 
                 if not program_name:
                     logger.warning(f"No program name provided for client {client.first_name} {client.last_name}")
@@ -2866,10 +2619,26 @@ def upload_clients(request):
                 program_names = [name.strip() for name in str(program_name).split('\n') if name.strip()]
                 print(f"DEBUG: Split program names: {program_names}")
                 
-                # Handle multiple dates in a single cell (separated by newlines)
-                # Pass None as default so parse_multiline_dates can handle empty values properly
-                # We'll use intake_date only if no dates are found
-                intake_dates = parse_multiline_dates(intake_date_value, None)
+                # Handle multiple dates in a single cell (separated by newlines); dates that
+                # cannot be parsed are left out and intake_date is used if none are found
+                if intake_date_value and '\n' in intake_date_value:
+                    intake_dates = []
+                    for date_str in intake_date_value.split('\n'):
+                        parsed_date = parse_date(date_str.strip())
+                        if not parsed_date:
+                            continue
+                        if is_future_date(parsed_date) and warnings_list is not None:
+                            warning_msg = (
+                                f"Row {index + 2}: Future date detected for intake_date. "
+                                f"Date: {parsed_date} (Client ID: {client.client_id if client else 'N/A'}). "
+                                f"Please update the sheet with the correct date."
+                            )
+                            warnings_list.append(warning_msg)
+                            logger.warning(warning_msg)
+                        intake_dates.append(parsed_date)
+                else:
+                    # A single date was already parsed above
+                    intake_dates = [parsed_intake_date] if parsed_intake_date else []
                 # If no dates were parsed, use the single parsed intake_date
                 if not intake_dates:
                     intake_dates = [intake_date]
@@ -2902,14 +2671,14 @@ def upload_clients(request):
                         logger.info(f"Created new department: {dept_name}")
                 
                 # Get additional enrollment fields using field mapping (outside loop for efficiency)
-                sub_program = get_field_data('sub_program')
-                support_workers = get_field_data('support_workers')
-                level_of_support = get_field_data('level_of_support')
-                client_type = get_field_data('client_type')
-                days_elapsed_value = get_field_data('days_elapsed')
-                program_status = get_field_data('program_status', 'active')
-                reason_discharge = get_field_data('reason_discharge')
-                receiving_services_value = get_field_data('receiving_services', 'false')
+                sub_program = row.get('sub_program')
+                support_workers = row.get('support_workers')
+                level_of_support = row.get('level_of_support')
+                client_type = row.get('client_type')
+                days_elapsed_value = row.get('days_elapsed')
+                program_status = row.get('program_status', 'active')
+                reason_discharge = row.get('reason_discharge')
+                receiving_services_value = row.get('receiving_services', 'false')
                 
                 # Use the already-parsed discharge_date
                 discharge_date = parsed_discharge_date
@@ -2931,27 +2700,12 @@ def upload_clients(request):
                         logger.warning(f"Skipping enrollment: empty program name for client {client.first_name} {client.last_name}")
                         continue
                     
-                    # First, try exact match (case-insensitive) across all departments from cache
-                    program = program_lookup_by_name.get(normalized_name.lower())
-                    
-                    # If no exact match, try cached fuzzy match before scanning all programs
-                    if not program:
-                        cached_program = program_fuzzy_cache.get(normalized_name)
-                        if cached_program is not None:
-                            program = cached_program
-                        else:
-                            best_match = None
-                            best_score = 0
-                            for p in all_programs_list:
-                                score = calculate_name_similarity(normalized_name, p.name or '')
-                                if score > best_score:
-                                    best_score = score
-                                    best_match = p
-                            # Store even if None to avoid repeated scans
-                            program_fuzzy_cache[normalized_name] = best_match if best_score > 0 else None
-                            if best_match and best_score > 0:
-                                program = best_match
-                                logger.info(f"Fuzzy matched program '{current_program_name}' to existing program '{program.name}' (score: {best_score:.2f})")
+                    # Exact match (case-insensitive) across all departments, then a learned alias,
+                    # then the best fuzzy match from the shared program index
+                    program, match_score, match_type = program_resolver.resolve(normalized_name)
+                    if program and match_type == 'fuzzy':
+                        learned_program_aliases[normalize_program_name(normalized_name)] = (program, match_score)
+                        logger.info(f"Fuzzy matched program '{current_program_name}' to existing program '{program.name}' (score: {match_score:.2f})")
                     
                     if not program:
                         logger.warning(
@@ -2962,14 +2716,10 @@ def upload_clients(request):
                     
                     # Create or update intake record with intelligent merging
                     # When client is merged cross-source, merge intake data intelligently
-                    intake_cache_key = (client.id, program.id)
-                    intake = intake_cache.get(intake_cache_key)
+                    intake = enrollment_index.get_upload_intake(client, program)
                     if intake is None:
                         # Check if intake already exists in database (for cross-source merges)
-                        existing_intake = Intake.objects.filter(
-                            client=client,
-                            program=program
-                        ).first()
+                        existing_intake = enrollment_index.get_intake(client, program)
                         
                         if existing_intake:
                             # Merge existing intake with new data
@@ -3002,35 +2752,34 @@ def upload_clients(request):
                             else:
                                 intake.notes = new_note
                             
-                            intake.save()
+                            enrollment_index.save_intake(intake)
                             logger.info(
                                 f"Merged intake record for {client.first_name} {client.last_name} in {current_program_name} "
                                 f"(cross-source merge)"
                             )
                         else:
-                            # Create new intake
-                            intake, created = Intake.objects.get_or_create(
-                                client=client,
-                                program=program,
-                                defaults={
-                                    'department': department,
-                                    'intake_date': current_intake_date,
-                                    'intake_database': intake_database,
-                                    'referral_source': referral_source,
-                                    'intake_housing_status': intake_housing_status,
-                                    'notes': f'Intake created from {source} upload (program {i+1})'
-                                }
+                            # Create new intake (inserted with the chunk's other intake writes)
+                            intake = enrollment_index.create_intake(
+                                client,
+                                program,
+                                department=department,
+                                intake_date=current_intake_date,
+                                intake_database=intake_database,
+                                referral_source=referral_source,
+                                intake_housing_status=intake_housing_status,
+                                notes=f'Intake created from {source} upload (program {i+1})',
                             )
+                            created = True
                             logger.info(f"Created intake record for {client.first_name} {client.last_name} in {current_program_name}")
                         
-                        intake_cache[intake_cache_key] = intake
+                        enrollment_index.set_intake(client, program, intake)
                     else:
                         # Intake already processed in this upload batch
                         created = False
                         # Still check if we should update intake_date to earliest
                         if current_intake_date and (not intake.intake_date or current_intake_date < intake.intake_date):
                             intake.intake_date = current_intake_date
-                            intake.save()
+                            enrollment_index.save_intake(intake)
                             logger.info(
                                 f"Updated intake_date to earliest date {current_intake_date} for {client.first_name} {client.last_name} "
                                 f"in {current_program_name} (within same upload batch)"
@@ -3058,20 +2807,10 @@ def upload_clients(request):
                     new_end_date = discharge_date
                     
                     # Get all non-archived enrollments for this client and program
-                    # IMPORTANT: This queries ALL existing enrollments, including those from other sources
+                    # IMPORTANT: This covers ALL existing enrollments, including those from other sources
                     # This enables cross-source enrollment merging when clients are merged
-                    # Also check the enrollment_cache for enrollments created in this same upload
-                    all_enrollments = list(ClientProgramEnrollment.objects.filter(
-                        client=client,
-                        program=program,
-                        is_archived=False
-                    ))
-                    
-                    # Add enrollments from cache that haven't been saved yet (same upload batch)
-                    for cache_key, cached_enrollment in enrollment_cache.items():
-                        if (cache_key[0] == client.id and cache_key[1] == program.id and 
-                            not cached_enrollment.is_archived and cached_enrollment not in all_enrollments):
-                            all_enrollments.append(cached_enrollment)
+                    # The index was prefetched for the chunk and also holds enrollments written by this upload
+                    all_enrollments = enrollment_index.get_enrollments(client, program)
                     
                     # Helper function to check if two date ranges overlap or are adjacent
                     def ranges_overlap_or_adjacent(start1, end1, start2, end2):
@@ -3140,8 +2879,12 @@ def upload_clients(request):
                     
                     # Combine all potential matches: open-ended > exact > similar > overlapping
                     # Remove duplicates while preserving priority
+                    # Matched by identity: enrollments created earlier in this chunk have no id yet
                     all_potential_matches = []
-                    match_ids = set()
+                    
+                    def add_potential_match(enrollment):
+                        if not any(enrollment is match for match in all_potential_matches):
+                            all_potential_matches.append(enrollment)
                     
                     # Add open-ended matches first (highest priority - always merge open-ended enrollments)
                     if open_ended_enrollments:
@@ -3150,27 +2893,19 @@ def upload_clients(request):
                             f"in program {program.name}. New enrollment also has no end_date - will merge into one."
                         )
                         for e in open_ended_enrollments:
-                            if e.id not in match_ids:
-                                all_potential_matches.append(e)
-                                match_ids.add(e.id)
+                            add_potential_match(e)
                     
                     # Add exact matches (high priority)
                     for e in exact_match_enrollments:
-                        if e.id not in match_ids:
-                            all_potential_matches.append(e)
-                            match_ids.add(e.id)
+                        add_potential_match(e)
                     
                     # Add similar start matches (medium priority)
                     for e in similar_start_enrollments:
-                        if e.id not in match_ids:
-                            all_potential_matches.append(e)
-                            match_ids.add(e.id)
+                        add_potential_match(e)
                     
                     # Add overlapping matches (lowest priority, but still valid)
                     for e in overlapping_enrollments:
-                        if e.id not in match_ids:
-                            all_potential_matches.append(e)
-                            match_ids.add(e.id)
+                        add_potential_match(e)
                     
                     # Use combined list for merging
                     overlapping_enrollments = all_potential_matches
@@ -3266,29 +3001,22 @@ def upload_clients(request):
                             if notes_parts:
                                 existing_enrollment.notes = ' | '.join(notes_parts)
                         
-                        # Save the merged enrollment immediately so it's visible to subsequent CSV records
-                        existing_enrollment.updated_by = request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
-                        existing_enrollment.save()
+                        # Queue the merged enrollment; the index makes it visible to subsequent CSV records
+                        existing_enrollment.updated_by = user.get_full_name() or user.username if user.is_authenticated else 'System'
+                        enrollment_index.save_enrollment(existing_enrollment)
                         
                         # ISSUE 2 FIX: Update client status after enrollment merge
-                        try:
-                            status_changed = client.update_inactive_status()
-                            if status_changed:
-                                client.save(update_fields=['is_inactive'])
-                                logger.debug(f"Updated client inactive status after enrollment merge for {client.first_name} {client.last_name}")
-                        except Exception as e:
-                            logger.warning(f"Failed to update client status after enrollment merge: {e}")
+                        enrollment_index.refresh_client_status(client)
                         
-                        # Update cache with the merged enrollment
-                        enrollment_cache_key = (client.id, program.id, earliest_start)
-                        enrollment_cache[enrollment_cache_key] = existing_enrollment
+                        # Update index with the merged enrollment
+                        enrollment_index.add_enrollment(client, program, existing_enrollment)
                         
                         # Archive other overlapping enrollments (they're being merged)
                         for other_enrollment in overlapping_enrollments[1:]:
                             if not other_enrollment.is_archived:
                                 other_enrollment.is_archived = True
                                 other_enrollment.archived_at = timezone.now()
-                                other_enrollment.save()
+                                enrollment_index.save_enrollment(other_enrollment)
                                 logger.info(
                                     f"Archived duplicate enrollment (ID: {other_enrollment.id}, "
                                     f"dates: {other_enrollment.start_date} to {other_enrollment.end_date}) "
@@ -3297,13 +3025,7 @@ def upload_clients(request):
                                 )
                                 
                                 # ISSUE 2 FIX: Update client status after archiving enrollment
-                                try:
-                                    status_changed = client.update_inactive_status()
-                                    if status_changed:
-                                        client.save(update_fields=['is_inactive'])
-                                        logger.debug(f"Updated client inactive status after archiving enrollment for {client.first_name} {client.last_name}")
-                                except Exception as e:
-                                    logger.warning(f"Failed to update client status after archiving enrollment: {e}")
+                                enrollment_index.refresh_client_status(client)
                         
                         # Mark that we've already merged and saved
                         enrollment = existing_enrollment
@@ -3319,9 +3041,8 @@ def upload_clients(request):
                         enrollment = existing_enrollment
                         created = False
                         
-                        # Cache the enrollment for potential future use in the same upload
-                        enrollment_cache_key = (client.id, program.id, enrollment.start_date)
-                        enrollment_cache[enrollment_cache_key] = enrollment
+                        # Index the enrollment for potential future use in the same upload
+                        enrollment_index.add_enrollment(client, program, enrollment)
                         
                         # If we merged enrollments above, the dates are already updated and saved
                         # We just need to ensure end_date is set if discharge_date is provided and it's later
@@ -3398,28 +3119,22 @@ def upload_clients(request):
                             if days_elapsed:
                                 enrollment.days_elapsed = days_elapsed
                             
-                            enrollment.updated_by = request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
+                            enrollment.updated_by = user.get_full_name() or user.username if user.is_authenticated else 'System'
                             # Only save if we didn't just merge (merge already saved above)
                             if not enrollment_was_just_merged:
-                                enrollment.save()
+                                enrollment_index.save_enrollment(enrollment)
                                 # ISSUE 2 FIX: Update client status after enrollment update
-                                try:
-                                    status_changed = client.update_inactive_status()
-                                    if status_changed:
-                                        client.save(update_fields=['is_inactive'])
-                                        logger.debug(f"Updated client inactive status after enrollment update for {client.first_name} {client.last_name}")
-                                except Exception as e:
-                                    logger.warning(f"Failed to update client status after enrollment update: {e}")
+                                enrollment_index.refresh_client_status(client)
                             logger.info(f"Updated enrollment end_date for {client.first_name} {client.last_name} in {program.name} with discharge date {discharge_date}")
                         else:
                             # No discharge date, just update other fields
                             enrollment.status = program_status if program_status else enrollment.status
                             if days_elapsed:
                                 enrollment.days_elapsed = days_elapsed
-                            enrollment.updated_by = request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
+                            enrollment.updated_by = user.get_full_name() or user.username if user.is_authenticated else 'System'
                             # Only save if we didn't just merge (merge already saved above)
                             if not enrollment_was_just_merged:
-                                enrollment.save()
+                                enrollment_index.save_enrollment(enrollment)
                     else:
                         # Create new enrollment - client is not enrolled in this program yet
                         # Build notes with additional information
@@ -3488,14 +3203,10 @@ def upload_clients(request):
                         # (no end_date) that we might have missed - if so, merge instead of creating duplicate
                         if discharge_date is None:
                             # New enrollment has no end_date - check for any existing open-ended enrollments
-                            existing_open_ended = ClientProgramEnrollment.objects.filter(
-                                client=client,
-                                program=program,
-                                end_date__isnull=True,
-                                is_archived=False
-                            ).exclude(
-                                start_date=enrollment_start_date  # Exclude exact start_date match (already handled above)
-                            ).first()
+                            # Exact start_date matches were already handled above
+                            existing_open_ended = enrollment_index.find_open_ended(
+                                client, program, exclude_start_date=enrollment_start_date
+                            )
                             
                             if existing_open_ended:
                                 # Found an existing open-ended enrollment - merge into it instead of creating duplicate
@@ -3507,7 +3218,6 @@ def upload_clients(request):
                                 # Use earliest start_date
                                 if enrollment_start_date < existing_open_ended.start_date:
                                     existing_open_ended.start_date = enrollment_start_date
-                                    existing_open_ended.save()
                                     logger.info(
                                         f"Updated existing enrollment start_date to {enrollment_start_date} "
                                         f"(earliest date) for client {client.first_name} {client.last_name}"
@@ -3526,60 +3236,51 @@ def upload_clients(request):
                                 if final_status:
                                     existing_open_ended.status = final_status
                                 
-                                existing_open_ended.updated_by = request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
-                                existing_open_ended.save()
+                                existing_open_ended.updated_by = user.get_full_name() or user.username if user.is_authenticated else 'System'
+                                enrollment_index.save_enrollment(existing_open_ended)
                                 
-                                # Cache the enrollment
-                                enrollment_cache_key = (client.id, program.id, existing_open_ended.start_date)
-                                enrollment_cache[enrollment_cache_key] = existing_open_ended
+                                # Index the enrollment
+                                enrollment_index.add_enrollment(client, program, existing_open_ended)
                                 
                                 enrollment = existing_open_ended
                                 created = False
                                 
                                 # Update client status
-                                try:
-                                    status_changed = client.update_inactive_status()
-                                    if status_changed:
-                                        client.save(update_fields=['is_inactive'])
-                                        logger.debug(f"Updated client inactive status after merging open-ended enrollment for {client.first_name} {client.last_name}")
-                                except Exception as e:
-                                    logger.warning(f"Failed to update client status after merging open-ended enrollment: {e}")
+                                enrollment_index.refresh_client_status(client)
                                 
                                 logger.info(f"Merged into existing open-ended enrollment for {client.first_name} {client.last_name} in {current_program_name}")
                             else:
                                 # No existing open-ended enrollment - proceed with normal creation
-                                enrollment, created = ClientProgramEnrollment.objects.get_or_create(
-                                    client=client,
-                                    program=program,
-                                    start_date=enrollment_start_date,  # Use start_date as part of unique constraint
+                                enrollment, created = enrollment_index.get_or_create_enrollment(
+                                    client,
+                                    program,
+                                    enrollment_start_date,
                                     defaults={
                                         'end_date': discharge_date,  # Set discharge_date as end_date (None for open-ended)
                                         'status': final_status,
                                         'days_elapsed': days_elapsed,
                                         'notes': ' | '.join(notes_parts),
-                                        'created_by': request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
+                                        'created_by': user.get_full_name() or user.username if user.is_authenticated else 'System'
                                     }
                                 )
-                                # Cache the enrollment for potential future use in the same upload
-                                enrollment_cache_key = (client.id, program.id, enrollment_start_date)
-                                enrollment_cache[enrollment_cache_key] = enrollment
+                                # Index the enrollment for potential future use in the same upload
+                                enrollment_index.add_enrollment(client, program, enrollment)
                         else:
                             # New enrollment has end_date - proceed with normal creation
-                            enrollment, created = ClientProgramEnrollment.objects.get_or_create(
-                                client=client,
-                                program=program,
-                                start_date=enrollment_start_date,  # Use start_date as part of unique constraint
+                            enrollment, created = enrollment_index.get_or_create_enrollment(
+                                client,
+                                program,
+                                enrollment_start_date,
                                 defaults={
                                     'end_date': discharge_date,  # Set discharge_date as end_date
                                     'status': final_status,
                                     'days_elapsed': days_elapsed,
                                     'notes': ' | '.join(notes_parts),
-                                    'created_by': request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
+                                    'created_by': user.get_full_name() or user.username if user.is_authenticated else 'System'
                                 }
                             )
-                            # Cache the enrollment for potential future use in the same upload
-                            enrollment_cache_key = (client.id, program.id, enrollment_start_date)
-                            enrollment_cache[enrollment_cache_key] = enrollment
+                            # Index the enrollment for potential future use in the same upload
+                            enrollment_index.add_enrollment(client, program, enrollment)
                         
                         if not created:
                             # Enrollment was found during get_or_create (race condition), update it instead
@@ -3607,32 +3308,17 @@ def upload_clients(request):
                                 else:
                                     enrollment.notes = discharge_note
                             enrollment.status = final_status
-                            enrollment.updated_by = request.user.get_full_name() or request.user.username if request.user.is_authenticated else 'System'
-                            enrollment.save()
+                            enrollment.updated_by = user.get_full_name() or user.username if user.is_authenticated else 'System'
+                            enrollment_index.save_enrollment(enrollment)
                             # ISSUE 2 FIX: Update client status after enrollment update
-                            try:
-                                status_changed = client.update_inactive_status()
-                                if status_changed:
-                                    client.save(update_fields=['is_inactive'])
-                                    logger.debug(f"Updated client inactive status after enrollment update for {client.first_name} {client.last_name}")
-                            except Exception as e:
-                                logger.warning(f"Failed to update client status after enrollment update: {e}")
+                            enrollment_index.refresh_client_status(client)
                             logger.info(f"Updated existing enrollment (found during get_or_create) for {client.first_name} {client.last_name} in {program.name}")
 
                     if created:
                         # ISSUE 2 FIX: Update client status after enrollment creation
-                        try:
-                            status_changed = client.update_inactive_status()
-                            if status_changed:
-                                client.save(update_fields=['is_inactive'])
-                                logger.debug(f"Updated client inactive status after enrollment creation for {client.first_name} {client.last_name}")
-                        except Exception as e:
-                            logger.warning(f"Failed to update client status after enrollment creation: {e}")
+                        enrollment_index.refresh_client_status(client)
                         logger.info(f"Created {final_status} enrollment for {client.first_name} {client.last_name} in {current_program_name}")
-                        # Skip audit log for bulk imports to improve performance
-                        # Audit logs can be created separately if needed for specific tracking
-                        # For 10k+ records, creating individual audit logs adds significant overhead
-                        pass
+                        # Audit log entries are written in one batch when the chunk is flushed
                     else:
                         logger.info(f"Enrollment already exists for {client.first_name} {client.last_name} in {current_program_name}")
                     
@@ -3641,88 +3327,45 @@ def upload_clients(request):
                 errors.append(f"Row {index + 2} (Intake): {str(e)}")
         
         
-        # Load test mode: process data but skip database writes
-        if is_load_test:
-            # Simulate processing without database writes
-            processed_count = len(df)
-            
-            # Return load test response
-            return JsonResponse({
-                'success': True,
-                'message': f'Load test mode: {processed_count} clients processed (no DB writes)',
-                'load_test_mode': True,
-                'processed_count': processed_count,
-                'stats': {
-                    'total_rows': processed_count,
-                    'created': 0,
-                    'updated': 0,
-                    'skipped': 0,
-                    'duplicates_flagged': 0,
-                    'errors': 0
-                },
-                'notes': [
-                    'Load test mode: Data was processed but not saved to database',
-                    'This is a safe test run with no data persistence'
-                ]
-            })
+        # Dry runs record what happens to every row; their writes are rolled back
+        report = UploadReport(get_report_path(upload_log)) if dry_run and upload_log else None
         
-        # ===== BATCH OPTIMIZATION: Pre-load existing data =====
-        # Collect all client_ids, emails, phones from the upload first
-        all_client_ids = []
-        all_emails = []
-        all_phones = []
-        row_data_map = {}  # Store row data by index for later processing
+        # Column positions for every mapped field, resolved once for all rows
+        row_mapper = UploadRowMapper(upload_reader.columns, column_mapping, date_formats)
+        
+        # Plain client files can be matched and written set-based through a staging table
+        # (in one transaction, so not for commit-per-chunk uploads or dry runs)
+        if can_stage_upload(row_mapper) and not commit_per_chunk and not dry_run:
+            return process_staged_client_upload(
+                upload_log, upload_reader, row_mapper, source, file_extension, user, CHUNK_SIZE, debug_info,
+                profiler
+            )
         
+        # ===== BATCH OPTIMIZATION: Pre-load existing data =====
+        profiler.enter('preload')
         # Pre-load all departments and programs for intake processing optimization
         logger.info("Pre-loading departments and programs for batch processing")
         departments_cache = {dept.name: dept for dept in Department.objects.filter(is_archived=False)}
-        all_programs_list = list(Program.objects.select_related('department').all())
-        program_lookup_by_name = {}
-        for program in all_programs_list:
-            name_key = (program.name or '').strip().lower()
-            if name_key:
-                program_lookup_by_name[name_key] = program
-        
-        program_fuzzy_cache = {}
-        enrollment_cache = {}
-        intake_cache = {}
-        
-        logger.info(f"Pre-loaded {len(departments_cache)} departments and {len(all_programs_list)} programs")
-        logger.info("Starting batch data collection phase")
-        for index, row in df.iterrows():
-            try:
-                # Helper function to get data using field mapping (inline version for collection phase)
-                def get_field_data_inline(field_name, default=''):
-                    for col in df.columns:
-                        if column_mapping.get(col) == field_name:
-                            value = row[col]
-                            if pd.notna(value) and str(value).strip():
-                                return str(value).strip()
-                    return default
-                
-                # Helper function to clean client_id
-                client_id = _clean_client_id(get_field_data_inline('client_id'))
-                email = get_field_data_inline('email', '').strip()
-                phone = get_field_data_inline('phone', '').strip()
-                
-                # Store row data for later processing
-                row_data_map[index] = {
-                    'client_id': client_id,
-                    'email': email,
-                    'phone': phone,
-                    'first_name': get_field_data_inline('first_name', ''),
-                    'last_name': get_field_data_inline('last_name', ''),
-                }
-                
-                if client_id:
-                    all_client_ids.append(client_id)
-                if email:
-                    all_emails.append(email.lower())
-                if phone:
-                    all_phones.append(phone)
-            except Exception as e:
-                logger.warning(f"Error collecting data from row {index + 1}: {str(e)}")
-                continue
+        # Shared across uploads; rebuilt only when programs or aliases changed
+        program_resolver = get_program_resolver()
+        # Fuzzy program matches (program, score) used by this upload; strong ones are stored as aliases with each chunk's writes
+        learned_program_aliases = {}
+        enrollment_index = UploadEnrollmentIndex(
+            changed_by=getattr(user, 'staff_profile', None) if user.is_authenticated else None
+        )
+        
+        logger.info(f"Pre-loaded {len(departments_cache)} departments and {len(program_resolver.programs)} programs")
+        
+        all_client_ids = upload_keys['client_ids']
+        all_emails = upload_keys['emails']
+        all_phones = upload_keys['phones']
+        all_dobs_in_upload = upload_keys['dobs']
+        all_name_dob_combos = upload_keys['name_dob_combos']
+        all_external_ids_in_upload = upload_keys['external_ids']
+        logger.info(
+            f"Collected {len(all_client_ids)} client IDs, {len(all_emails)} emails, {len(all_phones)} phones, "
+            f"{len(all_dobs_in_upload)} DOBs and {len(all_name_dob_combos)} name+DOB combinations from upload file"
+        )
         
         # Batch query existing clients by client_id - check ALL sources (including same source)
         # Logic: If uploading from EMHware, check SMIS AND EMHware. If uploading from SMIS, check EMHware AND SMIS.
@@ -3848,36 +3491,6 @@ def upload_clients(request):
         # Pre-load clients by DOB for name+DOB matching (for all sources)
         # This maintains the original business logic for Priority 5 and 6 duplicate checks
         clients_by_dob = {}
-        all_dobs_in_upload = set()
-        for index, row in df.iterrows():
-            try:
-                # Get DOB from row
-                dob_value = None
-                for col in df.columns:
-                    if column_mapping.get(col) == 'dob':
-                        dob_value = row[col]
-                        break
-                if dob_value:
-                    try:
-                        # Check if value is pandas NaT (Not a Time) before processing
-                        if pd.isna(dob_value):
-                            continue
-                        parsed_dob = pd.to_datetime(dob_value, errors='coerce')
-                        # Check if parsing resulted in NaT
-                        if pd.isna(parsed_dob):
-                            continue
-                        # Convert to date object
-                        parsed_dob_date = parsed_dob.date()
-                        # Additional check: ensure it's a valid date (not NaT date)
-                        if parsed_dob_date and parsed_dob_date != datetime(1900, 1, 1).date():
-                            all_dobs_in_upload.add(parsed_dob_date)
-                    except Exception as e:
-                        # Skip invalid date values
-                        logger.debug(f"Skipping invalid DOB value at row {index}: {e}")
-                        pass
-            except:
-                pass
-        
         if all_dobs_in_upload:
             clients_with_matching_dob = Client.objects.filter(dob__in=all_dobs_in_upload).only(
                 'id', 'first_name', 'last_name', 'dob', 'source', 'client_id'
@@ -3891,71 +3504,36 @@ def upload_clients(request):
         # Pre-load clients by name+DOB for discharge updates (name-based lookup)
         # This maintains the original business logic for discharge date updates
         clients_by_name_dob = {}  # Key: (first_name_lower, last_name_lower, dob) -> [clients]
-        all_name_dob_combos = set()
-        logger.info("Collecting name+DOB combinations from upload file...")
-        for index, row in df.iterrows():
-            try:
-                # Get name and DOB from row
-                first_name_val = None
-                last_name_val = None
-                dob_value = None
-                for col in df.columns:
-                    field_name = column_mapping.get(col)
-                    if field_name == 'first_name':
-                        first_name_val = row[col]
-                    elif field_name == 'last_name':
-                        last_name_val = row[col]
-                    elif field_name == 'dob':
-                        dob_value = row[col]
-                
-                if first_name_val and last_name_val and dob_value:
-                    try:
-                        first_name_clean = str(first_name_val).strip().lower() if first_name_val else ''
-                        last_name_clean = str(last_name_val).strip().lower() if last_name_val else ''
-                        parsed_dob = pd.to_datetime(dob_value).date()
-                        if first_name_clean and last_name_clean and parsed_dob and parsed_dob != datetime(1900, 1, 1).date():
-                            all_name_dob_combos.add((first_name_clean, last_name_clean, parsed_dob))
-                    except:
-                        pass
-            except:
-                pass
-        
-        logger.info(f"Collected {len(all_name_dob_combos)} unique name+DOB combinations from upload file")
-        
         if all_name_dob_combos:
             logger.info("Pre-loading clients with matching name+DOB combinations...")
-            # Build query to find clients matching any of the name+DOB combinations
-            # For large sets, we'll query in batches to avoid overly complex Q() objects
-            from django.db.models import Q
-            BATCH_SIZE = 1000  # Process 1000 combinations at a time
-            all_combos_list = list(all_name_dob_combos)
-            
-            for i in range(0, len(all_combos_list), BATCH_SIZE):
-                batch_combos = all_combos_list[i:i+BATCH_SIZE]
-                name_dob_filters = Q()
-                for first_name_lower, last_name_lower, dob in batch_combos:
-                    name_dob_filters |= Q(
-                        first_name__iexact=first_name_lower,
-                        last_name__iexact=last_name_lower,
-                        dob=dob
-                    )
-                
-                if name_dob_filters.children:
-                    try:
-                        clients_with_matching_name_dob = Client.objects.filter(name_dob_filters).only(
-                            'id', 'first_name', 'last_name', 'dob', 'source', 'client_id'
-                        )
-                        for client in clients_with_matching_name_dob:
-                            key = (client.first_name.lower().strip() if client.first_name else '', 
-                                   client.last_name.lower().strip() if client.last_name else '',
-                                   client.dob)
-                            if key not in clients_by_name_dob:
-                                clients_by_name_dob[key] = []
-                            clients_by_name_dob[key].append(client)
-                        logger.info(f"Pre-loaded batch {i//BATCH_SIZE + 1}: {len(clients_with_matching_name_dob)} clients (total so far: {len(clients_by_name_dob)} unique matches)")
-                    except Exception as e:
-                        logger.error(f"Error pre-loading name+DOB batch {i//BATCH_SIZE + 1}: {e}")
-                        # Continue with next batch even if one fails
+            # Ship the upload's (lower(first), lower(last), dob) tuples as arrays and join them
+            # against the clients(lower(first_name), lower(last_name), dob) index in one query,
+            # instead of OR-ing one iexact Q() per combination
+            combo_first_names, combo_last_names, combo_dobs = (list(values) for values in zip(*all_name_dob_combos))
+            matching_name_dob_ids = RawSQL(
+                f"""
+                SELECT c.id
+                FROM {Client._meta.db_table} c
+                JOIN unnest(%s::text[], %s::text[], %s::date[]) AS upload(first_name, last_name, dob)
+                  ON lower(c.first_name) = upload.first_name
+                 AND lower(c.last_name) = upload.last_name
+                 AND c.dob = upload.dob
+                """,
+                (combo_first_names, combo_last_names, combo_dobs),
+            )
+            try:
+                clients_with_matching_name_dob = Client.objects.filter(id__in=matching_name_dob_ids).only(
+                    'id', 'first_name', 'last_name', 'dob', 'source', 'client_id'
+                )
+                for client in clients_with_matching_name_dob:
+                    key = (client.first_name.lower().strip() if client.first_name else '', 
+                           client.last_name.lower().strip() if client.last_name else '',
+                           client.dob)
+                    if key not in clients_by_name_dob:
+                        clients_by_name_dob[key] = []
+                    clients_by_name_dob[key].append(client)
+            except Exception as e:
+                logger.error(f"Error pre-loading name+DOB matches: {e}")
             
             logger.info(f"Pre-loaded {sum(len(clients) for clients in clients_by_name_dob.values())} total clients with matching name+DOB for discharge updates ({len(clients_by_name_dob)} unique name+DOB combinations)")
         
@@ -3963,20 +3541,6 @@ def upload_clients(request):
         
         # Pre-load clients by uid_external for external ID matching
         existing_clients_by_external_id = {}
-        all_external_ids_in_upload = set()
-        for index, row in df.iterrows():
-            try:
-                # Get uid_external from row
-                uid_external_val = None
-                for col in df.columns:
-                    if column_mapping.get(col) == 'uid_external':
-                        uid_external_val = row[col]
-                        break
-                if uid_external_val and str(uid_external_val).strip():
-                    all_external_ids_in_upload.add(str(uid_external_val).strip())
-            except:
-                pass
-        
         if all_external_ids_in_upload:
             clients_with_external_id = Client.objects.filter(uid_external__in=all_external_ids_in_upload).only(
                 'id', 'first_name', 'last_name', 'uid_external', 'client_id', 'source'
@@ -3988,74 +3552,56 @@ def upload_clients(request):
             logger.info(f"Pre-loaded {len(existing_clients_by_external_id)} clients with matching external IDs")
         
         # ===== CROSS-SOURCE ID MATCHING: Pre-load clients by smis_id, emhware_id, and legacy_client_ids =====
-        # This enables robust cross-source matching when importing from different sources
+        # This enables robust cross-source matching when importing from different sources.
+        # Only ids present in the upload are looked up, in batches through the smis_id/emhware_id
+        # indexes and the GIN index on legacy_client_ids, instead of loading every client that has one.
         existing_clients_by_smis_id = {}
         existing_clients_by_emhware_id = {}
         existing_clients_by_legacy_id = {}  # Key: client_id -> [clients] (list because one ID might map to multiple clients in edge cases)
         
-        # Pre-load all clients with smis_id
-        logger.info("Pre-loading clients by smis_id for cross-source matching...")
-        clients_with_smis_id = Client.objects.filter(
-            smis_id__isnull=False
-        ).exclude(
-            smis_id=''
-        ).only(
-            'id', 'smis_id', 'emhware_id', 'client_id', 'source', 'legacy_client_ids', 
-            'first_name', 'last_name', 'email', 'phone', 'dob'
-        )
-        for client in clients_with_smis_id:
-            if client.smis_id and str(client.smis_id).strip():
-                smis_id_key = str(client.smis_id).strip()
-                # Normalize: handle case where multiple clients might have same smis_id (edge case)
-                if smis_id_key not in existing_clients_by_smis_id:
-                    existing_clients_by_smis_id[smis_id_key] = []
-                existing_clients_by_smis_id[smis_id_key].append(client)
-        logger.info(f"Pre-loaded {len(clients_with_smis_id)} clients with smis_id ({len(existing_clients_by_smis_id)} unique IDs)")
-        
-        # Pre-load all clients with emhware_id
-        logger.info("Pre-loading clients by emhware_id for cross-source matching...")
-        clients_with_emhware_id = Client.objects.filter(
-            emhware_id__isnull=False
-        ).exclude(
-            emhware_id=''
-        ).only(
+        source_ids_in_upload = upload_keys['source_ids']
+        source_id_list = list(source_ids_in_upload)
+        cross_source_fields = (
             'id', 'smis_id', 'emhware_id', 'client_id', 'source', 'legacy_client_ids',
             'first_name', 'last_name', 'email', 'phone', 'dob'
         )
-        for client in clients_with_emhware_id:
-            if client.emhware_id and str(client.emhware_id).strip():
-                emhware_id_key = str(client.emhware_id).strip()
-                # Normalize: handle case where multiple clients might have same emhware_id (edge case)
-                if emhware_id_key not in existing_clients_by_emhware_id:
-                    existing_clients_by_emhware_id[emhware_id_key] = []
-                existing_clients_by_emhware_id[emhware_id_key].append(client)
-        logger.info(f"Pre-loaded {len(clients_with_emhware_id)} clients with emhware_id ({len(existing_clients_by_emhware_id)} unique IDs)")
-        
-        # Pre-load all clients with legacy_client_ids
-        logger.info("Pre-loading clients by legacy_client_ids for cross-source matching...")
-        from django.db.models import Q
-        # Query clients that have non-empty legacy_client_ids
-        clients_with_legacy_ids = Client.objects.filter(
-            legacy_client_ids__len__gt=0
-        ).only(
-            'id', 'smis_id', 'emhware_id', 'client_id', 'source', 'legacy_client_ids',
-            'first_name', 'last_name', 'email', 'phone', 'dob'
+        SOURCE_ID_BATCH_SIZE = 1000
+        LEGACY_ID_BATCH_SIZE = 200  # Each legacy id is its own containment clause
+        logger.info(f"Pre-loading clients by smis_id, emhware_id and legacy_client_ids for {len(source_id_list)} IDs in the upload...")
+        
+        for i in range(0, len(source_id_list), SOURCE_ID_BATCH_SIZE):
+            batch_ids = source_id_list[i:i+SOURCE_ID_BATCH_SIZE]
+            clients_with_source_id = Client.objects.filter(
+                Q(smis_id__in=batch_ids) | Q(emhware_id__in=batch_ids)
+            ).only(*cross_source_fields)
+            for client in clients_with_source_id:
+                # Normalize: handle case where multiple clients might have same source id (edge case)
+                if client.smis_id in source_ids_in_upload:
+                    existing_clients_by_smis_id.setdefault(client.smis_id, []).append(client)
+                if client.emhware_id in source_ids_in_upload:
+                    existing_clients_by_emhware_id.setdefault(client.emhware_id, []).append(client)
+        
+        for i in range(0, len(source_id_list), LEGACY_ID_BATCH_SIZE):
+            batch_ids = source_id_list[i:i+LEGACY_ID_BATCH_SIZE]
+            legacy_filter = Q()
+            for legacy_id in batch_ids:
+                legacy_filter |= Q(legacy_client_ids__contains=[{'client_id': legacy_id}])
+            for client in Client.objects.filter(legacy_filter).only(*cross_source_fields):
+                for legacy_entry in client.legacy_client_ids or []:
+                    if not isinstance(legacy_entry, dict) or not legacy_entry.get('client_id'):
+                        continue
+                    legacy_id_key = str(legacy_entry['client_id']).strip()
+                    if legacy_id_key not in source_ids_in_upload:
+                        continue
+                    # Avoid adding same client multiple times for same legacy_id
+                    legacy_matches = existing_clients_by_legacy_id.setdefault(legacy_id_key, [])
+                    if client not in legacy_matches:
+                        legacy_matches.append(client)
+        
+        logger.info(
+            f"Pre-loaded cross-source matches: {len(existing_clients_by_smis_id)} smis_ids, "
+            f"{len(existing_clients_by_emhware_id)} emhware_ids, {len(existing_clients_by_legacy_id)} legacy IDs"
         )
-        for client in clients_with_legacy_ids:
-            if client.legacy_client_ids and isinstance(client.legacy_client_ids, list):
-                for legacy_entry in client.legacy_client_ids:
-                    if isinstance(legacy_entry, dict):
-                        legacy_client_id = legacy_entry.get('client_id')
-                        legacy_source = legacy_entry.get('source')
-                        if legacy_client_id and str(legacy_client_id).strip():
-                            legacy_id_key = str(legacy_client_id).strip()
-                            # Store by legacy_id -> list of clients (in case of duplicates)
-                            if legacy_id_key not in existing_clients_by_legacy_id:
-                                existing_clients_by_legacy_id[legacy_id_key] = []
-                            # Avoid adding same client multiple times for same legacy_id
-                            if client not in existing_clients_by_legacy_id[legacy_id_key]:
-                                existing_clients_by_legacy_id[legacy_id_key].append(client)
-        logger.info(f"Pre-loaded {len(clients_with_legacy_ids)} clients with legacy_client_ids ({len(existing_clients_by_legacy_id)} unique legacy IDs)")
         # ===== END CROSS-SOURCE ID PRE-LOADING =====
         
         # Optimized find_duplicate_client function using pre-loaded data
@@ -4184,13 +3730,25 @@ def upload_clients(request):
         total_created_count = 0
         total_updated_count = 0
         total_skipped_count = 0
+        total_unchanged_count = 0
         total_duplicates_flagged = 0
         all_errors = []
         all_warnings = []  # Track all future date warnings
         all_duplicate_details = []
+        if resume_from_row:
+            # Counters of the chunks committed before the upload was interrupted
+            checkpoint_stats = upload_log.checkpoint_stats or {}
+            total_created_count = checkpoint_stats.get('created', 0)
+            total_updated_count = checkpoint_stats.get('updated', 0)
+            total_skipped_count = checkpoint_stats.get('skipped', 0)
+            total_unchanged_count = checkpoint_stats.get('unchanged', 0)
+            total_duplicates_flagged = checkpoint_stats.get('duplicates_flagged', 0)
+            all_errors = list(checkpoint_stats.get('errors', []))
+            all_warnings = list(checkpoint_stats.get('warnings', []))
+            all_duplicate_details = list(checkpoint_stats.get('duplicate_details', []))
         
         # Check file size and warn if very large
-        total_rows = len(df)
+        total_rows = upload_reader.total_rows
         if total_rows > 10000:
             logger.warning(f"Large file detected: {total_rows} rows. Processing in chunks within a single transaction.")
         
@@ -4198,38 +3756,64 @@ def upload_clients(request):
         
         # Process file in chunks but within a SINGLE transaction
         # If ANY chunk fails, ALL database operations will rollback
+        # In commit-per-chunk mode each chunk commits with its checkpoint and only the failing chunk rolls back
         chunk_start = 0
         chunk_number = 0
         
+        # Parses rows on worker processes for files with more than one chunk
+        chunk_parser = ChunkParser(row_mapper, source, upload_reader.chunk_count).start()
+        
         # Wrap ALL chunk processing in a single transaction
         # This ensures that if any chunk fails, everything rolls back
         try:
             logger.info("Entering transaction.atomic() block...")
-            with transaction.atomic():
+            with (upload_jobs.chunk_transactions() if commit_per_chunk else transaction.atomic()):
                 logger.info("Inside transaction.atomic() block. Starting chunk processing...")
-                while chunk_start < total_rows:
-                    chunk_end = min(chunk_start + CHUNK_SIZE, total_rows)
+                
+                def select_chunk_rows(chunk_df):
+                    # Chunks are indexed by file row; committed chunks of a resumed upload are not parsed again
+                    if chunk_df.index[-1] < resume_from_row:
+                        return None
+                    return fingerprints.filter_chunk(chunk_df)
+                
+                # Rows of the next chunks are parsed on worker processes while this one is matched and written
+                for chunk_df, rows_df, parsed_rows in chunk_parser.iter_chunks(upload_reader.iter_chunks(), select_chunk_rows):
+                    chunk_end = chunk_start + len(chunk_df)
                     chunk_number += 1
-                    chunk_df = df.iloc[chunk_start:chunk_end]
+                    if rows_df is None:
+                        # Committed by an earlier run of this upload
+                        chunk_start = chunk_end
+                        continue
+                    # Stop between chunks once a user cancelled the upload
+                    if upload_log and upload_jobs.is_cancel_requested(upload_log):
+                        raise UploadError('UPLOAD_063', details={
+                            'chunk': chunk_number,
+                            'committed_rows': upload_log.checkpoint_row if commit_per_chunk else 0,
+                        })
+                    profiler.enter('match_rows')
+                    profiler.start_chunk()
+                    chunk_row_count = len(chunk_df)
+                    unchanged_df = chunk_df
+                    chunk_df = rows_df
+                    parsed_rows_by_index = dict(zip(chunk_df.index, parsed_rows))
+                    # MappedRow per row, also read by process_intake_data for the chunk's clients
+                    mapped_rows_by_index = dict(row_mapper.iter_rows(chunk_df))
                     
                     logger.info(f"Processing chunk {chunk_number}: rows {chunk_start + 1} to {chunk_end} of {total_rows}")
                     
                     # Update progress in upload log (outside transaction for visibility)
-                    # Note: This won't persist if transaction rolls back, but gives user feedback
+                    # Written on a separate connection so the status endpoint sees it mid-import
                     if upload_log:
                         try:
                             progress_percentage = int((chunk_start / total_rows) * 100) if total_rows > 0 else 0
-                            upload_log.upload_details = upload_log.upload_details or {}
-                            upload_log.upload_details['progress'] = {
-                                'processed': chunk_start,
-                                'total': total_rows,
-                                'percentage': progress_percentage,
-                                'current_chunk': chunk_number,
-                                'status': 'processing'
-                            }
-                            # Save outside transaction for progress visibility
-                            # Use save(update_fields=...) to avoid triggering signals
-                            upload_log.save(update_fields=['upload_details'])
+                            upload_jobs.set_upload_progress(
+                                upload_log,
+                                processed=chunk_start,
+                                total=total_rows,
+                                percentage=progress_percentage,
+                                current_chunk=chunk_number,
+                                status='processing'
+                            )
                         except Exception as e:
                             logger.warning(f"Failed to update progress: {e}")
                     
@@ -4243,7 +3827,9 @@ def upload_clients(request):
                     chunk_duplicate_details = []
                     chunk_created_count = 0
                     chunk_updated_count = 0
-                    chunk_skipped_count = 0
+                    # Rows unchanged since the last import of their client id
+                    chunk_unchanged_count = chunk_row_count - len(chunk_df)
+                    chunk_skipped_count = chunk_unchanged_count
                     chunk_duplicates_flagged = 0
                     
                     # CRITICAL FIX: Track clients being created in this chunk by name+DOB
@@ -4251,265 +3837,9 @@ def upload_clients(request):
                     chunk_clients_by_name_dob = {}  # Key: (first_name_lower, last_name_lower, dob) -> client_data dict
                     
                     # Process rows in this chunk
-                    for chunk_row_idx, (index, row) in enumerate(chunk_df.iterrows()):
+                    for chunk_row_idx, ((index, row), parsed_row) in enumerate(zip(mapped_rows_by_index.items(), parsed_rows)):
                         try:
-                            # Helper function to get data using field mapping
-                            def get_field_data(field_name, default=''):
-                                """Get data from row using field mapping"""
-                                for col in df.columns:
-                                    if column_mapping.get(col) == field_name:
-                                        value = row[col]
-                                        if pd.notna(value) and str(value).strip():
-                                            return str(value).strip()
-                                        return default
-                            # Helper function to ensure proper defaults for optional fields (convert empty strings to None)
-                            def get_field_with_default(field_name, default=None):
-                                """Get field data and ensure empty strings become None for optional fields"""
-                                value = get_field_data(field_name, '')
-                                if value == '' or value is None:
-                                    return default
-                                return value
-                            
-                            # Helper function to parse boolean values safely
-                            def parse_boolean(value, default=False):
-                                """Parse boolean value from string, handling empty values"""
-                                if not value or value.strip() == '':
-                                    return default
-                                return str(value).lower().strip() in ['true', '1', 'yes', 'y']
-                            
-                            # Helper function to parse integer values safely
-                            def parse_integer(value, default=None):
-                                """Parse integer value from string, handling empty values"""
-                                if not value or value.strip() == '':
-                                    return default
-                                try:
-                                    return int(str(value).strip())
-                                except (ValueError, TypeError):
-                                    return default
-                            
-                            # Helper function to check if a date is in the future (without adding warning)
-                            def is_future_date(parsed_date):
-                                """Check if date is in the future. Returns True if date is future."""
-                                if not parsed_date:
-                                    return False
-                                from django.utils import timezone
-                                today = timezone.now().date()
-                                return parsed_date > today
-                            
-                            # Helper function to check for future dates and add warnings
-                            def check_future_date(parsed_date, field_name, row_index):
-                                """Check if date is in the future and add warning for all date fields. Returns True if date is future."""
-                                if is_future_date(parsed_date):
-                                    # For intake_date and discharge_date, don't add warning here - it will be added when we skip the record
-                                    if field_name in ['intake_date', 'discharge_date']:
-                                        return True
-                                    
-                                    # For other date fields, add warning
-                                    client_id = get_field_data('client_id', 'N/A')
-                                    warning_msg = (
-                                        f"Row {row_index + 2}: Future date detected for {field_name}. "
-                                        f"Date: {parsed_date} (Client ID: {client_id}). "
-                                        f"Please update the sheet with the correct date."
-                                    )
-                                    chunk_warnings.append(warning_msg)
-                                    logger.warning(warning_msg)
-                                    return True
-                                return False
-                            
-                            # Helper function to parse date values safely
-                            def parse_date(value, field_name='date', default=None):
-                                """Parse date value from string, handling empty values, multiple formats, Excel serial numbers, and various date formats"""
-                                if not value or (isinstance(value, str) and value.strip() == ''):
-                                    return default
-                                
-                                # Handle pandas Timestamp or datetime objects directly
-                                if hasattr(value, 'date'):
-                                    try:
-                                        parsed_date_obj = value.date()
-                                        check_future_date(parsed_date_obj, field_name, index)
-                                        return parsed_date_obj
-                                    except (AttributeError, TypeError):
-                                        pass
-                                
-                                # Handle date objects directly
-                                if hasattr(value, 'year') and hasattr(value, 'month') and hasattr(value, 'day'):
-                                    try:
-                                        from datetime import date
-                                        if isinstance(value, date):
-                                            check_future_date(value, field_name, index)
-                                            return value
-                                    except (AttributeError, TypeError):
-                                        pass
-                                
-                                try:
-                                    # Check if it's an Excel serial number (numeric value between 1 and 1000000)
-                                    # Excel dates are days since 1900-01-01 (but Excel incorrectly treats 1900 as a leap year)
-                                    try:
-                                        numeric_value = float(value)
-                                        # Excel serial numbers for dates are typically between 1 (Jan 1, 1900) and ~45000+ (modern dates)
-                                        if 1 <= numeric_value <= 1000000:
-                                            from datetime import datetime, timedelta
-                                            from django.utils import timezone
-                                            # Excel epoch is 1899-12-30 (not 1900-01-01 due to Excel's 1900 leap year bug)
-                                            excel_epoch = datetime(1899, 12, 30)
-                                            parsed_date = excel_epoch + timedelta(days=int(numeric_value))
-                                            parsed_date_obj = parsed_date.date()
-                                            
-                                            # Check for future date and add warning (don't reject)
-                                            check_future_date(parsed_date_obj, field_name, index)
-                                            
-                                            logger.debug(f"Converted Excel serial {numeric_value} to date: {parsed_date_obj}")
-                                            return parsed_date_obj
-                                    except (ValueError, TypeError):
-                                        pass
-                                    
-                                    # Try pandas automatic parsing first (handles most standard formats)
-                                    try:
-                                        parsed = pd.to_datetime(value, errors='coerce', infer_datetime_format=True)
-                                        if pd.notna(parsed):
-                                            parsed_date_obj = parsed.date() if hasattr(parsed, 'date') else parsed
-                                            
-                                            # Check for future date and add warning (don't reject)
-                                            check_future_date(parsed_date_obj, field_name, index)
-                                            
-                                            return parsed_date_obj
-                                    except (ValueError, TypeError, OverflowError):
-                                        pass
-                                except (ValueError, TypeError):
-                                    pass
-                                
-                                # If pandas fails, try manual parsing for common formats
-                                try:
-                                    from datetime import datetime, timedelta
-                                    from django.utils import timezone
-                                    value_str = str(value).strip()
-                                    
-                                    # ISSUE 6 FIX: Enhanced time stripping - handle multiple datetime formats
-                                    # Remove time components: "2024-12-05 14:30:00" -> "2024-12-05"
-                                    if ' ' in value_str:
-                                        value_str = value_str.split(' ')[0]
-                                        logger.debug(f"Stripped time component from datetime string, result: {value_str}")
-                                    # Handle T separator: "2024-12-05T14:30:00" -> "2024-12-05"
-                                    if 'T' in value_str:
-                                        value_str = value_str.split('T')[0]
-                                        logger.debug(f"Stripped T separator from datetime string, result: {value_str}")
-                                    
-                                    # Try various date formats
-                                    date_formats = [
-                                        '%Y-%m-%d',           # 2024-12-05
-                                        '%Y/%m/%d',           # 2024/12/05
-                                        '%m/%d/%Y',           # 12/05/2024 (US format)
-                                        '%d/%m/%Y',           # 05/12/2024 (European format)
-                                        '%m-%d-%Y',           # 12-05-2024
-                                        '%d-%m-%Y',           # 05-12-2024
-                                        '%Y.%m.%d',           # 2024.12.05
-                                        '%m.%d.%Y',           # 12.05.2024
-                                        '%d.%m.%Y',           # 05.12.2024
-                                        '%B %d, %Y',          # December 5, 2024
-                                        '%b %d, %Y',          # Dec 5, 2024
-                                        '%d %B %Y',           # 5 December 2024
-                                        '%d %b %Y',           # 5 Dec 2024
-                                        '%Y%m%d',             # 20241205
-                                        '%m/%d/%y',           # 12/05/24 (2-digit year)
-                                        '%d/%m/%y',           # 05/12/24 (2-digit year, European)
-                                    ]
-                                    
-                                    for date_format in date_formats:
-                                        try:
-                                            parsed = datetime.strptime(value_str, date_format)
-                                            parsed_date = parsed.date()
-                                            
-                                            # Check for future date and add warning (don't reject)
-                                            check_future_date(parsed_date, field_name, index)
-                                            
-                                            return parsed_date
-                                        except (ValueError, TypeError):
-                                            continue
-                                    
-                                    # Try parsing with slash separator (handle both MM/DD/YYYY and DD/MM/YYYY)
-                                    if '/' in value_str:
-                                        parts = value_str.split('/')
-                                        if len(parts) == 3:
-                                            try:
-                                                # Try MM/DD/YYYY first (US format)
-                                                month, day, year = parts
-                                                if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                                    parsed_date = datetime(int(year), int(month), int(day)).date()
-                                                    check_future_date(parsed_date, field_name, index)
-                                                    return parsed_date
-                                            except (ValueError, TypeError):
-                                                try:
-                                                    # Try DD/MM/YYYY (European format)
-                                                    day, month, year = parts
-                                                    if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                                        parsed_date = datetime(int(year), int(month), int(day)).date()
-                                                        check_future_date(parsed_date, field_name, index)
-                                                        return parsed_date
-                                                except (ValueError, TypeError):
-                                                    pass
-                                    
-                                    # Try parsing with dash separator
-                                    if '-' in value_str:
-                                        parts = value_str.split('-')
-                                        if len(parts) == 3:
-                                            try:
-                                                # Try YYYY-MM-DD first (ISO format)
-                                                year, month, day = parts
-                                                if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                                    parsed_date = datetime(int(year), int(month), int(day)).date()
-                                                    check_future_date(parsed_date, field_name, index)
-                                                    return parsed_date
-                                            except (ValueError, TypeError):
-                                                try:
-                                                    # Try MM-DD-YYYY (US format)
-                                                    month, day, year = parts
-                                                    if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                                        parsed_date = datetime(int(year), int(month), int(day)).date()
-                                                        check_future_date(parsed_date, field_name, index)
-                                                        return parsed_date
-                                                except (ValueError, TypeError):
-                                                    try:
-                                                        # Try DD-MM-YYYY (European format)
-                                                        day, month, year = parts
-                                                        if len(year) == 4 and 1 <= int(month) <= 12 and 1 <= int(day) <= 31:
-                                                            parsed_date = datetime(int(year), int(month), int(day)).date()
-                                                            check_future_date(parsed_date, field_name, index)
-                                                            return parsed_date
-                                                    except (ValueError, TypeError):
-                                                        pass
-                                except (ValueError, TypeError, AttributeError) as e:
-                                    logger.debug(f"Failed to parse date '{value}': {e}")
-                                    pass
-                                
-                                return default
-                            
-                            # Helper function to clean client_id and ensure it's a whole number string
-                            def clean_client_id(value):
-                                """Clean client_id to ensure it's a whole number string without decimals"""
-                                # Check for pandas NaN/None/null values first
-                                if pd.isna(value) or value is None:
-                                    return None
-                                
-                                # Convert to string and check if it's empty or 'nan'
-                                try:
-                                    str_value = str(value).strip()
-                                    if not str_value or str_value.lower() in ['nan', 'none', 'null', '']:
-                                        return None
-                                    
-                                    # If it's a decimal number (like 2765.0), convert to integer then back to string
-                                    if '.' in str_value:
-                                        # Check if it's a whole number decimal (like 2765.0)
-                                        float_val = float(str_value)
-                                        if float_val.is_integer():
-                                            return str(int(float_val))
-                                        else:
-                                            # If it has actual decimal places, keep as is
-                                            return str_value
-                                    else:
-                                        # Already a whole number, return as string
-                                        return str_value
-                                except (ValueError, TypeError):
-                                    return None
+                            get_field_data = row.get
 
                             # Clean and prepare data using field mapping
                             email = get_field_data('email')  # Now optional
@@ -4518,11 +3848,9 @@ def upload_clients(request):
                             
                             # Early validation: Check for future dates in intake_date and discharge_date
                             # If found, skip this record and add warning
-                            intake_date_value = get_field_data('intake_date')
                             discharge_date_value = get_field_data('discharge_date')
-                            
-                            parsed_intake_date = parse_date(intake_date_value, 'intake_date') if intake_date_value else None
-                            parsed_discharge_date = parse_date(discharge_date_value, 'discharge_date') if discharge_date_value else None
+                            parsed_intake_date = parsed_row.intake_date
+                            parsed_discharge_date = parsed_row.discharge_date
                             
                             # Check if either date is in the future (without adding warning yet)
                             has_future_intake = is_future_date(parsed_intake_date)
@@ -4546,309 +3874,25 @@ def upload_clients(request):
                                 chunk_skipped_count += 1
                                 continue  # Skip this record
                             
-                            # Handle date of birth - required for new clients, optional for updates
-                            dob = None
-                            try:
-                                dob_value = get_field_data('dob')
-                                if dob_value:
-                                    # Check if the value looks like a valid date format
-                                    dob_str = str(dob_value).strip().lower()
-                                    
-                                    # Skip values that are clearly not dates
-                                    if dob_str in ['yes', 'no', 'y', 'n', 'true', 'false', '1', '0', '']:
-                                        # These are not valid date values, treat as missing
-                                        dob_value = None
-                                    
-                                    if dob_value:
-                                        # Use parse_date helper function which handles all formats and future date warnings
-                                        dob = parse_date(dob_value, 'dob')
-                                        # DOB should never be in the future - if it is, it's likely a data entry error
-                                        # But we'll still allow it and just warn (parse_date already handles the warning)
-                                else:
-                                    # DOB is optional - no error needed
-                                    dob = None
-                            except Exception as e:
-                                # If date parsing fails, DOB is optional - just set to None
-                                dob = None
+                            # Parsing failures are reported against the row like any other row error
+                            if parsed_row.error is not None:
+                                raise parsed_row.error
                             
-                            client_data = {
-                                'first_name': get_field_data('first_name'),
-                                'last_name': get_field_data('last_name'),
-                                'middle_name': get_field_with_default('middle_name'),
-                                'dob': dob,
-                                'preferred_name': get_field_with_default('preferred_name'),
-                                'alias': get_field_with_default('alias'),
-                                'gender': get_field_with_default('gender'),
-                                'gender_identity': get_field_with_default('gender_identity'),
-                                'pronoun': get_field_with_default('pronoun'),
-                                'marital_status': get_field_with_default('marital_status'),
-                                'citizenship_status': get_field_with_default('citizenship_status'),
-                                'location_county': get_field_with_default('location_county'),
-                                'province': get_field_with_default('province'),
-                                'city': get_field_with_default('city'),
-                                'postal_code': get_field_with_default('postal_code'),
-                                'address': get_field_with_default('address'),
-                                'address_2': get_field_with_default('address_2'),
-                                'language': get_field_with_default('language'),
-                                'preferred_language': get_field_with_default('preferred_language'),
-                                'mother_tongue': get_field_with_default('mother_tongue'),
-                                'official_language': get_field_with_default('official_language'),
-                                'language_interpreter_required': parse_boolean(get_field_data('language_interpreter_required')),
-                                'self_identification_race_ethnicity': get_field_with_default('self_identification_race_ethnicity'),
-                                'indigenous_status': get_field_with_default('indigenous_status'),
-                                'lgbtq_status': get_field_with_default('lgbtq_status'),
-                                'highest_level_education': get_field_with_default('highest_level_education'),
-                                'children_home': parse_boolean(get_field_data('children_home')),
-                                'children_number': parse_integer(get_field_data('children_number')),
-                                'lhin': get_field_with_default('lhin'),
-                                'client_id': clean_client_id(get_field_data('client_id')),
-                                'phone': get_field_with_default('phone'),
-                                'email': email if email else None,  # Add email to direct field, None if empty
-                                'source': source,  # Add the source field from the form
-                                'level_of_support': get_field_with_default('level_of_support'),
-                                'client_type': get_field_with_default('client_type'),
-                                'referral_source': get_field_with_default('referral_source'),
-                                'phone_work': get_field_with_default('phone_work'),
-                                'phone_alt': get_field_with_default('phone_alt'),
-                                'permission_to_phone': parse_boolean(get_field_data('permission_to_phone')),
-                                'permission_to_email': parse_boolean(get_field_data('permission_to_email')),
-                                'medical_conditions': get_field_with_default('medical_conditions'),
-                                'primary_diagnosis': get_field_with_default('primary_diagnosis'),
-                                'family_doctor': get_field_with_default('family_doctor'),
-                                'health_card_number': get_field_with_default('health_card_number'),
-                                'health_card_version': get_field_with_default('health_card_version'),
-                                'health_card_exp_date': parse_date(get_field_data('health_card_exp_date'), 'health_card_exp_date'),
-                                'health_card_issuing_province': get_field_with_default('health_card_issuing_province'),
-                                'no_health_card_reason': get_field_with_default('no_health_card_reason'),
-                                'next_of_kin': get_field_with_default('next_of_kin'),
-                                'emergency_contact': get_field_with_default('emergency_contact'),
-                                'comments': get_field_with_default('comments'),
-                                'chart_number': get_field_with_default('chart_number'),
-                                'contact_information': {
-                                    'email': email if email else None,
-                                    'phone': phone if phone else None,
-                                },
-                                # Extended fields for ClientExtended model
-                                'indigenous_identity': get_field_with_default('indigenous_identity'),
-                                'military_status': get_field_with_default('military_status'),
-                                'refugee_status': get_field_with_default('refugee_status'),
-                                'household_size': parse_integer(get_field_data('household_size')),
-                                'family_head_client_no': get_field_with_default('family_head_client_no'),
-                                'relationship': get_field_with_default('relationship'),
-                                'primary_worker': get_field_with_default('primary_worker'),
-                                'chronically_homeless': parse_boolean(get_field_data('chronically_homeless')),
-                                'num_bednights_current_stay': parse_integer(get_field_data('num_bednights_current_stay')),
-                                'length_homeless_3yrs': parse_integer(get_field_data('length_homeless_3yrs')),
-                                'income_source': get_field_with_default('income_source'),
-                                'taxation_year_filed': get_field_with_default('taxation_year_filed'),
-                                'status_id': get_field_with_default('status_id'),
-                                'picture_id': get_field_with_default('picture_id'),
-                                'other_id': get_field_with_default('other_id'),
-                                'bnl_consent': parse_boolean(get_field_data('bnl_consent')),
-                                'allergies': get_field_with_default('allergies'),
-                                'harm_reduction_support': parse_boolean(get_field_data('harm_reduction_support')),
-                                'medication_support': parse_boolean(get_field_data('medication_support')),
-                                'pregnancy_support': parse_boolean(get_field_data('pregnancy_support')),
-                                'mental_health_support': parse_boolean(get_field_data('mental_health_support')),
-                                'physical_health_support': parse_boolean(get_field_data('physical_health_support')),
-                                'daily_activities_support': parse_boolean(get_field_data('daily_activities_support')),
-                                'other_health_supports': get_field_with_default('other_health_supports'),
-                                'cannot_use_stairs': parse_boolean(get_field_data('cannot_use_stairs')),
-                                'limited_mobility': parse_boolean(get_field_data('limited_mobility')),
-                                'wheelchair_accessibility': parse_boolean(get_field_data('wheelchair_accessibility')),
-                                'vision_hearing_speech_supports': get_field_with_default('vision_hearing_speech_supports'),
-                                'english_translator': parse_boolean(get_field_data('english_translator')),
-                                'reading_supports': parse_boolean(get_field_data('reading_supports')),
-                                'other_accessibility_supports': get_field_with_default('other_accessibility_supports'),
-                                'pet_owner': parse_boolean(get_field_data('pet_owner')),
-                                'legal_support': parse_boolean(get_field_data('legal_support')),
-                                'immigration_support': parse_boolean(get_field_data('immigration_support')),
-                                'religious_cultural_supports': get_field_with_default('religious_cultural_supports'),
-                                'safety_concerns': get_field_with_default('safety_concerns'),
-                                'intimate_partner_violence_support': parse_boolean(get_field_data('intimate_partner_violence_support')),
-                                'human_trafficking_support': parse_boolean(get_field_data('human_trafficking_support')),
-                                'other_supports': get_field_with_default('other_supports'),
-                                'access_to_housing_application': get_field_with_default('access_to_housing_application'),
-                                'access_to_housing_no': get_field_with_default('access_to_housing_no'),
-                                'access_point_application': get_field_with_default('access_point_application'),
-                                'access_point_no': get_field_with_default('access_point_no'),
-                                'cars': get_field_with_default('cars'),
-                                'cars_no': parse_integer(get_field_data('cars_no')),
-                                'discharge_disposition': get_field_with_default('discharge_disposition'),
-                                'intake_status': get_field_with_default('intake_status'),
-                                'lived_last_12_months': get_field_with_default('lived_last_12_months'),
-                                'reason_for_service': get_field_with_default('reason_for_service'),
-                                'intake_date': parse_date(get_field_data('intake_date'), 'intake_date'),
-                                'service_end_date': parse_date(get_field_data('service_end_date'), 'service_end_date'),
-                                'rejection_date': parse_date(get_field_data('rejection_date'), 'rejection_date'),
-                                'rejection_reason': get_field_with_default('rejection_reason'),
-                                'room': get_field_with_default('room'),
-                                'bed': get_field_with_default('bed'),
-                                'occupancy_status': get_field_with_default('occupancy_status'),
-                                'bed_nights_historical': parse_integer(get_field_data('bed_nights_historical')),
-                                'restriction_reason': get_field_with_default('restriction_reason'),
-                                'restriction_date': parse_date(get_field_data('restriction_date'), 'restriction_date'),
-                                'restriction_duration_days': parse_integer(get_field_data('restriction_duration_days')),
-                                'restriction_status': get_field_with_default('restriction_status'),
-                                'early_termination_by': get_field_with_default('early_termination_by')
-                            }
-                    
-                            # OPTIONAL: Check for combined client field (only if present) - MUST happen before validation
-                            combined_client_value = None
-                            client_id_from_separate_field = None
-                            
-                            # Look for combined client field via mapping first
-                            for col in df.columns:
-                                if column_mapping.get(col) == 'client_combined':
-                                    combined_client_value = row[col]
-                                    break
-                            
-                            # If not found via mapping, check for "Client" or "client" column directly (case-insensitive)
-                            if not combined_client_value or pd.isna(combined_client_value) or not str(combined_client_value).strip():
-                                for col in df.columns:
-                                    col_lower = col.lower().strip()
-                                    # Check if column name is "client" (but not already mapped to client_id or something else)
-                                    if col_lower == 'client' and column_mapping.get(col) not in ['client_id', 'first_name', 'last_name']:
-                                        combined_client_value = row[col]
-                                        break
-                            
-                            # Look for separate client_id field via mapping
-                            for col in df.columns:
-                                if column_mapping.get(col) == 'client_id':
-                                    client_id_from_separate_field = row[col]
-                                    break
-                            
-                            # If not found via mapping, check for "Client ID" or "client id" column directly (case-insensitive)
-                            if not client_id_from_separate_field or pd.isna(client_id_from_separate_field) or (str(client_id_from_separate_field).strip() == '' or str(client_id_from_separate_field).strip().lower() in ['nan', 'none', '']):
-                                for col in df.columns:
-                                    col_lower = col.lower().strip()
-                                    # Check if column name contains "client" and "id" (like "Client ID", "client id", etc.)
-                                    if ('client' in col_lower and 'id' in col_lower) and column_mapping.get(col) not in ['first_name', 'last_name', 'client_combined']:
-                                        potential_client_id = row[col]
-                                        if potential_client_id and not pd.isna(potential_client_id) and str(potential_client_id).strip() and str(potential_client_id).strip().lower() not in ['nan', 'none', '']:
-                                            client_id_from_separate_field = potential_client_id
-                                            break
-                            
-                            # Try to extract names and client_id from combined field
-                            if combined_client_value and not pd.isna(combined_client_value) and str(combined_client_value).strip():
-                                parsed_first, parsed_last, parsed_client_id = parse_combined_client_field(
-                                    combined_client_value, 
-                                    client_id_from_separate_field
-                                )
-                                
-                                # Override names if parsing was successful
-                                if parsed_first and parsed_last:
-                                    if not client_data.get('first_name') or (isinstance(client_data.get('first_name'), str) and client_data.get('first_name', '').strip() == ''):
-                                        client_data['first_name'] = parsed_first
-                                    if not client_data.get('last_name') or (isinstance(client_data.get('last_name'), str) and client_data.get('last_name', '').strip() == ''):
-                                        client_data['last_name'] = parsed_last
-                                    
-                                    # Override client_id if we successfully parsed it and it's missing
-                                    if parsed_client_id and (not client_data.get('client_id') or (isinstance(client_data.get('client_id'), str) and client_data.get('client_id', '').strip() == '')):
-                                        client_data['client_id'] = clean_client_id(parsed_client_id)
-                            
-                            # If client_id is still missing, try to get it from Client ID column
-                            client_id_value = client_data.get('client_id')
-                            if (not client_id_value or (isinstance(client_id_value, str) and client_id_value.strip() == '')) and client_id_from_separate_field:
-                                try:
-                                    if not pd.isna(client_id_from_separate_field):
-                                        cleaned_id = clean_client_id(client_id_from_separate_field)
-                                        if cleaned_id:
-                                            client_data['client_id'] = cleaned_id
-                                except Exception:
-                                    pass
+                            # Typed fields with the combined client field and name fallbacks applied
+                            dob = parsed_row.dob
+                            client_data = parsed_row.client_data
                             
-                            # If names are still missing, try to extract from a simple "name" column (First Last format)
-                            first_name_val = client_data.get('first_name')
-                            last_name_val = client_data.get('last_name')
-                            first_name_empty = not first_name_val or (isinstance(first_name_val, str) and first_name_val.strip() == '')
-                            last_name_empty = not last_name_val or (isinstance(last_name_val, str) and last_name_val.strip() == '')
-                            
-                            if first_name_empty or last_name_empty:
-                                # Check for a "name" column that might contain "First Last" format
-                                name_field_value = None
-                                for col in df.columns:
-                                    col_lower = col.lower().strip()
-                                    # Check if column is "name" (but not already mapped to something else)
-                                    if col_lower in ['name'] and column_mapping.get(col) not in ['first_name', 'last_name', 'client_combined']:
-                                        name_field_value = row[col]
-                                        break
-                                
-                                if name_field_value and str(name_field_value).strip():
-                                    name_str = str(name_field_value).strip()
-                                    # Try to parse as "First Last" format (simple space-separated)
-                                    # Only split if we have at least one space and the result has 2+ parts
-                                    name_parts = name_str.split()
-                                    if len(name_parts) >= 2:
-                                        # First part is first name, rest is last name
-                                        if first_name_empty:
-                                            client_data['first_name'] = name_parts[0]
-                                        if last_name_empty:
-                                            client_data['last_name'] = ' '.join(name_parts[1:])
-                            
-                            # Handle languages_spoken (expect comma-separated string)
-                            languages = get_field_data('language')
-                            if languages:
-                                client_data['languages_spoken'] = [lang.strip() for lang in languages.split(',') if lang.strip()]
-                            else:
-                                client_data['languages_spoken'] = []
-                            
-                            # Handle ethnicity (expect comma-separated string)
-                            ethnicity = get_field_data('ethnicity')
-                            if ethnicity:
-                                client_data['ethnicity'] = [eth.strip() for eth in ethnicity.split(',') if eth.strip()]
-                            else:
-                                client_data['ethnicity'] = []
-                            
-                            # Handle support_workers (expect comma-separated string)
-                            support_workers = get_field_data('support_workers')
-                            if support_workers:
-                                client_data['support_workers'] = [worker.strip() for worker in support_workers.split(',') if worker.strip()]
-                            # Don't set empty list if no support_workers column exists - this prevents overwriting existing data
-                            
-                            # Handle next_of_kin (expect JSON string or simple text)
-                            next_of_kin = get_field_data('next_of_kin')
-                            if next_of_kin:
-                                try:
-                                    client_data['next_of_kin'] = json.loads(next_of_kin)
-                                except json.JSONDecodeError:
-                                    # If JSON parsing fails, create a simple dict with the string
-                                    client_data['next_of_kin'] = {'name': next_of_kin}
-                            else:
-                                client_data['next_of_kin'] = {}
-                            
-                            # Handle emergency_contact (expect JSON string or simple text)
-                            emergency_contact = get_field_data('emergency_contact')
-                            if emergency_contact:
-                                try:
-                                    client_data['emergency_contact'] = json.loads(emergency_contact)
-                                except json.JSONDecodeError:
-                                    # If JSON parsing fails, create a simple dict with the string
-                                    client_data['emergency_contact'] = {'name': emergency_contact}
-                            else:
-                                client_data['emergency_contact'] = {}
-                            
-                            # Handle addresses (expect JSON string or individual address fields)
-                            addresses = []
-                            if 'addresses' in row and pd.notna(row['addresses']):
-                                try:
-                                    addresses = json.loads(str(row['addresses']))
-                                except (json.JSONDecodeError, ValueError, TypeError):
-                                    addresses = []
-                            elif get_field_data('address'):
-                                address = {
-                                    'type': get_field_data('address_type', 'Home'),
-                                    'street': get_field_data('address'),
-                                    'address_2': get_field_data('address_2'),
-                                    'city': get_field_data('city'),
-                                    'state': get_field_data('province'),
-                                    'zip': get_field_data('postal_code'),
-                                    'country': 'USA'  # Default country
-                                }
-                                if any(address.values()):
-                                    addresses = [address]
-                            
-                            client_data['addresses'] = addresses
+                            # Future dates outside intake/discharge are kept but flagged
+                            for field_name in FUTURE_DATE_WARNING_FIELDS:
+                                parsed_date = client_data.get(field_name)
+                                if is_future_date(parsed_date):
+                                    warning_msg = (
+                                        f"Row {index + 2}: Future date detected for {field_name}. "
+                                        f"Date: {parsed_date} (Client ID: {get_field_data('client_id', 'N/A')}). "
+                                        f"Please update the sheet with the correct date."
+                                    )
+                                    chunk_warnings.append(warning_msg)
+                                    logger.warning(warning_msg)
                             
                             # Early validation: Check if we have at least client_id, first_name, or last_name before processing
                             # This helps catch errors early and provide better error messages
@@ -4870,8 +3914,7 @@ def upload_clients(request):
                                 continue
                             
                             # Parse discharge_date and reason_discharge early to check if we should update instead of create
-                            discharge_date_value = get_field_data('discharge_date')
-                            discharge_date_parsed = parse_date(discharge_date_value, 'discharge_date')
+                            discharge_date_parsed = parsed_discharge_date
                             reason_discharge_value = get_field_data('reason_discharge')
                             program_name = get_field_data('program_name')
                             
@@ -4901,39 +3944,18 @@ def upload_clients(request):
                             
                             # Extract BOTH SMIS and EMHware IDs from the row if present
                             # This handles files that contain both IDs in the same row
-                            def extract_source_id_from_row(row, column_mapping, source_type):
-                                """Extract source ID from row based on source type"""
-                                # First try to get from client_data (already parsed)
-                                if source_type == 'SMIS':
-                                    # Check for SMIS ID in various column names
-                                    for col in df.columns:
-                                        col_lower = col.lower().strip()
-                                        if 'smis' in col_lower and 'id' in col_lower:
-                                            value = row[col]
-                                            if pd.notna(value) and str(value).strip():
-                                                return str(value).strip()
-                                elif source_type == 'EMHware':
-                                    # Check for EMHware ID in various column names
-                                    for col in df.columns:
-                                        col_lower = col.lower().strip()
-                                        if 'emhware' in col_lower and 'id' in col_lower:
-                                            value = row[col]
-                                            if pd.notna(value) and str(value).strip():
-                                                return str(value).strip()
-                                return None
-                            
                             # Extract the OTHER source ID (opposite of source_type)
                             other_source_id = None
                             if source_type == 'SMIS':
                                 # Try to extract EMHware ID from row
-                                other_source_id = extract_source_id_from_row(row, column_mapping, 'EMHware')
+                                other_source_id = row.get_source_id('EMHware')
                                 # Also check if it's in client_data (might be in a different field)
                                 if not other_source_id:
                                     # Check legacy_client_ids structure or other fields
                                     pass
                             elif source_type == 'EMHware':
                                 # Try to extract SMIS ID from row
-                                other_source_id = extract_source_id_from_row(row, column_mapping, 'SMIS')
+                                other_source_id = row.get_source_id('SMIS')
                             
                             if source_id and source_type:
                                 try:
@@ -5048,11 +4070,7 @@ def upload_clients(request):
                                         filtered_data = {}
                                         
                                         # Get all fields that are mapped from CSV columns
-                                        csv_fields = set()
-                                        for col in df.columns:
-                                            field_name = column_mapping.get(col)
-                                            if field_name:
-                                                csv_fields.add(field_name)
+                                        csv_fields = row_mapper.mapped_fields
                                         
                                         # Only include fields that exist in the CSV and have non-empty values
                                         for field, value in client_data.items():
@@ -5139,12 +4157,12 @@ def upload_clients(request):
                                             # If program is specified, we'll handle it later in enrollment processing
                                         
                                         # Set updated_by field
-                                        if request.user.is_authenticated:
-                                            first_name = request.user.first_name or ''
-                                            last_name = request.user.last_name or ''
+                                        if user.is_authenticated:
+                                            first_name = user.first_name or ''
+                                            last_name = user.last_name or ''
                                             user_name = f"{first_name} {last_name}".strip()
                                             if not user_name or user_name == ' ':
-                                                user_name = request.user.username or request.user.email or 'System'
+                                                user_name = user.username or user.email or 'System'
                                             client.updated_by = user_name
                                         else:
                                             client.updated_by = 'System'
@@ -5307,11 +4325,7 @@ def upload_clients(request):
                                             filtered_data = {}
                                             
                                             # Get all fields that are mapped from CSV columns
-                                            csv_fields = set()
-                                            for col in df.columns:
-                                                field_name = column_mapping.get(col)
-                                                if field_name:
-                                                    csv_fields.add(field_name)
+                                            csv_fields = row_mapper.mapped_fields
                                             
                                             # Only include fields that exist in the CSV and have non-empty values
                                             for field, value in client_data.items():
@@ -5398,12 +4412,12 @@ def upload_clients(request):
                                                 # If program is specified, we'll handle it later in enrollment processing
                                             
                                             # Set updated_by field
-                                            if request.user.is_authenticated:
-                                                first_name = request.user.first_name or ''
-                                                last_name = request.user.last_name or ''
+                                            if user.is_authenticated:
+                                                first_name = user.first_name or ''
+                                                last_name = user.last_name or ''
                                                 user_name = f"{first_name} {last_name}".strip()
                                                 if not user_name or user_name == ' ':
-                                                    user_name = request.user.username or request.user.email or 'System'
+                                                    user_name = user.username or user.email or 'System'
                                                 client.updated_by = user_name
                                             else:
                                                 client.updated_by = 'System'
@@ -5469,11 +4483,7 @@ def upload_clients(request):
                                         filtered_data = {}
                                         
                                         # Get all fields that are mapped from CSV columns
-                                        csv_fields = set()
-                                        for col in df.columns:
-                                            field_name = column_mapping.get(col)
-                                            if field_name:
-                                                csv_fields.add(field_name)
+                                        csv_fields = row_mapper.mapped_fields
                                         
                                         # Only include fields that exist in the CSV and have non-empty values
                                         for field, value in client_data.items():
@@ -5579,12 +4589,12 @@ def upload_clients(request):
                                                     filtered_data['reason_discharge'] = reason_discharge_value
                                         
                                         # Set updated_by field
-                                        if request.user.is_authenticated:
-                                            first_name = request.user.first_name or ''
-                                            last_name = request.user.last_name or ''
+                                        if user.is_authenticated:
+                                            first_name = user.first_name or ''
+                                            last_name = user.last_name or ''
                                             user_name = f"{first_name} {last_name}".strip()
                                             if not user_name or user_name == ' ':
-                                                user_name = request.user.username or request.user.email or 'System'
+                                                user_name = user.username or user.email or 'System'
                                             client.updated_by = user_name
                                         else:
                                             client.updated_by = 'System'
@@ -5829,11 +4839,7 @@ def upload_clients(request):
                                             filtered_data = {}
                                             
                                             # Get all fields that are mapped from CSV columns
-                                            csv_fields = set()
-                                            for col in df.columns:
-                                                field_name = column_mapping.get(col)
-                                                if field_name:
-                                                    csv_fields.add(field_name)
+                                            csv_fields = row_mapper.mapped_fields
                                             
                                             # Only include fields that exist in the CSV and have non-empty values
                                             for field, value in client_data.items():
@@ -5904,12 +4910,12 @@ def upload_clients(request):
                                                         setattr(client, field, value)
                                             
                                             # Set updated_by field
-                                            if request.user.is_authenticated:
-                                                first_name = request.user.first_name or ''
-                                                last_name = request.user.last_name or ''
+                                            if user.is_authenticated:
+                                                first_name = user.first_name or ''
+                                                last_name = user.last_name or ''
                                                 user_name = f"{first_name} {last_name}".strip()
                                                 if not user_name or user_name == ' ':
-                                                    user_name = request.user.username or request.user.email or 'System'
+                                                    user_name = user.username or user.email or 'System'
                                                 client.updated_by = user_name
                                             else:
                                                 client.updated_by = 'System'
@@ -6024,11 +5030,7 @@ def upload_clients(request):
                                     filtered_data = {}
                                     
                                     # Get all fields that are mapped from CSV columns
-                                    csv_fields = set()
-                                    for col in df.columns:
-                                        field_name = column_mapping.get(col)
-                                        if field_name:
-                                            csv_fields.add(field_name)
+                                    csv_fields = row_mapper.mapped_fields
                                     
                                     # Only include fields that exist in the CSV and have non-empty values
                                     for field, value in client_data.items():
@@ -6174,12 +5176,12 @@ def upload_clients(request):
                                                 setattr(client, field, value)
                                     
                                     # Set updated_by field
-                                    if request.user.is_authenticated:
-                                        first_name = request.user.first_name or ''
-                                        last_name = request.user.last_name or ''
+                                    if user.is_authenticated:
+                                        first_name = user.first_name or ''
+                                        last_name = user.last_name or ''
                                         user_name = f"{first_name} {last_name}".strip()
                                         if not user_name or user_name == ' ':
-                                            user_name = request.user.username or request.user.email or 'System'
+                                            user_name = user.username or user.email or 'System'
                                         client.updated_by = user_name
                                     else:
                                         client.updated_by = 'System'
@@ -6394,11 +5396,7 @@ def upload_clients(request):
                                     filtered_data = {}
                                     
                                     # Get all fields that are mapped from CSV columns
-                                    csv_fields = set()
-                                    for col in df.columns:
-                                        field_name = column_mapping.get(col)
-                                        if field_name:
-                                            csv_fields.add(field_name)
+                                    csv_fields = row_mapper.mapped_fields
                                     
                                     # Only include fields that exist in the CSV and have non-empty values
                                     for field, value in client_data.items():
@@ -6518,12 +5516,12 @@ def upload_clients(request):
                                                 )
                                     
                                     # Set updated_by field
-                                    if request.user.is_authenticated:
-                                        first_name = request.user.first_name or ''
-                                        last_name = request.user.last_name or ''
+                                    if user.is_authenticated:
+                                        first_name = user.first_name or ''
+                                        last_name = user.last_name or ''
                                         user_name = f"{first_name} {last_name}".strip()
                                         if not user_name or user_name == ' ':
-                                            user_name = request.user.username or request.user.email or 'System'
+                                            user_name = user.username or user.email or 'System'
                                         existing_client.updated_by = user_name
                                     else:
                                         existing_client.updated_by = 'System'
@@ -6592,15 +5590,15 @@ def upload_clients(request):
                                         client_fields[field] = value
                                 
                                 # Set user fields for created_by and updated_by
-                                if request.user.is_authenticated:
+                                if user.is_authenticated:
                                     # Try to get user's full name
-                                    first_name = request.user.first_name or ''
-                                    last_name = request.user.last_name or ''
+                                    first_name = user.first_name or ''
+                                    last_name = user.last_name or ''
                                     user_name = f"{first_name} {last_name}".strip()
                                     
                                     # If no full name, fall back to username or email
                                     if not user_name or user_name == ' ':
-                                        user_name = request.user.username or request.user.email or 'System'
+                                        user_name = user.username or user.email or 'System'
                                     
                                     client_fields['created_by'] = user_name
                                     client_fields['updated_by'] = user_name
@@ -6771,6 +5769,7 @@ def upload_clients(request):
                                 })
                     
                     # Bulk update existing clients first for this chunk (AFTER processing all rows)
+                    profiler.enter('write_clients')
                     if clients_to_update:
                         logger.info(f"Bulk updating {len(clients_to_update)} clients in chunk {chunk_number}")
                         clients_to_bulk_update = [update_data['client'] for update_data in clients_to_update]
@@ -6790,15 +5789,26 @@ def upload_clients(request):
                             'no_health_card_reason', 'next_of_kin', 'emergency_contact', 'comments',
                             'chart_number', 'contact_information', 'addresses', 'languages_spoken',
                             'ethnicity', 'support_workers', 'discharge_date', 'reason_discharge', 'updated_by',
-                            'emhware_id', 'smis_id', 'legacy_client_ids'
+                            'emhware_id', 'smis_id', 'legacy_client_ids', *NAME_KEY_FIELDS
                         ]
+                        for client in clients_to_bulk_update:
+                            client.refresh_name_keys()
+                        
+                        # Only clients and columns whose values differ from the database are written
+                        clients_to_bulk_update, update_fields = changed_update_fields(clients_to_bulk_update, update_fields)
+                        # bulk_update does not apply auto_now; the incremental duplicate scan reads updated_at
+                        if clients_to_bulk_update:
+                            updated_at = timezone.now()
+                            for client in clients_to_bulk_update:
+                                client.updated_at = updated_at
+                            update_fields.append('updated_at')
                         
-                        # Use bulk_update - Django will only update fields that are set on the objects
                         # Use smaller batch size (100) to avoid PostgreSQL stack depth limit exceeded error
                         # When updating 1000+ clients, the SQL query becomes too complex
                         try:
-                            Client.objects.bulk_update(clients_to_bulk_update, update_fields, batch_size=500)
-                            logger.info(f"Bulk updated {len(clients_to_bulk_update)} clients successfully")
+                            if clients_to_bulk_update:
+                                Client.objects.bulk_update(clients_to_bulk_update, update_fields, batch_size=500)
+                            logger.info(f"Bulk updated {len(clients_to_bulk_update)} clients successfully ({len(update_fields)} changed fields)")
                         except Exception as bulk_error:
                             import traceback
                             error_traceback = traceback.format_exc()
@@ -6812,6 +5822,7 @@ def upload_clients(request):
                         for update_data in clients_to_update:
                             client = update_data['client']
                             extended_data = update_data['extended_data']
+                            fingerprints.record(update_data['row_index'], client)
                             
                             if extended_data:
                                 extended_record, created = ClientExtended.objects.get_or_create(
@@ -6826,46 +5837,54 @@ def upload_clients(request):
                         
                         # Process intake data for updated clients
                         if has_intake_data:
+                            profiler.enter('intake')
+                            # One bulk load of intakes and enrollments for the chunk's updated clients
+                            enrollment_index.prefetch(update_data['client'].id for update_data in clients_to_update)
                             for update_data in clients_to_update:
                                 try:
                                     client = update_data['client']
                                     row_index = update_data['row_index']
-                                    row = df.iloc[row_index]
                                     process_intake_data(
                                         client,
-                                        row,
+                                        mapped_rows_by_index[row_index],
                                         row_index,
-                                        column_mapping,
-                                        df.columns,
                                         departments_cache,
-                                        program_lookup_by_name,
-                                        all_programs_list,
-                                        program_fuzzy_cache,
-                                        enrollment_cache,
-                                        intake_cache,
+                                        program_resolver,
+                                        learned_program_aliases,
+                                        enrollment_index,
                                         chunk_warnings,  # Pass warnings list
+                                        parsed_row=parsed_rows_by_index.get(row_index),
                                     )
                                 except UploadError:
                                     # Re-raise UploadError to trigger transaction rollback
                                     raise
                                 except Exception as e:
                                     logger.error(f"Error processing intake data for updated client {update_data['client'].client_id}: {str(e)}")
+                                    fingerprints.discard(update_data['row_index'])
                                     chunk_errors.append(f"Row {update_data['row_index'] + 2}: Error processing intake data - {str(e)}")
                     
                     chunk_updated_count = len(clients_to_update)
                     
                     # Bulk create all clients for this chunk
+                    profiler.enter('write_clients')
                     created_clients = []
                     if clients_to_create:
                         # Extract just the client fields for bulk creation
                         client_objects = []
                         for client_data in clients_to_create:
-                            client_objects.append(Client(**client_data['client_fields']))
+                            client_object = Client(**client_data['client_fields'])
+                            # bulk_create skips save(), which maintains the name keys
+                            client_object.refresh_name_keys()
+                            client_objects.append(client_object)
                         
                         # Bulk create clients
                         # Use smaller batch size (100) to avoid PostgreSQL stack depth limit exceeded error
                         created_clients = Client.objects.bulk_create(client_objects, batch_size=500)
                         chunk_created_count = len(created_clients)
+                        for client_data, client in zip(clients_to_create, created_clients):
+                            fingerprints.record(client_data['row_index'], client)
+                            for merged_row_index in client_data.get('merged_row_indices', []):
+                                fingerprints.record(merged_row_index, client)
                         
                         # Create ClientExtended records
                         from core.models import ClientExtended
@@ -6947,27 +5966,25 @@ def upload_clients(request):
                         # Process intake data for all created clients
                         if has_intake_data and created_clients:
                             logger.info(f"Processing intake data for {len(created_clients)} created clients in chunk {chunk_number}")
+                            profiler.enter('intake')
+                            enrollment_index.add_new_clients(client.id for client in created_clients)
                             for i, client in enumerate(created_clients):
                                 try:
                                     # Get the original row data for this client
                                     client_data = clients_to_create[i]
                                     row_index = client_data['row_index']
-                                    row = df.iloc[row_index]
                                     
                                     # Pass pre-loaded caches to avoid repeated database queries
                                     process_intake_data(
                                         client,
-                                        row,
+                                        mapped_rows_by_index[row_index],
                                         row_index,
-                                        column_mapping,
-                                        df.columns,
                                         departments_cache,
-                                        program_lookup_by_name,
-                                        all_programs_list,
-                                        program_fuzzy_cache,
-                                        enrollment_cache,
-                                        intake_cache,
+                                        program_resolver,
+                                        learned_program_aliases,
+                                        enrollment_index,
                                         chunk_warnings,  # Pass warnings list
+                                        parsed_row=parsed_rows_by_index.get(row_index),
                                     )
                                     
                                     # CRITICAL FIX: Also process intake data for merged rows (if this client was merged in the same batch)
@@ -6978,20 +5995,16 @@ def upload_clients(request):
                                         )
                                         for merged_row_index in merged_row_indices:
                                             try:
-                                                merged_row = df.iloc[merged_row_index]
                                                 process_intake_data(
                                                     client,
-                                                    merged_row,
+                                                    mapped_rows_by_index[merged_row_index],
                                                     merged_row_index,
-                                                    column_mapping,
-                                                    df.columns,
                                                     departments_cache,
-                                                    program_lookup_by_name,
-                                                    all_programs_list,
-                                                    program_fuzzy_cache,
-                                                    enrollment_cache,
-                                                    intake_cache,
+                                                    program_resolver,
+                                                    learned_program_aliases,
+                                                    enrollment_index,
                                                     chunk_warnings,
+                                                    parsed_row=parsed_rows_by_index.get(merged_row_index),
                                                 )
                                             except Exception as e:
                                                 logger.error(f"Error processing intake data for merged row {merged_row_index + 2}: {e}"                                    )
@@ -7004,20 +6017,16 @@ def upload_clients(request):
                                         )
                                         for merged_row_index in merged_row_indices:
                                             try:
-                                                merged_row = df.iloc[merged_row_index]
                                                 process_intake_data(
                                                     client,
-                                                    merged_row,
+                                                    mapped_rows_by_index[merged_row_index],
                                                     merged_row_index,
-                                                    column_mapping,
-                                                    df.columns,
                                                     departments_cache,
-                                                    program_lookup_by_name,
-                                                    all_programs_list,
-                                                    program_fuzzy_cache,
-                                                    enrollment_cache,
-                                                    intake_cache,
+                                                    program_resolver,
+                                                    learned_program_aliases,
+                                                    enrollment_index,
                                                     chunk_warnings,
+                                                    parsed_row=parsed_rows_by_index.get(merged_row_index),
                                                 )
                                             except Exception as e:
                                                 logger.error(f"Error processing intake data for merged row {merged_row_index + 2}: {e}")
@@ -7026,26 +6035,61 @@ def upload_clients(request):
                                     raise
                                 except Exception as e:
                                     logger.error(f"Error processing intake data for client {client.first_name} {client.last_name}: {str(e)}")
+                                    fingerprints.discard(row_index)
                                     chunk_errors.append(f"Row {row_index + 2}: Error processing intake data - {str(e)}")
                     
+                    # Write the chunk's intakes, enrollments and client statuses in bulk
+                    if has_intake_data:
+                        profiler.enter('intake')
+                        enrollment_index.flush()
+                        record_program_aliases(learned_program_aliases, source)
+                        learned_program_aliases.clear()
+                    fingerprints.flush()
+                    if report:
+                        report.add_chunk(
+                            unchanged_df.index.difference(chunk_df.index),
+                            clients_to_update, clients_to_create, chunk_errors, chunk_warnings,
+                        )
+                    
                     # Aggregate chunk results
                     chunk_duplicates_flagged = len([d for d in chunk_duplicate_details if d['type'] == 'created_with_duplicate'])
                     
                     total_created_count += chunk_created_count
                     total_updated_count += chunk_updated_count
                     total_skipped_count += chunk_skipped_count
+                    total_unchanged_count += chunk_unchanged_count
                     total_duplicates_flagged += chunk_duplicates_flagged
                     all_errors.extend(chunk_errors)
                     all_warnings.extend(chunk_warnings)  # Collect warnings from chunk
                     all_duplicate_details.extend(chunk_duplicate_details)
                     
                     logger.info(f"Chunk {chunk_number} completed: {chunk_created_count} created, {chunk_updated_count} updated, {len(chunk_errors)} errors")
+                    profiler.end_chunk(chunk_number, chunk_row_count)
+                    
+                    if commit_per_chunk:
+                        # The checkpoint commits together with the chunk's writes
+                        upload_jobs.save_checkpoint(upload_log, chunk_end, {
+                            'created': total_created_count,
+                            'updated': total_updated_count,
+                            'skipped': total_skipped_count,
+                            'unchanged': total_unchanged_count,
+                            'duplicates_flagged': total_duplicates_flagged,
+                            'errors': all_errors[:100],
+                            'warnings': all_warnings[:100],
+                            'duplicate_details': all_duplicate_details[:100],
+                        })
+                        transaction.commit()
                     
                     # Move to next chunk
                     chunk_start = chunk_end
                 
-                # All chunks processed successfully - transaction will commit
-                logger.info(f"All {chunk_number} chunks processed successfully. Transaction will commit.")
+                if dry_run:
+                    # Everything ran against the real data; nothing is kept
+                    transaction.set_rollback(True)
+                    logger.info(f"Dry run: all {chunk_number} chunks processed. Rolling back.")
+                else:
+                    # All chunks processed successfully - transaction will commit
+                    logger.info(f"All {chunk_number} chunks processed successfully. Transaction will commit.")
                             
         except UploadError as e:
             # If UploadError is raised, preserve it and re-raise
@@ -7069,7 +6113,9 @@ def upload_clients(request):
                     'chunk_start': chunk_start, 
                     'chunk_end': chunk_end,
                     'error_type': type(e).__name__,
-                    'traceback': error_traceback
+                    'traceback': error_traceback,
+                    # Rows committed before the failure; the upload can be resumed after them
+                    'resumable_from_row': upload_log.checkpoint_row if commit_per_chunk else None,
                 }
             )
             logger.error(f"Error processing chunk {chunk_number}: {upload_error.message}. ALL database operations will rollback.")
@@ -7078,11 +6124,20 @@ def upload_clients(request):
             all_errors.append(f"Chunk {chunk_number} (rows {chunk_start + 1}-{chunk_end}): {upload_error.message}")
             # Re-raise to trigger transaction rollback
             raise upload_error
+        finally:
+            chunk_parser.close()
+        
+        # Release the spooled chunks; on the error paths the temporary file goes with the reader
+        upload_reader.close()
         
         # Update inactive status for all processed clients based on active enrollments
         # This is done after all clients and enrollments have been processed
+        profiler.enter('finalize')
         try:
             all_processed_client_ids = []
+            if dry_run:
+                # The processed clients were rolled back
+                clients_to_update = created_clients = []
             
             # Collect IDs from updated clients
             if clients_to_update:
@@ -7126,150 +6181,22 @@ def upload_clients(request):
             # Don't fail the upload if inactive status update fails
             logger.error(f"Error updating inactive status for processed clients: {str(e)}")
         
-        # Calculate completion time and update upload log
-        upload_completed_time = timezone.now()
-        
-        # Determine status based on aggregated results
-        if len(all_errors) > 0 and (total_created_count == 0 and total_updated_count == 0):
-            status = 'failed'
-        elif len(all_errors) > 0:
-            status = 'partial'
-        else:
-            status = 'success'
-        
-        # Update upload log with final results
-        if upload_log:
-            try:
-                upload_log.completed_at = upload_completed_time
-                upload_log.total_rows = total_rows
-                upload_log.records_created = total_created_count
-                upload_log.records_updated = total_updated_count
-                upload_log.records_skipped = total_skipped_count
-                upload_log.duplicates_flagged = total_duplicates_flagged
-                upload_log.errors_count = len(all_errors)
-                upload_log.status = status
-                
-                # Store error details with structure (include tracebacks if available)
-                error_details_list = []
-                for error in all_errors[:100]:  # Store first 100 errors
-                    if isinstance(error, str):
-                        error_details_list.append({
-                            'message': error,
-                            'error_type': 'string',
-                            'timestamp': str(timezone.now())
-                        })
-                    elif isinstance(error, dict):
-                        # Ensure traceback is included as string if present
-                        error_dict = error.copy()
-                        if 'traceback' in error_dict and error_dict['traceback']:
-                            error_dict['traceback'] = str(error_dict['traceback'])
-                        error_details_list.append(error_dict)
-                    else:
-                        error_details_list.append({
-                            'message': str(error),
-                            'error_type': type(error).__name__,
-                            'timestamp': str(timezone.now())
-                        })
-                
-                upload_log.error_details = error_details_list
-                
-                # Store comprehensive error message with summary
-                if all_errors:
-                    error_summary = f"Total errors: {len(all_errors)}\n"
-                    error_summary += f"First error: {all_errors[0] if isinstance(all_errors[0], str) else str(all_errors[0])}\n"
-                    if len(all_errors) > 1:
-                        error_summary += f"... and {len(all_errors) - 1} more error(s)"
-                    upload_log.error_message = error_summary
-                upload_log.upload_details = {
-                    'has_intake_data': has_intake_data,
-                    'source': source,
-                    'file_extension': file_extension,
-                    'chunks_processed': chunk_number,
-                    'chunk_size': CHUNK_SIZE,
-                    'progress': {
-                        'processed': total_rows,
-                        'total': total_rows,
-                        'percentage': 100,
-                        'status': 'completed'
-                    }
-                }
-                upload_log.save()
-                logger.info(f"Upload log updated: {upload_log.id} - Duration: {upload_log.duration_seconds:.2f}s")
-                
-                # Create audit log entry for bulk upload operation
-                try:
-                    from core.models import create_audit_log
-                    create_audit_log(
-                        entity_name='ClientUpload',
-                        entity_id=upload_log.external_id,
-                        action='import',
-                        changed_by=request.user if request.user.is_authenticated else None,
-                        diff_data={
-                            'file_name': upload_log.file_name,
-                            'file_size': upload_log.file_size,
-                            'source': upload_log.source,
-                            'status': status,
-                            'total_rows': total_rows,
-                            'records_created': total_created_count,
-                            'records_updated': total_updated_count,
-                            'records_skipped': total_skipped_count,
-                            'duplicates_flagged': total_duplicates_flagged,
-                            'errors_count': len(all_errors),
-                            'duration_seconds': upload_log.duration_seconds,
-                            'chunks_processed': chunk_number,
-                            'chunk_size': CHUNK_SIZE,
-                            'started_at': str(upload_log.started_at),
-                            'completed_at': str(upload_log.completed_at),
-                            'error_summary': all_errors[:10] if all_errors else []  # First 10 errors for quick reference
-                        }
-                    )
-                    logger.info(f"Audit log created for upload: {upload_log.external_id}")
-                except Exception as audit_error:
-                    logger.error(f"Failed to create audit log for upload: {audit_error}")
-            except Exception as e:
-                logger.error(f"Failed to update upload log: {e}")
-        
-        # Build success message with skipped records info if applicable
-        success_message = f'Upload completed! {total_created_count} clients created, {total_updated_count} clients updated.'
-        if total_skipped_count > 0:
-            success_message += f' {total_skipped_count} record(s) skipped due to future dates.'
-        
-        response_data = {
-            'success': True,
-            'message': success_message,
-            'stats': {
-                'total_rows': total_rows,
-                'created': total_created_count,
-                'updated': total_updated_count,
-                'skipped': total_skipped_count,
-                'duplicates_flagged': total_duplicates_flagged,
-                'errors': len(all_errors),
-                'warnings': len(all_warnings),
-                'duration_seconds': upload_log.duration_seconds if upload_log else None,
-                'chunks_processed': chunk_number
-            },
-            'duplicate_details': all_duplicate_details[:20],  # Limit to first 20 duplicates for display
-            'errors': all_errors[:10] if all_errors else [],  # Limit to first 10 errors
-            'warnings': all_warnings if all_warnings else [],  # Include all future date warnings
-            'debug_info': debug_info,  # Add debug information
-            'notes': [
-                'Existing clients with matching Client ID were updated with new information',
-                'New clients were created for records without existing Client ID matches',
-                'Missing date of birth values were set to 1900-01-01',
-                'Missing gender values were set to null',
-                f'{total_duplicates_flagged} clients were created with potential duplicate flags for review',
-                'Review flagged duplicates in the "Probable Duplicate Clients" section'
-            ] if total_created_count > 0 or total_updated_count > 0 or total_duplicates_flagged > 0 else []
-        }
-        
-        # Add warning note if there are future date warnings
-        if all_warnings:
-            response_data['notes'].append(
-                f'{len(all_warnings)} record(s) were skipped due to future dates in intake_date or discharge_date. Please review and update the sheet with correct dates.'
-            )
-        
-        return JsonResponse(response_data)
-        
+        return finish_client_upload(
+            upload_log, user, source, file_extension, has_intake_data, CHUNK_SIZE, debug_info,
+            total_rows=total_rows,
+            created=total_created_count,
+            updated=total_updated_count,
+            skipped=total_skipped_count,
+            duplicates_flagged=total_duplicates_flagged,
+            chunks_processed=chunk_number,
+            errors=all_errors,
+            warnings=all_warnings,
+            duplicate_details=all_duplicate_details,
+            profile=profiler.as_dict(),
+            unchanged=total_unchanged_count,
+            report=report,
+        )
+
     except UploadError as e:
         # Handle structured upload errors
         logger.error(f"Upload error [{e.code}]: {e.message}")
@@ -7286,7 +6213,7 @@ def upload_clients(request):
         if upload_log:
             try:
                 upload_log.completed_at = timezone.now()
-                upload_log.status = 'failed'
+                upload_log.status = 'cancelled' if e.category == 'cancelled' else 'failed'
                 upload_log.error_message = f"{e.message}\n\nTraceback:\n{error_traceback}"
                 upload_log.error_details = [enhanced_error_details]
                 if 'file' in locals():
@@ -7321,7 +6248,7 @@ def upload_clients(request):
                         entity_name='ClientUpload',
                         entity_id=entity_id,
                         action='import',
-                        changed_by=request.user if request.user.is_authenticated else None,
+                        changed_by=user if user.is_authenticated else None,
                         diff_data={
                             'file_name': file_name,
                             'file_size': file_size,
@@ -7350,6 +6277,8 @@ def upload_clients(request):
             status_code = 400
         elif e.category in ['permission', 'authentication']:
             status_code = 403
+        elif e.category in ['cancelled', 'concurrency']:
+            status_code = 409
         else:
             status_code = 500
         
@@ -7414,7 +6343,7 @@ def upload_clients(request):
                         entity_name='ClientUpload',
                         entity_id=upload_log.external_id,
                         action='import',
-                        changed_by=request.user if request.user.is_authenticated else None,
+                        changed_by=user if user.is_authenticated else None,
                         diff_data={
                             'file_name': upload_log.file_name if hasattr(upload_log, 'file_name') else 'Unknown',
                             'file_size': upload_log.file_size if hasattr(upload_log, 'file_size') else 0,
@@ -7444,6 +6373,395 @@ def upload_clients(request):
             'details': upload_error.details if settings.DEBUG else {}
         }, status=500)
 
+def process_staged_client_upload(upload_log, upload_reader, row_mapper, source, file_extension, user,
+                                 chunk_size, debug_info, profiler):
+    """
+    Import a plain client file with StagedClientImport in one transaction.
+    Counters, duplicate flags and the response match the chunk loop's.
+    """
+    if user.is_authenticated:
+        user_name = f"{user.first_name or ''} {user.last_name or ''}".strip()
+        if not user_name:
+            user_name = user.username or user.email or 'System'
+    else:
+        user_name = 'System'
+    
+    def report_progress(processed, total, current_chunk):
+        if not upload_log:
+            return
+        # Called after every staged chunk; cancelling rolls the whole import back
+        if upload_jobs.is_cancel_requested(upload_log):
+            raise UploadError('UPLOAD_063', details={'engine': 'staging', 'chunk': current_chunk})
+        try:
+            upload_jobs.set_upload_progress(
+                upload_log,
+                processed=processed,
+                total=total,
+                percentage=int((processed / total) * 100) if total > 0 else 0,
+                current_chunk=current_chunk,
+                status='processing'
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update progress: {e}")
+    
+    total_rows = upload_reader.total_rows
+    logger.info(f"Importing {total_rows} rows through the staging table")
+    staged_import = StagedClientImport(row_mapper, source, user_name, progress=report_progress)
+    profiler.enter('staged_import')
+    try:
+        with transaction.atomic():
+            result = staged_import.run(upload_reader.iter_chunks(), total_rows)
+    except UploadError:
+        raise
+    except Exception as e:
+        import traceback
+        error_traceback = traceback.format_exc()
+        upload_error = UploadError(
+            get_error_code_for_exception(e),
+            raw_error=e,
+            details={
+                'engine': 'staging',
+                'chunk': staged_import.result.chunks,
+                'error_type': type(e).__name__,
+                'traceback': error_traceback
+            }
+        )
+        logger.error(f"Staged import failed: {upload_error.message}. ALL database operations will rollback.")
+        logger.error(f"Full traceback:\n{error_traceback}")
+        raise upload_error
+    finally:
+        upload_reader.close()
+    
+    logger.info(
+        f"Staged import completed: {result.created} created, {result.updated} updated, "
+        f"{result.skipped} skipped, {result.duplicates_flagged} flagged as duplicates"
+    )
+    return finish_client_upload(
+        upload_log, user, source, file_extension, False, chunk_size, debug_info,
+        total_rows=total_rows,
+        created=result.created,
+        updated=result.updated,
+        skipped=result.skipped,
+        duplicates_flagged=result.duplicates_flagged,
+        chunks_processed=result.chunks,
+        errors=result.errors,
+        warnings=result.warnings,
+        duplicate_details=result.duplicate_details,
+        profile=profiler.as_dict(),
+    )
+
+
+def finish_client_upload(upload_log, user, source, file_extension, has_intake_data, chunk_size, debug_info,
+                         total_rows, created, updated, skipped, duplicates_flagged, chunks_processed,
+                         errors, warnings, duplicate_details, profile=None, unchanged=0, report=None):
+    """
+    Record the outcome of an import on its ClientUploadLog and audit log and build
+    the JsonResponse returned by process_client_upload. Shared by the chunk loop
+    and the staged import. `report` is the UploadReport of a dry run.
+    """
+    total_created_count = created
+    total_updated_count = updated
+    total_skipped_count = skipped
+    total_duplicates_flagged = duplicates_flagged
+    all_errors = errors
+    all_warnings = warnings
+    all_duplicate_details = duplicate_details
+    
+    # Calculate completion time and update upload log
+    upload_completed_time = timezone.now()
+    
+    # Determine status based on aggregated results
+    if len(all_errors) > 0 and (total_created_count == 0 and total_updated_count == 0):
+        status = 'failed'
+    elif len(all_errors) > 0:
+        status = 'partial'
+    else:
+        status = 'success'
+    
+    # Update upload log with final results
+    if upload_log:
+        try:
+            upload_log.completed_at = upload_completed_time
+            upload_log.total_rows = total_rows
+            upload_log.records_created = total_created_count
+            upload_log.records_updated = total_updated_count
+            upload_log.records_skipped = total_skipped_count
+            upload_log.duplicates_flagged = total_duplicates_flagged
+            upload_log.errors_count = len(all_errors)
+            upload_log.status = status
+            
+            # Store error details with structure (include tracebacks if available)
+            error_details_list = []
+            for error in all_errors[:100]:  # Store first 100 errors
+                if isinstance(error, str):
+                    error_details_list.append({
+                        'message': error,
+                        'error_type': 'string',
+                        'timestamp': str(timezone.now())
+                    })
+                elif isinstance(error, dict):
+                    # Ensure traceback is included as string if present
+                    error_dict = error.copy()
+                    if 'traceback' in error_dict and error_dict['traceback']:
+                        error_dict['traceback'] = str(error_dict['traceback'])
+                    error_details_list.append(error_dict)
+                else:
+                    error_details_list.append({
+                        'message': str(error),
+                        'error_type': type(error).__name__,
+                        'timestamp': str(timezone.now())
+                    })
+            
+            upload_log.error_details = error_details_list
+            
+            # Store comprehensive error message with summary
+            if all_errors:
+                error_summary = f"Total errors: {len(all_errors)}\n"
+                error_summary += f"First error: {all_errors[0] if isinstance(all_errors[0], str) else str(all_errors[0])}\n"
+                if len(all_errors) > 1:
+                    error_summary += f"... and {len(all_errors) - 1} more error(s)"
+                upload_log.error_message = error_summary
+            upload_log.upload_details = {
+                'has_intake_data': has_intake_data,
+                'source': source,
+                'file_extension': file_extension,
+                'chunks_processed': chunks_processed,
+                'chunk_size': chunk_size,
+                'progress': {
+                    'processed': total_rows,
+                    'total': total_rows,
+                    'percentage': 100,
+                    'status': 'completed'
+                },
+                'profile': profile,
+                'unchanged_rows': unchanged,
+            }
+            if report:
+                upload_log.upload_details['dry_run'] = True
+                upload_log.upload_details['report_counts'] = report.counts
+            upload_log.save()
+            logger.info(f"Upload log updated: {upload_log.id} - Duration: {upload_log.duration_seconds:.2f}s")
+            
+            # Create audit log entry for bulk upload operation
+            try:
+                from core.models import create_audit_log
+                create_audit_log(
+                    entity_name='ClientUpload',
+                    entity_id=upload_log.external_id,
+                    action='import',
+                    changed_by=user if user.is_authenticated else None,
+                    diff_data={
+                        'file_name': upload_log.file_name,
+                        'file_size': upload_log.file_size,
+                        'source': upload_log.source,
+                        'status': status,
+                        'total_rows': total_rows,
+                        'records_created': total_created_count,
+                        'records_updated': total_updated_count,
+                        'records_skipped': total_skipped_count,
+                        'duplicates_flagged': total_duplicates_flagged,
+                        'errors_count': len(all_errors),
+                        'dry_run': upload_log.is_dry_run,
+                        'duration_seconds': upload_log.duration_seconds,
+                        'chunks_processed': chunks_processed,
+                        'chunk_size': chunk_size,
+                        'started_at': str(upload_log.started_at),
+                        'completed_at': str(upload_log.completed_at),
+                        'error_summary': all_errors[:10] if all_errors else []  # First 10 errors for quick reference
+                    }
+                )
+                logger.info(f"Audit log created for upload: {upload_log.external_id}")
+            except Exception as audit_error:
+                logger.error(f"Failed to create audit log for upload: {audit_error}")
+        except Exception as e:
+            logger.error(f"Failed to update upload log: {e}")
+    
+    # Build success message with skipped records info if applicable
+    success_message = f'Upload completed! {total_created_count} clients created, {total_updated_count} clients updated.'
+    if unchanged > 0:
+        success_message += f' {unchanged} record(s) unchanged since the last import were skipped.'
+    if total_skipped_count > unchanged:
+        success_message += f' {total_skipped_count - unchanged} record(s) skipped due to future dates.'
+    
+    response_data = {
+        'success': True,
+        'message': success_message,
+        'stats': {
+            'total_rows': total_rows,
+            'created': total_created_count,
+            'updated': total_updated_count,
+            'skipped': total_skipped_count,
+            'duplicates_flagged': total_duplicates_flagged,
+            'errors': len(all_errors),
+            'warnings': len(all_warnings),
+            'unchanged': unchanged,
+            'duration_seconds': upload_log.duration_seconds if upload_log else None,
+            'chunks_processed': chunks_processed
+        },
+        'profile': profile,
+        'duplicate_details': all_duplicate_details[:20],  # Limit to first 20 duplicates for display
+        'errors': all_errors[:10] if all_errors else [],  # Limit to first 10 errors
+        'warnings': all_warnings if all_warnings else [],  # Include all future date warnings
+        'debug_info': debug_info,  # Add debug information
+        'notes': [
+            'Existing clients with matching Client ID were updated with new information',
+            'New clients were created for records without existing Client ID matches',
+            'Missing date of birth values were set to 1900-01-01',
+            'Missing gender values were set to null',
+            f'{total_duplicates_flagged} clients were created with potential duplicate flags for review',
+            'Review flagged duplicates in the "Probable Duplicate Clients" section'
+        ] if total_created_count > 0 or total_updated_count > 0 or total_duplicates_flagged > 0 else []
+    }
+    
+    # Add warning note if there are future date warnings
+    if all_warnings:
+        response_data['notes'].append(
+            f'{len(all_warnings)} record(s) were skipped due to future dates in intake_date or discharge_date. Please review and update the sheet with correct dates.'
+        )
+    
+    if report:
+        response_data['dry_run'] = True
+        response_data['message'] = (
+            f'Dry run completed: {total_created_count} clients would be created and {total_updated_count} updated. '
+            f'No changes were saved.'
+        )
+        response_data['report'] = report.counts
+        if upload_log:
+            report_url = reverse('clients:upload_report', args=[upload_log.external_id])
+            response_data['report_urls'] = {'csv': f'{report_url}?format=csv', 'json': f'{report_url}?format=json'}
+        response_data['notes'] = ['Dry run: every row was processed and all changes were rolled back']
+    
+    return JsonResponse(response_data)
+
+
+def upload_permission_error(request, upload_log, action):
+    """
+    Return a 403 response unless the user started this upload or may upload clients.
+    Staff, Manager and Leader users without an Admin role only reach their own uploads.
+    """
+    try:
+        staff = request.user.staff_profile
+        if upload_log.uploaded_by_id is not None and upload_log.uploaded_by_id == staff.id:
+            return None
+
+        role_names = [staff_role.role.name for staff_role in staff.staffrole_set.select_related('role').all()]
+        if any(role in ['Staff', 'Manager', 'Leader'] for role in role_names) and not any(role in ['SuperAdmin', 'Admin'] for role in role_names):
+            return JsonResponse({'success': False, 'error': f'You do not have permission to {action} this upload.'}, status=403)
+    except Exception:
+        pass
+    return None
+
+@require_http_methods(["GET"])
+@login_required
+def upload_status(request, external_id):
+    """API endpoint polled by the upload page while a background upload runs"""
+    upload_log = get_object_or_404(ClientUploadLog, external_id=external_id)
+    forbidden = upload_permission_error(request, upload_log, 'view')
+    if forbidden:
+        return forbidden
+    # An upload whose worker died shows as failed (and resumable) instead of processing forever
+    upload_jobs.fail_if_stale(upload_log)
+    upload_details = upload_log.upload_details or {}
+    finished = upload_log.status in upload_jobs.FINISHED_STATUSES
+    
+    return JsonResponse({
+        'success': True,
+        'upload_id': str(upload_log.external_id),
+        'status': upload_log.status,
+        'finished': finished,
+        'progress': upload_details.get('progress', {}),
+        'queue_position': upload_jobs.queue_position(upload_log),
+        'cancel_requested': upload_log.cancel_requested_at is not None,
+        'result': upload_details.get('result') if finished else None,
+        'error_message': upload_log.error_message if upload_log.status in ('failed', 'cancelled') else None,
+        'checkpoint_row': upload_log.checkpoint_row,
+        'resumable': upload_jobs.is_resumable(upload_log),
+        'started_at': upload_log.started_at.isoformat() if upload_log.started_at else None,
+        'completed_at': upload_log.completed_at.isoformat() if upload_log.completed_at else None,
+    })
+
+@require_http_methods(["POST"])
+@login_required
+def cancel_upload(request, external_id):
+    """Cancel a queued upload, or stop a running one before its next chunk"""
+    upload_log = get_object_or_404(ClientUploadLog, external_id=external_id)
+    forbidden = upload_permission_error(request, upload_log, 'cancel')
+    if forbidden:
+        return forbidden
+    if not upload_jobs.request_cancel(upload_log):
+        return JsonResponse({
+            'success': False,
+            'error': f'This upload has already finished (status: {upload_log.status}).'
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'upload_id': str(upload_log.external_id),
+        'status': upload_log.status,
+        'cancel_requested': True,
+        'status_url': reverse('clients:upload_status', args=[upload_log.external_id]),
+    })
+
+@require_http_methods(["GET"])
+@login_required
+def upload_report(request, external_id):
+    """Stream the row-by-row report of a dry-run upload as CSV (default) or JSON"""
+    upload_log = get_object_or_404(ClientUploadLog, external_id=external_id, is_dry_run=True)
+    forbidden = upload_permission_error(request, upload_log, 'view the report of')
+    if forbidden:
+        return forbidden
+    path = get_report_path(upload_log)
+    if not os.path.exists(path):
+        return JsonResponse({'success': False, 'error': 'No report is available for this upload.'}, status=404)
+    
+    if request.GET.get('format') == 'json':
+        upload_details = upload_log.upload_details or {}
+        summary = {
+            'upload_id': str(upload_log.external_id),
+            'file_name': upload_log.file_name,
+            'source': upload_log.source,
+            'total_rows': upload_log.total_rows,
+            'created': upload_log.records_created,
+            'updated': upload_log.records_updated,
+            'skipped': upload_log.records_skipped,
+            'duplicates_flagged': upload_log.duplicates_flagged,
+            'errors': upload_log.errors_count,
+            'counts': upload_details.get('report_counts', {}),
+            'profile': upload_details.get('profile'),
+        }
+        response = StreamingHttpResponse(iter_report_json(path, summary), content_type='application/json')
+        extension = 'json'
+    else:
+        response = StreamingHttpResponse(iter_report_csv(path), content_type='text/csv')
+        extension = 'csv'
+    response['Content-Disposition'] = f'attachment; filename="dry_run_report_{upload_log.external_id}.{extension}"'
+    return response
+
+@require_http_methods(["POST"])
+@login_required
+def resume_upload(request, external_id):
+    """Queue a failed commit-per-chunk upload again from its last committed chunk"""
+    upload_log = get_object_or_404(ClientUploadLog, external_id=external_id)
+    forbidden = upload_permission_error(request, upload_log, 'resume')
+    if forbidden:
+        return forbidden
+    if not upload_jobs.is_resumable(upload_log):
+        return JsonResponse({
+            'success': False,
+            'error': 'This upload cannot be resumed. Only failed commit-per-chunk uploads with committed rows can be resumed.'
+        }, status=400)
+    
+    upload_jobs.resume_client_upload(upload_log, request.user)
+    return JsonResponse({
+        'success': True,
+        'queued': True,
+        'upload_id': str(upload_log.external_id),
+        'resume_from_row': upload_log.checkpoint_row,
+        'status': upload_log.status,
+        'status_url': reverse('clients:upload_status', args=[upload_log.external_id]),
+    }, status=202)
+
+
 @require_http_methods(["GET"])
 @login_required
 def get_upload_logs(request):
@@ -7503,7 +6821,8 @@ def get_upload_logs(request):
                 'status': log.status,
                 'error_message': log.error_message,
                 'uploaded_by': f"{log.uploaded_by.first_name} {log.uploaded_by.last_name}".strip() if log.uploaded_by else 'System',
-                'upload_details': log.upload_details
+                'upload_details': log.upload_details,
+                'profile': (log.upload_details or {}).get('profile'),
             })
         
         return JsonResponse({
@@ -8579,11 +7898,8 @@ def auto_merge_high_confidence_duplicate(primary_client, duplicate_client, simil
         }
 
 
-@csrf_protect
-@require_http_methods(["POST"])
-@jwt_required
-def run_duplicate_scan(request):
-    """Scan existing client data and automatically merge high-confidence duplicates, flag others for review."""
+def duplicate_scan_permission_error(request):
+    """Return a 401/403 response unless the user may run and follow duplicate scans"""
     if not request.user.is_authenticated:
         return JsonResponse({'success': False, 'error': 'Authentication required'}, status=401)
     
@@ -8613,6 +7929,20 @@ def run_duplicate_scan(request):
     except Exception:
         # If no staff profile is available we allow the request to continue
         pass
+    return None
+
+
+@csrf_protect
+@require_http_methods(["POST"])
+@jwt_required
+def run_duplicate_scan(request):
+    """
+    Queue a scan of existing client data that automatically merges high-confidence
+    duplicates and flags others for review. Runs as a DuplicateScanJob.
+    """
+    forbidden = duplicate_scan_permission_error(request)
+    if forbidden:
+        return forbidden
     
     try:
         payload = json.loads(request.body.decode('utf-8')) if request.body else {}
@@ -8646,525 +7976,87 @@ def run_duplicate_scan(request):
         source_filter = source_filter.strip() or None
     else:
         source_filter = None
+    # Incremental by default: only clients updated since the last complete scan of
+    # the same clients are compared with the rest. full_rescan compares everyone.
+    full_rescan = bool(payload.get('full_rescan', False))
     
     try:
-        clients_qs = Client.objects.all()
-        if not include_archived:
-            clients_qs = clients_qs.filter(is_archived=False)
-        if source_filter:
-            clients_qs = clients_qs.filter(source=source_filter)
-        
-        clients_qs = clients_qs.only(
-            'id', 'external_id', 'first_name', 'last_name', 'client_id', 'source',
-            'email', 'phone', 'dob', 'is_archived', 'is_inactive', 'created_at'
+        job, created = duplicate_jobs.start_duplicate_scan(
+            include_archived=include_archived,
+            source=source_filter,
+            full_rescan=full_rescan,
+            auto_merge=bool(auto_merge_mode),
+            result_limit=max(response_limit, 0),
+            candidate_limit=scan_limit,
+            requested_by=getattr(request.user, 'staff_profile', None),
         )
-        
-        # Track already flagged duplicates to avoid returning them again
-        existing_pairs = {
-            tuple(sorted(pair))
-            for pair in ClientDuplicate.objects.values_list('primary_client_id', 'duplicate_client_id')
-        }
-        
-        results = []
-        seen_pairs = set()
-        
-        def serialize_client(client):
-            return {
-                'id': client.id,
-                'external_id': str(client.external_id),
-                'detail_url': request.build_absolute_uri(
-                    reverse('clients:detail', kwargs={'external_id': client.external_id})
-                ),
-                'first_name': client.first_name or '',
-                'last_name': client.last_name or '',
-                'client_id': client.client_id or '',
-                'source': client.source or '',
-                'email': client.email or '',
-                'phone': client.phone or '',
-                'dob': client.dob.isoformat() if client.dob else None,
-                'is_archived': bool(client.is_archived),
-                'is_inactive': bool(client.is_inactive),
-            }
-        
-        def add_candidate(client_a, client_b, match_type, reason, score):
-            if not client_a or not client_b or client_a.id == client_b.id:
-                return
-            
-            pair_key = tuple(sorted([client_a.id, client_b.id]))
-            if pair_key in seen_pairs or pair_key in existing_pairs:
-                return
-            
-            # Determine which client should be treated as the primary candidate (oldest record wins)
-            primary, duplicate = client_a, client_b
-            if client_a.created_at and client_b.created_at:
-                if client_b.created_at < client_a.created_at:
-                    primary, duplicate = client_b, client_a
-            elif client_b.id < client_a.id:
-                primary, duplicate = client_b, client_a
-            
-            seen_pairs.add(pair_key)
-            confidence = fuzzy_matcher.get_duplicate_confidence_level(score)
-            
-            results.append({
-                'primary_client': serialize_client(primary),
-                'duplicate_client': serialize_client(duplicate),
-                'match_type': match_type,
-                'reason': reason,
-                'similarity_score': round(float(score), 3),
-                'confidence_level': confidence,
-            })
-        
-        # 1. Exact External ID (uid_external) matches - highest priority for auto-merge
-        if len(results) < scan_limit:
-            external_id_groups = (
-                clients_qs
-                .filter(uid_external__isnull=False)
-                .exclude(uid_external__exact='')
-                .values('uid_external')
-                .annotate(count=Count('id'))
-                .filter(count__gt=1)
-                .order_by('-count', 'uid_external')[:scan_limit * 5]
-            )
-            
-            for group in external_id_groups:
-                group_clients = list(
-                    clients_qs.filter(uid_external=group['uid_external']).order_by('created_at', 'id')
-                )
-                
-                if len(group_clients) < 2:
-                    continue
-                
-                primary_candidate = group_clients[0]
-                for duplicate_candidate in group_clients[1:]:
-                    reason = f"Matching external ID {group['uid_external']}"
-                    add_candidate(primary_candidate, duplicate_candidate, 'matching_external_id', reason, 1.0)
-                    if len(results) >= scan_limit:
-                        break
-                if len(results) >= scan_limit:
-                    break
-        
-        # 1b. Exact Client ID + Source matches
-        if len(results) < scan_limit:
-            id_groups = (
-                clients_qs
-                .filter(client_id__isnull=False)
-                .exclude(client_id__exact='')
-                .values('source', 'client_id')
-                .annotate(count=Count('id'))
-                .filter(count__gt=1)
-                .order_by('-count', 'client_id')[:scan_limit * 5]
-            )
-            
-            for group in id_groups:
-                group_clients = list(
-                    clients_qs.filter(
-                        source=group['source'],
-                        client_id=group['client_id']
-                    ).order_by('created_at', 'id')
-                )
-                
-                if len(group_clients) < 2:
-                    continue
-                
-                primary_candidate = group_clients[0]
-                for duplicate_candidate in group_clients[1:]:
-                    reason = f"Matching {group['source'] or 'source'} client ID {group['client_id']}"
-                    add_candidate(primary_candidate, duplicate_candidate, 'matching_client_id', reason, 1.0)
-                    if len(results) >= scan_limit:
-                        break
-                if len(results) >= scan_limit:
-                    break
-        
-        # 2. Exact Email matches (check both email field and contact_information JSON)
-        if len(results) < scan_limit:
-            # Get all unique emails from both email field and contact_information
-            from django.db.models import Q
-            email_clients = clients_qs.filter(
-                Q(email__isnull=False) & ~Q(email__exact='') |
-                Q(contact_information__email__isnull=False) & ~Q(contact_information__email__exact='')
-            )
-            
-            # Normalize emails (lowercase) and group by normalized email
-            email_groups_dict = {}
-            for client in email_clients:
-                # Check email field first
-                email_val = client.email
-                if not email_val or email_val.strip() == '':
-                    # Fall back to contact_information
-                    email_val = client.contact_information.get('email', '') if client.contact_information else ''
-                
-                if email_val and email_val.strip():
-                    normalized_email = email_val.strip().lower()
-                    if normalized_email not in email_groups_dict:
-                        email_groups_dict[normalized_email] = []
-                    email_groups_dict[normalized_email].append(client)
-            
-            # Find groups with multiple clients
-            for normalized_email, group_clients in email_groups_dict.items():
-                if len(group_clients) < 2:
-                    continue
-                
-                # Sort by created_at to ensure consistent primary/duplicate assignment
-                group_clients.sort(key=lambda c: (c.created_at or timezone.now(), c.id))
-                
-                primary_candidate = group_clients[0]
-                for duplicate_candidate in group_clients[1:]:
-                    reason = f"Matching email address {normalized_email}"
-                    add_candidate(primary_candidate, duplicate_candidate, 'matching_email', reason, 0.99)
-                    if len(results) >= scan_limit:
-                        break
-                if len(results) >= scan_limit:
-                    break
-        
-        # 3. Exact Phone matches (check both phone field and contact_information JSON)
-        if len(results) < scan_limit:
-            # Get all unique phones from both phone field and contact_information
-            from django.db.models import Q
-            phone_clients = clients_qs.filter(
-                Q(phone__isnull=False) & ~Q(phone__exact='') |
-                Q(contact_information__phone__isnull=False) & ~Q(contact_information__phone__exact='')
-            )
-            
-            # Normalize phones (strip whitespace) and group by normalized phone
-            phone_groups_dict = {}
-            for client in phone_clients:
-                # Check phone field first
-                phone_val = client.phone
-                if not phone_val or phone_val.strip() == '':
-                    # Fall back to contact_information
-                    phone_val = client.contact_information.get('phone', '') if client.contact_information else ''
-                
-                if phone_val and phone_val.strip():
-                    normalized_phone = phone_val.strip()
-                    if normalized_phone not in phone_groups_dict:
-                        phone_groups_dict[normalized_phone] = []
-                    phone_groups_dict[normalized_phone].append(client)
-            
-            # Find groups with multiple clients
-            for normalized_phone, group_clients in phone_groups_dict.items():
-                if len(group_clients) < 2:
-                    continue
-                
-                # Sort by created_at to ensure consistent primary/duplicate assignment
-                group_clients.sort(key=lambda c: (c.created_at or timezone.now(), c.id))
-                
-                primary_candidate = group_clients[0]
-                for duplicate_candidate in group_clients[1:]:
-                    reason = f"Matching phone number {normalized_phone}"
-                    add_candidate(primary_candidate, duplicate_candidate, 'matching_phone', reason, 0.96)
-                    if len(results) >= scan_limit:
-                        break
-                if len(results) >= scan_limit:
-                    break
-        
-        # 4. Exact Name + DOB matches
-        if len(results) < scan_limit:
-            name_dob_groups = (
-                clients_qs
-                .filter(dob__isnull=False)
-                .exclude(first_name__isnull=True)
-                .exclude(last_name__isnull=True)
-                .exclude(first_name__exact='')
-                .exclude(last_name__exact='')
-                .values('first_name', 'last_name', 'dob')
-                .annotate(count=Count('id'))
-                .filter(count__gt=1)
-                .order_by('-count', 'first_name', 'last_name')[:scan_limit * 5]
-            )
-            
-            for group in name_dob_groups:
-                group_clients = list(
-                    clients_qs.filter(
-                        first_name=group['first_name'],
-                        last_name=group['last_name'],
-                        dob=group['dob']
-                    ).order_by('created_at', 'id')
-                )
-                
-                if len(group_clients) < 2:
-                    continue
-                
-                primary_candidate = group_clients[0]
-                for duplicate_candidate in group_clients[1:]:
-                    reason = (
-                        f"Matching name and date of birth "
-                        f"({group['first_name']} {group['last_name']}, {group['dob']})"
-                    )
-                    add_candidate(primary_candidate, duplicate_candidate, 'matching_name_dob', reason, 0.92)
-                    if len(results) >= scan_limit:
-                        break
-                if len(results) >= scan_limit:
-                    break
-        
-        # 5. Fuzzy name matches (sampled set for performance)
-        # For auto-merge, increase sample size to find more duplicates
-        if len(results) < scan_limit:
-            # Increase sample size for auto-merge mode to find hundreds of duplicates
-            fuzzy_sample_size = 2000 if auto_merge_mode else 400
-            fuzzy_candidates = list(
-                clients_qs
-                .filter(first_name__isnull=False, last_name__isnull=False)
-                .exclude(first_name__exact='')
-                .exclude(last_name__exact='')
-                .order_by('last_name', 'first_name')[:fuzzy_sample_size]
-            )
-            
-            if fuzzy_candidates:
-                buckets = {}
-                for client in fuzzy_candidates:
-                    key = (client.last_name[:1] or '').lower()
-                    buckets.setdefault(key, []).append(client)
-                
-                for bucket_clients in buckets.values():
-                    bucket_clients.sort(key=lambda c: (c.last_name.lower(), c.first_name.lower(), c.id))
-                    bucket_size = len(bucket_clients)
-                    if bucket_size < 2:
-                        continue
-                    
-                    for i in range(bucket_size):
-                        if len(results) >= scan_limit:
-                            break
-                        for j in range(i + 1, bucket_size):
-                            c1 = bucket_clients[i]
-                            c2 = bucket_clients[j]
-                            
-                            similarity = fuzzy_matcher.calculate_similarity(
-                                f"{c1.first_name} {c1.last_name}",
-                                f"{c2.first_name} {c2.last_name}"
-                            )
-                            
-                            if c1.dob and c2.dob and c1.dob == c2.dob:
-                                similarity = max(similarity, 0.9)
-                                match_type = 'name_dob_similarity'
-                                reason = 'Similar names with matching date of birth'
-                            else:
-                                match_type = 'fuzzy_name'
-                                reason = 'Similar client names'
-                            
-                            if similarity < 0.88:
-                                continue
-                            
-                            add_candidate(c1, c2, match_type, reason, similarity)
-                            if len(results) >= scan_limit:
-                                break
-                        if len(results) >= scan_limit:
-                            break
-                    if len(results) >= scan_limit:
-                        break
-        
-        results.sort(key=lambda item: item['similarity_score'], reverse=True)
-        # For auto-merge, process ALL results (not just limited)
-        # This ensures hundreds of high-confidence duplicates can be auto-merged
-        # Only limit results for display/response
-        limited_results = results[:response_limit] if response_limit else results
-        all_results = results  # Process all results for auto-merge
-        
-        # Automatically merge high-confidence duplicates, flag others for review
-        merged_count = 0
-        flagged_count = 0
-        skipped_count = 0
-        errors = []
-        merge_errors = []
-        
-        # Threshold for automatic merge: high confidence (similarity >= 0.9)
-        AUTO_MERGE_CONFIDENCE_THRESHOLD = 'high'
-        AUTO_MERGE_SIMILARITY_THRESHOLD = 0.9
-        
-        # Use transaction to ensure all operations are atomic
-        from django.db import transaction
-        
-        # Process ALL results for auto-merge (not just the first N)
-        # This allows hundreds of duplicates to be automatically merged
-        processed_clients = set()  # Track processed client pairs to avoid duplicates
-        
-        for result in all_results:
-            try:
-                primary_client_id = result['primary_client']['id']
-                duplicate_client_id = result['duplicate_client']['id']
-                similarity_score = result['similarity_score']
-                confidence_level = result['confidence_level']
-                match_type = result['match_type']
-                
-                # Get the actual client objects
-                try:
-                    primary_client = Client.objects.get(id=primary_client_id)
-                    duplicate_client = Client.objects.get(id=duplicate_client_id)
-                except Client.DoesNotExist as e:
-                    errors.append(f"Client not found: {str(e)}")
-                    continue
-                
-                # Skip if either client is archived (unless include_archived is True)
-                if not include_archived:
-                    if primary_client.is_archived or duplicate_client.is_archived:
-                        skipped_count += 1
-                        continue
-                
-                # Skip if either client has already been processed (merged or deleted)
-                client_pair_key = tuple(sorted([primary_client_id, duplicate_client_id]))
-                if client_pair_key in processed_clients:
-                    skipped_count += 1
-                    continue
-                
-                # Check if duplicate record already exists
-                existing_duplicate = ClientDuplicate.objects.filter(
-                    primary_client=primary_client,
-                    duplicate_client=duplicate_client
-                ).first()
-                
-                if existing_duplicate:
-                    skipped_count += 1
-                    continue
-                
-                # Check if either client has been deleted (might happen during processing)
-                try:
-                    primary_client.refresh_from_db()
-                    duplicate_client.refresh_from_db()
-                except Client.DoesNotExist:
-                    skipped_count += 1
-                    continue
-                
-                # Check if this is a high-confidence duplicate that should be automatically merged
-                should_auto_merge = (
-                    confidence_level == AUTO_MERGE_CONFIDENCE_THRESHOLD and
-                    similarity_score >= AUTO_MERGE_SIMILARITY_THRESHOLD
-                )
-                
-                # Also auto-merge exact matches (email, phone, name+dob, client_id, external_id) regardless of similarity score
-                # Include all possible match type variations
-                is_exact_match = match_type in [
-                    'matching_email', 'exact_email', 'matching_phone', 'exact_phone', 
-                    'email_phone', 'name_dob_match', 'matching_name_dob',
-                    'matching_client_id', 'matching_external_id', 'matching_uid_external'
-                ] or similarity_score >= 0.95
-                
-                if should_auto_merge or is_exact_match:
-                    # Automatically merge high-confidence duplicates
-                    try:
-                        merge_result = auto_merge_high_confidence_duplicate(
-                            primary_client=primary_client,
-                            duplicate_client=duplicate_client,
-                            similarity_score=similarity_score,
-                            match_type=match_type,
-                            confidence_level=confidence_level,
-                            reviewed_by=request.user.staff_profile if hasattr(request.user, 'staff_profile') else None
-                        )
-                        
-                        if merge_result.get('success') and merge_result.get('merged'):
-                            merged_count += 1
-                            # Mark this pair as processed
-                            processed_clients.add(client_pair_key)
-                        else:
-                            # Merge failed, flag for manual review instead
-                            merge_errors.append({
-                                'primary': f"{primary_client.first_name} {primary_client.last_name}",
-                                'duplicate': f"{duplicate_client.first_name} {duplicate_client.last_name}",
-                                'error': merge_result.get('error', 'Unknown error')
-                            })
-                            
-                            # Create ClientDuplicate record for manual review
-                            ClientDuplicate.objects.create(
-                                primary_client=primary_client,
-                                duplicate_client=duplicate_client,
-                                similarity_score=similarity_score,
-                                match_type=match_type,
-                                confidence_level=confidence_level,
-                                status='pending',
-                                detection_source='scan',
-                                match_details={
-                                    'reason': result['reason'],
-                                    'source': 'scan_existing_data',
-                                    'scanned_at': timezone.now().isoformat(),
-                                    'auto_merge_failed': True,
-                                    'merge_error': merge_result.get('error', 'Unknown error')
-                                }
-                            )
-                            flagged_count += 1
-                    
-                    except Exception as merge_exc:
-                        logger.error(f"Error auto-merging duplicate: {merge_exc}", exc_info=True)
-                        merge_errors.append({
-                            'primary': f"{primary_client.first_name} {primary_client.last_name}",
-                            'duplicate': f"{duplicate_client.first_name} {duplicate_client.last_name}",
-                            'error': str(merge_exc)
-                        })
-                        
-                        # Merge failed, flag for manual review instead
-                        ClientDuplicate.objects.create(
-                            primary_client=primary_client,
-                            duplicate_client=duplicate_client,
-                            similarity_score=similarity_score,
-                            match_type=match_type,
-                            confidence_level=confidence_level,
-                            status='pending',
-                            detection_source='scan',
-                            match_details={
-                                'reason': result['reason'],
-                                'source': 'scan_existing_data',
-                                'scanned_at': timezone.now().isoformat(),
-                                'auto_merge_failed': True,
-                                'merge_error': str(merge_exc)
-                            }
-                        )
-                        flagged_count += 1
-                
-                else:
-                    # Lower confidence - flag for manual review
-                    ClientDuplicate.objects.create(
-                        primary_client=primary_client,
-                        duplicate_client=duplicate_client,
-                        similarity_score=similarity_score,
-                        match_type=match_type,
-                        confidence_level=confidence_level,
-                        status='pending',
-                        detection_source='scan',
-                        match_details={
-                            'reason': result['reason'],
-                            'source': 'scan_existing_data',
-                            'scanned_at': timezone.now().isoformat()
-                        }
-                    )
-                    flagged_count += 1
-                    
-            except Client.DoesNotExist as e:
-                errors.append(f"Client not found: {str(e)}")
-            except Exception as e:
-                errors.append(f"Error processing duplicate: {str(e)}")
-                logger.error(f"Error processing duplicate record: {e}", exc_info=True)
-        
-        # Build response message
-        message_parts = []
-        if merged_count > 0:
-            message_parts.append(f'Auto-merged {merged_count} high-confidence duplicate(s)')
-        if flagged_count > 0:
-            message_parts.append(f'Flagged {flagged_count} duplicate(s) for manual review')
-        if skipped_count > 0:
-            message_parts.append(f'Skipped {skipped_count} existing record(s)')
-        
-        message = 'Scan completed. ' + ', '.join(message_parts) + '.'
-        
-        return JsonResponse({
-            'success': True,
-            'results': limited_results,
-            'count': len(limited_results),
-            'merged_count': merged_count,
-            'flagged_count': flagged_count,
-            'skipped_count': skipped_count,
-            'errors': errors if errors else None,
-            'merge_errors': merge_errors if merge_errors else None,
-            'limit': response_limit,
-            'scan_limit': scan_limit,
-            'auto_merge_mode': auto_merge_mode,
-            'include_archived': include_archived,
-            'source': source_filter,
-            'message': message
-        })
-    
     except Exception as exc:
-        logger.error(f"Error running duplicate scan: {exc}", exc_info=True)
+        logger.error(f"Error starting duplicate scan: {exc}", exc_info=True)
         return JsonResponse({
             'success': False,
             'error': f'Error scanning for duplicates: {str(exc)}'
         }, status=500)
+    
+    # The scan runs in the background (clients.duplicate_jobs); the page polls status_url
+    return JsonResponse({
+        'success': True,
+        'queued': True,
+        'job_id': str(job.external_id),
+        'status': job.status,
+        'scan_mode': job.scan_mode,
+        'already_running': not created,
+        'status_url': reverse('clients:dedupe_scan_status', args=[job.external_id]),
+        'message': 'Duplicate scan started.' if created else 'A scan of these clients is already running.',
+    }, status=202)
+
+
+@require_http_methods(["GET"])
+@jwt_required
+def duplicate_scan_status(request, external_id):
+    """API endpoint polled by the dedupe page while a background duplicate scan runs"""
+    forbidden = duplicate_scan_permission_error(request)
+    if forbidden:
+        return forbidden
+    job = get_object_or_404(DuplicateScanJob, external_id=external_id)
+    # A scan whose worker died is dispatched again and carries on where it stopped
+    duplicate_jobs.resume_if_stale(job)
+    finished = job.status in duplicate_jobs.FINISHED_STATUSES
+    
+    return JsonResponse({
+        'success': True,
+        'job_id': str(job.external_id),
+        'status': job.status,
+        'finished': finished,
+        'progress': duplicate_jobs.job_progress(job),
+        'result': duplicate_jobs.job_result(job) if job.status == 'success' else None,
+        'error_message': job.error_message if job.status == 'failed' else None,
+        'resumable': job.status == 'failed',
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+    })
+
+
+@csrf_protect
+@require_http_methods(["POST"])
+@jwt_required
+def resume_duplicate_scan(request, external_id):
+    """Queue a failed duplicate scan again; it skips the phases it finished"""
+    forbidden = duplicate_scan_permission_error(request)
+    if forbidden:
+        return forbidden
+    job = get_object_or_404(DuplicateScanJob, external_id=external_id)
+    if not duplicate_jobs.resume_failed_scan(job):
+        return JsonResponse({
+            'success': False,
+            'error': f'Only failed scans can be resumed (status: {job.status}).'
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'job_id': str(job.external_id),
+        'status': job.status,
+        'status_url': reverse('clients:dedupe_scan_status', args=[job.external_id]),
+    })
 
 
 @csrf_protect
@@ -3,7 +3,7 @@ from .models import (
     Department, Role, Staff, StaffRole, Program, SubProgram, ProgramStaff,
     Client, ClientProgramEnrollment, Intake, Discharge, ServiceRestriction,
     AuditLog, EmailRecipient, EmailLog, ServiceRestrictionNotificationSubscription,
-    Notification
+    Notification, ProgramNameAlias
 )
 
 
@@ -46,6 +46,14 @@ class ProgramAdmin(admin.ModelAdmin):
     readonly_fields = ['external_id', 'created_at', 'updated_at']
 
 
+@admin.register(ProgramNameAlias)
+class ProgramNameAliasAdmin(admin.ModelAdmin):
+    list_display = ['alias', 'program', 'source', 'created_at']
+    search_fields = ['alias', 'program__name']
+    list_filter = ['source']
+    readonly_fields = ['external_id', 'created_at', 'updated_at']
+
+
 @admin.register(SubProgram)
 class SubProgramAdmin(admin.ModelAdmin):
     list_display = ['name', 'program', 'is_active', 'created_at']
@@ -0,0 +1,63 @@
+"""
+Database-side fuzzy client name search.
+
+similar_clients ranks clients by pg_trgm similarity of their stored
+full_name_key to a name, in one query served by the client_full_name_trgm_idx
+GIN index, instead of loading candidate clients into Python and scoring each
+with FuzzyMatcher. Callers that need FuzzyMatcher's scores and thresholds
+(nicknames, 0.7 / 0.9) score the few clients it returns.
+"""
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db.models import BooleanField, Case, Value, When
+
+from core.fuzzy_matching import fuzzy_matcher
+from core.models import Client
+from core.name_keys import normalize_name
+
+# Clients fetched by trigram similarity before FuzzyMatcher scores them
+NAME_DUPLICATE_CANDIDATES = 25
+
+
+def similar_clients(first_name, last_name, dob=None, limit=10, queryset=None):
+    """
+    Up to `limit` clients with names similar to first_name / last_name, best
+    first, as (client, score, same_dob). score is the pg_trgm similarity (0-1)
+    of the full names; only clients above pg_trgm.similarity_threshold (0.3 by
+    default) are considered. Given a dob, clients born that day rank first.
+    """
+    name = normalize_name(f"{first_name or ''} {last_name or ''}")
+    if not name:
+        return []
+    clients = queryset if queryset is not None else Client.objects.all()
+    clients = (
+        clients
+        .filter(full_name_key__trigram_similar=name)
+        .annotate(name_similarity=TrigramSimilarity('full_name_key', name))
+    )
+    ordering = ['-name_similarity', 'id']
+    if dob:
+        clients = clients.annotate(same_dob=Case(
+            When(dob=dob, then=Value(True)), default=Value(False), output_field=BooleanField(),
+        ))
+        ordering.insert(0, '-same_dob')
+    return [
+        (client, client.name_similarity, bool(dob) and client.dob == dob)
+        for client in clients.order_by(*ordering)[:limit]
+    ]
+
+
+def find_name_duplicates(client, similarity_threshold=0.7):
+    """
+    FuzzyMatcher.find_potential_duplicates for a saved client, checked against
+    the clients whose names are most similar by trigram search rather than
+    against every client.
+    """
+    candidates = similar_clients(
+        client.first_name, client.last_name, dob=client.dob,
+        limit=NAME_DUPLICATE_CANDIDATES, queryset=Client.objects.exclude(id=client.id),
+    )
+    return fuzzy_matcher.find_potential_duplicates(
+        {'first_name': client.first_name or '', 'last_name': client.last_name or ''},
+        [candidate for candidate, _, _ in candidates],
+        similarity_threshold=similarity_threshold,
+    )
@@ -1,26 +1,238 @@
 import json
 import os
+import time
+from collections import namedtuple
 from difflib import SequenceMatcher
-from typing import List, Tuple, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Tuple, Optional, Dict, Any, Iterable, Union
 from django.conf import settings
 
 
+# A normalized name and its set of words, prepared once and scored many times
+PreparedName = namedtuple('PreparedName', 'text words')
+
+
+@lru_cache(maxsize=4096)
+def _pattern_masks(text: str) -> Dict[str, int]:
+    masks = {}
+    for position, char in enumerate(text):
+        masks[char] = masks.get(char, 0) | (1 << position)
+    return masks
+
+
+def lcs_length(a: str, b: str) -> int:
+    """Length of the longest common subsequence, bit-parallel over the characters of a"""
+    if not a or not b:
+        return 0
+    get_mask = _pattern_masks(a).get
+    full = (1 << len(a)) - 1
+    row = full
+    for char in b:
+        matches = row & get_mask(char, 0)
+        # Carries past bit len(a) never flow back down, so masking once at the end is enough
+        row = (row + matches) | (row - matches)
+    return len(a) - bin(row & full).count('1')
+
+
+def indel_similarity(a: str, b: str) -> float:
+    """
+    2 * LCS / (len(a) + len(b)), the similarity insert/delete edit distance
+    gives. Never below SequenceMatcher's ratio, whose matching blocks are a
+    common subsequence.
+    """
+    total = len(a) + len(b)
+    return 2 * lcs_length(a, b) / total if total else 1.0
+
+
+def jaro_winkler(s1: str, s2: str, prefix_scale: float = 0.1) -> float:
+    """Jaro-Winkler similarity of two strings (0-1 scale)"""
+    if s1 == s2:
+        return 1.0
+    len1, len2 = len(s1), len(s2)
+    if not len1 or not len2:
+        return 0.0
+    window = max(max(len1, len2) // 2 - 1, 0)
+    matched2 = [False] * len2
+    matches1 = []
+    for i, char in enumerate(s1):
+        for j in range(max(0, i - window), min(i + window + 1, len2)):
+            if not matched2[j] and s2[j] == char:
+                matched2[j] = True
+                matches1.append(char)
+                break
+    matches = len(matches1)
+    if not matches:
+        return 0.0
+    matches2 = [s2[j] for j in range(len2) if matched2[j]]
+    transpositions = sum(a != b for a, b in zip(matches1, matches2)) // 2
+    jaro = (matches / len1 + matches / len2 + (matches - transpositions) / matches) / 3
+    prefix = 0
+    for a, b in zip(s1[:4], s2[:4]):
+        if a != b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+class DifflibScorer:
+    """difflib.SequenceMatcher ratio, the scorer FuzzyMatcher has always used"""
+    name = 'difflib'
+    
+    def ratio(self, a: str, b: str) -> float:
+        return SequenceMatcher(None, a, b).ratio()
+    
+    def upper_bound(self, a: str, b: str, threshold: float) -> float:
+        """A value >= ratio(a, b), cheaper to compute, to compare with threshold"""
+        total = len(a) + len(b)
+        # SequenceMatcher.real_quick_ratio, then the edit-distance similarity
+        bound = 2 * min(len(a), len(b)) / total
+        if bound < threshold:
+            return bound
+        return indel_similarity(a, b)
+
+
+class IndelScorer:
+    """
+    Insert/delete edit-distance similarity, computed bit-parallel: an order of
+    magnitude faster than SequenceMatcher. Equal to its ratio for most names
+    and never lower, so pairs at the 0.7 / 0.88 / 0.9 thresholds still pass.
+    """
+    name = 'indel'
+    
+    def ratio(self, a: str, b: str) -> float:
+        return indel_similarity(a, b)
+    
+    def upper_bound(self, a: str, b: str, threshold: float) -> float:
+        total = len(a) + len(b)
+        return 2 * min(len(a), len(b)) / total if total else 1.0
+
+
+class JaroWinklerScorer:
+    """
+    Jaro-Winkler similarity: several times faster than SequenceMatcher and
+    more forgiving of typos near the end of a name. Scores on the same 0-1
+    scale, slightly higher than difflib's for similar names.
+    """
+    name = 'jaro_winkler'
+    
+    def ratio(self, a: str, b: str) -> float:
+        return jaro_winkler(a, b)
+    
+    def upper_bound(self, a: str, b: str, threshold: float) -> float:
+        if not a or not b:
+            return 0.0
+        # At best every character of the shorter string matches, untransposed, with a full prefix
+        shorter = min(len(a), len(b))
+        jaro = (shorter / len(a) + shorter / len(b) + 1) / 3
+        return jaro + 0.4 * (1 - jaro)
+
+
+SCORERS = {scorer.name: scorer for scorer in (DifflibScorer(), IndelScorer(), JaroWinklerScorer())}
+
+
+def get_scorer(name: Optional[str] = None):
+    """Scorer by name, or the one named by the FUZZY_MATCH_SCORER setting"""
+    name = name or getattr(settings, 'FUZZY_MATCH_SCORER', DifflibScorer.name)
+    try:
+        return SCORERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown fuzzy match scorer {name!r}; choose from {', '.join(SCORERS)}")
+
+
+_NO_GROUPS = frozenset()
+
+
+class NicknameIndex:
+    """
+    Nickname mappings compiled into inverted indexes from a normalized full
+    name or nickname to the mapping entries (groups, numbered in file order)
+    it belongs to, so a pair of names is checked with a few set lookups
+    instead of a pass over every entry.
+    """
+    
+    def __init__(self, mappings: Dict[str, List[str]], normalize):
+        self.full_names = {}
+        self.nicknames = {}
+        for group, (full_name, nicknames) in enumerate(mappings.items()):
+            self.full_names.setdefault(normalize(full_name), set()).add(group)
+            for nickname in nicknames:
+                self.nicknames.setdefault(normalize(nickname), set()).add(group)
+    
+    def match(self, name1: str, name2: str) -> Tuple[bool, float]:
+        """check_nickname_match for two normalized names"""
+        nicknames1 = self.nicknames.get(name1, _NO_GROUPS)
+        nicknames2 = self.nicknames.get(name2, _NO_GROUPS)
+        if not nicknames1 and not nicknames2:
+            return False, 0.0
+        # One name is the full name of a group the other is a nickname in
+        full_groups = (self.full_names.get(name1, _NO_GROUPS) & nicknames2) | \
+            (self.full_names.get(name2, _NO_GROUPS) & nicknames1)
+        shared_groups = nicknames1 & nicknames2
+        if not full_groups and not shared_groups:
+            return False, 0.0
+        # The first matching entry of the file decides, as when entries were checked in order
+        if full_groups and (not shared_groups or min(full_groups) <= min(shared_groups)):
+            return True, 0.9  # High confidence for nickname match
+        return True, 0.85  # High confidence for both being nicknames
+
+
 class FuzzyMatcher:
     """Fuzzy matching utility for client names with nickname support"""
     
-    def __init__(self):
-        self.nickname_mappings = self._load_nickname_mappings()
+    def __init__(self, scorer: Optional[str] = None):
+        self._nickname_file_mtime = None
+        self._nickname_file_checked = time.monotonic()
+        self._set_nickname_mappings(self._load_nickname_mappings())
+        self.scorer = get_scorer(scorer)
     
-    def _load_nickname_mappings(self) -> Dict[str, List[str]]:
-        """Load nickname mappings from JSON file or use default mappings"""
-        # Try to load from a JSON file first
-        nickname_file = getattr(settings, 'NICKNAME_MAPPINGS_FILE', None)
+    def _set_nickname_mappings(self, mappings: Dict[str, List[str]]):
+        self.nickname_mappings = mappings
+        self.nickname_index = NicknameIndex(mappings, self.normalize_name)
+    
+    def _nickname_file(self) -> Optional[str]:
+        return getattr(settings, 'NICKNAME_MAPPINGS_FILE', None)
+    
+    def _read_nickname_file(self) -> Optional[Dict[str, List[str]]]:
+        nickname_file = self._nickname_file()
         if nickname_file and os.path.exists(nickname_file):
             try:
+                self._nickname_file_mtime = os.path.getmtime(nickname_file)
                 with open(nickname_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except (json.JSONDecodeError, IOError):
                 pass
+        return None
+    
+    def reload_nickname_mappings_if_changed(self) -> bool:
+        """
+        Reload the nickname mappings when the JSON file has changed since it
+        was read. Checked at most every NICKNAME_MAPPINGS_RELOAD_SECONDS;
+        an unreadable file leaves the current mappings in place.
+        """
+        interval = getattr(settings, 'NICKNAME_MAPPINGS_RELOAD_SECONDS', 5)
+        now = time.monotonic()
+        if now - self._nickname_file_checked < interval:
+            return False
+        self._nickname_file_checked = now
+        nickname_file = self._nickname_file()
+        try:
+            mtime = os.path.getmtime(nickname_file) if nickname_file else None
+        except OSError:
+            return False
+        if mtime is None or mtime == self._nickname_file_mtime:
+            return False
+        mappings = self._read_nickname_file()
+        if mappings is None:
+            return False
+        self._set_nickname_mappings(mappings)
+        return True
+    
+    def _load_nickname_mappings(self) -> Dict[str, List[str]]:
+        """Load nickname mappings from JSON file or use default mappings"""
+        # Try to load from a JSON file first
+        mappings = self._read_nickname_file()
+        if mappings is not None:
+            return mappings
         
         # Default nickname mappings
         return {
@@ -42,65 +254,74 @@ class FuzzyMatcher:
             return ""
         return " ".join(name.lower().strip().split())
     
-    def calculate_similarity(self, name1: str, name2: str) -> float:
-        """Calculate similarity between two names (0-1 scale)"""
-        if not name1 or not name2:
-            return 0.0
-        
-        name1_norm = self.normalize_name(name1)
-        name2_norm = self.normalize_name(name2)
-        
-        if name1_norm == name2_norm:
+    def prepare(self, name: Union[str, PreparedName]) -> PreparedName:
+        """Normalized form of a name for the batch scoring methods"""
+        if isinstance(name, PreparedName):
+            return name
+        text = self.normalize_name(name)
+        return PreparedName(text, frozenset(text.split()))
+    
+    def could_reach(self, name1: PreparedName, name2: PreparedName, threshold: float) -> bool:
+        """False when the similarity of two prepared names is certainly below threshold"""
+        a, b = name1.text, name2.text
+        if a == b:
+            return True
+        if threshold <= 0.8 and (a in b or b in a):
+            return True
+        if self._word_similarity(name1, name2) >= threshold:
+            return True
+        return self.scorer.upper_bound(a, b, threshold) >= threshold
+    
+    def _word_similarity(self, name1: PreparedName, name2: PreparedName) -> float:
+        common_words = len(name1.words & name2.words)
+        total_words = len(name1.words) + len(name2.words) - common_words
+        return common_words / total_words if total_words > 0 else 0
+    
+    def score_prepared(self, name1: PreparedName, name2: PreparedName, threshold: float = 0.0) -> float:
+        """
+        calculate_similarity of two prepared names. With a threshold, scores
+        that would fall below it may be returned as 0.0 without being computed.
+        """
+        a, b = name1.text, name2.text
+        if a == b:
             return 1.0
         
         # Check if one name contains the other
-        if name1_norm in name2_norm or name2_norm in name1_norm:
+        if a in b or b in a:
             return 0.8
         
-        # Use SequenceMatcher for more accurate similarity
-        similarity = SequenceMatcher(None, name1_norm, name2_norm).ratio()
-        
-        # Check for common words
-        words1 = set(name1_norm.split())
-        words2 = set(name2_norm.split())
-        if words1 and words2:
-            common_words = len(words1.intersection(words2))
-            total_words = len(words1.union(words2))
-            word_similarity = common_words / total_words if total_words > 0 else 0
-            # Take the higher of the two similarities
-            similarity = max(similarity, word_similarity)
-        
-        return similarity
+        # Take the higher of the scorer's similarity and the share of common words
+        word_similarity = self._word_similarity(name1, name2)
+        if word_similarity < threshold and self.scorer.upper_bound(a, b, threshold) < threshold:
+            return 0.0
+        return max(self.scorer.ratio(a, b), word_similarity)
+    
+    def calculate_similarity(self, name1: str, name2: str) -> float:
+        """Calculate similarity between two names (0-1 scale)"""
+        if not name1 or not name2:
+            return 0.0
+        return self.score_prepared(self.prepare(name1), self.prepare(name2))
+    
+    def score_many(self, name: Union[str, PreparedName], candidates: Iterable[Union[str, PreparedName]],
+                   threshold: float = 0.0) -> List[float]:
+        """
+        Similarity of one name to each candidate, in candidate order. Prepare
+        candidates once with prepare() to score them against many names.
+        Scores below threshold may be reported as 0.0.
+        """
+        query = self.prepare(name)
+        return [self.score_prepared(query, self.prepare(candidate), threshold) for candidate in candidates]
+    
+    def score_matrix(self, names: Iterable[Union[str, PreparedName]], candidates: Iterable[Union[str, PreparedName]],
+                     threshold: float = 0.0) -> List[List[float]]:
+        """score_many for each of names against the same candidates"""
+        prepared = [self.prepare(candidate) for candidate in candidates]
+        return [self.score_many(name, prepared, threshold) for name in names]
     
     def check_nickname_match(self, name1: str, name2: str) -> Tuple[bool, float]:
         """Check if two names match through nickname mappings"""
-        name1_norm = self.normalize_name(name1)
-        name2_norm = self.normalize_name(name2)
-        
-        # Check direct nickname mappings
-        for full_name, nicknames in self.nickname_mappings.items():
-            full_name_norm = self.normalize_name(full_name)
-            
-            # Check if name1 matches full name and name2 matches a nickname
-            if name1_norm == full_name_norm:
-                for nickname in nicknames:
-                    if self.normalize_name(nickname) == name2_norm:
-                        return True, 0.9  # High confidence for nickname match
-            
-            # Check if name2 matches full name and name1 matches a nickname
-            if name2_norm == full_name_norm:
-                for nickname in nicknames:
-                    if self.normalize_name(nickname) == name1_norm:
-                        return True, 0.9  # High confidence for nickname match
-            
-            # Check if both names are nicknames of the same full name
-            name1_is_nickname = any(self.normalize_name(nickname) == name1_norm for nickname in nicknames)
-            name2_is_nickname = any(self.normalize_name(nickname) == name2_norm for nickname in nicknames)
-            
-            if name1_is_nickname and name2_is_nickname:
-                return True, 0.85  # High confidence for both being nicknames
-        
-        return False, 0.0
+        self.reload_nickname_mappings_if_changed()
+        return self.nickname_index.match(self.normalize_name(name1), self.normalize_name(name2))
     
     def find_potential_duplicates(self, client_data: Dict[str, Any], existing_clients: List[Any], 
                                 similarity_threshold: float = 0.7) -> List[Tuple[Any, str, float]]:
@@ -111,12 +332,17 @@ class FuzzyMatcher:
         if not client_name:
             return potential_duplicates
         
-        for existing_client in existing_clients:
+        existing_clients = list(existing_clients)
+        # Scores under the threshold are not needed: a nickname match replaces them
+        similarities = self.score_many(
+            client_name,
+            (f"{existing_client.first_name} {existing_client.last_name}".strip() for existing_client in existing_clients),
+            threshold=similarity_threshold,
+        )
+        
+        for existing_client, similarity in zip(existing_clients, similarities):
             existing_name = f"{existing_client.first_name} {existing_client.last_name}".strip()
             
-            # Calculate basic similarity
-            similarity = self.calculate_similarity(client_name, existing_name)
-            
             # Check for nickname match
             is_nickname_match, nickname_confidence = self.check_nickname_match(client_name, existing_name)
             
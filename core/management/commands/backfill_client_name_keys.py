@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Client
+from core.name_keys import refresh_name_keys
+
+
+class Command(BaseCommand):
+    help = 'Fill in or correct the stored name matching keys (normalized, Soundex and NYSIIS) of existing clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Clients read and committed per batch')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = Client.objects.count()
+        self.stdout.write(f'Checking name keys of {total} clients')
+
+        # One transaction per id range, so a large table is not locked in a single update
+        updated = 0
+        checked = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Client.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += refresh_name_keys(Client.objects.filter(id__in=ids), batch_size=1000)
+            checked += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f'  {checked}/{total} checked, {updated} updated')
+
+        self.stdout.write(self.style.SUCCESS(f'Updated name keys of {updated} clients'))
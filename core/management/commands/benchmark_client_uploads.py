@@ -0,0 +1,143 @@
+import json
+import os
+import subprocess
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from clients.upload_benchmark import (
+    UPLOAD_SHAPES, clear_benchmark_data, ensure_benchmark_programs, generate_upload_file, run_upload_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark client uploads with generated SMIS/EMHware files and write rows/sec, '
+        'query counts and peak memory per phase as JSON. Run against a local database: '
+        'benchmark clients are created and removed again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=str, default='1000,10000', help='Comma-separated row counts, e.g. 1000,10000,100000')
+        parser.add_argument('--sources', type=str, default='SMIS,EMHware', help='Comma-separated upload sources')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.05, help='Share of rows repeating an earlier person under a new client id')
+        parser.add_argument('--enrollment-ratio', type=float, default=0.5, help='Share of rows with a program enrollment')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the generated files')
+        parser.add_argument('--dry-run', action='store_true', help='Import in dry-run mode (rolled back); skips the re-import pass')
+        parser.add_argument('--output', type=str, help='JSON file to write (default: upload_benchmark_<timestamp>.json)')
+        parser.add_argument('--compare', type=str, help='Earlier benchmark JSON to compare rows/sec against')
+        parser.add_argument('--keep-data', action='store_true', help='Leave the imported benchmark clients in the database')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        sources = [source.strip() for source in options['sources'].split(',') if source.strip()]
+        unknown = [source for source in sources if source not in UPLOAD_SHAPES]
+        if unknown:
+            raise CommandError(f"Unknown source(s): {', '.join(unknown)}. Choose from {', '.join(UPLOAD_SHAPES)}.")
+
+        report = {
+            'started_at': timezone.now().isoformat(),
+            'git_commit': self.git_commit(),
+            'database': settings.DATABASES['default'].get('NAME'),
+            'settings': {
+                name: getattr(settings, name, None)
+                for name in (
+                    'CLIENT_UPLOAD_ENGINE', 'CLIENT_UPLOAD_COMMIT_PER_CHUNK', 'CLIENT_UPLOAD_SKIP_UNCHANGED',
+                    'CLIENT_UPLOAD_PARSE_WORKERS',
+                )
+            },
+            'options': {
+                'duplicate_ratio': options['duplicate_ratio'],
+                'enrollment_ratio': options['enrollment_ratio'],
+                'seed': options['seed'],
+                'dry_run': options['dry_run'],
+            },
+            'results': [],
+        }
+
+        # Smallest files first: peak memory is per process and only grows
+        with tempfile.TemporaryDirectory(prefix='upload_benchmark_') as workdir:
+            for rows in sorted(sizes):
+                for source in sources:
+                    report['results'].extend(self.benchmark(workdir, source, rows, options))
+
+        output = options['output'] or f"upload_benchmark_{timezone.now():%Y%m%d_%H%M%S}.json"
+        with open(output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2, default=str)
+        self.stdout.write(self.style.SUCCESS(f"\nWrote {output}"))
+
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def benchmark(self, workdir, source, rows, options):
+        path = os.path.join(workdir, f"{source.lower()}_{rows}.csv")
+        contents = generate_upload_file(
+            path, source, rows,
+            duplicate_ratio=options['duplicate_ratio'],
+            enrollment_ratio=options['enrollment_ratio'],
+            seed=options['seed'],
+        )
+        clear_benchmark_data()
+        ensure_benchmark_programs()
+
+        # A first import creates every client; importing the same file again measures
+        # the matching and update path on a populated table
+        passes = ['import'] if options['dry_run'] else ['import', 'reimport']
+        results = []
+        try:
+            for name in passes:
+                result = run_upload_benchmark(path, source, dry_run=options['dry_run'])
+                result.update({'source': source, 'size': rows, 'pass': name, 'file': contents})
+                results.append(result)
+                self.report_pass(result)
+                if not result['success']:
+                    break
+        finally:
+            if not options['keep_data']:
+                clear_benchmark_data()
+        return results
+
+    def report_pass(self, result):
+        label = f"{result['source']:8} {result['size']:>7} rows  {result['pass']:9}"
+        if not result['success']:
+            self.stdout.write(self.style.ERROR(f"{label} failed: {result['error']}"))
+            return
+        self.stdout.write(
+            f"{label} {result['seconds']:8.2f}s  {result['rows_per_second'] or 0:9.1f} rows/s  "
+            f"{result['queries'] or 0:6} queries  peak {result['peak_memory_mb']} MB"
+        )
+        for phase, stats in result['phases'].items():
+            self.stdout.write(
+                f"    {phase:14} {stats['seconds']:8.2f}s  {stats['queries']:6} queries  "
+                f"peak {stats.get('peak_memory_mb')} MB"
+            )
+
+    def compare(self, path, report):
+        with open(path, encoding='utf-8') as fh:
+            previous = json.load(fh)
+        baseline = {
+            (result['source'], result['size'], result['pass']): result
+            for result in previous.get('results', [])
+        }
+        self.stdout.write(f"\nCompared with {path} ({previous.get('git_commit') or 'unknown commit'}):")
+        for result in report['results']:
+            before = baseline.get((result['source'], result['size'], result['pass']))
+            if not before or not before.get('rows_per_second') or not result.get('rows_per_second'):
+                continue
+            change = (result['rows_per_second'] - before['rows_per_second']) / before['rows_per_second'] * 100
+            style = self.style.SUCCESS if change >= 0 else self.style.WARNING
+            self.stdout.write(style(
+                f"  {result['source']:8} {result['size']:>7} rows  {result['pass']:9} "
+                f"{before['rows_per_second']:9.1f} -> {result['rows_per_second']:9.1f} rows/s ({change:+.1f}%)"
+            ))
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0084_archive_test_departments'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='clientuploadlog',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('success', 'Success'), ('failed', 'Failed'), ('partial', 'Partial Success')], db_index=True, default='success', max_length=20),
+        ),
+    ]
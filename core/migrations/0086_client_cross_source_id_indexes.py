@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0085_client_upload_log_job_statuses'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['smis_id'], name='client_smis_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['emhware_id'], name='client_emhware_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['legacy_client_ids'], name='client_legacy_ids_gin_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
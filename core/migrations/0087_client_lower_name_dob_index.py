@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:40
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0086_client_cross_source_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), django.db.models.functions.text.Lower('last_name'), models.F('dob'), name='client_lower_name_dob_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0087_client_lower_name_dob_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='checkpoint_row',
+            field=models.IntegerField(default=0, help_text='Rows committed so far in commit-per-chunk mode'),
+        ),
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='checkpoint_stats',
+            field=models.JSONField(default=dict, help_text='Counters and errors of the committed chunks'),
+        ),
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='commit_mode',
+            field=models.CharField(choices=[('single', 'Single transaction'), ('chunk', 'Commit per chunk')], default='single', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='file_hash',
+            field=models.CharField(blank=True, default='', help_text='SHA-256 of the uploaded file', max_length=64),
+        ),
+    ]
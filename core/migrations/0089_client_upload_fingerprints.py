@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0088_client_upload_log_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientUploadFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.UUIDField(db_index=True, default=uuid.uuid4, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source', models.CharField(help_text='SMIS or EMHware', max_length=50)),
+                ('source_client_id', models.CharField(help_text='Client ID as it appears in the source file', max_length=100)),
+                ('row_hash', models.CharField(help_text="SHA-256 of the row's column names and values", max_length=64)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_fingerprints', to='core.client')),
+            ],
+            options={
+                'db_table': 'client_upload_fingerprints',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='clientuploadfingerprint',
+            constraint=models.UniqueConstraint(fields=('source', 'source_client_id'), name='unique_upload_fingerprint_source_client_id'),
+        ),
+    ]
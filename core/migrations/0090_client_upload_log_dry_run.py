@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0089_client_upload_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='is_dry_run',
+            field=models.BooleanField(default=False, help_text='Processed in a rolled-back transaction to produce a report'),
+        ),
+    ]
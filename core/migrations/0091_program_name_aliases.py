@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0090_client_upload_log_dry_run'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramNameAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.UUIDField(db_index=True, default=uuid.uuid4, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('alias', models.CharField(help_text='Normalized program name from the upload', max_length=255, unique=True)),
+                ('source', models.CharField(blank=True, default='', help_text='Upload source the alias was learned from', max_length=50)),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_aliases', to='core.program')),
+            ],
+            options={
+                'db_table': 'program_name_aliases',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0091_program_name_aliases'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='cancel_requested_at',
+            field=models.DateTimeField(blank=True, help_text='When a user asked to stop the upload; checked between chunks', null=True),
+        ),
+        migrations.AlterField(
+            model_name='clientuploadlog',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Queued'), ('processing', 'Processing'), ('success', 'Success'), ('failed', 'Failed'), ('partial', 'Partial Success'), ('cancelled', 'Cancelled')], db_index=True, default='success', max_length=20),
+        ),
+    ]
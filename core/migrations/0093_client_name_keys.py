@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0092_client_upload_log_cancel'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='first_name_key',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Lowercase first name with whitespace collapsed', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='first_name_nysiis',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='first_name_soundex',
+            field=models.CharField(blank=True, default='', editable=False, max_length=4),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='last_name_key',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Lowercase last name with whitespace collapsed', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='last_name_nysiis',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='client',
+            name='last_name_soundex',
+            field=models.CharField(blank=True, default='', editable=False, max_length=4),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['last_name_key', 'first_name_key', 'dob'], name='client_name_key_dob_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['last_name_soundex', 'first_name_soundex'], name='client_name_soundex_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['last_name_nysiis', 'first_name_nysiis'], name='client_name_nysiis_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:05
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0093_client_name_keys'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='client',
+            name='full_name_key',
+            field=models.CharField(blank=True, default='', editable=False, help_text='Normalized "first last" name, trigram indexed', max_length=201),
+        ),
+        # Rows already backfilled by backfill_client_name_keys; the rest get it from that command
+        migrations.RunSQL(
+            "UPDATE clients SET full_name_key = btrim(first_name_key || ' ' || last_name_key) "
+            "WHERE first_name_key <> '' OR last_name_key <> ''",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['full_name_key'], name='client_full_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
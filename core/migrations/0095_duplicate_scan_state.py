@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:14
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0094_client_full_name_trigram'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateScanState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.UUIDField(db_index=True, default=uuid.uuid4, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('scope', models.CharField(help_text='Clients the scan covers: archived or not, and source', max_length=120, unique=True)),
+                ('scanned_through', models.DateTimeField(help_text='Clients updated before this time have been compared with the rest')),
+                ('last_scan_mode', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=20)),
+                ('last_full_scan_at', models.DateTimeField(blank=True, null=True)),
+                ('clients_scanned', models.PositiveIntegerField(default=0, help_text='Clients compared by the last scan')),
+            ],
+            options={
+                'db_table': 'duplicate_scan_states',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['updated_at'], name='client_updated_at_idx'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0095_duplicate_scan_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateScanJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.UUIDField(db_index=True, default=uuid.uuid4, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('scope', models.CharField(db_index=True, help_text='DuplicateScanState.scope of the scanned clients', max_length=120)),
+                ('include_archived', models.BooleanField(default=False)),
+                ('source', models.CharField(blank=True, max_length=50, null=True)),
+                ('scan_mode', models.CharField(choices=[('full', 'Full'), ('incremental', 'Incremental')], max_length=20)),
+                ('changed_since', models.DateTimeField(blank=True, help_text='Incremental scans compare the clients updated since this time', null=True)),
+                ('auto_merge', models.BooleanField(default=True)),
+                ('result_limit', models.PositiveIntegerField(default=10, help_text='Candidates returned to the browser')),
+                ('candidate_limit', models.PositiveIntegerField(default=10000, help_text='The scan stops after finding this many candidates')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('phase', models.CharField(blank=True, default='', help_text='Phase being run', max_length=20)),
+                ('completed_phases', models.JSONField(default=list, help_text='Phases whose candidates are all saved')),
+                ('phase_candidates', models.JSONField(default=dict, help_text='Candidates found by each phase')),
+                ('clients_scanned', models.PositiveIntegerField(default=0)),
+                ('merged_count', models.PositiveIntegerField(default=0)),
+                ('flagged_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(default=list)),
+                ('merge_errors', models.JSONField(default=list)),
+                ('started_at', models.DateTimeField(blank=True, help_text='When a worker first picked the job up', null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, help_text='Last sign of life of the worker running the job', null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicate_scan_jobs', to='core.staff')),
+            ],
+            options={
+                'db_table': 'duplicate_scan_jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateScanCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('external_id', models.UUIDField(db_index=True, default=uuid.uuid4, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('primary_client_id', models.IntegerField()),
+                ('duplicate_client_id', models.IntegerField()),
+                ('phase', models.CharField(max_length=20)),
+                ('similarity_score', models.FloatField()),
+                ('details', models.JSONField(default=dict)),
+                ('outcome', models.CharField(choices=[('pending', 'Pending'), ('merged', 'Merged'), ('flagged', 'Flagged for review'), ('skipped', 'Skipped'), ('error', 'Error')], default='pending', max_length=20)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='candidates', to='core.duplicatescanjob')),
+            ],
+            options={
+                'db_table': 'duplicate_scan_candidates',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='duplicatescanjob',
+            index=models.Index(fields=['scope', 'status'], name='duplicate_s_scope_3d8350_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='duplicatescancandidate',
+            index=models.Index(fields=['job', 'outcome', 'similarity_score'], name='duplicate_s_job_id_356533_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='duplicatescancandidate',
+            constraint=models.UniqueConstraint(fields=('job', 'primary_client_id', 'duplicate_client_id'), name='unique_duplicate_scan_candidate'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0096_duplicate_scan_jobs'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='clientuploadfingerprint',
+            name='unique_upload_fingerprint_source_client_id',
+        ),
+        migrations.AddConstraint(
+            model_name='clientuploadfingerprint',
+            constraint=models.UniqueConstraint(fields=('source', 'source_client_id', 'row_hash'), name='unique_upload_fingerprint_row'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0097_upload_fingerprint_per_row'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clientuploadlog',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last progress write of a running upload; a stale one has lost its worker', null=True),
+        ),
+    ]
@@ -1,5 +1,7 @@
 import uuid
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.base_user import BaseUserManager
 from django.utils import timezone
@@ -535,11 +537,33 @@ class Client(BaseModel):
     created_by = models.CharField(max_length=255, null=True, blank=True, help_text="Name of the person who created this record")
     updated_by = models.CharField(max_length=255, null=True, blank=True, help_text="Name of the person who last updated this record")
     
+    # 🔎 NAME MATCHING KEYS (maintained from first_name / last_name, see core.name_keys)
+    full_name_key = models.CharField(max_length=201, blank=True, default='', editable=False, help_text="Normalized \"first last\" name, trigram indexed")
+    first_name_key = models.CharField(max_length=100, blank=True, default='', editable=False, help_text="Lowercase first name with whitespace collapsed")
+    last_name_key = models.CharField(max_length=100, blank=True, default='', editable=False, help_text="Lowercase last name with whitespace collapsed")
+    first_name_soundex = models.CharField(max_length=4, blank=True, default='', editable=False)
+    last_name_soundex = models.CharField(max_length=4, blank=True, default='', editable=False)
+    first_name_nysiis = models.CharField(max_length=20, blank=True, default='', editable=False)
+    last_name_nysiis = models.CharField(max_length=20, blank=True, default='', editable=False)
+    
+    def refresh_name_keys(self):
+        """Set the name matching keys from the current first and last name"""
+        from core.name_keys import client_name_keys
+        for field, value in client_name_keys(self.first_name, self.last_name).items():
+            setattr(self, field, value)
+    
     def save(self, *args, **kwargs):
         # Auto-generate external ID if not provided
         if not self.uid_external:
             self.uid_external = str(uuid.uuid4())
         
+        # Keep the name matching keys in step with the names
+        self.refresh_name_keys()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'first_name', 'last_name'} & set(update_fields):
+            from core.name_keys import NAME_KEY_FIELDS
+            kwargs['update_fields'] = set(update_fields) | set(NAME_KEY_FIELDS)
+        
         # Calculate age from DOB
         if self.dob and not self.age:
             from datetime import date
@@ -645,6 +669,8 @@ class Client(BaseModel):
         indexes = [
             # Critical for duplicate detection during uploads
             models.Index(fields=['first_name', 'last_name', 'dob'], name='client_name_dob_idx'),
+            # Case-insensitive name+DOB join used by the upload preload
+            models.Index(Lower('first_name'), Lower('last_name'), 'dob', name='client_lower_name_dob_idx'),
             # Critical for existing client lookup during uploads (composite for better performance)
             models.Index(fields=['client_id', 'source'], name='client_id_source_idx'),
             # Critical for DOB-based duplicate detection
@@ -658,6 +684,18 @@ class Client(BaseModel):
             models.Index(fields=['discharge_date'], name='client_discharge_date_idx'),
             # Legacy field index (may be used in some queries)
             models.Index(fields=['uid_external'], name='client_uid_external_idx'),
+            # Cross-source ID matching during uploads
+            models.Index(fields=['smis_id'], name='client_smis_id_idx'),
+            models.Index(fields=['emhware_id'], name='client_emhware_id_idx'),
+            GinIndex(fields=['legacy_client_ids'], name='client_legacy_ids_gin_idx', opclasses=['jsonb_path_ops']),
+            # Name matching keys for duplicate candidate lookups
+            models.Index(fields=['last_name_key', 'first_name_key', 'dob'], name='client_name_key_dob_idx'),
+            models.Index(fields=['last_name_soundex', 'first_name_soundex'], name='client_name_soundex_idx'),
+            models.Index(fields=['last_name_nysiis', 'first_name_nysiis'], name='client_name_nysiis_idx'),
+            # pg_trgm similarity search on the full name (core.client_search)
+            GinIndex(fields=['full_name_key'], name='client_full_name_trgm_idx', opclasses=['gin_trgm_ops']),
+            # Clients changed since the last incremental duplicate scan
+            models.Index(fields=['updated_at'], name='client_updated_at_idx'),
         ]
     
     def __str__(self):
@@ -1306,6 +1344,114 @@ class ClientDuplicate(BaseModel):
         self.review_notes = notes
         self.save()
 
+
+class DuplicateScanState(BaseModel):
+    """High-water mark of the duplicate scan of one client population, for incremental scans"""
+    
+    SCAN_MODES = [
+        ('full', 'Full'),
+        ('incremental', 'Incremental'),
+    ]
+    
+    # e.g. 'active' or 'all:SMIS' (clients.duplicate_scan.scan_scope)
+    scope = models.CharField(max_length=120, unique=True, help_text="Clients the scan covers: archived or not, and source")
+    scanned_through = models.DateTimeField(help_text="Clients updated before this time have been compared with the rest")
+    last_scan_mode = models.CharField(max_length=20, choices=SCAN_MODES)
+    last_full_scan_at = models.DateTimeField(null=True, blank=True)
+    clients_scanned = models.PositiveIntegerField(default=0, help_text="Clients compared by the last scan")
+    
+    class Meta:
+        db_table = 'duplicate_scan_states'
+    
+    def __str__(self):
+        return f"{self.scope} scanned through {self.scanned_through:%Y-%m-%d %H:%M}"
+
+
+class DuplicateScanJob(BaseModel):
+    """A duplicate scan run in the background (clients.duplicate_jobs), with its phase progress"""
+    
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('success', 'Success'),
+        ('failed', 'Failed'),
+    ]
+    
+    # What to scan
+    scope = models.CharField(max_length=120, db_index=True, help_text="DuplicateScanState.scope of the scanned clients")
+    include_archived = models.BooleanField(default=False)
+    source = models.CharField(max_length=50, null=True, blank=True)
+    scan_mode = models.CharField(max_length=20, choices=DuplicateScanState.SCAN_MODES)
+    changed_since = models.DateTimeField(null=True, blank=True, help_text="Incremental scans compare the clients updated since this time")
+    auto_merge = models.BooleanField(default=True)
+    result_limit = models.PositiveIntegerField(default=10, help_text="Candidates returned to the browser")
+    candidate_limit = models.PositiveIntegerField(default=10000, help_text="The scan stops after finding this many candidates")
+    
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    phase = models.CharField(max_length=20, blank=True, default='', help_text="Phase being run")
+    completed_phases = models.JSONField(default=list, help_text="Phases whose candidates are all saved")
+    phase_candidates = models.JSONField(default=dict, help_text="Candidates found by each phase")
+    clients_scanned = models.PositiveIntegerField(default=0)
+    
+    # Outcome of the merge phase
+    merged_count = models.PositiveIntegerField(default=0)
+    flagged_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list)
+    merge_errors = models.JSONField(default=list)
+    
+    requested_by = models.ForeignKey('core.Staff', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicate_scan_jobs')
+    started_at = models.DateTimeField(null=True, blank=True, help_text="When a worker first picked the job up")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last sign of life of the worker running the job")
+    completed_at = models.DateTimeField(null=True, blank=True)
+    error_message = models.TextField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'duplicate_scan_jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['scope', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"Duplicate scan {self.scope} ({self.scan_mode}) - {self.status}"
+
+
+class DuplicateScanCandidate(BaseModel):
+    """A duplicate pair found by a DuplicateScanJob, saved as soon as it is found"""
+    
+    OUTCOME_CHOICES = [
+        ('pending', 'Pending'),
+        ('merged', 'Merged'),
+        ('flagged', 'Flagged for review'),
+        ('skipped', 'Skipped'),
+        ('error', 'Error'),
+    ]
+    
+    job = models.ForeignKey(DuplicateScanJob, on_delete=models.CASCADE, related_name='candidates')
+    # Plain ids: merging deletes the duplicate client, and the candidate is kept as a record of the scan
+    primary_client_id = models.IntegerField()
+    duplicate_client_id = models.IntegerField()
+    phase = models.CharField(max_length=20)
+    similarity_score = models.FloatField()
+    # The pair as shown on the dedupe page: both clients, match type, reason and confidence
+    details = models.JSONField(default=dict)
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES, default='pending')
+    
+    class Meta:
+        db_table = 'duplicate_scan_candidates'
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'primary_client_id', 'duplicate_client_id'], name='unique_duplicate_scan_candidate'),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'outcome', 'similarity_score']),
+        ]
+    
+    def __str__(self):
+        return f"{self.primary_client_id} / {self.duplicate_client_id} ({self.phase}, {self.outcome})"
+
+
 class ProgramManagerAssignment(BaseModel):
     """Assigns a staff member with Manager role to specific programs"""
     staff = models.ForeignKey(Staff, on_delete=models.CASCADE, db_index=True, related_name='program_manager_assignments')
@@ -1576,9 +1722,12 @@ class ClientUploadLog(BaseModel):
     """Track client upload operations for performance monitoring and debugging"""
     
     STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('processing', 'Processing'),
         ('success', 'Success'),
         ('failed', 'Failed'),
         ('partial', 'Partial Success'),
+        ('cancelled', 'Cancelled'),
     ]
     
     # File information
@@ -1611,6 +1760,19 @@ class ClientUploadLog(BaseModel):
     # Additional metadata
     upload_details = models.JSONField(default=dict, help_text="Additional upload metadata")
     
+    # Checkpointing for commit-per-chunk imports
+    COMMIT_MODE_CHOICES = [
+        ('single', 'Single transaction'),
+        ('chunk', 'Commit per chunk'),
+    ]
+    commit_mode = models.CharField(max_length=10, choices=COMMIT_MODE_CHOICES, default='single')
+    file_hash = models.CharField(max_length=64, blank=True, default='', help_text="SHA-256 of the uploaded file")
+    checkpoint_row = models.IntegerField(default=0, help_text="Rows committed so far in commit-per-chunk mode")
+    checkpoint_stats = models.JSONField(default=dict, help_text="Counters and errors of the committed chunks")
+    is_dry_run = models.BooleanField(default=False, help_text="Processed in a rolled-back transaction to produce a report")
+    cancel_requested_at = models.DateTimeField(null=True, blank=True, help_text="When a user asked to stop the upload; checked between chunks")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, help_text="Last progress write of a running upload; a stale one has lost its worker")
+    
     class Meta:
         db_table = 'client_upload_logs'
         ordering = ['-started_at']
@@ -1634,4 +1796,35 @@ class ClientUploadLog(BaseModel):
         # Auto-calculate duration on save
         if self.completed_at:
             self.duration_seconds = self.calculate_duration()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ClientUploadFingerprint(BaseModel):
+    """Content hash of an imported row for a (source, client_id), used to skip unchanged rows; one per row of the client"""
+    
+    source = models.CharField(max_length=50, help_text="SMIS or EMHware")
+    source_client_id = models.CharField(max_length=100, help_text="Client ID as it appears in the source file")
+    client = models.ForeignKey(Client, on_delete=models.CASCADE, related_name='upload_fingerprints')
+    row_hash = models.CharField(max_length=64, help_text="SHA-256 of the row's column names and values")
+    
+    class Meta:
+        db_table = 'client_upload_fingerprints'
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_client_id', 'row_hash'], name='unique_upload_fingerprint_row'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.source_client_id}: {self.row_hash[:12]}"
+
+class ProgramNameAlias(BaseModel):
+    """Program name as written in upload files, learned from a fuzzy match that an import committed"""
+    
+    alias = models.CharField(max_length=255, unique=True, help_text="Normalized program name from the upload")
+    program = models.ForeignKey(Program, on_delete=models.CASCADE, related_name='name_aliases')
+    source = models.CharField(max_length=50, blank=True, default='', help_text="Upload source the alias was learned from")
+    
+    class Meta:
+        db_table = 'program_name_aliases'
+    
+    def __str__(self):
+        return f"{self.alias} -> {self.program.name}"
@@ -0,0 +1,149 @@
+"""
+Comparison keys for client names.
+
+Duplicate detection compares names after lowercasing and collapsing whitespace;
+these helpers produce that form and phonetic codes of it, so names that are
+spelled differently but sound alike can share a blocking key.
+
+Client stores the keys of its first and last name (NAME_KEY_FIELDS) so lookups
+can use indexed equality instead of normalizing names at query time. save()
+keeps them current; bulk writes call client_name_keys / refresh_name_keys, and
+the backfill_client_name_keys command fills them for existing rows.
+"""
+import unicodedata
+
+# Client columns holding the keys of the full, first and last name
+NAME_KEY_FIELDS = (
+    'full_name_key', 'first_name_key', 'last_name_key',
+    'first_name_soundex', 'last_name_soundex',
+    'first_name_nysiis', 'last_name_nysiis',
+)
+NYSIIS_MAX_LENGTH = 20
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys('bfpv', '1'),
+    **dict.fromkeys('cgjkqsxz', '2'),
+    **dict.fromkeys('dt', '3'),
+    'l': '4',
+    **dict.fromkeys('mn', '5'),
+    'r': '6',
+}
+
+
+def normalize_name(name):
+    """Lowercase with runs of whitespace collapsed, as FuzzyMatcher compares names"""
+    if not name:
+        return ""
+    return " ".join(name.lower().strip().split())
+
+
+def _ascii_letters(name):
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    return ''.join(char for char in decomposed.lower() if 'a' <= char <= 'z')
+
+
+def soundex(name):
+    """American Soundex code of a name (e.g. 'Robert' -> 'r163'), '' when it has no letters"""
+    letters = _ascii_letters(name)
+    if not letters:
+        return ''
+    code = letters[0]
+    previous = _SOUNDEX_CODES.get(letters[0], '')
+    for char in letters[1:]:
+        digit = _SOUNDEX_CODES.get(char, '')
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code; vowels do
+        if char not in 'hw':
+            previous = digit
+    return code.ljust(4, '0')
+
+
+_NYSIIS_PREFIXES = (('mac', 'mcc'), ('kn', 'nn'), ('k', 'c'), ('ph', 'ff'), ('pf', 'ff'), ('sch', 'sss'))
+_NYSIIS_SUFFIXES = (('ee', 'y'), ('ie', 'y'), ('dt', 'd'), ('rt', 'd'), ('rd', 'd'), ('nt', 'd'), ('nd', 'd'))
+_VOWELS = 'aeiou'
+
+
+def nysiis(name):
+    """NYSIIS code of a name (e.g. 'MacDonald' -> 'mcdanald'), '' when it has no letters"""
+    letters = _ascii_letters(name)
+    if not letters:
+        return ''
+    for prefix, replacement in _NYSIIS_PREFIXES:
+        if letters.startswith(prefix):
+            letters = replacement + letters[len(prefix):]
+            break
+    for suffix, replacement in _NYSIIS_SUFFIXES:
+        if letters.endswith(suffix):
+            letters = letters[:-len(suffix)] + replacement
+            break
+
+    chars = list(letters)
+    key = chars[0]
+    for i in range(1, len(chars)):
+        char = chars[i]
+        following = chars[i + 1] if i + 1 < len(chars) else ''
+        if char == 'e' and following == 'v':
+            chars[i:i + 2] = ['a', 'f']
+        elif char in _VOWELS:
+            chars[i] = 'a'
+        elif char in 'qzm':
+            chars[i] = {'q': 'g', 'z': 's', 'm': 'n'}[char]
+        elif char == 'k':
+            chars[i] = 'n' if following == 'n' else 'c'
+        elif chars[i:i + 3] == ['s', 'c', 'h']:
+            chars[i:i + 3] = ['s', 's', 's']
+        elif char == 'p' and following == 'h':
+            chars[i:i + 2] = ['f', 'f']
+        elif char == 'h' and (chars[i - 1] not in _VOWELS or following not in _VOWELS or not following):
+            chars[i] = chars[i - 1]
+        elif char == 'w' and chars[i - 1] in _VOWELS:
+            chars[i] = chars[i - 1]
+        if chars[i] != key[-1]:
+            key += chars[i]
+
+    if len(key) > 1 and key.endswith('s'):
+        key = key[:-1]
+    if key.endswith('ay'):
+        key = key[:-2] + 'y'
+    if len(key) > 1 and key.endswith('a'):
+        key = key[:-1]
+    return key[:NYSIIS_MAX_LENGTH]
+
+
+def client_name_keys(first_name, last_name):
+    """Values of NAME_KEY_FIELDS for a first and last name"""
+    return {
+        'full_name_key': normalize_name(f"{first_name or ''} {last_name or ''}")[:201],
+        'first_name_key': normalize_name(first_name)[:100],
+        'last_name_key': normalize_name(last_name)[:100],
+        'first_name_soundex': soundex(first_name),
+        'last_name_soundex': soundex(last_name),
+        'first_name_nysiis': nysiis(first_name),
+        'last_name_nysiis': nysiis(last_name),
+    }
+
+
+def refresh_name_keys(clients_qs, batch_size=1000):
+    """
+    Recompute the stored name keys of the clients in clients_qs and write the
+    ones that are out of date. Returns the number of clients updated.
+    """
+    model = clients_qs.model
+    rows = clients_qs.order_by().values_list('id', 'first_name', 'last_name', *NAME_KEY_FIELDS)
+    stale = []
+    updated = 0
+    for client_id, first_name, last_name, *stored in rows.iterator(chunk_size=batch_size):
+        keys = client_name_keys(first_name, last_name)
+        if [keys[field] for field in NAME_KEY_FIELDS] != stored:
+            stale.append(model(id=client_id, **keys))
+        if len(stale) >= batch_size:
+            model.objects.bulk_update(stale, NAME_KEY_FIELDS, batch_size=batch_size)
+            updated += len(stale)
+            stale = []
+    if stale:
+        model.objects.bulk_update(stale, NAME_KEY_FIELDS, batch_size=batch_size)
+        updated += len(stale)
+    return updated
@@ -31,6 +31,11 @@ UPLOAD_ERROR_CODES = {
         'category': 'file_size',
         'user_action': 'Please split your file into smaller chunks (recommended: <10,000 rows per file).'
     },
+    'UPLOAD_006': {
+        'message': 'File does not match the interrupted upload being resumed.',
+        'category': 'file_content',
+        'user_action': 'Resume the upload with the original file, or start a new upload.'
+    },
     
     # Validation errors (020-039)
     'UPLOAD_020': {
@@ -102,6 +107,16 @@ UPLOAD_ERROR_CODES = {
         'category': 'timeout',
         'user_action': 'Upload is taking too long. Please try a smaller file.'
     },
+    'UPLOAD_063': {
+        'message': 'Upload was cancelled.',
+        'category': 'cancelled',
+        'user_action': 'Start the upload again when you are ready. Chunks committed before the cancel are kept.'
+    },
+    'UPLOAD_064': {
+        'message': 'Another upload from this source is already running.',
+        'category': 'concurrency',
+        'user_action': 'Wait for the running upload to finish and try again.'
+    },
     
     # Business logic errors (080-099)
     'UPLOAD_080': {
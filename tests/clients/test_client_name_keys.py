@@ -0,0 +1,47 @@
+import os
+
+import django
+import pytest
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from core.models import Client
+from core.name_keys import client_name_keys, nysiis, refresh_name_keys, soundex
+
+
+def test_soundex():
+    assert [soundex(name) for name in ["Robert", "Rupert", "Ashcraft", "Tymczak", "Pfister", "Lee", "Zoë", ""]] == [
+        "r163", "r163", "a261", "t522", "p236", "l000", "z000", "",
+    ]
+
+
+def test_nysiis():
+    assert [nysiis(name) for name in ["Johnson", "MacDonald", "Knight", "Catherine", "Katherine", "Schmidt", ""]] == [
+        "jansan", "mcdanald", "nagt", "cataran", "cataran", "snad", "",
+    ]
+
+
+def test_client_name_keys():
+    assert client_name_keys("  Mary  Ann ", None) == {
+        "full_name_key": "mary ann",
+        "first_name_key": "mary ann", "last_name_key": "",
+        "first_name_soundex": "m650", "last_name_soundex": "",
+        "first_name_nysiis": "maryan", "last_name_nysiis": "",
+    }
+
+
+@pytest.mark.django_db
+def test_keys_follow_the_names_on_save_and_refresh():
+    client = Client.objects.create(first_name="Katherine", last_name="Smyth")
+    assert (client.last_name_soundex, client.first_name_nysiis) == ("s530", "cataran")
+
+    client.first_name = "Jon"
+    client.save(update_fields=["first_name"])
+    assert Client.objects.filter(first_name_key="jon", first_name_soundex="j500").exists()
+
+    Client.objects.filter(id=client.id).update(last_name="Smith", last_name_key="")
+    assert refresh_name_keys(Client.objects.all()) == 1
+    assert refresh_name_keys(Client.objects.all()) == 0
+    assert Client.objects.get(id=client.id).last_name_key == "smith"
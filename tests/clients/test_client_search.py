@@ -0,0 +1,50 @@
+import os
+from datetime import date
+
+import django
+import pytest
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from core.client_search import find_name_duplicates, similar_clients
+from core.models import Client
+
+
+@pytest.fixture
+def clients(db):
+    return {
+        name: Client.objects.create(first_name=name.split()[0], last_name=name.split()[1], dob=dob)
+        for name, dob in [
+            ("John Smith", date(1980, 1, 1)),
+            ("Jon Smith", date(1975, 6, 1)),
+            ("Johnny Smyth", date(1980, 1, 1)),
+            ("Maria Garcia", None),
+        ]
+    }
+
+
+def test_similar_clients_ranks_by_trigram_similarity(clients):
+    results = similar_clients("John", "Smith")
+
+    assert results[0][0] == clients["John Smith"] and results[0][1] == pytest.approx(1.0)
+    assert clients["Maria Garcia"] not in [client for client, _, _ in results]
+    assert [score for _, score, _ in results] == sorted((score for _, score, _ in results), reverse=True)
+
+
+def test_similar_clients_puts_same_dob_first(clients):
+    results = similar_clients("Jon", "Smith", dob=date(1980, 1, 1), limit=2)
+
+    assert [client for client, _, _ in results] == [clients["John Smith"], clients["Johnny Smyth"]]
+    assert all(same_dob for _, _, same_dob in results)
+
+
+def test_find_name_duplicates_scores_the_candidates_with_fuzzy_matcher(clients):
+    client = Client.objects.create(first_name="John", last_name="Smith")
+
+    matches = find_name_duplicates(client)
+
+    assert matches[0][0] == clients["John Smith"] and matches[0][2] == 1.0
+    assert client not in [match[0] for match in matches]
+    assert all(similarity >= 0.7 for _, _, similarity in matches)
@@ -0,0 +1,137 @@
+import os
+from datetime import date, timedelta
+
+import django
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+import clients.duplicate_jobs as duplicate_jobs
+from core.models import Client, ClientDuplicate, DuplicateScanJob, DuplicateScanState
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Job ids sent to the worker pool, instead of running them on a thread"""
+    job_ids = []
+
+    class CapturingExecutor:
+        def submit(self, fn, *args):
+            job_ids.append(args[0])
+
+    monkeypatch.setattr(duplicate_jobs, "_get_executor", lambda: CapturingExecutor())
+    return job_ids
+
+
+@pytest.fixture
+def duplicate_clients(db):
+    dob = date(1985, 3, 4)
+    return [
+        Client.objects.create(first_name="Ana", last_name="Lopez", email="ana@example.com"),
+        Client.objects.create(first_name="Anna", last_name="Lopes", email=" ANA@example.com "),
+        Client.objects.create(first_name="Tom", last_name="Reed", dob=dob),
+        Client.objects.create(first_name="Tom", last_name="Reed", dob=dob),
+        Client.objects.create(first_name="Priya", last_name="Shah"),
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_scan_is_queued_and_reports_phases(client, admin_user, settings, submitted, duplicate_clients):
+    settings.CELERY_BROKER_URL = ''
+    client.force_login(admin_user)
+
+    response = client.post(
+        reverse("clients:dedupe_run_scan"), data={"auto_merge": False, "limit": 10}, content_type="application/json",
+    )
+
+    assert response.status_code == 202
+    data = response.json()
+    job = DuplicateScanJob.objects.get(external_id=data["job_id"])
+    assert job.status == "queued" and job.scan_mode == "full"
+    assert submitted == [data["job_id"]]
+
+    duplicate_jobs.run_duplicate_scan_job(submitted[0])
+
+    status = client.get(data["status_url"]).json()
+    assert status["finished"] is True and status["status"] == "success"
+    assert status["progress"]["completed_phases"] == [key for key, _ in duplicate_jobs.PHASES]
+    assert status["progress"]["phase_candidates"]["email"] == 1
+    assert status["progress"]["phase_candidates"]["name_dob"] == 1
+    assert {item["match_type"] for item in status["result"]["results"]} == {"matching_email", "matching_name_dob"}
+    assert ClientDuplicate.objects.count() + status["result"]["merged_count"] == 2
+    assert DuplicateScanState.objects.get(scope="active").scanned_through == job.created_at
+
+
+@pytest.mark.django_db(transaction=True)
+def test_a_second_request_joins_the_running_scan(submitted, duplicate_clients):
+    job, created = duplicate_jobs.start_duplicate_scan()
+    same_job, created_again = duplicate_jobs.start_duplicate_scan()
+
+    assert created and not created_again
+    assert same_job == job
+    assert len(submitted) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_scan_resumes_without_repeating_finished_phases(monkeypatch, submitted, duplicate_clients):
+    job, _ = duplicate_jobs.start_duplicate_scan(auto_merge=False)
+    merge_candidates = duplicate_jobs.DuplicateScan.merge_candidates
+
+    def crash(self):
+        raise RuntimeError("worker lost")
+
+    monkeypatch.setattr(duplicate_jobs.DuplicateScan, "merge_candidates", crash)
+    duplicate_jobs.run_duplicate_scan_job(job.external_id)
+    job.refresh_from_db()
+    assert job.status == "failed"
+    assert "fuzzy" in job.completed_phases and "merge" not in job.completed_phases
+    saved = job.candidates.count()
+    assert saved >= 2
+
+    scanned = []
+    monkeypatch.setattr(duplicate_jobs.DuplicateScan, "merge_candidates", merge_candidates)
+    monkeypatch.setattr(duplicate_jobs.DuplicateScan, "scan_email", lambda self: scanned.append("email"))
+    assert duplicate_jobs.resume_failed_scan(job)
+    duplicate_jobs.run_duplicate_scan_job(submitted[-1])
+
+    job.refresh_from_db()
+    assert job.status == "success"
+    # Finished phases are not run again and their candidates are not saved twice
+    assert scanned == []
+    assert job.candidates.count() == saved
+    assert not job.candidates.filter(outcome="pending").exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stale_running_job_is_claimed_again(submitted, duplicate_clients):
+    job, _ = duplicate_jobs.start_duplicate_scan()
+    DuplicateScanJob.objects.filter(pk=job.pk).update(
+        status="running", heartbeat_at=timezone.now() - duplicate_jobs.STALE_AFTER - timedelta(minutes=1),
+    )
+    job.refresh_from_db()
+
+    assert duplicate_jobs.resume_if_stale(job)
+    duplicate_jobs.run_duplicate_scan_job(submitted[-1])
+
+    job.refresh_from_db()
+    assert job.status == "success"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_leader_cannot_follow_or_resume_scans(client, django_user_model, submitted):
+    from core.models import Role, Staff, StaffRole
+
+    user = django_user_model.objects.create_user(username="leader", email="leader@example.com", password="pw")
+    staff = Staff.objects.create(user=user, email="leader@example.com")
+    StaffRole.objects.create(staff=staff, role=Role.objects.create(name="Leader"))
+    job = DuplicateScanJob.objects.create(scope="active", scan_mode="full", status="failed")
+    client.force_login(user)
+
+    assert client.get(reverse("clients:dedupe_scan_status", args=[job.external_id])).status_code == 403
+    assert client.post(reverse("clients:dedupe_scan_resume", args=[job.external_id])).status_code == 403
+    job.refresh_from_db()
+    assert job.status == "failed" and submitted == []
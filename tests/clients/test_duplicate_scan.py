@@ -0,0 +1,149 @@
+import os
+import random
+from datetime import date, timedelta
+from itertools import combinations
+
+import django
+import pytest
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.duplicate_scan import (
+    candidate_pairs, find_fuzzy_duplicates, load_incremental_scan_clients, scan_client, scan_scope, score_pair,
+)
+from core.fuzzy_matching import fuzzy_matcher
+from core.models import Client
+
+FIRST_NAMES = ["John", "Jon", "Katherine", "Catherine", "Mary", "Marie", "Robert", "Bob", "Ahmed", "Li"]
+LAST_NAMES = ["Smith", "Smyth", "Khan", "Kahn", "Nguyen", "Lee", "Garcia", "Okafor", "Silva", "Patel"]
+
+
+def _client(client_id, first_name, last_name, dob=None):
+    return scan_client(client_id, first_name, last_name, dob)
+
+
+def _population(size, seed=0):
+    rng = random.Random(seed)
+    clients = []
+    for client_id in range(size):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        if rng.random() < 0.2:
+            # A typo somewhere in the first name
+            cut = rng.randint(0, len(first_name) - 1)
+            first_name = first_name[:cut] + rng.choice("aeiouy") + first_name[cut + 1:]
+        dob = date(1950, 1, 1) + timedelta(days=rng.randint(0, 400)) if rng.random() < 0.8 else None
+        clients.append(_client(client_id, first_name, last_name, dob))
+    return clients
+
+
+def _pairs(matches):
+    return {(tuple(sorted((a.id, b.id))), match_type, round(score, 6)) for a, b, match_type, _, score in matches}
+
+
+def test_score_pair_keeps_the_scan_thresholds():
+    dob = date(1980, 5, 1)
+
+    assert score_pair(_client(1, "Jon", "Smith"), _client(2, "John", "Smith"))[0] == "fuzzy_name"
+    assert score_pair(_client(1, "Bob", "Smith", dob), _client(2, "Robert", "Smith", dob))[::2] == (
+        "name_dob_similarity", 0.9,
+    )
+    # A shared birthday alone is not a duplicate
+    assert score_pair(_client(1, "Ahmed", "Silva", dob), _client(2, "Mary", "Smith", dob)) is None
+    assert score_pair(_client(1, "Mary", "Smith"), _client(2, "Marty", "Smithers")) is None
+
+
+def test_windows_covering_every_client_find_what_comparing_all_pairs_finds():
+    clients = _population(300)
+    expected = set()
+    for client1, client2 in combinations(clients, 2):
+        match = client1.initial == client2.initial and score_pair(client1, client2, fuzzy_matcher)
+        if match:
+            expected.add((tuple(sorted((client1.id, client2.id))), match[0], round(match[2], 6)))
+
+    found = list(find_fuzzy_duplicates(clients, window=len(clients), max_block=len(clients)))
+
+    assert _pairs(found) == expected
+    assert len(found) == len(expected)
+
+
+def test_default_blocking_finds_spelling_variants_across_a_large_population():
+    clients = _population(5000, seed=1)
+    dob = date(1990, 2, 3)
+    clients += [
+        _client(10001, "Katherine", "Moreau"), _client(10002, "Catherine", "Moreau"),
+        _client(10003, "Jonathon", "Fitzgerald"), _client(10004, "Jonathan", "Fitzgerald"),
+        _client(10005, "Bob", "Whitaker", dob), _client(10006, "Robert", "Whitaker", dob),
+    ]
+
+    found = {pair for pair, _, _ in _pairs(find_fuzzy_duplicates(clients, window=10, max_block=200))}
+
+    assert {(10001, 10002), (10003, 10004), (10005, 10006)} <= found
+
+
+def test_changed_ids_limit_the_scan_to_pairs_with_a_changed_client():
+    clients = _population(300)
+    changed_ids = {3, 50, 120}
+
+    everything = _pairs(find_fuzzy_duplicates(clients, window=len(clients), max_block=len(clients)))
+    changed = _pairs(
+        find_fuzzy_duplicates(clients, window=len(clients), max_block=len(clients), changed_ids=changed_ids)
+    )
+
+    assert changed == {pair for pair in everything if set(pair[0]) & changed_ids}
+
+
+def test_scan_scope_separates_the_scanned_populations():
+    assert scan_scope() == "active"
+    assert scan_scope(include_archived=True) == "all"
+    assert scan_scope(source="SMIS") == "active:SMIS"
+
+
+@pytest.mark.django_db
+def test_incremental_scan_loads_the_clients_a_changed_client_could_match():
+    dob = date(1980, 1, 1)
+    new = Client.objects.create(first_name="Katherine", last_name="Moreau")
+    same_sound = Client.objects.create(first_name="Catherine", last_name="Moreau")
+    same_dob = Client.objects.create(first_name="Kate", last_name="Mills", dob=dob)
+    new_with_dob = Client.objects.create(first_name="Kathy", last_name="Moss", dob=dob)
+    unrelated = Client.objects.create(first_name="Ahmed", last_name="Okafor")
+
+    loaded = {client.id for client in load_incremental_scan_clients(Client.objects.all(), {new.id, new_with_dob.id})}
+
+    assert {new.id, same_sound.id, same_dob.id, new_with_dob.id} <= loaded
+    assert unrelated.id not in loaded
+
+
+def _random_population(size):
+    rng = random.Random(size)
+
+    def word():
+        return "".join(rng.choice("bcdfgklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+
+    return [
+        _client(client_id, word(), word(), date(1940, 1, 1) + timedelta(days=rng.randint(0, 25000)))
+        for client_id in range(size)
+    ]
+
+
+def test_comparisons_grow_about_linearly():
+    small = sum(1 for _ in candidate_pairs(_random_population(5000), window=10, max_block=200))
+    large = sum(1 for _ in candidate_pairs(_random_population(40000), window=10, max_block=200))
+
+    assert large < small * 8 * 1.2
+    # Only the sorted windows should contribute much: 2 passes of 10 neighbours each
+    assert large < 40000 * 10 * 2 * 1.2
+
+
+def test_progress_is_reported_every_few_candidate_pairs(monkeypatch):
+    import clients.duplicate_scan as duplicate_scan
+
+    monkeypatch.setattr(duplicate_scan, "PROGRESS_EVERY_PAIRS", 10)
+    clients = _population(100)
+    pair_count = sum(1 for _ in candidate_pairs(clients, len(clients), len(clients)))
+    calls = []
+
+    list(find_fuzzy_duplicates(clients, window=len(clients), max_block=len(clients), progress=lambda: calls.append(1)))
+
+    assert len(calls) == pair_count // 10 > 0
@@ -0,0 +1,138 @@
+import json
+import os
+import random
+
+import django
+import pytest
+from django.test import override_settings
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from core.fuzzy_matching import FuzzyMatcher, NicknameIndex, get_scorer, indel_similarity, jaro_winkler, lcs_length
+from core.name_keys import normalize_name
+
+NAMES = [
+    "John Smith", "Jon Smith", "Johnny Smyth", "Katherine Moreau", "Catherine Moreau", "Mary Lee",
+    "Marie Leigh", "Robert Anderson", "Bob Anderson", "Ahmed Khan", "Ahmad Kahn", "Li Nguyen",
+    "Smith John", "John", "", "   ", "Maria Garcia-Lopez", "Mari Garcia",
+]
+
+
+def _lcs_table(a, b):
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def test_lcs_length_matches_dynamic_programming():
+    rng = random.Random(0)
+    for _ in range(500):
+        a = "".join(rng.choice("abcde ") for _ in range(rng.randint(0, 70)))
+        b = "".join(rng.choice("abcde ") for _ in range(rng.randint(0, 70)))
+        assert lcs_length(a, b) == _lcs_table(a, b)
+
+
+def test_jaro_winkler_known_values():
+    assert jaro_winkler("martha", "marhta") == pytest.approx(0.961, abs=0.001)
+    assert jaro_winkler("dwayne", "duane") == pytest.approx(0.84, abs=0.001)
+    assert jaro_winkler("abc", "xyz") == 0.0
+    assert jaro_winkler("same", "same") == 1.0
+
+
+def test_indel_similarity_is_never_below_the_difflib_ratio():
+    difflib = get_scorer("difflib")
+    for name1 in NAMES:
+        for name2 in NAMES:
+            assert indel_similarity(name1, name2) >= difflib.ratio(name1, name2) - 1e-9
+
+
+@pytest.mark.parametrize("scorer", ["difflib", "indel", "jaro_winkler"])
+@pytest.mark.parametrize("threshold", [0.0, 0.7, 0.88])
+def test_batch_scores_match_pairwise_scores_at_or_above_the_threshold(scorer, threshold):
+    matcher = FuzzyMatcher(scorer=scorer)
+    matrix = matcher.score_matrix(NAMES, NAMES, threshold=threshold)
+
+    for name, row in zip(NAMES, matrix):
+        assert row == matcher.score_many(name, NAMES, threshold=threshold)
+        for candidate, score in zip(NAMES, row):
+            expected = matcher.score_prepared(matcher.prepare(name), matcher.prepare(candidate))
+            if expected >= threshold:
+                assert score == expected
+            else:
+                assert score < threshold
+
+
+def test_default_scorer_keeps_sequence_matcher_scores():
+    matcher = FuzzyMatcher()
+
+    assert matcher.scorer.name == "difflib"
+    assert matcher.calculate_similarity("Jon Smith", "John Smith") == pytest.approx(18 / 19)
+    assert matcher.calculate_similarity("John", "John Smith") == 0.8
+    # Same words in another order
+    assert matcher.calculate_similarity("Smith John", "John Smith") == 1.0
+    assert matcher.calculate_similarity("", "John") == 0.0
+
+
+def test_unknown_scorer_is_rejected():
+    with pytest.raises(ValueError):
+        get_scorer("soundex")
+
+
+def _scan_nickname_mappings(mappings, name1, name2):
+    """check_nickname_match as it was before the index: a pass over every entry"""
+    def normalize(name):
+        return " ".join(name.lower().strip().split())
+
+    name1, name2 = normalize(name1), normalize(name2)
+    for full_name, nicknames in mappings.items():
+        nicknames = [normalize(nickname) for nickname in nicknames]
+        if name1 == normalize(full_name) and name2 in nicknames:
+            return True, 0.9
+        if name2 == normalize(full_name) and name1 in nicknames:
+            return True, 0.9
+        if name1 in nicknames and name2 in nicknames:
+            return True, 0.85
+    return False, 0.0
+
+
+def test_nickname_index_agrees_with_checking_every_entry():
+    rng = random.Random(3)
+    words = ["Al", "Bo", "Cy", "Di", "Ed", "Al Bo", "Cy Di", "Bo Al", " ed "]
+    for _ in range(50):
+        mappings = {
+            rng.choice(words) + str(entry % 3): rng.sample(words, 3) + [rng.choice(words) + str(entry % 3)]
+            for entry in range(8)
+        }
+        index = NicknameIndex(mappings, normalize_name)
+        names = words + list(mappings)
+        for name1 in names:
+            for name2 in names:
+                expected = _scan_nickname_mappings(mappings, name1, name2)
+                assert index.match(normalize_name(name1), normalize_name(name2)) == expected
+
+
+def test_nickname_mappings_reload_when_the_file_changes(tmp_path):
+    nickname_file = tmp_path / "nicknames.json"
+    nickname_file.write_text(json.dumps({"William Jones": ["Bill", "Will"]}))
+
+    with override_settings(NICKNAME_MAPPINGS_FILE=str(nickname_file), NICKNAME_MAPPINGS_RELOAD_SECONDS=0):
+        matcher = FuzzyMatcher()
+        assert matcher.check_nickname_match("Bill", "William Jones") == (True, 0.9)
+        assert matcher.check_nickname_match("Bill", "Will") == (True, 0.85)
+        assert matcher.check_nickname_match("Peggy", "Margaret") == (False, 0.0)
+
+        nickname_file.write_text(json.dumps({"Margaret": ["Peggy", "Maggie"]}))
+        os.utime(nickname_file, (1, 1))
+        assert matcher.check_nickname_match("Peggy", "Margaret") == (True, 0.9)
+        assert matcher.check_nickname_match("Bill", "Will") == (False, 0.0)
+
+        # A broken edit keeps the mappings that were loaded
+        nickname_file.write_text("{")
+        os.utime(nickname_file, (2, 2))
+        assert matcher.check_nickname_match("Peggy", "Maggie") == (True, 0.85)
@@ -15,7 +15,10 @@ from core.models import Client
 
 
 @pytest.mark.django_db(transaction=True)
-def test_upload_rolls_back_on_bulk_create_failure(client, monkeypatch):
+def test_upload_rolls_back_on_bulk_create_failure(client, monkeypatch, settings):
+    # Process inline so the response reflects the outcome of the import
+    settings.CLIENT_UPLOAD_BACKGROUND = False
+
     # Build a minimal valid CSV that results in a new client creation
     csv_io = io.StringIO()
     writer = csv.writer(csv_io)
@@ -0,0 +1,71 @@
+import csv
+import os
+
+import django
+import pytest
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_benchmark import (
+    BENCHMARK_ID_PREFIX, UPLOAD_SHAPES, clear_benchmark_data, ensure_benchmark_programs, generate_upload_file,
+    run_upload_benchmark,
+)
+from core.models import Client
+
+
+def _read(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        return list(csv.DictReader(fh))
+
+
+@pytest.mark.parametrize("source", list(UPLOAD_SHAPES))
+def test_generated_file_has_the_requested_shape(tmp_path, source):
+    path = tmp_path / "upload.csv"
+    counts = generate_upload_file(path, source, 2000, duplicate_ratio=0.1, enrollment_ratio=0.4, seed=3)
+    rows = _read(path)
+
+    assert list(rows[0]) == UPLOAD_SHAPES[source]["columns"]
+    assert len(rows) == counts["rows"] == 2000
+    assert len({row["Client ID"] for row in rows}) == 2000
+    assert all(row["Client ID"].startswith(BENCHMARK_ID_PREFIX) for row in rows)
+    assert 150 <= counts["possible_duplicates"] <= 250
+    assert 700 <= counts["enrollments"] <= 900
+
+    program_column = "Program" if source == "SMIS" else "Program Name"
+    assert sum(1 for row in rows if row[program_column]) == counts["enrollments"]
+
+
+def test_generated_file_is_deterministic(tmp_path):
+    first, second, other = tmp_path / "a.csv", tmp_path / "b.csv", tmp_path / "c.csv"
+    generate_upload_file(first, "EMHware", 500, seed=1)
+    generate_upload_file(second, "EMHware", 500, seed=1)
+    generate_upload_file(other, "EMHware", 500, seed=2)
+
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+
+
+@pytest.mark.benchmark
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("source", list(UPLOAD_SHAPES))
+def test_upload_throughput(tmp_path, source):
+    path = tmp_path / "upload.csv"
+    counts = generate_upload_file(path, source, 1000)
+    ensure_benchmark_programs()
+    try:
+        result = run_upload_benchmark(path, source)
+
+        assert result["success"], result["error"]
+        assert result["rows"] == 1000
+        assert result["rows_per_second"] > 0
+        assert result["queries"] > 0
+        assert result["peak_memory_mb"] > 0
+        assert result["phases"]
+        assert all(phase["queries"] >= 0 and phase["seconds"] >= 0 for phase in result["phases"].values())
+        assert Client.objects.filter(client_id__startswith=BENCHMARK_ID_PREFIX).exists()
+        print(f"{source}: {result['rows_per_second']} rows/s, {result['queries']} queries, "
+              f"{counts['possible_duplicates']} possible duplicates")
+    finally:
+        clear_benchmark_data()
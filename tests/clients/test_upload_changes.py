@@ -0,0 +1,107 @@
+import io
+import os
+import csv
+import pytest
+import django
+import pandas as pd
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_changes import UploadFingerprintIndex, changed_update_fields, chunk_row_hashes, header_digest
+from core.models import Client, ClientUploadFingerprint
+
+
+def build_csv_upload(rows):
+    csv_io = io.StringIO()
+    writer = csv.writer(csv_io)
+    writer.writerow(["client_id", "first_name", "last_name", "dob"])
+    writer.writerows(rows)
+    return SimpleUploadedFile("clients.csv", csv_io.getvalue().encode("utf-8"), content_type="text/csv")
+
+
+def test_row_hashes_follow_values_and_layout():
+    columns = ["Client ID", "First Name"]
+    mapping = {"Client ID": "client_id", "First Name": "first_name"}
+    digest = header_digest(columns, mapping)
+    df = pd.DataFrame([["1001", " Alex "], ["1001", "Alex"], ["1001", "Alexander"], ["1001", None]], columns=columns)
+
+    hashes = chunk_row_hashes(df, digest).tolist()
+
+    # Surrounding whitespace is ignored, values are not
+    assert hashes[0] == hashes[1]
+    assert hashes[2] != hashes[0]
+    assert hashes[3] != hashes[0]
+    # Remapping a column changes every row's hash
+    remapped = header_digest(columns, {"Client ID": "client_id", "First Name": "preferred_name"})
+    assert chunk_row_hashes(df, remapped).tolist()[0] != hashes[0]
+
+
+@pytest.mark.django_db
+def test_changed_update_fields_keeps_only_changed_clients_and_columns():
+    alex = Client.objects.create(client_id="4001", first_name="Alex", last_name="Morgan")
+    sam = Client.objects.create(client_id="4002", first_name="Sam", last_name="Lee")
+    alex.last_name = "Morgan-Lee"
+
+    clients, fields = changed_update_fields([alex, sam], ["first_name", "last_name", "email"])
+
+    assert clients == [alex]
+    assert fields == ["last_name"]
+
+
+@pytest.mark.django_db
+def test_every_row_of_a_multi_row_client_keeps_its_fingerprint():
+    alex = Client.objects.create(client_id="4201", first_name="Alex", last_name="Morgan")
+    columns = ["Client ID", "Program"]
+    mapping = {"Client ID": "client_id", "Program": "program"}
+    rows = pd.DataFrame([["4201", "Emergency Shelter"], ["4201", "Housing First"]], columns=columns)
+
+    def import_rows(df):
+        index = UploadFingerprintIndex("SMIS", columns, mapping)
+        index.scan([df])
+        for row_index in index.changed_rows:
+            index.record(row_index, alex)
+        index.flush()
+        return index
+
+    first = import_rows(rows)
+    assert (len(first.changed_rows), first.unchanged_rows) == (2, set())
+    assert ClientUploadFingerprint.objects.filter(source="SMIS", source_client_id="4201").count() == 2
+
+    # Both rows match a stored hash, not just the last one imported
+    assert import_rows(rows).unchanged_rows == {0, 1}
+
+    rows.loc[1, "Program"] = "Youth Shelter"
+    changed = import_rows(rows)
+    assert (set(changed.changed_rows), changed.unchanged_rows) == ({1}, {0})
+    # The replaced row's hash is dropped, so the old row is imported again if it comes back
+    assert set(ClientUploadFingerprint.objects.values_list("row_hash", flat=True)) == set(
+        chunk_row_hashes(rows, header_digest(columns, mapping))
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_repeated_upload_skips_unchanged_rows(client, settings):
+    settings.CLIENT_UPLOAD_BACKGROUND = False
+    settings.CLIENT_UPLOAD_ENGINE = "python"
+    rows = [
+        ["4101", "Alex", "Morgan", "1990-01-02"],
+        ["4102", "Sam", "Lee", "1985-03-04"],
+    ]
+
+    first = client.post(reverse("clients:upload_process"), {"file": build_csv_upload(rows), "source": "SMIS"})
+    assert first.json()["stats"]["created"] == 2
+    assert ClientUploadFingerprint.objects.filter(source="SMIS").count() == 2
+
+    again = client.post(reverse("clients:upload_process"), {"file": build_csv_upload(rows), "source": "SMIS"})
+    stats = again.json()["stats"]
+    assert (stats["created"], stats["updated"], stats["skipped"], stats["unchanged"]) == (0, 0, 2, 2)
+
+    rows[1][1] = "Samuel"
+    changed = client.post(reverse("clients:upload_process"), {"file": build_csv_upload(rows), "source": "SMIS"})
+    stats = changed.json()["stats"]
+    assert (stats["updated"], stats["unchanged"]) == (1, 1)
+    assert Client.objects.get(client_id="4102").first_name == "Samuel"
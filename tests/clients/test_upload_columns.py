@@ -0,0 +1,72 @@
+import os
+from datetime import date
+
+import django
+import numpy as np
+import pandas as pd
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_columns import clean_client_id_column, collect_upload_keys
+
+
+def test_collect_upload_keys_normalizes_whole_columns():
+    df = pd.DataFrame({
+        "Client ID": [2765.0, np.nan, 12, 2765.0],
+        "Email": [" Alex@Example.com", None, "", "alex@example.com"],
+        "First Name": ["Alex", "Sam", None, "Alex"],
+        "Last Name": ["Morgan", "Lee", "Park", "Morgan"],
+        "DOB": ["01/02/1990", "1985-03-04", None, "not a date"],
+        "External ID": [None, " ext-1 ", "", np.nan],
+    })
+    column_mapping = {
+        "Client ID": "client_id",
+        "Email": "email",
+        "First Name": "first_name",
+        "Last Name": "last_name",
+        "DOB": "dob",
+        "External ID": "uid_external",
+    }
+
+    keys = collect_upload_keys(df, column_mapping)
+
+    assert keys["client_ids"] == ["2765", "12"]
+    assert keys["emails"] == ["alex@example.com"]
+    assert keys["phones"] == []
+    assert keys["dobs"] == {date(1990, 1, 2), date(1985, 3, 4)}
+    assert keys["name_dob_combos"] == {
+        ("alex", "morgan", date(1990, 1, 2)),
+        ("sam", "lee", date(1985, 3, 4)),
+    }
+    assert keys["external_ids"] == {"ext-1"}
+
+
+def test_collect_upload_keys_uses_first_non_empty_mapped_column():
+    df = pd.DataFrame({"Phone": ["", "5551112222"], "Mobile": ["5559990000", "5553334444"]})
+
+    keys = collect_upload_keys(df, {"Phone": "phone", "Mobile": "phone"})
+
+    assert keys["phones"] == ["5559990000", "5551112222"]
+
+
+def test_clean_client_id_column_matches_row_cleaning():
+    values = pd.Series(["2765.0", "A.1", "null", "12", "1.5", ""])
+
+    assert clean_client_id_column(values).tolist() == ["2765", "", "", "12", "1.5", ""]
+
+
+def test_collect_upload_keys_gathers_cross_source_ids():
+    df = pd.DataFrame({
+        "Client ID": [2765.0, np.nan, 12.0],
+        "EMHware ID": [" E-9 ", None, ""],
+        "Client": ["Morgan, Alex (4410)", "Lee, Sam", None],
+        "Notes": ["id 77", None, None],
+    })
+    column_mapping = {"Client ID": "client_id", "Client": "client_combined"}
+
+    keys = collect_upload_keys(df, column_mapping)
+
+    # Whole-number ids are kept as read and cleaned, like the row loop looks them up
+    assert keys["source_ids"] == {"2765.0", "2765", "12.0", "12", "E-9", "4410"}
@@ -0,0 +1,59 @@
+import os
+from datetime import date
+
+import django
+import pandas as pd
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_columns import parse_dob_column
+from clients.upload_dates import NEEDS_FALLBACK, infer_date_format, parse_date_column
+from clients.upload_row_mapper import UploadRowMapper, parse_date
+
+
+def test_infer_date_format_reads_day_first_columns_consistently():
+    # 05/12/2024 alone is ambiguous; 25/12/2024 settles the column as day-first
+    column = pd.Series(["05/12/2024", "25/12/2024", "", "01/02/2023"], dtype=object)
+
+    assert infer_date_format(column) == "%d/%m/%Y"
+    assert infer_date_format(pd.Series(["05/12/2024", "01/02/2023"])) == "%m/%d/%Y"
+    assert infer_date_format(pd.Series(["not a date", "unknown", "2024-01-02"])) is None
+    assert infer_date_format(pd.Series([45000.0, 45001.0])) is None
+
+
+def test_parse_date_column_leaves_unfitting_cells_to_parse_date():
+    column = pd.Series(["2024-01-02", " 2024-03-04 ", None, "45000", "Dec 5, 2024"], dtype=object)
+
+    parsed = parse_date_column(column, "%Y-%m-%d").tolist()
+
+    assert parsed[:3] == [date(2024, 1, 2), date(2024, 3, 4), None]
+    assert parsed[3] is NEEDS_FALLBACK and parsed[4] is NEEDS_FALLBACK
+    assert parse_date("45000") == date(2023, 3, 15)
+
+
+def test_parse_chunk_matches_per_cell_parsing():
+    columns = ["Client ID", "DOB", "Intake Date", "Service End Date"]
+    mapping = {"Client ID": "client_id", "DOB": "dob", "Intake Date": "intake_date",
+               "Service End Date": "service_end_date"}
+    df = pd.DataFrame([
+        ["1", "1990-01-02", "2024-02-01", "2024-06-30"],
+        ["2", "yes", "45000", ""],
+        ["3", "Jan 3, 1980", "2024-02-01 09:30:00", "bad"],
+    ], columns=columns)
+
+    inline = UploadRowMapper(columns, mapping).parse_chunk(df, "SMIS")
+    mapper = UploadRowMapper(columns, mapping, {"dob": "%Y-%m-%d", "intake_date": "%Y-%m-%d",
+                                                "service_end_date": "%Y-%m-%d"})
+    vectorized = mapper.parse_chunk(df, "SMIS")
+
+    assert [row.client_data for row in vectorized] == [row.client_data for row in inline]
+    assert [row.intake_date for row in vectorized] == [date(2024, 2, 1), date(2023, 3, 15), date(2024, 2, 1)]
+    assert [row.dob for row in vectorized] == [date(1990, 1, 2), None, date(1980, 1, 3)]
+
+
+def test_dob_preload_uses_the_inferred_format():
+    column = pd.Series(["03/04/1990", "1900-01-01", "31/12/1985"], dtype=object)
+
+    assert parse_dob_column(column, "%d/%m/%Y").tolist() == [date(1990, 4, 3), None, date(1985, 12, 31)]
@@ -0,0 +1,76 @@
+import os
+from datetime import date
+
+import pytest
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_enrollments import UploadEnrollmentIndex
+from core.models import Client, ClientProgramEnrollment, Department, Intake, Program
+
+
+@pytest.mark.django_db
+def test_enrollment_index_prefetches_once_per_chunk():
+    department = Department.objects.create(name="Housing")
+    program = Program.objects.create(name="Shelter", department=department, location="Toronto")
+    alex = Client.objects.create(client_id="5001", first_name="Alex", last_name="Morgan")
+    sam = Client.objects.create(client_id="5002", first_name="Sam", last_name="Lee")
+    Intake.objects.create(client=alex, program=program, intake_date=date(2024, 1, 1))
+    ClientProgramEnrollment.objects.create(client=alex, program=program, start_date=date(2023, 1, 1))
+    ClientProgramEnrollment.objects.create(client=alex, program=program, start_date=date(2024, 1, 1))
+    ClientProgramEnrollment.objects.create(
+        client=alex, program=program, start_date=date(2022, 1, 1), is_archived=True
+    )
+
+    index = UploadEnrollmentIndex()
+    with CaptureQueriesContext(connection) as queries:
+        index.prefetch([alex.id, sam.id])
+        enrollments = index.get_enrollments(alex, program)
+        assert index.get_intake(alex, program) is not None
+        assert index.get_intake(sam, program) is None
+    assert len(queries) == 2
+
+    # Archived enrollments are left out, latest start first
+    assert [e.start_date for e in enrollments] == [date(2024, 1, 1), date(2023, 1, 1)]
+    assert index.find_open_ended(alex, program, exclude_start_date=date(2024, 1, 1)).start_date == date(2023, 1, 1)
+
+    # Enrollments written during the upload are visible to later rows
+    created = ClientProgramEnrollment.objects.create(client=sam, program=program, start_date=date(2024, 6, 1))
+    index.add_enrollment(sam, program, created)
+    assert index.get_enrollments(sam, program) == [created]
+    assert index.get_upload_intake(alex, program) is None
+
+
+@pytest.mark.django_db
+def test_enrollment_index_flushes_pending_writes_in_bulk():
+    department = Department.objects.create(name="Health")
+    program = Program.objects.create(name="Clinic", department=department, location="Toronto")
+    client = Client.objects.create(client_id="5003", first_name="Jo", last_name="Park", is_inactive=True)
+    archived = ClientProgramEnrollment.objects.create(client=client, program=program, start_date=date(2023, 1, 1))
+
+    index = UploadEnrollmentIndex()
+    enrollment, created = index.get_or_create_enrollment(
+        client, program, date(2024, 1, 1), defaults={"status": "active"}
+    )
+    assert created and enrollment.pk is None
+    # Later rows in the chunk see the pending enrollment
+    assert index.get_or_create_enrollment(client, program, date(2024, 1, 1), defaults={}) == (enrollment, False)
+    index.create_intake(client, program, intake_date=date(2024, 1, 1))
+    archived.is_archived = True
+    index.save_enrollment(archived)
+    index.refresh_client_status(client)
+
+    summary = index.flush()
+
+    assert summary["enrollments_created"] == 1
+    assert summary["enrollments_updated"] == 1
+    assert enrollment.pk is not None
+    assert Intake.objects.filter(client=client, program=program).count() == 1
+    assert ClientProgramEnrollment.objects.get(pk=archived.pk).is_archived
+    client.refresh_from_db()
+    assert not client.is_inactive
@@ -0,0 +1,367 @@
+import io
+import os
+import csv
+import pytest
+import django
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from core.models import Client, ClientUploadLog
+
+
+def build_csv_upload():
+    csv_io = io.StringIO()
+    writer = csv.writer(csv_io)
+    writer.writerow(["client_id", "first_name", "last_name", "phone"])
+    writer.writerow(["2001", "Jamie", "Rivera", "5553334444"])
+    return SimpleUploadedFile(
+        "clients.csv",
+        csv_io.getvalue().encode("utf-8"),
+        content_type="text/csv",
+    )
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "progress"])
+def test_upload_is_queued_and_reports_progress(client, admin_user, monkeypatch, settings, tmp_path):
+    settings.CLIENT_UPLOAD_BACKGROUND = True
+    settings.CELERY_BROKER_URL = ''
+    settings.MEDIA_ROOT = str(tmp_path)
+
+    # Capture the job instead of letting the thread pool pick it up
+    import clients.upload_jobs as upload_jobs
+    submitted = []
+
+    class CapturingExecutor:
+        def submit(self, fn, *args):
+            submitted.append(args)
+
+    monkeypatch.setattr(upload_jobs, "_get_executor", lambda: CapturingExecutor())
+
+    response = client.post(reverse("clients:upload_process"), {"file": build_csv_upload(), "source": "SMIS"})
+
+    assert response.status_code == 202
+    data = response.json()
+    assert data["queued"] is True
+    upload_log = ClientUploadLog.objects.get(external_id=data["upload_id"])
+    assert upload_log.status == "queued"
+    assert upload_log.upload_details["progress"]["status"] == "queued"
+    assert os.path.exists(upload_jobs.get_upload_file_path(upload_log))
+    assert Client.objects.filter(client_id="2001").count() == 0
+
+    # Run the job the way the worker would
+    upload_id, user_id = submitted[0]
+    upload_jobs.run_client_upload_job(upload_id, user_id)
+
+    client.force_login(admin_user)
+    status = client.get(data["status_url"]).json()
+    assert status["finished"] is True
+    assert status["status"] == "success"
+    assert status["progress"]["percentage"] == 100
+    assert status["result"]["stats"]["created"] == 1
+    assert Client.objects.filter(client_id="2001").count() == 1
+    assert not os.path.exists(upload_jobs.get_upload_file_path(upload_log))
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "progress"])
+def test_job_is_not_processed_twice(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    from django.utils import timezone
+    import clients.upload_jobs as upload_jobs
+
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv",
+        file_size=10,
+        file_type="csv",
+        source="SMIS",
+        started_at=timezone.now(),
+        status="processing",
+    )
+
+    upload_jobs.run_client_upload_job(str(upload_log.external_id))
+
+    upload_log.refresh_from_db()
+    assert upload_log.status == "processing"
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "progress"])
+def test_commit_per_chunk_upload_resumes_from_checkpoint(client, admin_user, monkeypatch, settings, tmp_path):
+    settings.CLIENT_UPLOAD_BACKGROUND = True
+    settings.CELERY_BROKER_URL = ''
+    settings.MEDIA_ROOT = str(tmp_path)
+
+    import clients.upload_jobs as upload_jobs
+    import clients.views as views
+    submitted = []
+
+    class CapturingExecutor:
+        def submit(self, fn, *args):
+            submitted.append(args)
+
+    monkeypatch.setattr(upload_jobs, "_get_executor", lambda: CapturingExecutor())
+
+    # Two chunks of the upload's 1000-row chunk size
+    csv_io = io.StringIO()
+    writer = csv.writer(csv_io)
+    writer.writerow(["client_id", "first_name", "last_name"])
+    writer.writerows([str(3000 + i), f"First{i}", f"Last{i}"] for i in range(1500))
+    upload = SimpleUploadedFile("clients.csv", csv_io.getvalue().encode("utf-8"), content_type="text/csv")
+
+    response = client.post(reverse("clients:upload_process"), {"file": upload, "source": "SMIS", "commit_mode": "chunk"})
+    upload_id = response.json()["upload_id"]
+
+    # Fail the second chunk's bulk insert
+    original_bulk_create = views.Client.objects.bulk_create
+    calls = []
+
+    def fail_second_chunk(objs, batch_size=None):
+        calls.append(len(objs))
+        if len(calls) == 2:
+            raise RuntimeError("Connection dropped")
+        return original_bulk_create(objs, batch_size=batch_size)
+
+    monkeypatch.setattr(views.Client.objects, "bulk_create", fail_second_chunk)
+    upload_jobs.run_client_upload_job(*submitted.pop())
+
+    upload_log = ClientUploadLog.objects.get(external_id=upload_id)
+    assert upload_log.status == "failed"
+    assert upload_log.checkpoint_row == 1000
+    assert upload_log.file_hash
+    assert Client.objects.filter(client_id__startswith="3").count() == 1000
+    assert upload_jobs.is_resumable(upload_log)
+
+    monkeypatch.setattr(views.Client.objects, "bulk_create", original_bulk_create)
+    client.force_login(admin_user)
+    resumed = client.post(reverse("clients:upload_resume", args=[upload_id]))
+    assert resumed.status_code == 202
+    upload_jobs.run_client_upload_job(*submitted.pop())
+
+    upload_log.refresh_from_db()
+    assert upload_log.status == "success"
+    assert upload_log.records_created == 1500
+    assert Client.objects.filter(client_id__startswith="3").count() == 1500
+    assert not os.path.exists(upload_jobs.get_upload_file_path(upload_log))
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "progress"])
+def test_queued_upload_can_be_cancelled_and_reports_queue_position(client, admin_user, monkeypatch, settings, tmp_path):
+    settings.CLIENT_UPLOAD_BACKGROUND = True
+    settings.CELERY_BROKER_URL = ''
+    settings.MEDIA_ROOT = str(tmp_path)
+
+    import clients.upload_jobs as upload_jobs
+    submitted = []
+
+    class CapturingExecutor:
+        def submit(self, fn, *args):
+            submitted.append(args)
+
+    monkeypatch.setattr(upload_jobs, "_get_executor", lambda: CapturingExecutor())
+
+    first = client.post(reverse("clients:upload_process"), {"file": build_csv_upload(), "source": "SMIS"}).json()
+    second = client.post(reverse("clients:upload_process"), {"file": build_csv_upload(), "source": "SMIS"}).json()
+    assert (first["queue_position"], second["queue_position"]) == (1, 2)
+
+    client.force_login(admin_user)
+    response = client.post(first["cancel_url"])
+    assert response.status_code == 200
+    upload_log = ClientUploadLog.objects.get(external_id=first["upload_id"])
+    assert upload_log.status == "cancelled"
+    assert not os.path.exists(upload_jobs.get_upload_file_path(upload_log))
+    assert client.get(second["status_url"]).json()["queue_position"] == 1
+
+    # The cancelled job is not picked up by its worker
+    upload_jobs.run_client_upload_job(*submitted[0])
+    assert ClientUploadLog.objects.get(external_id=first["upload_id"]).status == "cancelled"
+    assert Client.objects.filter(client_id="2001").count() == 0
+    assert client.post(first["cancel_url"]).status_code == 400
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "progress"])
+def test_running_upload_stops_at_next_chunk_when_cancelled(admin_user, monkeypatch, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    import clients.upload_jobs as upload_jobs
+    from django.utils import timezone
+
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=timezone.now(), status="queued",
+    )
+    upload_jobs.store_upload_file(upload_log, build_csv_upload())
+    # The cancel arrives while the job is running
+    monkeypatch.setattr(upload_jobs, "is_cancel_requested", lambda upload_log: True)
+
+    upload_jobs.run_client_upload_job(str(upload_log.external_id), admin_user.pk)
+
+    upload_log.refresh_from_db()
+    assert upload_log.status == "cancelled"
+    assert upload_log.upload_details["progress"]["status"] == "cancelled"
+    assert upload_log.upload_details["result"]["error_code"] == "UPLOAD_063"
+    assert Client.objects.filter(client_id="2001").count() == 0
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "progress"])
+def test_job_waits_while_its_source_has_no_free_slot(monkeypatch, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.CLIENT_UPLOAD_SOURCE_CONCURRENCY = 1
+    import clients.upload_jobs as upload_jobs
+    from django.utils import timezone
+
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=timezone.now(), status="queued",
+    )
+    retried = []
+    monkeypatch.setattr(upload_jobs, "_submit", lambda *args, **kwargs: retried.append(kwargs))
+
+    # Another SMIS import holds the only slot on its own connection
+    from django.db import connections
+    with connections["progress"].cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_lock(%s, %s)",
+            [upload_jobs.UPLOAD_LOCK_NAMESPACE, upload_jobs._slot_lock_key("SMIS", 0)],
+        )
+        try:
+            upload_jobs.run_client_upload_job(str(upload_log.external_id))
+        finally:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(%s, %s)",
+                [upload_jobs.UPLOAD_LOCK_NAMESPACE, upload_jobs._slot_lock_key("SMIS", 0)],
+            )
+
+    assert retried == [{"countdown": upload_jobs.SLOT_RETRY_SECONDS}]
+    upload_log.refresh_from_db()
+    assert upload_log.status == "queued"
+
+
+def create_staff_user(django_user_model, username, role_name):
+    from core.models import Role, Staff, StaffRole
+
+    user = django_user_model.objects.create_user(username=username, email=f"{username}@example.com", password="pw")
+    staff = Staff.objects.create(user=user, email=f"{username}@example.com")
+    role, _ = Role.objects.get_or_create(name=role_name)
+    StaffRole.objects.create(staff=staff, role=role)
+    return user, staff
+
+
+@pytest.mark.django_db(databases=["default", "progress"])
+def test_staff_role_users_only_see_their_own_uploads(client, django_user_model):
+    from django.utils import timezone
+
+    user, staff = create_staff_user(django_user_model, "caseworker", "Staff")
+    _, other_staff = create_staff_user(django_user_model, "teammate", "Staff")
+    own_upload = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=timezone.now(), status="queued", uploaded_by=staff,
+    )
+    other_upload = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=timezone.now(), status="queued", uploaded_by=other_staff, is_dry_run=True,
+    )
+    client.force_login(user)
+
+    assert client.get(reverse("clients:upload_status", args=[own_upload.external_id])).status_code == 200
+    assert client.get(reverse("clients:upload_status", args=[other_upload.external_id])).status_code == 403
+    assert client.get(reverse("clients:upload_report", args=[other_upload.external_id])).status_code == 403
+
+
+@pytest.mark.django_db(databases=["default", "progress"])
+def test_staff_role_users_cannot_cancel_other_uploads(client, django_user_model):
+    from django.utils import timezone
+
+    user, _ = create_staff_user(django_user_model, "caseworker", "Staff")
+    _, other_staff = create_staff_user(django_user_model, "teammate", "Staff")
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=timezone.now(), status="queued", uploaded_by=other_staff,
+    )
+    client.force_login(user)
+
+    response = client.post(reverse("clients:upload_cancel", args=[upload_log.external_id]))
+
+    assert response.status_code == 403
+    upload_log.refresh_from_db()
+    assert upload_log.status == "queued"
+    assert upload_log.cancel_requested_at is None
+
+
+@pytest.mark.django_db(databases=["default", "progress"])
+def test_staff_role_users_cannot_resume_other_uploads(client, django_user_model, monkeypatch):
+    from django.utils import timezone
+    import clients.upload_jobs as upload_jobs
+
+    user, _ = create_staff_user(django_user_model, "caseworker", "Staff")
+    _, other_staff = create_staff_user(django_user_model, "teammate", "Staff")
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=timezone.now(), status="failed", uploaded_by=other_staff,
+    )
+    resumed = []
+    monkeypatch.setattr(upload_jobs, "is_resumable", lambda upload_log: True)
+    monkeypatch.setattr(upload_jobs, "resume_client_upload", lambda *args: resumed.append(args))
+    client.force_login(user)
+
+    response = client.post(reverse("clients:upload_resume", args=[upload_log.external_id]))
+
+    assert response.status_code == 403
+    assert resumed == []
+
+
+@pytest.mark.django_db(databases=["default", "progress"])
+def test_upload_whose_worker_died_can_be_resumed(client, admin_user, monkeypatch, settings, tmp_path):
+    from datetime import timedelta
+    from django.utils import timezone
+    import clients.upload_jobs as upload_jobs
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    long_ago = timezone.now() - upload_jobs.STALE_AFTER - timedelta(minutes=1)
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=long_ago, heartbeat_at=long_ago, status="processing",
+        commit_mode="chunk", checkpoint_row=500,
+    )
+    upload_jobs.store_upload_file(upload_log, build_csv_upload())
+    submitted = []
+    monkeypatch.setattr(upload_jobs, "_submit", lambda *args, **kwargs: submitted.append(args))
+
+    # A recent progress write means the worker is still running
+    ClientUploadLog.objects.filter(pk=upload_log.pk).update(heartbeat_at=timezone.now())
+    upload_log.refresh_from_db()
+    assert not upload_jobs.is_resumable(upload_log)
+    assert not upload_jobs.fail_if_stale(upload_log)
+
+    ClientUploadLog.objects.filter(pk=upload_log.pk).update(heartbeat_at=long_ago)
+    upload_log.refresh_from_db()
+    assert upload_jobs.is_resumable(upload_log)
+
+    client.force_login(admin_user)
+    status = client.get(reverse("clients:upload_status", args=[upload_log.external_id])).json()
+    assert (status["status"], status["resumable"], status["checkpoint_row"]) == ("failed", True, 500)
+
+    response = client.post(reverse("clients:upload_resume", args=[upload_log.external_id]))
+    assert response.status_code == 202
+    assert response.json()["resume_from_row"] == 500
+    upload_log.refresh_from_db()
+    assert upload_log.status == "queued"
+    assert submitted == [(str(upload_log.external_id), admin_user.pk)]
+
+
+@pytest.mark.django_db(databases=["default", "progress"])
+def test_upload_whose_worker_died_can_be_cancelled(monkeypatch, settings, tmp_path):
+    from datetime import timedelta
+    from django.utils import timezone
+    import clients.upload_jobs as upload_jobs
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    long_ago = timezone.now() - upload_jobs.STALE_AFTER - timedelta(minutes=1)
+    upload_log = ClientUploadLog.objects.create(
+        file_name="clients.csv", file_size=1, file_type="csv", source="SMIS",
+        started_at=long_ago, heartbeat_at=long_ago, status="processing",
+    )
+
+    assert upload_jobs.request_cancel(upload_log)
+    upload_log.refresh_from_db()
+    assert upload_log.status == "cancelled"
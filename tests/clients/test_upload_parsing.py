@@ -0,0 +1,60 @@
+import os
+from datetime import date
+
+import django
+import pandas as pd
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_parsing import ChunkParser
+from clients.upload_row_mapper import UploadRowMapper
+
+
+COLUMNS = ["Client ID", "Client", "DOB", "Intake Date"]
+MAPPING = {"Client ID": "client_id", "DOB": "dob", "Intake Date": "intake_date"}
+
+
+def _chunks(rows, size):
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    return [df.iloc[start:start + size] for start in range(0, len(df), size)]
+
+
+def test_parse_row_applies_combined_client_field():
+    mapper = UploadRowMapper(COLUMNS, MAPPING)
+    df = pd.DataFrame([["", "Abdul-Azim,  Safi (1234)", "1990-01-02", "not a date"]], columns=COLUMNS)
+
+    [parsed] = mapper.parse_chunk(df, "SMIS")
+
+    assert parsed.error is None
+    assert parsed.dob == date(1990, 1, 2)
+    assert parsed.intake_date is None
+    assert (parsed.client_data["first_name"], parsed.client_data["last_name"]) == ("Safi", "Abdul-Azim")
+    assert parsed.client_data["client_id"] == "1234"
+
+
+def test_pool_parsing_matches_inline_parsing_in_order():
+    rows = [[str(i), f"Doe, John ({i})", f"1990-01-{i % 28 + 1:02d}", "2024-02-01"] for i in range(60)]
+    mapper = UploadRowMapper(COLUMNS, MAPPING)
+    chunks = _chunks(rows, 10)
+
+    def select(chunk):
+        # Every other chunk is skipped, like the committed chunks of a resumed upload
+        return chunk if chunk.index[0] % 20 == 0 else None
+
+    inline = list(ChunkParser(mapper, "SMIS", len(chunks), workers=1).iter_chunks(chunks, select))
+    parser = ChunkParser(mapper, "SMIS", len(chunks), workers=2).start()
+    try:
+        assert parser.executor is not None
+        pooled = list(parser.iter_chunks(chunks, select))
+    finally:
+        parser.close()
+
+    assert [chunk.index[0] for chunk, _, _ in pooled] == [0, 10, 20, 30, 40, 50]
+    assert [parsed is None for _, _, parsed in pooled] == [False, True, False, True, False, True]
+    for (_, _, expected), (_, _, actual) in zip(inline, pooled):
+        if expected is None:
+            assert actual is None
+            continue
+        assert [row.client_data for row in actual] == [row.client_data for row in expected]
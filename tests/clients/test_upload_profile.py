@@ -0,0 +1,36 @@
+import os
+
+import django
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_profile import UploadProfiler
+
+
+def test_profile_attributes_queries_to_the_running_phase():
+    profiler = UploadProfiler()
+
+    def execute(sql, params, many, context):
+        return "result"
+
+    profiler.enter("preload")
+    assert profiler._record_query(execute, "SELECT 1", None, False, {}) == "result"
+    profiler.enter("match_rows")
+    profiler.start_chunk()
+    profiler._record_query(execute, "SELECT 1", None, False, {})
+    profiler._record_query(execute, "SELECT 2", None, False, {})
+    profiler.end_chunk(1, 250)
+    # Re-entering a phase adds to its totals
+    profiler.enter("preload")
+    profiler._record_query(execute, "SELECT 3", None, False, {})
+
+    profile = profiler.as_dict()
+
+    assert profile["phases"]["preload"]["queries"] == 2
+    assert profile["phases"]["match_rows"]["queries"] == 2
+    assert profile["total_queries"] == 4
+    assert profile["chunks"][0]["chunk"] == 1
+    assert profile["chunks"][0]["rows"] == 250
+    assert profiler.current_phase is None
@@ -0,0 +1,100 @@
+import os
+import random
+from types import SimpleNamespace
+
+import django
+import pytest
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_programs import (
+    ProgramNameResolver, get_program_resolver, program_name_similarity, record_program_aliases,
+)
+from core.models import Department, Program, ProgramNameAlias
+
+
+PROGRAM_NAMES = [
+    "Emergency Shelter", "Youth Shelter North", "Housing First", "Mental Health Outreach",
+    "ES", "Housing Support - East", "Addictions Day Program", "  ", "Outreach",
+]
+
+
+def _programs(names):
+    return [SimpleNamespace(id=position, name=name) for position, name in enumerate(names)]
+
+
+def _scan_all(programs, name):
+    best_match, best_score = None, 0
+    for program in programs:
+        score = program_name_similarity(name, program.name or "")
+        if score > best_score:
+            best_match, best_score = program, score
+    return best_match, best_score
+
+
+@pytest.mark.parametrize("name", [
+    "emergency shelter program", "Shelter", "youth  shelter", "housing", "Mental Health",
+    "ES Downtown", "day program", "Unknown Service", "st", "Outreach Team",
+])
+def test_fuzzy_match_agrees_with_scoring_every_program(name):
+    programs = _programs(PROGRAM_NAMES)
+    resolver = ProgramNameResolver(programs)
+
+    assert resolver.fuzzy_match(name) == _scan_all(programs, name)
+
+
+def test_fuzzy_match_agrees_with_scoring_every_program_on_random_names():
+    rng = random.Random(7)
+    words = ["housing", "shelter", "youth", "east", "es", "day", "program", "first", "h"]
+    programs = _programs([" ".join(rng.sample(words, rng.randint(1, 3))) for _ in range(200)])
+    resolver = ProgramNameResolver(programs)
+
+    for _ in range(300):
+        name = " ".join(rng.sample(words, rng.randint(1, 4)))
+        assert resolver.fuzzy_match(name) == _scan_all(programs, name)
+
+
+def test_resolve_prefers_exact_then_alias_then_fuzzy():
+    programs = _programs([name for name in PROGRAM_NAMES if name.strip()])
+    resolver = ProgramNameResolver(programs, aliases={"es - main site": programs[0]})
+
+    assert resolver.resolve(" housing first ")[::2] == (programs[2], "exact")
+    assert resolver.resolve("ES -  Main Site")[::2] == (programs[0], "alias")
+    assert resolver.resolve("Housing First Plus")[::2] == (programs[2], "fuzzy")
+    assert resolver.resolve("Bike Repair")[0] is None
+
+
+def test_only_programs_that_can_match_are_scored():
+    programs = _programs([f"Program {i} Site" for i in range(2000)] + ["Emergency Shelter"])
+    resolver = ProgramNameResolver(programs)
+
+    assert list(resolver.scores("emergency shelter west")) == [2000]
+
+
+@pytest.mark.django_db
+def test_shared_resolver_is_rebuilt_when_programs_change():
+    department = Department.objects.create(name="Housing")
+    shelter = Program.objects.create(name="Emergency Shelter", department=department, location="Main")
+    resolver = get_program_resolver()
+    assert get_program_resolver() is resolver
+
+    record_program_aliases({"es main": (shelter, 1.0)}, "SMIS")
+    Program.objects.create(name="Youth Shelter", department=department, location="North")
+
+    rebuilt = get_program_resolver()
+    assert rebuilt is not resolver
+    assert rebuilt.resolve("ES  Main")[::2] == (shelter, "alias")
+    assert rebuilt.resolve("youth shelter")[2] == "exact"
+
+
+@pytest.mark.django_db
+def test_weak_fuzzy_matches_are_not_learned_as_aliases():
+    department = Department.objects.create(name="Housing")
+    shelter = Program.objects.create(name="Emergency Shelter", department=department, location="Main")
+    youth = Program.objects.create(name="Youth Shelter", department=department, location="North")
+
+    record_program_aliases({"shelter": (shelter, 0.8), "youth shelter west": (youth, 0.5), "es main": (shelter, 0.9)}, "SMIS")
+
+    assert dict(ProgramNameAlias.objects.values_list("alias", "program_id")) == {"es main": shelter.id}
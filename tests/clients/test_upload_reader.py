@@ -0,0 +1,103 @@
+import io
+import os
+
+import django
+import pandas as pd
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_columns import collect_chunked_upload_keys, collect_upload_keys
+from clients.upload_reader import UploadFileReader, sniff_csv_encoding
+
+
+def _csv_bytes(rows, encoding="utf-8"):
+    text = "Client ID,First Name,Score\n" + "".join(f"{a},{b},{c}\n" for a, b, c in rows)
+    return text.encode(encoding)
+
+
+def test_csv_chunks_match_whole_file_read():
+    rows = [(i, f"Name{i}", i) for i in range(1, 8)]
+    # A float late in the file must widen the column in every chunk
+    rows.append((8, "Name8", 2.5))
+    data = _csv_bytes(rows)
+
+    reader = UploadFileReader(io.BytesIO(data), "csv", chunk_size=3).scan()
+    chunks = list(reader.iter_chunks())
+
+    assert reader.total_rows == 8
+    assert reader.chunk_count == 3
+    assert reader.columns == ["Client ID", "First Name", "Score"]
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+    expected = pd.read_csv(io.BytesIO(data))
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    assert all(chunk["Score"].dtype == expected["Score"].dtype for chunk in chunks)
+    reader.close()
+
+
+def test_column_left_blank_for_a_whole_chunk_matches_whole_file_read():
+    data = b"a,b\n1,x\n,y\n2,z\n"
+
+    reader = UploadFileReader(io.BytesIO(data), "csv", chunk_size=1).scan()
+    chunks = list(reader.iter_chunks())
+
+    expected = pd.read_csv(io.BytesIO(data))
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    assert all(chunk["a"].dtype == expected["a"].dtype for chunk in chunks)
+    reader.close()
+
+
+def test_csv_encoding_is_sniffed_once_from_the_head():
+    data = _csv_bytes([(1, "Zoë", 1)], encoding="latin-1")
+
+    # Same preference order as the old read_csv retry loop
+    assert sniff_csv_encoding(data) == "latin-1"
+    reader = UploadFileReader(io.BytesIO(data), "csv").scan()
+    assert reader.encoding == "latin-1"
+    assert list(next(reader.iter_chunks())["First Name"]) == ["Zoë"]
+
+
+def test_header_only_csv_is_empty_but_keeps_columns():
+    reader = UploadFileReader(io.BytesIO(b"Client ID,First Name\n"), "csv").scan()
+
+    assert reader.empty
+    assert reader.columns == ["Client ID", "First Name"]
+
+
+def test_xlsx_is_read_in_chunks_without_trailing_blank_rows():
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Client ID", "First Name", "DOB"])
+    sheet.append([1, "Alex", "1990-01-02"])
+    sheet.append([None, None, None])
+    sheet.append([2.0, "Sam", None])
+    sheet.append([3, "Lee", "1985-03-04"])
+    sheet.append([None, None, None])
+    data = io.BytesIO()
+    workbook.save(data)
+
+    reader = UploadFileReader(io.BytesIO(data.getvalue()), "xlsx", chunk_size=2).scan()
+    df = pd.concat(list(reader.iter_chunks()))
+
+    # Blank rows inside the data are kept, trailing ones dropped
+    assert reader.total_rows == 4
+    assert reader.chunk_count == 2
+    assert list(df.index) == [0, 1, 2, 3]
+    assert list(df["Client ID"].isna()) == [False, True, False, False]
+    assert df.loc[2, "First Name"] == "Sam"
+
+
+def test_chunked_key_collection_matches_single_pass():
+    data = _csv_bytes([(3, "A", 1), (1, "B", 1), (3, "C", 1), (2, "D", 1)])
+    column_mapping = {"Client ID": "client_id", "First Name": "first_name"}
+    reader = UploadFileReader(io.BytesIO(data), "csv", chunk_size=2).scan()
+
+    keys = collect_chunked_upload_keys(reader.iter_chunks(), reader.columns, column_mapping)
+    expected = collect_upload_keys(pd.read_csv(io.BytesIO(data)), column_mapping)
+
+    assert keys["client_ids"] == expected["client_ids"] == ["3", "1", "2"]
+    assert keys["field_columns"] == expected["field_columns"]
@@ -0,0 +1,86 @@
+import io
+import os
+import csv
+import json
+import pytest
+import django
+from types import SimpleNamespace
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_report import UploadReport, iter_report_csv, iter_report_json
+from core.models import Client, ClientUploadLog
+
+
+def build_csv_upload(rows):
+    csv_io = io.StringIO()
+    writer = csv.writer(csv_io)
+    writer.writerow(["client_id", "first_name", "last_name", "dob"])
+    writer.writerows(rows)
+    return SimpleUploadedFile("clients.csv", csv_io.getvalue().encode("utf-8"), content_type="text/csv")
+
+
+def test_report_records_chunk_outcomes_and_streams_csv_and_json(tmp_path):
+    report = UploadReport(str(tmp_path / "uploads" / "report.jsonl"))
+    existing = SimpleNamespace(client_id="100", first_name="Alex", last_name="Morgan")
+    report.add_chunk(
+        unchanged_indices=[0],
+        clients_to_update=[{"client": existing, "row_index": 1}],
+        clients_to_create=[{
+            "row_index": 2,
+            "client_fields": {"client_id": "101", "first_name": "Sam", "last_name": "Lee"},
+            "duplicate_info": {"is_duplicate": False},
+            "merged_row_indices": [3],
+        }],
+        errors=[
+            "Row 6: Missing all required fields (client_id, first_name).",
+            {"row": 6, "error_message": "missing", "traceback": "..."},
+        ],
+        warnings=["Row 7: Record skipped due to future date(s) in intake_date (2099-01-01)."],
+    )
+
+    assert report.counts == {"unchanged": 1, "update": 1, "create": 1, "merge": 1, "error": 1, "skip": 1}
+
+    rows = list(csv.DictReader(io.StringIO("".join(iter_report_csv(report.path)))))
+    assert [(row["row"], row["action"]) for row in rows] == [
+        ("2", "unchanged"), ("3", "update"), ("4", "create"), ("5", "merge"), ("6", "error"), ("7", "skip"),
+    ]
+
+    document = json.loads("".join(iter_report_json(report.path, {"created": 1})))
+    assert document["summary"] == {"created": 1}
+    assert len(document["rows"]) == 6
+
+
+@pytest.mark.django_db(transaction=True)
+def test_dry_run_processes_rows_and_rolls_back(client, settings, tmp_path):
+    settings.CLIENT_UPLOAD_BACKGROUND = False
+    settings.MEDIA_ROOT = str(tmp_path)
+    Client.objects.create(client_id="4201", first_name="Alex", last_name="Morgan", source="SMIS")
+
+    response = client.post(reverse("clients:upload_process"), {
+        "file": build_csv_upload([
+            ["4201", "Alexander", "Morgan", "1990-01-02"],
+            ["4202", "Sam", "Lee", "1985-03-04"],
+        ]),
+        "source": "SMIS",
+        "dry_run": "true",
+    })
+
+    data = response.json()
+    assert data["dry_run"]
+    assert (data["stats"]["created"], data["stats"]["updated"]) == (1, 1)
+    assert data["report"] == {"update": 1, "create": 1}
+    assert "match_rows" in data["profile"]["phases"]
+
+    # Nothing was kept
+    assert Client.objects.get(client_id="4201").first_name == "Alex"
+    assert not Client.objects.filter(client_id="4202").exists()
+    assert ClientUploadLog.objects.get().is_dry_run
+
+    report = client.get(data["report_urls"]["csv"])
+    rows = list(csv.DictReader(io.StringIO(b"".join(report.streaming_content).decode())))
+    assert {row["action"] for row in rows} == {"update", "create"}
@@ -0,0 +1,90 @@
+import os
+from datetime import date
+
+import django
+import numpy as np
+import pandas as pd
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_row_mapper import UploadRowMapper, clean_client_id, parse_date
+
+
+def _mapper_and_rows(df, column_mapping):
+    mapper = UploadRowMapper(df.columns, column_mapping)
+    return mapper, list(mapper.iter_rows(df))
+
+
+def test_mapped_row_reads_first_mapped_column():
+    df = pd.DataFrame({
+        "Client ID": [2765.0, np.nan],
+        "First Name": [" Alex ", None],
+        "Given Name": ["Ignored", "Sam"],
+        "addresses": ['[{"city": "Toronto"}]', None],
+    })
+    mapper, rows = _mapper_and_rows(df, {
+        "Client ID": "client_id",
+        "First Name": "first_name",
+        "Given Name": "first_name",
+    })
+
+    (first_index, first), (second_index, second) = rows
+    assert (first_index, second_index) == (0, 1)
+    assert first.get("first_name") == "Alex"
+    # Only the first mapped column is consulted, as the chunk loop always did
+    assert second.get("first_name") == ""
+    assert second.get("first_name", "N/A") == "N/A"
+    # Unmapped fields give the default, as they did before the mapper
+    assert first.get("email") == ""
+    assert first.get("address_type", "Home") == "Home"
+    assert first.get_optional("email") is None
+    assert second.get_optional("client_id") is None
+    assert "addresses" in first and first["addresses"].startswith("[")
+    assert mapper.mapped_fields == {"client_id", "first_name"}
+
+
+def test_build_client_data_types_fields():
+    df = pd.DataFrame({
+        "Client ID": ["2765.0"],
+        "Email": ["alex@example.com"],
+        "Pet Owner": ["Yes"],
+        "Household Size": ["3"],
+        "Health Card Expiry": ["45000"],
+        "Gender": [""],
+        "SMIS ID": [" S-1 "],
+    })
+    mapper, rows = _mapper_and_rows(df, {
+        "Client ID": "client_id",
+        "Email": "email",
+        "Pet Owner": "pet_owner",
+        "Household Size": "household_size",
+        "Health Card Expiry": "health_card_exp_date",
+        "Gender": "gender",
+    })
+    _, row = rows[0]
+
+    client_data = mapper.build_client_data(row, "EMHware", dob=date(1990, 1, 2), intake_date=date(2024, 5, 1))
+
+    assert client_data["client_id"] == "2765"
+    assert client_data["contact_information"] == {"email": "alex@example.com", "phone": None}
+    assert client_data["pet_owner"] is True
+    assert client_data["legal_support"] is False
+    assert client_data["household_size"] == 3
+    assert client_data["health_card_exp_date"] == date(2023, 3, 15)
+    assert client_data["gender"] is None
+    assert client_data["intake_date"] == date(2024, 5, 1)
+    assert row.get_source_id("SMIS") == "S-1"
+    assert row.get_source_id("EMHware") is None
+
+
+def test_parse_date_and_clean_client_id_formats():
+    assert parse_date("2024-12-05") == date(2024, 12, 5)
+    assert parse_date("2024-12-05T14:30:00") == date(2024, 12, 5)
+    assert parse_date("2024/12/05") == date(2024, 12, 5)
+    assert parse_date("13/25/2024") is None
+    assert parse_date("", default="missing") == "missing"
+    assert clean_client_id(2765.0) == "2765"
+    assert clean_client_id("12.5") == "12.5"
+    assert clean_client_id("nan") is None
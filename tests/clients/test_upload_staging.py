@@ -0,0 +1,107 @@
+import io
+import os
+import csv
+import pytest
+import django
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+# Ensure Django is configured when running under plain pytest
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ccd.settings")
+django.setup()
+
+from clients.upload_row_mapper import UploadRowMapper
+from clients.upload_staging import can_stage_upload
+from core.models import Client, ClientDuplicate, ClientExtended
+
+
+def build_csv_upload(rows):
+    csv_io = io.StringIO()
+    writer = csv.writer(csv_io)
+    writer.writerow(["client_id", "first_name", "last_name", "dob", "email"])
+    writer.writerows(rows)
+    return SimpleUploadedFile(
+        "clients.csv",
+        csv_io.getvalue().encode("utf-8"),
+        content_type="text/csv",
+    )
+
+
+def test_only_plain_client_files_are_staged(settings):
+    settings.CLIENT_UPLOAD_ENGINE = "staging"
+    plain = UploadRowMapper(["Client ID", "First Name"], {"Client ID": "client_id", "First Name": "first_name"})
+    with_intake = UploadRowMapper(
+        ["Client ID", "First Name", "Program"],
+        {"Client ID": "client_id", "First Name": "first_name", "Program": "program_name"},
+    )
+    # An unmapped 'Name' column is split into first/last names by the chunk loop
+    with_name_column = UploadRowMapper(["Client ID", "Name"], {"Client ID": "client_id"})
+
+    assert can_stage_upload(plain)
+    assert not can_stage_upload(with_intake)
+    assert not can_stage_upload(with_name_column)
+
+    settings.CLIENT_UPLOAD_ENGINE = "python"
+    assert not can_stage_upload(plain)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_staged_upload_creates_and_updates_clients(client, settings):
+    settings.CLIENT_UPLOAD_BACKGROUND = False
+    settings.CLIENT_UPLOAD_ENGINE = "staging"
+    existing = Client.objects.create(
+        client_id="3001", first_name="Alex", last_name="Morgan", source="SMIS", smis_id="3001"
+    )
+
+    response = client.post(reverse("clients:upload_process"), {
+        "file": build_csv_upload([
+            ["3001", "Alexander", "Morgan", "1990-01-02", ""],
+            ["3002", "Sam", "Lee", "1985-03-04", "Sam@Example.com"],
+            ["", "Sam", "Lee", "1985-03-04", ""],
+            ["", "", "", "", ""],
+        ]),
+        "source": "SMIS",
+    })
+
+    stats = response.json()["stats"]
+    assert (stats["created"], stats["updated"], stats["skipped"]) == (1, 1, 1)
+
+    existing.refresh_from_db()
+    assert existing.first_name == "Alexander"
+    assert {"source": "SMIS", "client_id": "3001"} in existing.legacy_client_ids
+
+    # The second Sam Lee row merges into the client created for the first one
+    created = Client.objects.get(client_id="3002")
+    assert created.smis_id == "3002"
+    assert created.contact_information["email"] == "Sam@Example.com"
+    assert Client.objects.filter(first_name="Sam", last_name="Lee").count() == 1
+    assert ClientExtended.objects.filter(client=created).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_staged_upload_checks_names_against_other_source_clients(client, settings):
+    settings.CLIENT_UPLOAD_BACKGROUND = False
+    settings.CLIENT_UPLOAD_ENGINE = "staging"
+    katherine = Client.objects.create(first_name="Katherine", last_name="Moreau", source="EMHware", emhware_id="E1")
+    jonathan = Client.objects.create(
+        first_name="Jonathan", last_name="Fitzgerald", dob="1970-05-06", source="EMHware", emhware_id="E2",
+    )
+    Client.objects.bulk_create([
+        Client(first_name=f"Other{number}", last_name="Person", source="EMHware") for number in range(50)
+    ])
+
+    response = client.post(reverse("clients:upload_process"), {
+        "file": build_csv_upload([
+            ["5001", "Catherine", "Moreau", "1991-01-01", ""],
+            ["5002", "Jonathon", "Fitzgerald", "1970-05-06", ""],
+        ]),
+        "source": "SMIS",
+    })
+
+    stats = response.json()["stats"]
+    assert (stats["created"], stats["updated"]) == (1, 1)
+    # Same DOB merges into the other source's client, a different one is flagged
+    jonathan.refresh_from_db()
+    assert jonathan.smis_id == "5002"
+    flagged = ClientDuplicate.objects.get(primary_client=katherine)
+    assert flagged.duplicate_client.client_id == "5001"
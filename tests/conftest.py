@@ -0,0 +1,17 @@
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: upload throughput benchmarks against a local database (run with -m benchmark)"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Benchmarks are slow and need a real database; only run them when selected
+    if "benchmark" in (config.getoption("markexpr") or ""):
+        return
+    skip = pytest.mark.skip(reason="benchmark: run with -m benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)